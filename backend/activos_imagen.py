@@ -0,0 +1,98 @@
+"""
+Una imagen maestra por publicación y sus variantes por red
+
+En una publicación multi-red, Instagram pedía una imagen a Stability y
+WhatsApp otra casi igual (desde el chat, lo mismo Facebook e Instagram).
+ImagenPost genera una sola imagen y de ella se derivan localmente las
+variantes de cada red. El prompt es el adaptado de la red con más peso
+visual (prompt_maestro: Instagram, luego Facebook, luego WhatsApp), elegido
+cuando ya terminó la adaptación; solo si ninguna adaptación lo trae, se usa
+el del primero que pide la imagen.
+
+- tamaño, formato y peso según el perfil de la red (ver imagen_redes)
+- entrega: URL pública (ver llm_service.publicar_imagen) o data URL (ENTREGA)
+
+ImagenPost es seguro entre hilos: si dos redes piden la imagen a la vez,
+la segunda espera a la primera en lugar de generar otra.
+"""
+import base64
+import threading
+
+import imagen_redes
+import imagen_service
+import llm_service
+
+# Redes cuyo prompt adaptado define la imagen maestra, en orden de prioridad
+PRIORIDAD_PROMPT = ("instagram", "facebook", "whatsapp")
+
+ENTREGA = {
+    "instagram": "url",
+    "facebook": "url",
+    "whatsapp": "data_url",
+}
+
+
+def prompt_maestro(adaptaciones: dict) -> str:
+    """suggested_image_prompt de la red con más prioridad (None si ninguna lo trae)"""
+    for red in PRIORIDAD_PROMPT:
+        adaptacion = adaptaciones.get(red) or {}
+        if "error" not in adaptacion and adaptacion.get("suggested_image_prompt"):
+            return adaptacion["suggested_image_prompt"]
+    return None
+
+
+class ImagenPost:
+    """Imagen maestra de una publicación, generada una sola vez"""
+
+    def __init__(self, prompt: str = None):
+        # Con `prompt` fijo (ver prompt_maestro) se ignora el de cada red
+        self.prompt = prompt
+        self._intentada = False
+        self._maestra = None
+        self._variantes = {}
+        self._lock = threading.Lock()
+
+    def maestra(self, prompt: str) -> dict:
+        """
+        La imagen maestra ({"bytes", "mime", "proveedor"}); la genera con
+        self.prompt (o `prompt`, si no se fijó) si todavía no existe. None si ningún proveedor pudo (o si
+        solo hubo un marcador de posición, ver imagen_service.publicable).
+        """
+        with self._lock:
+            if not self._intentada:
+                self._intentada = True
+                self.prompt = self.prompt or prompt
+                try:
+                    imagen = imagen_service.generar_imagen(self.prompt)
+                    if imagen_service.publicable(imagen):
+                        self._maestra = imagen
+                except Exception as e:
+                    print(f"❌ Error generando la imagen maestra: {type(e).__name__}: {e}")
+            elif self._maestra is not None and self.prompt != prompt:
+                print("♻️ Reutilizando la imagen maestra de la publicación")
+            return self._maestra
+
+    def variante(self, red: str, prompt: str) -> str:
+        """URL o data URL de la imagen para `red` (None si no hay imagen)"""
+        imagen = self.maestra(prompt)
+        if imagen is None:
+            return None
+
+        with self._lock:
+            if red in self._variantes:
+                return self._variantes[red]
+
+        try:
+            imagen = imagen_redes.preparar(imagen, red)
+            if ENTREGA.get(red, "url") == "data_url":
+                resultado = f"data:{imagen['mime']};base64,{base64.b64encode(imagen['bytes']).decode('ascii')}"
+            else:
+                resultado = llm_service.publicar_imagen(imagen["bytes"], imagen["mime"])
+        except Exception as e:
+            print(f"❌ Error preparando la imagen para {red}: {type(e).__name__}: {e}")
+            return None
+
+        with self._lock:
+            self._variantes[red] = resultado
+        print(f"🖼️ Variante para {red} lista ({len(imagen['bytes']) // 1024} KB)")
+        return resultado
@@ -31,6 +31,22 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class UsuarioActual(BaseModel):
+    """
+    Usuario autenticado de un request (caché o claims del token).
+    Solo lectura y sin sesión de DB: para modificarlo, consultar el User.
+    """
+    id: int
+    username: str
+    email: str
+    created_at: Optional[datetime] = None
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
+
 class Token(BaseModel):
     """Schema de token de acceso"""
     access_token: str
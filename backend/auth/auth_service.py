@@ -1,15 +1,27 @@
 """
 Servicio de autenticación
 """
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 from .models import User
+from . import token_store, tokens_firmados
+from .auth_schemas import UsuarioActual
+import cache_service
 import secrets
 from typing import Optional
 import os
-from datetime import datetime, timedelta
 
-# Almacenamiento simple de tokens en memoria (para producción usar Redis)
-active_tokens = {}
+# Tokens de sesión compartidos entre workers (TOKEN_STORE: memoria, redis, postgres)
+tokens = token_store.crear_store()
+
+# Usuarios por id para get_current_user (el sidebar consulta seguido). Es
+# por worker: after_update/after_delete invalidan en este worker (otra vez
+# tras el commit, ver abajo) y el TTL acota lo que otro worker puede servir
+# desactualizado. Los UPDATE masivos (query(...).update()) no disparan los
+# eventos: invalidar a mano.
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60))
+CAMPOS_CACHE_USUARIO = ("id", "username", "email", "created_at", "is_active")
+cache_usuarios = cache_service.crear_cache("usuarios", maxsize=4096, ttl=USER_CACHE_TTL, backend="memoria")
 
 
 def create_user(db: Session, username: str, email: str, password: str) -> User:
@@ -58,41 +70,117 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
 
 
 def create_access_token(user: User) -> str:
-    """Crea un token con expiración de 7 días"""
+    """Crea un token: opaco por TOKEN_EXPIRATION_DAYS, o firmado por JWT_TTL si AUTH_TOKEN_MODE=jwt"""
+    if tokens_firmados.activo():
+        return tokens_firmados.emitir(user)
+    
     token = secrets.token_urlsafe(32)
     
     # Obtener días de expiración desde .env
     expiration_days = int(os.getenv("TOKEN_EXPIRATION_DAYS", 7))
-    expires_at = datetime.utcnow() + timedelta(days=expiration_days)
     
-    active_tokens[token] = {
-        "user_id": user.id,
-        "expires_at": expires_at
-    }
+    # El store expira el token solo (no hace falta revisarlo al verificar)
+    tokens.guardar(token, user.id, ttl=expiration_days * 24 * 3600)
     return token
 
 
-def verify_token(token: str, db: Session) -> Optional[User]:
+def verify_token(token: str, db: Session) -> Optional[UsuarioActual]:
     """Verifica token y su expiración"""
-    token_data = active_tokens.get(token)
+    # Los tokens firmados se validan sin store ni DB; los opacos emitidos
+    # antes de pasar a AUTH_TOKEN_MODE=jwt siguen valiendo hasta vencer
+    if tokens_firmados.parece_jwt(token):
+        return tokens_firmados.verificar(token)
     
-    if not token_data:
+    try:
+        user_id = tokens.obtener(token)
+    except Exception as e:
+        print(f"⚠️ Almacén de tokens no disponible: {e}")
         return None
     
-    # Verificar si expiró
-    if datetime.utcnow() > token_data["expires_at"]:
-        del active_tokens[token]  # Eliminar token expirado
+    if user_id is None:
         return None
     
-    user = db.query(User).filter(User.id == token_data["user_id"]).first()
-    return user
+    return get_user_cached(db, user_id)
+
+
+def get_user_cached(db: Session, user_id: int) -> Optional[UsuarioActual]:
+    """
+    Usuario activo por id, desde la caché o (en un miss) desde la DB.
+    Devuelve un UsuarioActual de solo lectura, no un User de la sesión.
+
+    La caché es de este proceso: un cambio hecho en otro worker se ve
+    aquí recién cuando vence USER_CACHE_TTL.
+    """
+    def cargar():
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            return None
+        return {campo: getattr(user, campo) for campo in CAMPOS_CACHE_USUARIO}
+    
+    datos = cache_usuarios.obtener_o_calcular(str(user_id), cargar)
+    if datos is None or not datos["is_active"]:
+        return None
+    return UsuarioActual(**datos)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidar_usuario_cacheado(mapper, connection, user):
+    """
+    Un usuario modificado (p. ej. desactivado) se vuelve a leer de la DB.
+    El flush ocurre antes del commit: un request concurrente puede volver
+    a cachear la fila vieja en ese intervalo, así que el id se guarda en la
+    sesión y se invalida de nuevo en after_commit.
+    """
+    cache_usuarios.invalidar(str(user.id))
+    _anotar(user, "usuarios_modificados")
+    if not user.is_active:
+        _anotar(user, "usuarios_desactivados")
+
+
+@event.listens_for(User, "after_delete")
+def _revocar_usuario_borrado(mapper, connection, user):
+    _anotar(user, "usuarios_desactivados")
+
+
+def _anotar(user: User, clave: str):
+    sesion = object_session(user)
+    if sesion is not None:
+        sesion.info.setdefault(clave, set()).add(user.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_usuarios_al_confirmar(sesion):
+    for user_id in sesion.info.pop("usuarios_modificados", ()):
+        cache_usuarios.invalidar(str(user_id))
+
+    # Los tokens firmados llevan "act" del momento de emisión: un usuario
+    # desactivado o borrado no debe seguir entrando hasta que venzan
+    for user_id in sesion.info.pop("usuarios_desactivados", ()):
+        try:
+            tokens_firmados.revocar_usuario(user_id)
+        except Exception as e:
+            print(f"⚠️ No se pudieron revocar los tokens firmados del usuario {user_id}: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_usuarios_modificados(sesion):
+    sesion.info.pop("usuarios_modificados", None)
+    sesion.info.pop("usuarios_desactivados", None)
 
 
 def logout_user(token: str):
     """
     Elimina el token (logout)
     """
-    if token in active_tokens:
-        del active_tokens[token]
-        return True
-    return False
\ No newline at end of file
+    if tokens_firmados.parece_jwt(token):
+        return tokens_firmados.revocar(token)
+    return tokens.revocar(token)
+
+
+def logout_all(user_id: int) -> int:
+    """
+    Revoca todas las sesiones de un usuario (p. ej. tras cambiar la contraseña)
+    """
+    tokens_firmados.revocar_usuario(user_id)
+    return tokens.revocar_usuario(user_id)
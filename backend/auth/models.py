@@ -1,7 +1,7 @@
 """
 Modelos de base de datos para el sistema de autenticación
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import hashlib
@@ -31,4 +31,16 @@ class User(Base):
         return hashlib.sha256(password.encode()).hexdigest()
     
     def __repr__(self):
-        return f"<User(username='{self.username}', email='{self.email}')>"
\ No newline at end of file
+        return f"<User(username='{self.username}', email='{self.email}')>"
+
+
+class AuthToken(Base):
+    """Token de sesión activo (backend "postgres" de token_store)"""
+    __tablename__ = "auth_tokens"
+    
+    token_hash = Column(String(64), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)
+    
+    def __repr__(self):
+        return f"<AuthToken(user_id={self.user_id}, expires_at={self.expires_at})>"
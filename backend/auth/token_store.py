@@ -0,0 +1,198 @@
+"""
+Almacén de tokens de sesión compartido entre workers
+
+Los tokens vivían en un dict del módulo: cada worker de uvicorn tenía los
+suyos (un login en un worker no servía en otro) y se perdían al reiniciar.
+Acá el almacenamiento es intercambiable (variable TOKEN_STORE):
+
+- "memoria" (por defecto): en el proceso; para desarrollo y un solo worker
+- "redis": compartido (REDIS_URL); cada token expira solo con su TTL
+- "postgres": tabla auth_tokens en la misma base que los usuarios
+  (DATABASE_URL); los vencidos no se devuelven y se purgan cada
+  PURGA_SEGUNDOS
+
+Todos guardan la huella SHA-256 del token, no el token en sí, y llevan un
+índice por usuario para revocar todas sus sesiones de una vez.
+"""
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from cachetools import TLRUCache
+
+TOKEN_STORE = os.getenv("TOKEN_STORE", "memoria")
+TOKEN_STORE_MAX = int(os.getenv("TOKEN_STORE_MAX", 100000))
+PURGA_SEGUNDOS = int(os.getenv("TOKEN_STORE_PURGA", 3600))
+
+
+def huella(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenStore:
+    """Interfaz común de los backends"""
+
+    nombre = "base"
+
+    def guardar(self, token: str, user_id: int, ttl: int):
+        """Registra `token` de `user_id`; deja de ser válido en `ttl` segundos"""
+        raise NotImplementedError
+
+    def obtener(self, token: str):
+        """user_id del token, o None si no existe o expiró"""
+        raise NotImplementedError
+
+    def revocar(self, token: str) -> bool:
+        """Invalida un token; True si estaba activo"""
+        raise NotImplementedError
+
+    def revocar_usuario(self, user_id: int) -> int:
+        """Invalida todas las sesiones de un usuario; devuelve cuántas eran"""
+        raise NotImplementedError
+
+
+class StoreMemoria(TokenStore):
+    """TLRUCache con expiración por entrada y un índice usuario -> tokens"""
+
+    nombre = "memoria"
+
+    def __init__(self, maxsize: int = TOKEN_STORE_MAX):
+        self._tokens = TLRUCache(maxsize=maxsize, ttu=lambda clave, valor, ahora: ahora + valor[1])
+        self._por_usuario = {}
+        self._lock = threading.Lock()
+
+    def guardar(self, token: str, user_id: int, ttl: int):
+        clave = huella(token)
+        with self._lock:
+            self._tokens[clave] = (user_id, ttl)
+            vigentes = {t for t in self._por_usuario.get(user_id, ()) if t in self._tokens}
+            vigentes.add(clave)
+            self._por_usuario[user_id] = vigentes
+
+    def obtener(self, token: str):
+        with self._lock:
+            valor = self._tokens.get(huella(token))
+        return valor[0] if valor else None
+
+    def revocar(self, token: str) -> bool:
+        with self._lock:
+            return self._tokens.pop(huella(token), None) is not None
+
+    def revocar_usuario(self, user_id: int) -> int:
+        with self._lock:
+            claves = self._por_usuario.pop(user_id, set())
+            return sum(1 for clave in claves if self._tokens.pop(clave, None) is not None)
+
+
+class StoreRedis(TokenStore):
+    """token:<huella> -> user_id con EX; tokens_usuario:<id> es un SET de huellas"""
+
+    nombre = "redis"
+
+    def __init__(self, url: str = None):
+        import redis
+        self._redis = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"), socket_timeout=1)
+
+    def guardar(self, token: str, user_id: int, ttl: int):
+        clave = huella(token)
+        indice = f"tokens_usuario:{user_id}"
+        with self._redis.pipeline() as pipe:
+            pipe.set(f"token:{clave}", user_id, ex=ttl)
+            pipe.sadd(indice, clave)
+            # El índice vive lo que su token más nuevo (todos duran lo mismo)
+            pipe.expire(indice, ttl)
+            pipe.execute()
+
+    def obtener(self, token: str):
+        valor = self._redis.get(f"token:{huella(token)}")
+        return int(valor) if valor is not None else None
+
+    def revocar(self, token: str) -> bool:
+        clave = huella(token)
+        user_id = self._redis.getdel(f"token:{clave}")
+        if user_id is None:
+            return False
+        self._redis.srem(f"tokens_usuario:{int(user_id)}", clave)
+        return True
+
+    def revocar_usuario(self, user_id: int) -> int:
+        indice = f"tokens_usuario:{user_id}"
+        claves = [c.decode() if isinstance(c, bytes) else c for c in self._redis.smembers(indice)]
+        with self._redis.pipeline() as pipe:
+            for clave in claves:
+                pipe.delete(f"token:{clave}")
+            pipe.delete(indice)
+            borrados = pipe.execute()
+        return sum(borrados[:len(claves)])
+
+
+class StorePostgres(TokenStore):
+    """Tabla auth_tokens (ver models.AuthToken), con una sesión por operación"""
+
+    nombre = "postgres"
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from .database import SessionLocal as session_factory
+        self._sesion = session_factory
+        self._ultima_purga = 0.0
+
+    def _purgar(self, db):
+        ahora = time.monotonic()
+        if ahora - self._ultima_purga < PURGA_SEGUNDOS:
+            return
+        self._ultima_purga = ahora
+        from .models import AuthToken
+        db.query(AuthToken).filter(AuthToken.expires_at <= datetime.utcnow()).delete(synchronize_session=False)
+
+    def guardar(self, token: str, user_id: int, ttl: int):
+        from .models import AuthToken
+        with self._sesion() as db:
+            self._purgar(db)
+            db.merge(AuthToken(
+                token_hash=huella(token),
+                user_id=user_id,
+                expires_at=datetime.utcnow() + timedelta(seconds=ttl)
+            ))
+            db.commit()
+
+    def obtener(self, token: str):
+        from .models import AuthToken
+        with self._sesion() as db:
+            fila = db.query(AuthToken.user_id).filter(
+                AuthToken.token_hash == huella(token),
+                AuthToken.expires_at > datetime.utcnow()
+            ).first()
+        return fila[0] if fila else None
+
+    def revocar(self, token: str) -> bool:
+        from .models import AuthToken
+        with self._sesion() as db:
+            borrados = db.query(AuthToken).filter(AuthToken.token_hash == huella(token)).delete()
+            db.commit()
+        return borrados > 0
+
+    def revocar_usuario(self, user_id: int) -> int:
+        from .models import AuthToken
+        with self._sesion() as db:
+            borrados = db.query(AuthToken).filter(AuthToken.user_id == user_id).delete()
+            db.commit()
+        return borrados
+
+
+STORES = {
+    "memoria": StoreMemoria,
+    "redis": StoreRedis,
+    "postgres": StorePostgres,
+}
+
+
+def crear_store(backend: str = None) -> TokenStore:
+    """Instancia el backend indicado (por defecto TOKEN_STORE)"""
+    backend = backend or TOKEN_STORE
+    if backend not in STORES:
+        raise ValueError(f"TOKEN_STORE desconocido: {backend} (opciones: {', '.join(STORES)})")
+    print(f"🔐 Tokens de sesión en: {backend}")
+    return STORES[backend]()
@@ -0,0 +1,184 @@
+"""
+Tokens de acceso firmados (JWT) sin consulta por request
+
+Con tokens opacos, cada request autenticado busca el token en el store
+(ver token_store) y después al usuario en Postgres. En modo firmado
+(AUTH_TOKEN_MODE=jwt) el token lleva en sus claims lo que necesitan los
+endpoints (id, username, email, activo, expiración) y se valida solo con
+la firma:
+
+- Rotación de claves: JWT_KEYS="kid1:secreto1,kid2:secreto2". Se firma
+  con la primera y se aceptan todas (el header "kid" indica cuál); para
+  rotar, se agrega la nueva adelante y se quita la vieja cuando vencen
+  sus tokens.
+- Revocación: logout guarda el jti y logout-all un "no antes de" por
+  usuario, solo hasta que vence el token (JWT_REVOCACION: "redis"
+  compartido por defecto, una sola consulta MGET por request, o "memoria"
+  solo con un worker; con WEB_CONCURRENCY > 1 no arranca). Desactivar o borrar un
+  usuario también lo revoca (ver auth_service). El "no antes de" se
+  compara en microsegundos con el claim "iat_us": "iat" solo tiene
+  segundos y rechazaría un login hecho en el mismo segundo que el logout-all.
+- Vida corta: JWT_TTL_MINUTOS (15 por defecto), porque los claims (p. ej.
+  "act") se fijan al emitir.
+"""
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+
+import jwt
+from cachetools import TLRUCache
+
+from .auth_schemas import UsuarioActual
+from .models import User
+
+AUTH_TOKEN_MODE = os.getenv("AUTH_TOKEN_MODE", "opaco")
+JWT_ALGORITMO = "HS256"
+JWT_TTL = int(os.getenv("JWT_TTL_SEGUNDOS", int(os.getenv("JWT_TTL_MINUTOS", 15)) * 60))
+JWT_REVOCACION = os.getenv("JWT_REVOCACION", "redis" if AUTH_TOKEN_MODE == "jwt" else "memoria")
+WORKERS = int(os.getenv("WEB_CONCURRENCY", 1))
+
+
+def cargar_claves(valor: str = None) -> dict:
+    """{kid: secreto} desde JWT_KEYS, en orden (la primera firma)"""
+    valor = os.getenv("JWT_KEYS", "") if valor is None else valor
+    claves = {}
+    for par in filter(None, (p.strip() for p in valor.split(","))):
+        kid, separador, secreto = par.partition(":")
+        if not separador or not kid or not secreto:
+            raise ValueError("JWT_KEYS debe tener la forma kid:secreto[,kid:secreto...]")
+        claves[kid] = secreto
+    return claves
+
+
+CLAVES = cargar_claves()
+
+
+def activo() -> bool:
+    """Los tokens nuevos se emiten firmados"""
+    return AUTH_TOKEN_MODE == "jwt"
+
+
+def comprobar_revocacion(backend: str = JWT_REVOCACION, workers: int = WORKERS):
+    """
+    Con varios workers, una revocación en memoria solo la vería el worker
+    que atendió el logout: se exige redis.
+    """
+    if backend == "memoria" and workers > 1:
+        raise ValueError(
+            f"JWT_REVOCACION=memoria no sirve con {workers} workers (WEB_CONCURRENCY); usar JWT_REVOCACION=redis"
+        )
+
+
+def parece_jwt(token: str) -> bool:
+    return token.count(".") == 2
+
+
+class ListaRevocacion:
+    """jti revocados y "no antes de" por usuario, con expiración por entrada"""
+
+    def __init__(self, backend: str = JWT_REVOCACION, maxsize: int = 100000):
+        self.backend = backend
+        if backend == "redis":
+            import redis
+            self._redis = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), socket_timeout=1)
+        else:
+            self._memoria = TLRUCache(maxsize=maxsize, ttu=lambda clave, valor, ahora: ahora + valor[1])
+            self._lock = threading.Lock()
+
+    def agregar(self, clave: str, valor: int, ttl: int):
+        if ttl <= 0:
+            return
+        if self.backend == "redis":
+            self._redis.set(f"revocado:{clave}", valor, ex=ttl)
+        else:
+            with self._lock:
+                self._memoria[clave] = (valor, ttl)
+
+    def consultar(self, *claves) -> list:
+        if self.backend == "redis":
+            return [int(v) if v is not None else None for v in self._redis.mget([f"revocado:{c}" for c in claves])]
+        with self._lock:
+            return [self._memoria.get(c, (None,))[0] for c in claves]
+
+
+if activo():
+    comprobar_revocacion()
+
+revocados = ListaRevocacion()
+
+
+def emitir(user: User, ttl: int = None) -> str:
+    """Token firmado con la primera clave de JWT_KEYS"""
+    if not CLAVES:
+        raise ValueError("AUTH_TOKEN_MODE=jwt requiere JWT_KEYS")
+    kid, secreto = next(iter(CLAVES.items()))
+    ahora_us = time.time_ns() // 1000
+    ahora = ahora_us // 1_000_000
+    claims = {
+        "sub": str(user.id),
+        "username": user.username,
+        "email": user.email,
+        "act": bool(user.is_active),
+        "created_at": int(user.created_at.replace(tzinfo=timezone.utc).timestamp()) if user.created_at else None,
+        "iat": ahora,
+        "iat_us": ahora_us,
+        "exp": ahora + (ttl or JWT_TTL),
+        "jti": secrets.token_urlsafe(12),
+    }
+    return jwt.encode(claims, secreto, algorithm=JWT_ALGORITMO, headers={"kid": kid})
+
+
+def decodificar(token: str):
+    """Claims del token si la firma, la clave y la expiración son válidas; si no, None"""
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+        secreto = CLAVES.get(kid)
+        if secreto is None:
+            return None
+        return jwt.decode(token, secreto, algorithms=[JWT_ALGORITMO], options={"require": ["sub", "exp", "iat", "jti"]})
+    except jwt.PyJWTError:
+        return None
+
+
+def verificar(token: str):
+    """
+    Usuario (UsuarioActual, de solo lectura) armado desde los claims, o None
+    si el token es inválido, expiró, está revocado o el usuario inactivo.
+    """
+    claims = decodificar(token)
+    if claims is None or not claims.get("act", False):
+        return None
+
+    try:
+        jti_revocado, no_antes = revocados.consultar(f"jti:{claims['jti']}", f"usuario:{claims['sub']}")
+    except Exception as e:
+        print(f"⚠️ Lista de revocación no disponible: {e}")
+        return None
+    emitido_us = claims.get("iat_us", claims["iat"] * 1_000_000)
+    if jti_revocado is not None or (no_antes is not None and emitido_us <= no_antes):
+        return None
+
+    created_at = claims.get("created_at")
+    return UsuarioActual(
+        id=int(claims["sub"]),
+        username=claims.get("username"),
+        email=claims.get("email"),
+        is_active=True,
+        created_at=datetime.utcfromtimestamp(created_at) if created_at is not None else None,
+    )
+
+
+def revocar(token: str) -> bool:
+    """Logout de un token firmado (hasta que vence)"""
+    claims = decodificar(token)
+    if claims is None:
+        return False
+    revocados.agregar(f"jti:{claims['jti']}", int(claims["sub"]), claims["exp"] - int(time.time()))
+    return True
+
+
+def revocar_usuario(user_id: int):
+    """Invalida los tokens firmados del usuario emitidos hasta ahora"""
+    revocados.agregar(f"usuario:{user_id}", time.time_ns() // 1000, JWT_TTL)
@@ -0,0 +1,77 @@
+"""
+Caché en disco de narraciones TTS ya aceleradas
+
+generar_audio_gTTS llama a gTTS (ida y vuelta por red) y después acelera
+el audio con FFmpeg. Con el mismo texto (p. ej. al reintentar una subida
+a TikTok que falló) el resultado es idéntico, así que se guarda el audio
+final y la siguiente vez se saltan gTTS y FFmpeg.
+
+- Clave: hash del texto limpio + motor + idioma + velocidad
+- tts_service también guarda acá cada oración (a velocidad 1.0)
+- Mismo tope/LRU que la caché de clips (ver cache_clips.CacheClips)
+- Quien pide el audio recibe su propia copia: puede borrarla al terminar
+- AUDIO_CACHE_DESACTIVADO=true genera siempre
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from cache_clips import CacheClips
+
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "audio_tts"))
+AUDIO_CACHE_MAX_MB = int(os.getenv("AUDIO_CACHE_MAX_MB", 256))
+AUDIO_CACHE_DESACTIVADO = os.getenv("AUDIO_CACHE_DESACTIVADO", "false").lower() == "true"
+
+cache = CacheClips(AUDIO_CACHE_DIR, max_mb=AUDIO_CACHE_MAX_MB, extension=".mp3")
+
+
+def clave_audio(texto: str, idioma: str, velocidad: float, motor: str = "gtts") -> tuple:
+    """(hash del texto normalizado, perfil) para CacheClips"""
+    texto_normalizado = " ".join(texto.split())
+    digest = hashlib.sha256(texto_normalizado.encode("utf-8")).hexdigest()[:32]
+    return digest, f"{motor}_{idioma}_x{velocidad:g}"
+
+
+def _enlazar_o_copiar(origen: str, destino: str):
+    # Un hard link no copia bytes; si el directorio está en otro disco, se copia
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copyfile(origen, destino)
+
+
+def obtener(texto: str, idioma: str, velocidad: float, motor: str = "gtts") -> str:
+    """Copia de trabajo del audio en caché (o None)"""
+    if AUDIO_CACHE_DESACTIVADO:
+        return None
+
+    ruta = cache.obtener(*clave_audio(texto, idioma, velocidad, motor))
+    if not ruta:
+        return None
+
+    copia = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3").name
+    try:
+        os.unlink(copia)
+        _enlazar_o_copiar(ruta, copia)
+    except OSError as e:
+        # Desalojado entre obtener() y la copia: se genera de nuevo
+        print(f"⚠️ No se pudo usar el audio en caché: {e}")
+        return None
+    return copia
+
+
+def guardar(ruta: str, texto: str, idioma: str, velocidad: float, motor: str = "gtts"):
+    """Guarda una copia de `ruta` (que sigue siendo de quien la generó)"""
+    if AUDIO_CACHE_DESACTIVADO:
+        return
+
+    clave = clave_audio(texto, idioma, velocidad, motor)
+    temporal = cache.ruta_temporal(*clave)
+    try:
+        _enlazar_o_copiar(ruta, temporal)
+        cache.guardar(temporal, *clave)
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar el audio en caché: {e}")
+        if os.path.exists(temporal):
+            os.unlink(temporal)
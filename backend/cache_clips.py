@@ -0,0 +1,141 @@
+"""
+Caché en disco de clips de Pexels ya normalizados
+
+Los clips de respaldo ("university campus students walking", los videos
+de emergencia, etc.) se repiten en casi todos los videos de TikTok. En vez
+de descargarlos y re-escalarlos cada vez, se guarda cada clip ya
+convertido al perfil de salida (resolución, fps, codificador). Así el
+render final solo concatena con -c:v copy.
+
+- Clave: id del video de Pexels + perfil (p. ej. 3209828_540x960_25fps_rapido)
+- Tope de tamaño (CLIPS_CACHE_MAX_MB) con desalojo LRU por fecha de uso:
+  cada acierto actualiza solo el atime; el mtime queda como fecha de
+  escritura, así media_probe sigue reconociendo el archivo (su caché usa
+  ruta + tamaño + mtime)
+- Las entradas usadas hace menos de CLIPS_CACHE_PROTECCION segundos no se
+  desalojan (pueden estar en medio de un render)
+- CLIPS_CACHE_DESACTIVADO=true vuelve al render de una sola pasada
+"""
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+
+CLIPS_CACHE_DIR = os.getenv("CLIPS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "clips_tiktok"))
+CLIPS_CACHE_MAX_MB = int(os.getenv("CLIPS_CACHE_MAX_MB", 2048))
+CLIPS_CACHE_PROTECCION = int(os.getenv("CLIPS_CACHE_PROTECCION", 600))
+CLIPS_CACHE_DESACTIVADO = os.getenv("CLIPS_CACHE_DESACTIVADO", "false").lower() == "true"
+
+# https://videos.pexels.com/video-files/3209828/3209828-uhd_2160_3840_25fps.mp4
+_PATRON_ID_PEXELS = re.compile(r"/video-files/(\d+)/|/videos/(\d+)/|/(\d+)-(?:uhd|hd|sd)_")
+
+
+def id_video(url: str) -> str:
+    """Id de Pexels del clip (igual para todas sus resoluciones) o hash de la URL"""
+    coincidencia = _PATRON_ID_PEXELS.search(url)
+    if coincidencia:
+        return next(grupo for grupo in coincidencia.groups() if grupo)
+    return "url-" + hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+class CacheClips:
+    """Directorio de segmentos listos para concatenar, con tope y LRU"""
+
+    def __init__(self, directorio: str = CLIPS_CACHE_DIR, max_mb: int = CLIPS_CACHE_MAX_MB,
+                 proteccion: int = CLIPS_CACHE_PROTECCION, extension: str = ".mp4"):
+        self.directorio = directorio
+        self.extension = extension
+        self.max_bytes = max_mb * 1024 * 1024
+        self.proteccion = proteccion
+        self._lock = threading.Lock()
+
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojados = 0
+
+    def _ruta(self, video_id: str, perfil: str) -> str:
+        return os.path.join(self.directorio, f"{video_id}_{perfil}{self.extension}")
+
+    def obtener(self, video_id: str, perfil: str) -> str:
+        """Ruta del segmento si está en caché (y lo marca como recién usado)"""
+        ruta = self._ruta(video_id, perfil)
+        try:
+            stat = os.stat(ruta)
+            os.utime(ruta, ns=(time.time_ns(), stat.st_mtime_ns))
+        except OSError:
+            with self._lock:
+                self.fallos += 1
+            return None
+
+        with self._lock:
+            self.aciertos += 1
+        return ruta
+
+    def ruta_temporal(self, video_id: str, perfil: str) -> str:
+        """Archivo donde escribir un segmento nuevo antes de guardarlo"""
+        os.makedirs(self.directorio, exist_ok=True)
+        return os.path.join(self.directorio, f".{video_id}_{perfil}.{os.getpid()}.{threading.get_ident()}.tmp{self.extension}")
+
+    def guardar(self, origen: str, video_id: str, perfil: str) -> str:
+        """Mueve `origen` a la caché (de forma atómica) y desaloja si hace falta"""
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = self._ruta(video_id, perfil)
+        os.replace(origen, ruta)
+        self.desalojar()
+        return ruta
+
+    def _entradas(self) -> list:
+        entradas = []
+        try:
+            nombres = os.listdir(self.directorio)
+        except FileNotFoundError:
+            return entradas
+
+        for nombre in nombres:
+            if nombre.startswith(".") or not nombre.endswith(self.extension):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                stat = os.stat(ruta)
+            except OSError:
+                continue
+            # Uso más reciente: atime (aciertos) o mtime (escritura)
+            entradas.append((max(stat.st_atime, stat.st_mtime), stat.st_size, ruta))
+        return entradas
+
+    def desalojar(self):
+        """Borra los segmentos menos usados hasta quedar bajo el tope"""
+        with self._lock:
+            entradas = sorted(self._entradas())
+            total = sum(tamano for _, tamano, _ in entradas)
+            limite_proteccion = time.time() - self.proteccion
+
+            for usado_en, tamano, ruta in entradas:
+                if total <= self.max_bytes:
+                    break
+                if usado_en > limite_proteccion:
+                    break  # El resto es aún más reciente
+                try:
+                    os.unlink(ruta)
+                    total -= tamano
+                    self.desalojados += 1
+                except OSError:
+                    pass
+
+    def metricas(self) -> dict:
+        entradas = self._entradas()
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / consultas, 3) if consultas else 0.0,
+            "desalojados": self.desalojados,
+            "entradas": len(entradas),
+            "mb": round(sum(tamano for _, tamano, _ in entradas) / (1024 * 1024), 1),
+            "max_mb": self.max_bytes // (1024 * 1024),
+        }
+
+
+cache = CacheClips()
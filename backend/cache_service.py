@@ -0,0 +1,213 @@
+"""
+Caché de respuestas (TTL + LRU) con métricas
+
+Evita repetir llamadas costosas (Gemini, búsquedas, etc.) cuando llega
+exactamente la misma entrada: reintentos de una publicación fallida,
+/api/posts/adapt seguido de /api/test/<red> con el mismo texto, etc.
+
+Las claves son un hash SHA-256 del contenido que determina la respuesta
+(p. ej. nombre del modelo + prompt ya renderizado). Así, si cambia una
+plantilla de PROMPTS_POR_RED, cambia el prompt y la entrada vieja deja
+de usarse sola.
+
+Backends (variable CACHE_BACKEND):
+- "memoria" (por defecto): cachetools.TTLCache en el proceso
+- "redis": compartido entre workers (REDIS_URL); si Redis falla, se
+  trata como un miss y se llama al proveedor normalmente
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+
+from cachetools import TTLCache
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memoria")
+CACHE_DESACTIVADO = os.getenv("CACHE_DESACTIVADO", "false").lower() == "true"
+
+# Registro de cachés por nombre, para exponer las métricas
+CACHES = {}
+
+
+def activa(usar_cache: bool = True) -> bool:
+    """Indica si se debe consultar la caché (bypass por llamada o global)"""
+    return usar_cache and not CACHE_DESACTIVADO
+
+
+def clave_cache(*partes) -> str:
+    """Hash estable de las partes que determinan la respuesta"""
+    sha = hashlib.sha256()
+    for parte in partes:
+        if not isinstance(parte, str):
+            parte = json.dumps(parte, sort_keys=True, ensure_ascii=False, default=str)
+        sha.update(parte.encode("utf-8"))
+        sha.update(b"\x00")
+    return sha.hexdigest()
+
+
+class BackendMemoria:
+    """TTLCache desaloja por LRU al llegar a `maxsize` y expira por `ttl`"""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._datos = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str):
+        with self._lock:
+            return self._datos.get(clave)
+
+    def guardar(self, clave: str, valor):
+        with self._lock:
+            self._datos[clave] = valor
+
+    def borrar(self, clave: str):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def tamano(self) -> int:
+        with self._lock:
+            return len(self._datos)
+
+
+class BackendRedis:
+    """Valores serializados en JSON con expiración nativa de Redis"""
+
+    def __init__(self, nombre: str, ttl: int, url: str):
+        import redis
+        self._redis = redis.Redis.from_url(url, socket_timeout=1)
+        self._prefijo = f"cache:{nombre}:"
+        self._ttl = ttl
+
+    def obtener(self, clave: str):
+        valor = self._redis.get(self._prefijo + clave)
+        return json.loads(valor) if valor is not None else None
+
+    def guardar(self, clave: str, valor):
+        self._redis.set(self._prefijo + clave, json.dumps(valor, ensure_ascii=False), ex=self._ttl)
+
+    def borrar(self, clave: str):
+        self._redis.delete(self._prefijo + clave)
+
+    def limpiar(self):
+        for clave in self._redis.scan_iter(self._prefijo + "*"):
+            self._redis.delete(clave)
+
+    def tamano(self) -> int:
+        return sum(1 for _ in self._redis.scan_iter(self._prefijo + "*"))
+
+
+class CacheRespuestas:
+    """
+    Caché con nombre y contadores de aciertos/fallos.
+
+    Los valores se copian al guardar y al leer: los llamadores suelen mutar
+    el dict devuelto (p. ej. adaptacion["image_url"] = ...).
+    """
+
+    def __init__(self, nombre: str, maxsize: int = 512, ttl: int = 3600, backend: str = CACHE_BACKEND):
+        self.nombre = nombre
+        self.ttl = ttl
+        if backend == "redis":
+            self._backend = BackendRedis(nombre, ttl, os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        else:
+            self._backend = BackendMemoria(maxsize, ttl)
+
+        self.aciertos = 0
+        self.fallos = 0
+        self.omitidos = 0
+        self.errores = 0
+        self._lock = threading.Lock()
+
+    def _contar(self, campo: str):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+    def obtener(self, clave: str):
+        try:
+            valor = self._backend.obtener(clave)
+        except Exception as e:
+            print(f"⚠️ Caché '{self.nombre}' no disponible: {e}")
+            self._contar("errores")
+            valor = None
+
+        self._contar("aciertos" if valor is not None else "fallos")
+        return copy.deepcopy(valor)
+
+    def guardar(self, clave: str, valor):
+        try:
+            self._backend.guardar(clave, copy.deepcopy(valor))
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar en caché '{self.nombre}': {e}")
+            self._contar("errores")
+
+    def obtener_o_calcular(self, clave: str, calcular, usar_cache: bool = True, es_cacheable=None):
+        """
+        Devuelve el valor cacheado o lo calcula con `calcular()` y lo guarda.
+
+        Args:
+            usar_cache: False para saltar la caché (no lee ni escribe)
+            es_cacheable: función(valor) -> bool; por defecto no se guardan
+                          dicts con la clave "error"
+        """
+        if not activa(usar_cache):
+            self._contar("omitidos")
+            return calcular()
+
+        valor = self.obtener(clave)
+        if valor is not None:
+            return valor
+
+        valor = calcular()
+
+        if es_cacheable is None:
+            cacheable = valor is not None and not (isinstance(valor, dict) and "error" in valor)
+        else:
+            cacheable = es_cacheable(valor)
+
+        if cacheable:
+            self.guardar(clave, valor)
+        return valor
+
+    def invalidar(self, clave: str = None):
+        """Borra una entrada, o toda la caché si no se indica clave"""
+        if clave is None:
+            self._backend.limpiar()
+        else:
+            self._backend.borrar(clave)
+
+    def metricas(self) -> dict:
+        consultas = self.aciertos + self.fallos
+        try:
+            entradas = self._backend.tamano()
+        except Exception:
+            entradas = None
+
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "omitidos": self.omitidos,
+            "errores": self.errores,
+            "tasa_aciertos": round(self.aciertos / consultas, 3) if consultas else 0.0,
+            "entradas": entradas,
+            "ttl_segundos": self.ttl,
+        }
+
+
+def crear_cache(nombre: str, maxsize: int = 512, ttl: int = 3600, backend: str = None) -> CacheRespuestas:
+    """
+    Crea (o devuelve, si ya existe) la caché con ese nombre
+
+    backend: fuerza "memoria" o "redis" (por defecto CACHE_BACKEND)
+    """
+    if nombre not in CACHES:
+        CACHES[nombre] = CacheRespuestas(nombre, maxsize, ttl, backend or CACHE_BACKEND)
+    return CACHES[nombre]
+
+
+def metricas() -> dict:
+    return {nombre: cache.metricas() for nombre, cache in CACHES.items()}
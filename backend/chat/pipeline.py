@@ -0,0 +1,267 @@
+"""
+Pipeline de generación y publicación disparado desde el chat
+
+Se ejecuta como tarea de la cola (jobs.service), fuera del request HTTP:
+valida → adapta → genera imagen/video → publica → guarda la respuesta
+del asistente como un nuevo Message de la conversación.
+
+La búsqueda de clips de TikTok solo depende del texto original, así que se
+lanza antes de la validación y se cancela si el contenido se rechaza.
+Después de adaptar, cada red se procesa en su propio hilo (como
+pipeline_service.publicar_en_paralelo); los límites por proveedor los
+ponen los pools de imagen_service y render_service.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import activos_imagen
+import especulacion
+import llm_service
+import social_services
+from auth.database import SessionLocal
+from jobs.service import tarea
+from . import models
+
+
+def _guardar_respuesta(db, conversation_id: int, contenido: str) -> int:
+    assistant_msg = models.Message(
+        conversation_id=conversation_id,
+        role="assistant",
+        content=contenido
+    )
+    db.add(assistant_msg)
+    db.commit()
+    db.refresh(assistant_msg)
+    return assistant_msg.id
+
+
+def _link_publicacion(red: str, pub_result: dict):
+    """Obtiene el enlace a la publicación, si la red lo devuelve"""
+    link = pub_result.get("permalink") or pub_result.get("share_url") or pub_result.get("link")
+
+    # Construir link manual para Facebook si no viene en la respuesta
+    if not link and red == 'facebook' and 'id' in pub_result:
+        post_id = pub_result['id']
+        if '_' in post_id:
+            _, post_id = post_id.split('_')
+        link = f"https://www.facebook.com/{post_id}"
+
+    return link
+
+
+def _reportar_imagen(job, red: str, url_imagen):
+    # Las imágenes base64 (WhatsApp) no se envían en el evento por su tamaño
+    es_url = bool(url_imagen) and url_imagen.startswith("http")
+    job.reportar("imagen_lista", red=red, ok=bool(url_imagen), url=url_imagen if es_url else None)
+
+
+def _procesar_red(job, red: str, contenido: str, adaptacion: dict, plan=None, imagen=None) -> dict:
+    """
+    Genera media y publica para una red, a partir de su adaptación.
+    `imagen` (activos_imagen.ImagenPost) se comparte entre las redes del mensaje.
+    """
+    imagen = imagen or activos_imagen.ImagenPost()
+
+    # A. ADAPTACIÓN (ya resuelta en lote)
+    if "error" in adaptacion:
+        job.reportar("publicacion", red=red, ok=False, error=adaptacion["error"])
+        return {
+            "network": red,
+            "content": adaptacion,
+            "status": "error",
+            "error": adaptacion["error"]
+        }
+
+    job.reportar("adaptacion_lista", red=red, texto=adaptacion.get("text", ""))
+
+    # B. GENERACIÓN DE MEDIA (Imagen/Video)
+    media_url = None
+    video_path = None
+
+    # Instagram/Facebook: Variante de la imagen maestra (URL pública)
+    if red in ["instagram", "facebook"] and "suggested_image_prompt" in adaptacion:
+        job.reportar("imagen", red=red)
+        url_imagen = imagen.variante(red, adaptacion["suggested_image_prompt"])
+        adaptacion["image_url"] = url_imagen
+        media_url = url_imagen
+        _reportar_imagen(job, red, url_imagen)
+
+    # WhatsApp: Variante de la imagen maestra (Base64 para evitar errores de enlace)
+    if red == "whatsapp" and "suggested_image_prompt" in adaptacion:
+        job.reportar("imagen", red=red)
+        url_imagen = imagen.variante(red, adaptacion["suggested_image_prompt"])
+        adaptacion["image_url"] = url_imagen
+        media_url = url_imagen
+        _reportar_imagen(job, red, url_imagen)
+
+    # TikTok: Generar Video con Audio
+    if red == "tiktok":
+        job.reportar("video_progreso", red=red, porcentaje=0)
+        video_urls = None
+        if plan is not None and plan.futuro("clips") is not None:
+            try:
+                video_urls = plan.resultado("clips")
+            except Exception as e:
+                print(f"❌ Error buscando clips: {e}")
+                video_urls = []
+        video_path = llm_service.generar_video_tiktok(
+            contenido, adaptacion,
+            progreso=lambda porcentaje: job.reportar("video_progreso", red=red, porcentaje=porcentaje),
+            video_urls=video_urls
+        )
+
+        if video_path:
+            adaptacion["video_generated_path"] = video_path
+            adaptacion["video_urls"] = ["(Video generado localmente con audio)"]
+        else:
+            adaptacion["error"] = "Falló la generación de video"
+
+    # C. PUBLICACIÓN
+    publicacion_result = None
+    texto_final = adaptacion.get("text", "")
+
+    try:
+        if red == "facebook":
+            publicacion_result = social_services.post_to_facebook(texto_final, media_url)
+
+        elif red == "instagram":
+            if media_url:
+                publicacion_result = social_services.post_to_instagram(texto_final, media_url)
+            else:
+                publicacion_result = {"error": "No se pudo generar imagen para Instagram"}
+
+        elif red == "linkedin":
+            publicacion_result = social_services.post_to_linkedin(texto_final)
+
+        elif red == "whatsapp":
+            publicacion_result = social_services.post_whatsapp_status(texto_final, media_url)
+
+        elif red == "tiktok":
+            if video_path and os.path.exists(video_path):
+                publicacion_result = social_services.post_to_tiktok(texto_final, video_path)
+            else:
+                publicacion_result = {"error": "No se pudo generar el video para TikTok"}
+
+    except Exception as e:
+        print(f"❌ Error publicando en {red}: {e}")
+        publicacion_result = {"error": str(e)}
+
+    finally:
+        if video_path and os.path.exists(video_path):
+            os.unlink(video_path)
+
+    if publicacion_result and "error" not in publicacion_result:
+        job.reportar("publicacion", red=red, ok=True, link=_link_publicacion(red, publicacion_result))
+    else:
+        error = publicacion_result.get("error") if publicacion_result else "Sin resultado"
+        job.reportar("publicacion", red=red, ok=False, error=str(error))
+
+    return {
+        "network": red,
+        "content": adaptacion,
+        "publish_result": publicacion_result
+    }
+
+
+def formatear_respuesta(resultados: list) -> str:
+    """Construye el markdown que ve el usuario en el chat"""
+    response_text = "He procesado tu solicitud para las redes seleccionadas:\n\n"
+
+    for res in resultados:
+        red = res['network'].capitalize()
+        content_data = res.get('content', {})
+        pub_result = res.get('publish_result', {})
+
+        response_text += f"### {red}\n"
+
+        # Estado de publicación
+        if pub_result and "error" not in pub_result:
+            link = _link_publicacion(res['network'], pub_result)
+
+            if link:
+                response_text += f"✅ **Publicado exitosamente**: [Ver Publicación]({link})\n\n"
+            else:
+                response_text += f"✅ **Publicado exitosamente** (ID: {pub_result.get('id', 'N/A')})\n\n"
+        else:
+            error_msg = pub_result.get("error") if pub_result else res.get("error", "Error desconocido")
+            response_text += f"❌ **Error al publicar**: {error_msg}\n\n"
+
+        # Mostrar contenido generado
+        text_body = content_data.get('text', '')
+        response_text += f"**Contenido Generado:**\n{text_body}\n\n"
+
+        if "image_url" in content_data:
+            response_text += f"![Imagen Generada]({content_data['image_url']})\n"
+
+        if "video_generated_path" in content_data:
+            response_text += f"**Video Generado con Audio** (Subido a TikTok)\n"
+        elif "video_urls" in content_data:
+            response_text += f"**Video Fuente:** [Ver Video Original]({content_data['video_urls'][0]})\n"
+
+        response_text += "\n---\n\n"
+
+    return response_text
+
+
+@tarea("chat.publicar")
+def publicar_desde_chat(job, conversation_id: int, contenido: str, redes: list) -> dict:
+    """
+    Tarea de la cola: procesa el mensaje del usuario y guarda la respuesta del asistente.
+
+    Returns:
+        dict con el id del mensaje del asistente
+    """
+    db = SessionLocal()
+    plan = especulacion.PlanificadorEspeculativo()
+
+    if "tiktok" in redes:
+        plan.lanzar("clips", llm_service.buscar_clips_tiktok, contenido, cancelacion=plan.token)
+
+    try:
+        # 1. Validar y adaptar para todas las redes (una sola llamada al LLM)
+        job.reportar("validacion", redes=list(redes))
+        validado = llm_service.validar_y_adaptar(contenido, redes, titulo="Generación Automática")
+        validacion = validado["validacion"]
+        job.reportar(
+            "validacion_completa",
+            es_academico=validacion.get("es_academico", False),
+            razon=validacion.get("razon")
+        )
+
+        # Rechazo temprano: no se genera media ni se publica
+        if not validacion.get("es_academico", False):
+            plan.cancelar()
+            razon = validacion.get("razon", "Contenido no apropiado.")
+            assistant_content = f"⚠️ El contenido no parece ser académico o relacionado con la UAGRM.\n\nRazón: {razon}"
+            mensaje_id = _guardar_respuesta(db, conversation_id, assistant_content)
+            return {"assistant_message_id": mensaje_id, "es_academico": False}
+
+        adaptaciones = validado["adaptaciones"]
+
+        # 2. Generar y Publicar contenido para todas las redes a la vez
+        imagen = activos_imagen.ImagenPost(activos_imagen.prompt_maestro(adaptaciones))
+        print(f"🔄 Procesando redes en paralelo: {', '.join(redes)}")
+        with ThreadPoolExecutor(max_workers=len(redes), thread_name_prefix="chat-red") as executor:
+            futuros = [
+                executor.submit(_procesar_red, job, red, contenido, adaptaciones[red], plan, imagen)
+                for red in redes
+            ]
+            resultados = [futuro.result() for futuro in futuros]
+
+        # 3. Guardar mensaje del asistente
+        job.reportar("guardando")
+        mensaje_id = _guardar_respuesta(db, conversation_id, formatear_respuesta(resultados))
+        return {"assistant_message_id": mensaje_id, "es_academico": True}
+
+    except Exception as e:
+        print(f"Error generando contenido: {e}")
+        plan.cancelar()
+        db.rollback()
+        mensaje_id = _guardar_respuesta(
+            db, conversation_id,
+            f"Lo siento, hubo un error al procesar tu solicitud: {str(e)}"
+        )
+        return {"assistant_message_id": mensaje_id, "error": str(e)}
+
+    finally:
+        db.close()
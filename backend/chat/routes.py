@@ -4,8 +4,8 @@ from typing import List
 from auth.database import get_db
 from auth.models import User
 from dependencies import get_current_user # Importar dependencia de auth
-from . import models, schemas
-import llm_service
+from . import models, schemas, pipeline  # pipeline registra la tarea "chat.publicar"
+from jobs import service as jobs_service
 
 router = APIRouter(
     prefix="/api/chat",
@@ -95,7 +95,9 @@ def create_message(
 ):
     """
     Agrega un mensaje a la conversación.
-    Si el rol es 'user', opcionalmente se podría disparar una respuesta del bot aquí.
+    Si el rol es 'user' y hay redes seleccionadas, encola el pipeline de
+    generación/publicación y devuelve el mensaje al instante con su job_id.
+    La respuesta del asistente se guarda como nuevo mensaje cuando el job termina.
     """
     # Verificar que la conversación existe y pertenece al usuario
     conversation = db.query(models.Conversation)\
@@ -125,190 +127,15 @@ def create_message(
     db.commit()
     db.refresh(db_message)
 
-    # --- LÓGICA DE GENERACIÓN Y PUBLICACIÓN DE CONTENIDO ---
+    # --- LÓGICA DE GENERACIÓN Y PUBLICACIÓN DE CONTENIDO (en segundo plano) ---
     if message.role == "user" and message.selected_networks:
-        import social_services # Importar aquí para evitar ciclos si los hubiera
-        import httpx
-        import os
-        import tempfile
-
-        try:
-            # 1. Validar contenido (opcional, pero recomendado)
-            validacion = llm_service.validar_contenido_academico(message.content)
-            
-            if not validacion.get("es_academico", False):
-                # Si no es académico, responder con la razón
-                razon = validacion.get("razon", "Contenido no apropiado.")
-                assistant_content = f"⚠️ El contenido no parece ser académico o relacionado con la UAGRM.\n\nRazón: {razon}"
-                
-                # Guardar respuesta de error/advertencia
-                error_msg = models.Message(
-                    conversation_id=conversation_id,
-                    role="assistant",
-                    content=assistant_content
-                )
-                db.add(error_msg)
-                db.commit()
-                return db_message 
-                
-            else:
-                # 2. Generar y Publicar contenido para cada red
-                resultados = []
-                for red in message.selected_networks:
-                    print(f"🔄 Procesando red: {red}...")
-                    
-                    # A. ADAPTACIÓN
-                    adaptacion = llm_service.adaptar_contenido(
-                        titulo="Generación Automática", 
-                        contenido=message.content,
-                        red_social=red
-                    )
-                    
-                    if "error" in adaptacion:
-                        resultados.append({
-                            "network": red,
-                            "content": adaptacion,
-                            "status": "error",
-                            "error": adaptacion["error"]
-                        })
-                        continue
-
-                    # B. GENERACIÓN DE MEDIA (Imagen/Video)
-                    media_url = None
-                    video_urls = []
-                    video_path = None
-                    
-                    # Instagram/Facebook: Generar Imagen (URL pública)
-                    if red in ["instagram", "facebook"] and "suggested_image_prompt" in adaptacion:
-                         print(f"🎨 Generando imagen para {red}...")
-                         url_imagen = llm_service.generar_imagen_ia(adaptacion["suggested_image_prompt"])
-                         adaptacion["image_url"] = url_imagen
-                         media_url = url_imagen
-                    
-                    # WhatsApp: Generar Imagen (Base64 para evitar errores de enlace)
-                    if red == "whatsapp" and "suggested_image_prompt" in adaptacion:
-                         print(f"🎨 Generando imagen para {red} (Base64)...")
-                         # Usar Base64 para WhatsApp
-                         url_imagen = llm_service.generar_imagen_ia_base64(adaptacion["suggested_image_prompt"])
-                         adaptacion["image_url"] = url_imagen
-                         media_url = url_imagen
-                    
-                    # TikTok: Generar Video con Audio
-                    if red == "tiktok":
-                        print(f"🎬 Generando video COMPLETO para TikTok (con audio)...")
-                        # Usar la función completa de llm_service que genera audio y combina
-                        video_path = llm_service.generar_video_tiktok(message.content, adaptacion)
-                        
-                        if video_path:
-                            adaptacion["video_generated_path"] = video_path
-                            # Simular URL para mostrar en frontend (aunque es local)
-                            adaptacion["video_urls"] = ["(Video generado localmente con audio)"]
-                        else:
-                            adaptacion["error"] = "Falló la generación de video"
-
-                    # C. PUBLICACIÓN
-                    publicacion_result = None
-                    texto_final = adaptacion.get("text", "")
-                    
-                    try:
-                        if red == "facebook":
-                            publicacion_result = social_services.post_to_facebook(texto_final, media_url)
-                        
-                        elif red == "instagram":
-                            if media_url:
-                                publicacion_result = social_services.post_to_instagram(texto_final, media_url)
-                            else:
-                                publicacion_result = {"error": "No se pudo generar imagen para Instagram"}
-
-                        elif red == "linkedin":
-                            publicacion_result = social_services.post_to_linkedin(texto_final)
-
-                        elif red == "whatsapp":
-                            publicacion_result = social_services.post_whatsapp_status(texto_final, media_url)
-
-                        elif red == "tiktok":
-                            if video_path and os.path.exists(video_path):
-                                publicacion_result = social_services.post_to_tiktok(texto_final, video_path)
-                                # No borramos el video inmediatamente por si se necesita debug, o lo borramos después
-                                # os.remove(video_path) 
-                            else:
-                                publicacion_result = {"error": "No se pudo generar el video para TikTok"}
-
-                    except Exception as e:
-                        print(f"❌ Error publicando en {red}: {e}")
-                        publicacion_result = {"error": str(e)}
-
-                    resultados.append({
-                        "network": red,
-                        "content": adaptacion,
-                        "publish_result": publicacion_result
-                    })
-
-                # 3. Formatear respuesta del asistente
-                response_text = "He procesado tu solicitud para las redes seleccionadas:\n\n"
-                
-                for res in resultados:
-                    red = res['network'].capitalize()
-                    content_data = res.get('content', {})
-                    pub_result = res.get('publish_result', {})
-                    
-                    response_text += f"### {red}\n"
-                    
-                    # Estado de publicación
-                    if pub_result and "error" not in pub_result:
-                        link = pub_result.get("permalink") or pub_result.get("share_url") or pub_result.get("link")
-                        
-                        # Construir link manual para Facebook si no viene en la respuesta
-                        if not link and res['network'] == 'facebook' and 'id' in pub_result:
-                            # El ID suele ser PAGEID_POSTID o solo POSTID
-                            post_id = pub_result['id']
-                            # Si el ID tiene formato PAGE_POST, extraemos la parte del post
-                            if '_' in post_id:
-                                _, post_id = post_id.split('_')
-                            link = f"https://www.facebook.com/{post_id}"
-
-                        if link:
-                            response_text += f"✅ **Publicado exitosamente**: [Ver Publicación]({link})\n\n"
-                        else:
-                            response_text += f"✅ **Publicado exitosamente** (ID: {pub_result.get('id', 'N/A')})\n\n"
-                    else:
-                        error_msg = pub_result.get("error") if pub_result else "Error desconocido"
-                        response_text += f"❌ **Error al publicar**: {error_msg}\n\n"
-
-                    # Mostrar contenido generado
-                    text_body = content_data.get('text', '')
-                    response_text += f"**Contenido Generado:**\n{text_body}\n\n"
-                    
-                    if "image_url" in content_data:
-                        response_text += f"![Imagen Generada]({content_data['image_url']})\n"
-                        
-                    if "video_generated_path" in content_data:
-                        response_text += f"**Video Generado con Audio** (Subido a TikTok)\n"
-                    elif "video_urls" in content_data:
-                        response_text += f"**Video Fuente:** [Ver Video Original]({content_data['video_urls'][0]})\n"
-                    
-                    response_text += "\n---\n\n"
-
-                # Guardar mensaje del asistente
-                assistant_msg = models.Message(
-                    conversation_id=conversation_id,
-                    role="assistant",
-                    content=response_text
-                )
-                db.add(assistant_msg)
-                db.commit()
-
-        except Exception as e:
-            print(f"Error generando contenido: {e}")
-            import traceback
-            traceback.print_exc()
-            # Guardar mensaje de error
-            error_msg = models.Message(
-                conversation_id=conversation_id,
-                role="assistant",
-                content=f"Lo siento, hubo un error al procesar tu solicitud: {str(e)}"
-            )
-            db.add(error_msg)
-            db.commit()
+        job = jobs_service.cola.encolar(
+            "chat.publicar",
+            current_user.id,
+            conversation_id,
+            message.content,
+            list(message.selected_networks)
+        )
+        db_message.job_id = job["id"]
     
     return db_message
@@ -14,6 +14,7 @@ class MessageResponse(MessageBase):
     id: int
     conversation_id: int
     created_at: datetime
+    job_id: Optional[str] = None  # Job en segundo plano que generará la respuesta
 
     class Config:
         orm_mode = True
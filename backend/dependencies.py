@@ -3,12 +3,12 @@ from sqlalchemy.orm import Session
 from typing import Optional
 from auth import auth_service
 from auth.database import get_db
-from auth.models import User
+from auth.auth_schemas import UsuarioActual
 
 def get_current_user(
     authorization: Optional[str] = Header(None),
     db: Session = Depends(get_db)
-) -> User:
+) -> UsuarioActual:
     """
     Verifica que el usuario esté autenticado mediante el token
     """
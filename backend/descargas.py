@@ -0,0 +1,164 @@
+"""
+Descarga de archivos grandes (clips de Pexels) directo a disco
+
+Los clips UHD pesan decenas o cientos de MB; leerlos con response.content
+los deja enteros en memoria. Aquí se descargan:
+- en streaming, por bloques, escribiendo en un archivo temporal
+- varios a la vez (DESCARGA_WORKERS), entregando cada archivo apenas
+  termina (descargar_a_medida) para procesarlo sin esperar al resto
+- con reintentos y reanudación (cabecera Range) si se corta la conexión
+- con un tope de tamaño por archivo (DESCARGA_MAX_MB)
+"""
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import httpx
+
+DESCARGA_WORKERS = int(os.getenv("DESCARGA_WORKERS", 4))
+DESCARGA_REINTENTOS = int(os.getenv("DESCARGA_REINTENTOS", 3))
+DESCARGA_MAX_MB = int(os.getenv("DESCARGA_MAX_MB", 150))
+DESCARGA_TIMEOUT = float(os.getenv("DESCARGA_TIMEOUT", 30.0))
+
+
+class DescargaError(Exception):
+    """La descarga falló de forma definitiva (sin más reintentos)"""
+
+
+def _es_reintentable(error: Exception) -> bool:
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return False
+
+
+def _descargar_intento(client: httpx.Client, url: str, destino: str, max_bytes: int):
+    """Un intento: continúa desde lo que ya haya en `destino`"""
+    descargados = os.path.getsize(destino) if os.path.exists(destino) else 0
+    headers = {"Range": f"bytes={descargados}-"} if descargados else {}
+
+    with client.stream("GET", url, headers=headers) as response:
+        if response.status_code == 416:
+            return  # El archivo ya estaba completo
+        response.raise_for_status()
+
+        if descargados and response.status_code != 206:
+            descargados = 0  # El servidor no soporta Range: se empieza de nuevo
+
+        restantes = int(response.headers.get("content-length", 0))
+        if descargados + restantes > max_bytes:
+            raise DescargaError(f"Archivo demasiado grande ({(descargados + restantes) // (1024 * 1024)} MB)")
+
+        with open(destino, "ab" if descargados else "wb") as archivo:
+            # Bloques tal como llegan de la red: lo recibido queda en disco
+            # aunque la conexión se corte a mitad
+            for bloque in response.iter_bytes():
+                descargados += len(bloque)
+                if descargados > max_bytes:
+                    raise DescargaError(f"Archivo supera el máximo de {max_bytes // (1024 * 1024)} MB")
+                archivo.write(bloque)
+
+
+def descargar_archivo(url: str, destino: str, client: httpx.Client = None,
+                      max_bytes: int = None, reintentos: int = None) -> str:
+    """
+    Descarga `url` en `destino` con reintentos y reanudación.
+
+    Raises:
+        DescargaError: si se agotan los reintentos o se supera el tamaño máximo
+    """
+    max_bytes = max_bytes or DESCARGA_MAX_MB * 1024 * 1024
+    reintentos = DESCARGA_REINTENTOS if reintentos is None else reintentos
+    propio = client is None
+    client = client or httpx.Client(timeout=DESCARGA_TIMEOUT, follow_redirects=True)
+
+    try:
+        for intento in range(reintentos + 1):
+            try:
+                _descargar_intento(client, url, destino, max_bytes)
+                return destino
+            except DescargaError:
+                raise
+            except Exception as e:
+                if not _es_reintentable(e) or intento == reintentos:
+                    raise DescargaError(f"{type(e).__name__}: {e}") from e
+                espera = 0.5 * 2 ** intento
+                print(f"⚠️ Descarga interrumpida ({type(e).__name__}), reintentando en {espera:.1f}s...")
+                time.sleep(espera)
+    finally:
+        if propio:
+            client.close()
+
+
+def _descargar_temporal(client: httpx.Client, indice: int, total: int, url: str, sufijo: str, max_bytes: int):
+    """Descarga `url` a un archivo temporal; None si falla (el parcial se borra)"""
+    if not url:
+        return None
+    destino = tempfile.NamedTemporaryFile(delete=False, suffix=sufijo).name
+    try:
+        descargar_archivo(url, destino, client, max_bytes)
+        print(f"📥 Video {indice + 1}/{total} descargado ({os.path.getsize(destino) // 1024} KB)")
+        return destino
+    except DescargaError as e:
+        print(f"❌ Video {indice + 1}/{total} omitido: {e}")
+        os.unlink(destino)
+        return None
+
+
+def descargar_a_medida(urls: list, sufijo: str = ".mp4", max_bytes: int = None):
+    """
+    Descarga varias URLs a la vez y va entregando (índice, ruta) en el orden
+    en que terminan; ruta es None si esa descarga falló.
+
+    Si se deja de iterar antes del final, las descargas pendientes se
+    cancelan y los archivos que ya no se entregaron se borran.
+    """
+    if not urls:
+        return
+
+    limites = httpx.Limits(max_connections=DESCARGA_WORKERS)
+    with httpx.Client(timeout=DESCARGA_TIMEOUT, follow_redirects=True, limits=limites) as client:
+        with ThreadPoolExecutor(max_workers=DESCARGA_WORKERS, thread_name_prefix="descarga") as executor:
+            futuros = {
+                executor.submit(_descargar_temporal, client, indice, len(urls), url, sufijo, max_bytes): indice
+                for indice, url in enumerate(urls)
+            }
+            pendientes = set(futuros)
+            try:
+                for futuro in as_completed(futuros):
+                    pendientes.discard(futuro)
+                    yield futuros[futuro], futuro.result()
+            finally:
+                for futuro in pendientes:
+                    futuro.cancel()
+                for futuro in pendientes:
+                    if futuro.cancelled():
+                        continue
+                    try:
+                        ruta = futuro.result()
+                    except Exception:
+                        continue
+                    if ruta and os.path.exists(ruta):
+                        os.unlink(ruta)
+
+
+def descargar_en_paralelo(urls: list, sufijo: str = ".mp4", max_bytes: int = None, omitir_fallidas: bool = True) -> list:
+    """
+    Descarga varias URLs a la vez en archivos temporales y espera a todas
+    (para quien necesita los clips juntos; si no, ver descargar_a_medida).
+
+    Returns:
+        Rutas en el mismo orden que `urls`; las descargas fallidas se omiten
+        (y su archivo parcial se borra). Con omitir_fallidas=False quedan
+        como None, para conservar la posición de cada URL.
+    """
+    if omitir_fallidas:
+        urls = [url for url in urls if url]
+
+    rutas = [None] * len(urls)
+    for indice, ruta in descargar_a_medida(urls, sufijo, max_bytes):
+        rutas[indice] = ruta
+
+    return [ruta for ruta in rutas if ruta] if omitir_fallidas else rutas
@@ -0,0 +1,137 @@
+"""
+Ejecución especulativa de etapas del pipeline
+
+Algunas etapas no necesitan esperar a la validación académica para empezar:
+la búsqueda de clips en Pexels puede partir del texto original, el TTS
+puede correr mientras se buscan los clips, etc. Este planificador lanza
+cada etapa en cuanto sus entradas existen y, si la validación rechaza el
+contenido, cancela todo lo que quedó en vuelo.
+
+    plan = PlanificadorEspeculativo()
+    plan.lanzar("validacion", llm_service.validar_contenido_academico, texto)
+    plan.lanzar("adaptacion", llm_service.adaptar_contenido, ...)
+    plan.despues("imagen", ["validacion", "adaptacion"], imagen_si_es_academico)
+
+    try:
+        if not plan.resultado("validacion")["es_academico"]:
+            raise ...
+    finally:
+        plan.cancelar()
+
+Nunca se hace de forma especulativa lo que se paga por uso (imágenes de
+Stability: dependen de la validación) ni, por supuesto, publicar.
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+ESPECULACION_WORKERS = int(os.getenv("ESPECULACION_WORKERS", 8))
+
+_executor = ThreadPoolExecutor(max_workers=ESPECULACION_WORKERS, thread_name_prefix="especulacion")
+
+
+class Cancelado(Exception):
+    """La etapa se canceló porque su resultado ya no se necesita"""
+
+
+class TokenCancelacion:
+    """
+    Señal compartida entre hilos. Las funciones largas reciben el token
+    (parámetro `cancelacion`) y llaman a verificar() entre sus pasos.
+    """
+
+    def __init__(self):
+        self._evento = threading.Event()
+
+    def cancelar(self):
+        self._evento.set()
+
+    @property
+    def cancelado(self) -> bool:
+        return self._evento.is_set()
+
+    def verificar(self):
+        if self._evento.is_set():
+            raise Cancelado()
+
+
+def verificar(cancelacion):
+    """Atajo para funciones donde el token es opcional"""
+    if cancelacion is not None:
+        cancelacion.verificar()
+
+
+class PlanificadorEspeculativo:
+    """Lanza etapas en un pool de hilos y las cancela en bloque si hace falta"""
+
+    def __init__(self):
+        self.token = TokenCancelacion()
+        self._futuros = {}
+        self._lock = threading.Lock()
+
+    def lanzar(self, nombre: str, func, *args, **kwargs) -> Future:
+        """Lanza `func` de inmediato"""
+        def ejecutar():
+            self.token.verificar()
+            return func(*args, **kwargs)
+
+        futuro = _executor.submit(ejecutar)
+        with self._lock:
+            self._futuros[nombre] = futuro
+        return futuro
+
+    def despues(self, nombre: str, dependencias: list, func) -> Future:
+        """
+        Lanza `func(*resultados_de_dependencias)` cuando todas las dependencias
+        terminen. Si alguna falla o se cancela, esta etapa falla igual.
+        """
+        futuro = Future()
+        previos = [self._futuros[d] for d in dependencias]
+        pendientes = {"n": len(previos)}
+        lock = threading.Lock()
+
+        def ejecutar():
+            try:
+                self.token.verificar()
+                resultados = [f.result() for f in previos]
+                futuro.set_result(func(*resultados))
+            except BaseException as e:
+                futuro.set_exception(e)
+
+        def al_terminar(_):
+            with lock:
+                pendientes["n"] -= 1
+                listo = pendientes["n"] == 0
+            if listo and futuro.set_running_or_notify_cancel():
+                _executor.submit(ejecutar)
+
+        with self._lock:
+            self._futuros[nombre] = futuro
+
+        if not previos:
+            futuro.set_running_or_notify_cancel()
+            _executor.submit(ejecutar)
+        for previo in previos:
+            previo.add_done_callback(al_terminar)
+
+        return futuro
+
+    def futuro(self, nombre: str) -> Future:
+        return self._futuros.get(nombre)
+
+    def resultado(self, nombre: str, timeout: float = None):
+        return self._futuros[nombre].result(timeout=timeout)
+
+    def cancelar(self):
+        """
+        Cancela las etapas que aún no empezaron y avisa a las que están
+        corriendo (vía token). Sus resultados se descartan.
+        """
+        self.token.cancelar()
+        with self._lock:
+            futuros = list(self._futuros.items())
+
+        cancelados = [nombre for nombre, futuro in futuros if not futuro.done() and futuro.cancel()]
+        en_vuelo = [nombre for nombre, futuro in futuros if not futuro.done() and nombre not in cancelados]
+        if cancelados or en_vuelo:
+            print(f"🛑 Especulación cancelada (sin iniciar: {cancelados or '-'}, en vuelo: {en_vuelo or '-'})")
@@ -0,0 +1,108 @@
+"""
+Post-procesado de imágenes por red social (tamaño, formato y peso)
+
+Los proveedores devuelven un PNG de 1024x1024 (1-2 MB de Stability). Para
+WhatsApp ese PNG viajaba entero como data URL dentro del JSON de Whapi
+(varios MB después de base64). Antes de publicar, cada imagen se adapta al
+perfil de su red (PERFILES):
+
+- recorte centrado al tamaño recomendado por la red
+- JPEG o WebP con la calidad configurada (Instagram solo acepta JPEG)
+- presupuesto de bytes: si no entra, se baja la calidad de a
+  PASO_CALIDAD hasta CALIDAD_MINIMA y después se achica la imagen
+
+Cada perfil se puede ajustar por entorno: IMAGEN_<RED>_FORMATO,
+IMAGEN_<RED>_CALIDAD e IMAGEN_<RED>_MAX_KB (bytes de la imagen, antes de
+base64). Sin Pillow, la imagen se devuelve tal cual.
+"""
+import io
+import os
+
+FORMATOS = {
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+    "png": "image/png",
+}
+CALIDAD_MINIMA = 40
+PASO_CALIDAD = 10
+ESCALA_REDUCCION = 0.75
+LADO_MINIMO = 320
+
+
+def _perfil(red: str, ancho: int, alto: int, formato: str, calidad: int, max_kb: int) -> dict:
+    prefijo = f"IMAGEN_{red.upper()}_"
+    formato = os.getenv(f"{prefijo}FORMATO", formato).lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de imagen no soportado para {red}: {formato}")
+    return {
+        "ancho": ancho,
+        "alto": alto,
+        "formato": formato,
+        "calidad": int(os.getenv(f"{prefijo}CALIDAD", calidad)),
+        "max_bytes": int(os.getenv(f"{prefijo}MAX_KB", max_kb)) * 1024,
+    }
+
+
+PERFILES = {
+    "instagram": _perfil("instagram", 1080, 1080, "jpeg", 90, 8 * 1024),
+    "facebook": _perfil("facebook", 1200, 630, "jpeg", 88, 4 * 1024),
+    "whatsapp": _perfil("whatsapp", 800, 800, "jpeg", 80, 300),
+}
+
+
+def _codificar(imagen, formato: str, calidad: int) -> bytes:
+    salida = io.BytesIO()
+    if formato == "jpeg":
+        imagen.save(salida, format="JPEG", quality=calidad, optimize=True, progressive=True)
+    elif formato == "webp":
+        imagen.save(salida, format="WEBP", quality=calidad, method=4)
+    else:
+        imagen.save(salida, format="PNG", optimize=True)
+    return salida.getvalue()
+
+
+def _calidades(calidad: int, formato: str) -> list:
+    if formato == "png":
+        return [calidad]
+    return list(range(calidad, CALIDAD_MINIMA - 1, -PASO_CALIDAD)) or [calidad]
+
+
+def transcodificar(imagen: dict, ancho: int, alto: int, formato: str = "jpeg",
+                   calidad: int = 85, max_bytes: int = None) -> dict:
+    """
+    Recorta `imagen` ({"bytes", "mime", ...}) a ancho x alto y la codifica en
+    `formato`, respetando `max_bytes` si se indica. Si ni con la calidad
+    mínima y LADO_MINIMO entra en el presupuesto, devuelve la más liviana.
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return imagen
+
+    with Image.open(io.BytesIO(imagen["bytes"])) as original:
+        base = ImageOps.fit(original.convert("RGB"), (ancho, alto), Image.LANCZOS)
+
+    lienzo = base
+    while True:
+        for q in _calidades(calidad, formato):
+            datos = _codificar(lienzo, formato, q)
+            if max_bytes is None or len(datos) <= max_bytes:
+                return {**imagen, "bytes": datos, "mime": FORMATOS[formato]}
+
+        nuevo = (int(lienzo.width * ESCALA_REDUCCION), int(lienzo.height * ESCALA_REDUCCION))
+        if min(nuevo) < LADO_MINIMO:
+            print(f"⚠️ Imagen de {len(datos) // 1024} KB no entra en {max_bytes // 1024} KB")
+            return {**imagen, "bytes": datos, "mime": FORMATOS[formato]}
+        lienzo = base.resize(nuevo, Image.LANCZOS)
+
+
+def preparar(imagen: dict, red: str) -> dict:
+    """`imagen` adaptada al perfil de `red` (sin cambios si la red no tiene perfil)"""
+    perfil = PERFILES.get(red)
+    if perfil is None:
+        return imagen
+
+    original = len(imagen["bytes"])
+    preparada = transcodificar(imagen, **perfil)
+    print(f"🗜️ Imagen para {red}: {original // 1024} KB → {len(preparada['bytes']) // 1024} KB")
+    return preparada
@@ -0,0 +1,294 @@
+"""
+Proveedores de imágenes intercambiables
+
+generar_imagen_ia dependía siempre de Stability AI (y el respaldo, de
+picsum.photos). Acá cada proveedor implementa la misma interfaz y se
+prueban en orden (IMAGEN_PROVEEDORES, por defecto solo "stability"):
+
+- stability: Stable Diffusion XL (requiere STABILITY_API_KEY)
+- local: tarjeta con la marca UAGRM dibujada con Pillow (determinista)
+- stub: PNG liso generado en el proceso, sin dependencias; para pruebas
+  de carga y benchmarks sin red (IMAGEN_PROVEEDORES=stub)
+
+Cada proveedor tiene su timeout (IMAGEN_TIMEOUT_<NOMBRE>) y sus métricas
+de latencia; si uno falla o se pasa del tiempo, se usa el siguiente.
+
+local y stub generan marcadores de posición, no imágenes reales: se usan
+solo si se agregan a IMAGEN_PROVEEDORES (desarrollo, pruebas), y aun así
+los caminos de publicación los descartan salvo IMAGEN_PERMITIR_MARCADORES
+(ver publicable), para no publicar una tarjeta genérica en una red real.
+"""
+import base64
+import hashlib
+import io
+import os
+import struct
+import textwrap
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from functools import lru_cache
+
+import httpx
+
+IMAGEN_PROVEEDORES = [p.strip() for p in os.getenv("IMAGEN_PROVEEDORES", "stability").split(",") if p.strip()]
+IMAGEN_PERMITIR_MARCADORES = os.getenv("IMAGEN_PERMITIR_MARCADORES", "false").lower() == "true"
+IMAGEN_WORKERS = int(os.getenv("IMAGEN_WORKERS", 8))
+
+_pool = ThreadPoolExecutor(max_workers=IMAGEN_WORKERS, thread_name_prefix="imagen")
+
+
+class ProveedorNoDisponible(Exception):
+    """El proveedor no está configurado (p. ej. falta la API key o Pillow)"""
+
+
+class ImagenNoDisponible(Exception):
+    """Ningún proveedor de la cadena pudo generar la imagen"""
+
+
+class MetricasProveedor:
+    """Llamadas, errores, timeouts y latencias (últimas 200) de un proveedor"""
+
+    def __init__(self):
+        self.llamadas = 0
+        self.errores = 0
+        self.timeouts = 0
+        self.no_disponible = 0
+        self._latencias = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def registrar(self, resultado: str, segundos: float = None):
+        with self._lock:
+            self.llamadas += 1
+            if resultado == "error":
+                self.errores += 1
+            elif resultado == "timeout":
+                self.timeouts += 1
+            elif resultado == "no_disponible":
+                self.no_disponible += 1
+            elif segundos is not None:
+                self._latencias.append(segundos)
+
+    def resumen(self) -> dict:
+        with self._lock:
+            latencias = sorted(self._latencias)
+            return {
+                "llamadas": self.llamadas,
+                "exitos": self.llamadas - self.errores - self.timeouts - self.no_disponible,
+                "errores": self.errores,
+                "timeouts": self.timeouts,
+                "no_disponible": self.no_disponible,
+                "latencia_promedio": round(sum(latencias) / len(latencias), 3) if latencias else None,
+                "latencia_p95": round(latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))], 3)
+                if latencias else None,
+            }
+
+
+class ProveedorImagen:
+    """Interfaz de un proveedor: prompt → bytes de la imagen"""
+
+    nombre = "base"
+    mime = "image/png"
+    timeout_por_defecto = 30.0
+    # True si genera un marcador de posición en vez de una imagen real
+    marcador = False
+
+    def __init__(self, timeout: float = None):
+        self.timeout = timeout or float(os.getenv(f"IMAGEN_TIMEOUT_{self.nombre.upper()}", self.timeout_por_defecto))
+        self.metricas = MetricasProveedor()
+
+    def generar(self, prompt: str, ancho: int, alto: int) -> bytes:
+        raise NotImplementedError
+
+
+class ProveedorStability(ProveedorImagen):
+    """Stable Diffusion XL (Stability AI)"""
+
+    nombre = "stability"
+    timeout_por_defecto = 60.0
+
+    def generar(self, prompt: str, ancho: int, alto: int) -> bytes:
+        stability_key = os.getenv("STABILITY_API_KEY")
+        if not stability_key:
+            raise ProveedorNoDisponible("STABILITY_API_KEY no configurada")
+
+        print(f"🎨 Generando con Stability AI...")
+        response = httpx.post(
+            "https://api.stability.ai/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image",
+            headers={
+                "Authorization": f"Bearer {stability_key}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "text_prompts": [{"text": f"professional university photo, {prompt}, realistic, high quality"}],
+                "cfg_scale": 7,
+                "height": alto,
+                "width": ancho,
+                "samples": 1,
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return base64.b64decode(response.json()["artifacts"][0]["base64"])
+
+
+# Azul y rojo institucionales, con variaciones para que cada post se distinga
+PALETA_UAGRM = [
+    ((0, 51, 102), (0, 92, 170)),
+    ((0, 51, 102), (165, 25, 35)),
+    ((12, 35, 64), (0, 122, 153)),
+    ((120, 15, 25), (0, 51, 102)),
+]
+
+
+class ProveedorLocal(ProveedorImagen):
+    """Tarjeta con degradado, el texto del prompt y la marca UAGRM (Pillow)"""
+
+    nombre = "local"
+    timeout_por_defecto = 5.0
+    marcador = True
+
+    @staticmethod
+    def _fuente(tamano: int):
+        from PIL import ImageFont
+        for nombre in ("DejaVuSans-Bold.ttf", "Arial Bold.ttf", "arialbd.ttf"):
+            try:
+                return ImageFont.truetype(nombre, tamano)
+            except OSError:
+                continue
+        try:
+            return ImageFont.load_default(size=tamano)
+        except TypeError:  # Pillow < 10.1
+            return ImageFont.load_default()
+
+    def generar(self, prompt: str, ancho: int, alto: int) -> bytes:
+        try:
+            from PIL import Image, ImageDraw
+        except ImportError:
+            raise ProveedorNoDisponible("Pillow no instalado (pip install Pillow)")
+
+        semilla = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        arriba, abajo = PALETA_UAGRM[semilla % len(PALETA_UAGRM)]
+
+        # Degradado vertical: una línea de 1 px de ancho estirada a todo el lienzo
+        degradado = Image.new("RGB", (1, alto))
+        for y in range(alto):
+            t = y / max(alto - 1, 1)
+            degradado.putpixel((0, y), tuple(int(a + (b - a) * t) for a, b in zip(arriba, abajo)))
+        imagen = degradado.resize((ancho, alto))
+        dibujo = ImageDraw.Draw(imagen)
+
+        margen = ancho // 12
+        dibujo.rectangle([0, 0, ancho, alto // 9], fill=(255, 255, 255))
+        dibujo.text((margen, alto // 18), "UAGRM", font=self._fuente(alto // 14), fill=arriba, anchor="lm")
+
+        fuente = self._fuente(alto // 18)
+        texto = prompt.strip().rstrip(".")
+        texto = texto[0].upper() + texto[1:] if texto else "UAGRM"
+        lineas = textwrap.wrap(texto, width=max(12, int(ancho / (alto // 18) * 1.6)))[:6]
+        interlineado = int(alto // 18 * 1.3)
+        y = alto // 2 - interlineado * len(lineas) // 2
+        for linea in lineas:
+            dibujo.text((ancho // 2, y), linea, font=fuente, fill=(255, 255, 255), anchor="mm")
+            y += interlineado
+
+        dibujo.text(
+            (ancho // 2, alto - alto // 14), "Universidad Autónoma Gabriel René Moreno",
+            font=self._fuente(alto // 34), fill=(235, 235, 235), anchor="mm"
+        )
+
+        salida = io.BytesIO()
+        imagen.save(salida, format="PNG", optimize=False)
+        return salida.getvalue()
+
+
+@lru_cache(maxsize=16)
+def _png_liso(ancho: int, alto: int, color: tuple) -> bytes:
+    """PNG RGB de un solo color, escrito a mano (sin Pillow)"""
+    def bloque(tipo: bytes, datos: bytes) -> bytes:
+        return struct.pack(">I", len(datos)) + tipo + datos + struct.pack(">I", zlib.crc32(tipo + datos))
+
+    fila = b"\x00" + bytes(color) * ancho
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + bloque(b"IHDR", struct.pack(">IIBBBBB", ancho, alto, 8, 2, 0, 0, 0))
+        + bloque(b"IDAT", zlib.compress(fila * alto, 6))
+        + bloque(b"IEND", b"")
+    )
+
+
+class ProveedorStub(ProveedorImagen):
+    """PNG liso con el color UAGRM: instantáneo y sin red"""
+
+    nombre = "stub"
+    timeout_por_defecto = 2.0
+    marcador = True
+
+    def generar(self, prompt: str, ancho: int, alto: int) -> bytes:
+        return _png_liso(ancho, alto, PALETA_UAGRM[0][0])
+
+
+PROVEEDORES = {
+    proveedor.nombre: proveedor
+    for proveedor in (ProveedorStability(), ProveedorLocal(), ProveedorStub())
+}
+
+
+def generar_imagen(prompt: str, ancho: int = 1024, alto: int = 1024, proveedores: list = None) -> dict:
+    """
+    Prueba los proveedores en orden hasta que uno devuelva la imagen.
+
+    Returns:
+        {"bytes", "mime", "proveedor", "marcador"}
+
+    Raises:
+        ImagenNoDisponible si todos fallan
+    """
+    nombres = proveedores or IMAGEN_PROVEEDORES
+    for nombre in nombres:
+        proveedor = PROVEEDORES.get(nombre)
+        if proveedor is None:
+            print(f"⚠️ Proveedor de imágenes desconocido: {nombre}")
+            continue
+
+        inicio = time.perf_counter()
+        futuro = _pool.submit(proveedor.generar, prompt, ancho, alto)
+        try:
+            imagen = futuro.result(timeout=proveedor.timeout)
+        except FuturesTimeout:
+            futuro.cancel()
+            proveedor.metricas.registrar("timeout")
+            print(f"⏱️ {nombre}: sin imagen después de {proveedor.timeout:.0f}s, probando el siguiente")
+            continue
+        except ProveedorNoDisponible as e:
+            proveedor.metricas.registrar("no_disponible")
+            print(f"⚠️ {nombre} no disponible: {e}")
+            continue
+        except Exception as e:
+            proveedor.metricas.registrar("error")
+            print(f"❌ Error con {nombre}: {type(e).__name__}: {e}")
+            continue
+
+        segundos = time.perf_counter() - inicio
+        proveedor.metricas.registrar("ok", segundos)
+        print(f"✅ Imagen de {nombre} ({len(imagen)} bytes, {segundos:.2f}s)")
+        return {"bytes": imagen, "mime": proveedor.mime, "proveedor": nombre, "marcador": proveedor.marcador}
+
+    raise ImagenNoDisponible(f"Ningún proveedor pudo generar la imagen ({', '.join(nombres)})")
+
+
+def publicable(imagen: dict) -> bool:
+    """
+    Si la imagen puede publicarse en una red real: los marcadores de
+    posición (local, stub) solo con IMAGEN_PERMITIR_MARCADORES=true.
+    """
+    if imagen.get("marcador") and not IMAGEN_PERMITIR_MARCADORES:
+        print(f"⚠️ Imagen de '{imagen.get('proveedor')}' es un marcador de posición: no se publica")
+        return False
+    return True
+
+
+def metricas() -> dict:
+    return {nombre: proveedor.metricas.resumen() for nombre, proveedor in PROVEEDORES.items()}
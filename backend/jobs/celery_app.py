@@ -0,0 +1,53 @@
+"""
+Aplicación Celery para ejecutar las tareas registradas en jobs.service
+
+Solo se usa con JOBS_BACKEND=celery. Iniciar el worker desde backend/:
+    celery -A jobs.celery_app worker --concurrency=2
+"""
+import os
+from celery import Celery
+from dotenv import load_dotenv
+
+from jobs.service import TAREAS, ContextoJob, JOBS_TTL_SEGUNDOS
+
+load_dotenv()
+
+BROKER_URL = os.getenv("CELERY_BROKER_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", BROKER_URL)
+
+celery_app = Celery("redes_sociales", broker=BROKER_URL, backend=RESULT_BACKEND)
+celery_app.conf.update(
+    task_track_started=True,
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    result_expires=JOBS_TTL_SEGUNDOS,
+)
+
+# Importar los módulos que registran tareas
+import chat.pipeline  # noqa: E402,F401
+
+
+def _registrar(nombre: str, func):
+    @celery_app.task(name=nombre, bind=True)
+    def _tarea(self, *args, _usuario_id=None, **kwargs):
+        meta = {"tipo": nombre, "usuario_id": _usuario_id}
+        self.update_state(state="STARTED", meta=meta)
+
+        contexto = ContextoJob(
+            self.request.id,
+            lambda etapa, datos: self.update_state(state="PROGRESS", meta={**meta, "etapa": etapa})
+        )
+        try:
+            resultado = func(contexto, *args, **kwargs)
+        except Exception as e:
+            contexto.finalizar(error=str(e))
+            raise
+
+        contexto.finalizar(resultado=resultado)
+        return resultado
+
+    return _tarea
+
+
+for _nombre, _func in TAREAS.items():
+    _registrar(_nombre, _func)
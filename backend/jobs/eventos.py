@@ -0,0 +1,195 @@
+"""
+Bus de eventos de progreso del pipeline de publicación
+
+Cada job (o cada publicación multi-red en streaming) tiene un "canal".
+Los hilos del pipeline publican eventos estructurados y los endpoints SSE
+los reenvían al frontend a medida que ocurren:
+
+    {"tipo": "adaptacion_lista", "red": "instagram", "ts": 1700000000.0, ...}
+
+Tipos de evento: validacion_completa, adaptacion_lista, imagen_lista,
+video_progreso, publicacion, completado, error.
+
+Backends:
+- local (por defecto): en memoria, para el pool de hilos del mismo proceso
+- redis (JOBS_BACKEND=celery): los workers de Celery publican en Redis pub/sub
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+
+EVENTOS_HISTORIAL_MAX = int(os.getenv("EVENTOS_HISTORIAL_MAX", 200))
+EVENTOS_TTL_SEGUNDOS = int(os.getenv("EVENTOS_TTL_SEGUNDOS", 600))
+EVENTOS_KEEPALIVE_SEGUNDOS = 15
+
+TIPOS_FINALES = ("completado", "error")
+
+_FIN = object()
+
+
+def crear_evento(tipo: str, **datos) -> dict:
+    return {"tipo": tipo, "ts": round(time.time(), 3), **datos}
+
+
+def formatear_sse(evento) -> str:
+    """Convierte un evento al formato text/event-stream (None = keepalive)"""
+    if evento is None:
+        return ": keepalive\n\n"
+    return f"event: {evento['tipo']}\ndata: {json.dumps(evento, ensure_ascii=False, default=str)}\n\n"
+
+
+class BusLocal:
+    """Pub/sub en memoria; publicar() se puede llamar desde cualquier hilo"""
+
+    def __init__(self):
+        self._historial = {}
+        self._cerrados = {}
+        self._suscriptores = {}
+        self._lock = threading.Lock()
+
+    def publicar(self, canal: str, tipo: str, **datos):
+        evento = crear_evento(tipo, **datos)
+
+        with self._lock:
+            self._historial.setdefault(canal, deque(maxlen=EVENTOS_HISTORIAL_MAX)).append(evento)
+            suscriptores = list(self._suscriptores.get(canal, []))
+
+        for loop, cola in suscriptores:
+            self._entregar(loop, cola, evento)
+
+    def cerrar_canal(self, canal: str):
+        with self._lock:
+            self._cerrados[canal] = time.time()
+            suscriptores = list(self._suscriptores.get(canal, []))
+
+        for loop, cola in suscriptores:
+            self._entregar(loop, cola, _FIN)
+
+        self._limpiar_expirados()
+
+    @staticmethod
+    def _entregar(loop, cola, evento):
+        try:
+            loop.call_soon_threadsafe(cola.put_nowait, evento)
+        except RuntimeError:
+            pass  # El loop del suscriptor ya se cerró
+
+    def _limpiar_expirados(self):
+        limite = time.time() - EVENTOS_TTL_SEGUNDOS
+        with self._lock:
+            for canal in [c for c, t in self._cerrados.items() if t < limite]:
+                self._cerrados.pop(canal, None)
+                self._historial.pop(canal, None)
+
+    async def suscribir(self, canal: str, keepalive: float = EVENTOS_KEEPALIVE_SEGUNDOS):
+        """
+        Itera los eventos del canal: primero el historial, luego los nuevos.
+        Produce None cada `keepalive` segundos sin eventos. Termina al cerrar el canal.
+        """
+        loop = asyncio.get_running_loop()
+        cola = asyncio.Queue()
+        suscriptor = (loop, cola)
+
+        with self._lock:
+            previos = list(self._historial.get(canal, []))
+            cerrado = canal in self._cerrados
+            if not cerrado:
+                self._suscriptores.setdefault(canal, []).append(suscriptor)
+
+        try:
+            for evento in previos:
+                yield evento
+            if cerrado:
+                return
+
+            while True:
+                try:
+                    evento = await asyncio.wait_for(cola.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                if evento is _FIN:
+                    return
+                yield evento
+        finally:
+            with self._lock:
+                if suscriptor in self._suscriptores.get(canal, []):
+                    self._suscriptores[canal].remove(suscriptor)
+                    if not self._suscriptores[canal]:
+                        del self._suscriptores[canal]
+
+
+class BusRedis:
+    """
+    Pub/sub con Redis, para cuando el pipeline corre en workers de Celery.
+    Guarda también el historial del canal para los suscriptores que llegan tarde.
+    """
+
+    def __init__(self, url: str):
+        import redis
+        self._url = url
+        self._redis = redis.Redis.from_url(url)
+
+    def publicar(self, canal: str, tipo: str, **datos):
+        mensaje = json.dumps(crear_evento(tipo, **datos), ensure_ascii=False, default=str)
+        clave = f"eventos:historial:{canal}"
+
+        pipe = self._redis.pipeline()
+        pipe.rpush(clave, mensaje)
+        pipe.ltrim(clave, -EVENTOS_HISTORIAL_MAX, -1)
+        pipe.expire(clave, EVENTOS_TTL_SEGUNDOS)
+        pipe.publish(f"eventos:{canal}", mensaje)
+        pipe.execute()
+
+    def cerrar_canal(self, canal: str):
+        pipe = self._redis.pipeline()
+        pipe.set(f"eventos:cerrado:{canal}", 1, ex=EVENTOS_TTL_SEGUNDOS)
+        pipe.publish(f"eventos:{canal}", "__fin__")
+        pipe.execute()
+
+    async def suscribir(self, canal: str, keepalive: float = EVENTOS_KEEPALIVE_SEGUNDOS):
+        import redis.asyncio as redis_async
+
+        cliente = redis_async.Redis.from_url(self._url)
+        pubsub = cliente.pubsub()
+        await pubsub.subscribe(f"eventos:{canal}")
+
+        try:
+            # Suscribirse antes de leer el historial evita perder eventos intermedios
+            vistos = set()
+            for mensaje in await cliente.lrange(f"eventos:historial:{canal}", 0, -1):
+                vistos.add(mensaje)
+                yield json.loads(mensaje)
+
+            if await cliente.exists(f"eventos:cerrado:{canal}"):
+                return
+
+            while True:
+                mensaje = await pubsub.get_message(ignore_subscribe_messages=True, timeout=keepalive)
+                if mensaje is None:
+                    yield None
+                    continue
+
+                data = mensaje["data"]
+                if data == b"__fin__":
+                    return
+                if data in vistos:
+                    continue
+                yield json.loads(data)
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+            await cliente.aclose()
+
+
+def crear_bus():
+    if os.getenv("JOBS_BACKEND", "local") == "celery":
+        return BusRedis(os.getenv("CELERY_BROKER_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    return BusLocal()
+
+
+bus = crear_bus()
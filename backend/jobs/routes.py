@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from auth.models import User
+from dependencies import get_current_user
+from . import eventos, schemas, service
+
+# Cabeceras para que proxies (nginx) no acumulen el stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+router = APIRouter(
+    prefix="/api/jobs",
+    tags=["jobs"]
+)
+
+
+@router.get("/{job_id}", response_model=schemas.JobResponse)
+def get_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Obtiene el estado de un job en segundo plano"""
+    return _obtener_job(job_id, current_user)
+
+
+@router.get("/{job_id}/eventos")
+def stream_job_events(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream SSE con el progreso del job: validación, adaptación por red,
+    imagen lista, % de render del video y resultado de cada publicación.
+    Termina con un evento 'completado' o 'error'.
+    """
+    _obtener_job(job_id, current_user)
+
+    async def generar():
+        async for evento in eventos.bus.suscribir(job_id):
+            yield eventos.formatear_sse(evento)
+
+    return StreamingResponse(generar(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _obtener_job(job_id: str, current_user: User) -> dict:
+    job = service.cola.estado(job_id)
+
+    if not job or job.get("usuario_id") != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
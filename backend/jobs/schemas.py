@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Any, Optional
+
+
+class JobResponse(BaseModel):
+    id: str
+    tipo: Optional[str] = None
+    estado: str  # 'pendiente' | 'en_proceso' | 'completado' | 'error'
+    etapa: Optional[str] = None
+    creado_en: Optional[float] = None
+    iniciado_en: Optional[float] = None
+    terminado_en: Optional[float] = None
+    resultado: Optional[Any] = None
+    error: Optional[str] = None
@@ -0,0 +1,254 @@
+"""
+Cola de trabajos en segundo plano
+
+Los pipelines largos (adaptación, imágenes, render de TikTok, publicación)
+se ejecutan fuera del request HTTP. El endpoint devuelve un job_id al instante
+y el cliente consulta el estado en /api/jobs/{job_id} o sigue el progreso
+en vivo en /api/jobs/{job_id}/eventos (SSE, ver jobs.eventos).
+
+Backends (variable JOBS_BACKEND):
+- "local" (por defecto): pool de hilos dentro del proceso de uvicorn
+- "celery": workers de Celery con Redis como broker
+      celery -A jobs.celery_app worker --concurrency=2
+"""
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from jobs import eventos
+
+JOBS_BACKEND = os.getenv("JOBS_BACKEND", "local")
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", 2))
+JOBS_TTL_SEGUNDOS = int(os.getenv("JOBS_TTL_SEGUNDOS", 3600))
+
+# Estados posibles de un job
+PENDIENTE = "pendiente"
+EN_PROCESO = "en_proceso"
+COMPLETADO = "completado"
+ERROR = "error"
+
+# Registro de tareas: nombre → función(contexto, *args, **kwargs)
+TAREAS = {}
+
+
+def tarea(nombre: str):
+    """Decorador para registrar una función como tarea ejecutable en la cola"""
+    def decorador(func):
+        TAREAS[nombre] = func
+        return func
+    return decorador
+
+
+class ContextoJob:
+    """
+    Se pasa como primer argumento a cada tarea.
+    Permite reportar la etapa actual del pipeline; cada reporte se publica
+    también como evento en el canal del job.
+    """
+
+    def __init__(self, job_id: str, al_reportar=None):
+        self.id = job_id
+        self._al_reportar = al_reportar
+
+    def reportar(self, etapa: str, **datos):
+        print(f"📌 [Job {self.id[:8]}] {etapa}")
+        if self._al_reportar:
+            self._al_reportar(etapa, datos)
+        eventos.bus.publicar(self.id, etapa, **datos)
+
+    def finalizar(self, resultado=None, error: str = None):
+        """Publica el evento final (completado/error) y cierra el canal"""
+        if error is None:
+            eventos.bus.publicar(self.id, "completado", resultado=resultado)
+        else:
+            eventos.bus.publicar(self.id, "error", error=error)
+        eventos.bus.cerrar_canal(self.id)
+
+
+# ============================================
+# 🧵 BACKEND LOCAL (pool de hilos)
+# ============================================
+
+class ColaLocal:
+    """Ejecuta las tareas en un ThreadPoolExecutor y guarda el estado en memoria"""
+
+    def __init__(self, workers: int = JOBS_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def encolar(self, nombre: str, usuario_id: int, *args, **kwargs) -> dict:
+        if nombre not in TAREAS:
+            raise ValueError(f"Tarea '{nombre}' no registrada")
+
+        self._limpiar_expirados()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "tipo": nombre,
+            "usuario_id": usuario_id,
+            "estado": PENDIENTE,
+            "etapa": None,
+            "creado_en": time.time(),
+            "iniciado_en": None,
+            "terminado_en": None,
+            "resultado": None,
+            "error": None,
+        }
+
+        with self._lock:
+            self._jobs[job_id] = job
+            snapshot = dict(job)
+
+        self._executor.submit(self._ejecutar, job_id, nombre, args, kwargs)
+        return snapshot
+
+    def estado(self, job_id: str):
+        # También al consultar: sin encolados nuevos los terminados no se liberarían
+        self._limpiar_expirados()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _actualizar(self, job_id: str, **cambios):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(cambios)
+
+    def _ejecutar(self, job_id: str, nombre: str, args, kwargs):
+        self._actualizar(job_id, estado=EN_PROCESO, iniciado_en=time.time())
+        contexto = ContextoJob(job_id, lambda etapa, datos: self._actualizar(job_id, etapa=etapa))
+
+        try:
+            resultado = TAREAS[nombre](contexto, *args, **kwargs)
+            self._actualizar(job_id, estado=COMPLETADO, resultado=resultado, terminado_en=time.time())
+            contexto.finalizar(resultado=resultado)
+        except Exception as e:
+            print(f"❌ [Job {job_id[:8]}] Error: {e}")
+            traceback.print_exc()
+            self._actualizar(job_id, estado=ERROR, error=str(e), terminado_en=time.time())
+            contexto.finalizar(error=str(e))
+
+    def _limpiar_expirados(self):
+        limite = time.time() - JOBS_TTL_SEGUNDOS
+        with self._lock:
+            expirados = [
+                job_id for job_id, job in self._jobs.items()
+                if job["terminado_en"] and job["terminado_en"] < limite
+            ]
+            for job_id in expirados:
+                del self._jobs[job_id]
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            estados = [job["estado"] for job in self._jobs.values()]
+        return {
+            "backend": "local",
+            "pendientes": estados.count(PENDIENTE),
+            "en_proceso": estados.count(EN_PROCESO),
+        }
+
+    def cerrar(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ============================================
+# 🥬 BACKEND CELERY (Redis)
+# ============================================
+
+_ESTADOS_CELERY = {
+    "PENDING": PENDIENTE,
+    "RECEIVED": PENDIENTE,
+    "STARTED": EN_PROCESO,
+    "PROGRESS": EN_PROCESO,
+    "RETRY": EN_PROCESO,
+    "SUCCESS": COMPLETADO,
+    "FAILURE": ERROR,
+    "REVOKED": ERROR,
+}
+
+
+class ColaCelery:
+    """
+    Envía las tareas a Celery; el estado se lee del result backend (Redis).
+    El dueño de cada job se guarda aparte en job:owner:<id> al encolar,
+    porque el result backend no lo conoce mientras el job está PENDING ni
+    después de SUCCESS.
+    """
+
+    def __init__(self, app=None, redis_cliente=None):
+        if app is None:
+            from jobs.celery_app import celery_app as app
+        if redis_cliente is None:
+            import redis
+            redis_cliente = redis.Redis.from_url(
+                os.getenv("CELERY_BROKER_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0")),
+                socket_timeout=1
+            )
+        self._app = app
+        self._redis = redis_cliente
+
+    def encolar(self, nombre: str, usuario_id: int, *args, **kwargs) -> dict:
+        if nombre not in TAREAS:
+            raise ValueError(f"Tarea '{nombre}' no registrada")
+
+        job_id = uuid.uuid4().hex
+        self._redis.set(f"job:owner:{job_id}", usuario_id, ex=JOBS_TTL_SEGUNDOS)
+        self._app.send_task(nombre, args=args, kwargs={**kwargs, "_usuario_id": usuario_id}, task_id=job_id)
+
+        return {
+            "id": job_id,
+            "tipo": nombre,
+            "usuario_id": usuario_id,
+            "estado": PENDIENTE,
+            "etapa": None,
+            "creado_en": time.time(),
+            "iniciado_en": None,
+            "terminado_en": None,
+            "resultado": None,
+            "error": None,
+        }
+
+    def estado(self, job_id: str):
+        dueno = self._redis.get(f"job:owner:{job_id}")
+        if dueno is None:
+            # Job inexistente o expirado: sin dueño conocido no se expone
+            return None
+
+        resultado = self._app.AsyncResult(job_id)
+        meta = resultado.info if isinstance(resultado.info, dict) else {}
+        estado = _ESTADOS_CELERY.get(resultado.state, EN_PROCESO)
+
+        return {
+            "id": job_id,
+            "tipo": meta.get("tipo"),
+            "usuario_id": int(dueno),
+            "estado": estado,
+            "etapa": meta.get("etapa"),
+            "creado_en": None,
+            "iniciado_en": None,
+            "terminado_en": None,
+            "resultado": resultado.result if estado == COMPLETADO else None,
+            "error": str(resultado.result) if estado == ERROR else None,
+        }
+
+    def estadisticas(self) -> dict:
+        return {"backend": "celery"}
+
+    def cerrar(self):
+        pass
+
+
+def crear_cola():
+    if JOBS_BACKEND == "celery":
+        print("🥬 Cola de trabajos: Celery")
+        return ColaCelery()
+    print(f"🧵 Cola de trabajos: local ({JOBS_WORKERS} workers)")
+    return ColaLocal(JOBS_WORKERS)
+
+
+cola = crear_cola()
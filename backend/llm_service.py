@@ -1,4 +1,5 @@
 import os
+import base64
 import google.generativeai as genai
 from dotenv import load_dotenv
 import subprocess
@@ -6,6 +7,19 @@ import tempfile
 import re
 import shutil
 import platform
+from concurrent.futures import ThreadPoolExecutor
+
+import cache_audio
+import cache_clips
+import cache_service
+import descargas
+import especulacion
+import imagen_redes
+import imagen_service
+import media_probe
+import media_store
+import render_service
+import tts_service
 
 load_dotenv()
 
@@ -19,8 +33,10 @@ generation_config = genai.GenerationConfig(
     response_mime_type="application/json",
 )
 
+MODELO_GEMINI = 'gemini-2.0-flash'
+
 model = genai.GenerativeModel(
-    model_name='gemini-2.0-flash',
+    model_name=MODELO_GEMINI,
     generation_config=generation_config,
 )
 
@@ -45,6 +61,24 @@ else:
     FFMPEG_PATH = shutil.which('ffmpeg') or 'ffmpeg'
     print(f"🎬 Usando FFmpeg desde PATH: {FFMPEG_PATH}")
 
+# Resolución de salida de los videos de TikTok. También decide qué versión
+# de cada clip de Pexels se descarga (la más chica que la cubra)
+TIKTOK_ANCHO = int(os.getenv("TIKTOK_ANCHO", 540))
+TIKTOK_ALTO = int(os.getenv("TIKTOK_ALTO", 960))
+TIKTOK_FPS = int(os.getenv("TIKTOK_FPS", 25))
+
+# Velocidad de la narración (se aplica con atempo dentro del render)
+TTS_VELOCIDAD = float(os.getenv("TTS_VELOCIDAD", 1.5))
+
+# Presets de codificación del render (variable RENDER_PRESET)
+PRESETS_RENDER = {
+    "rapido": ['-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '26'],
+    "balanceado": ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23'],
+    "calidad": ['-c:v', 'libx264', '-preset', 'medium', '-crf', '20'],
+    "nvenc": ['-c:v', 'h264_nvenc', '-preset', 'p4', '-cq', '23'],
+}
+RENDER_PRESET = os.getenv("RENDER_PRESET", "rapido")
+
 # ============================================
 
 PROMPTS_POR_RED = {
@@ -214,15 +248,8 @@ PROMPTS_POR_RED = {
 import json
 import httpx
 
-def validar_contenido_academico(texto: str) -> dict:
-    """
-    Valida si el contenido es apropiado para publicación académica/universitaria.
-    VERSIÓN MEJORADA: Acepta contenido relacionado con UAGRM incluso si es sensible.
-    """
-    prompt_validacion = f"""
-    Eres un moderador de contenido para redes sociales de la UAGRM (Universidad Autónoma Gabriel René Moreno).
-    Tu tarea es determinar si el siguiente contenido es apropiado para publicar en las redes sociales oficiales de la universidad.
-    
+# Criterios de moderación compartidos por la validación sola y la combinada
+CRITERIOS_VALIDACION = """
     ⭐ REGLA CRÍTICA: Si el contenido menciona "UAGRM" o cualquiera de sus facultades (FICCT, FIA, FCS, FACICO, Medicina, Derecho, Economía, etc.), 
     el contenido DEBE ser considerado académico, ya que se refiere directamente a la institución universitaria.
     
@@ -254,7 +281,19 @@ def validar_contenido_academico(texto: str) -> dict:
     - La universidad puede y debe comunicar tanto logros como problemas institucionales
     - NO rechaces contenido solo porque sea controversial o sensible si es relevante para la comunidad universitaria
     - Si el texto menciona "docentes de la Universidad", "estudiantes de UAGRM", "FICCT", etc., ES CONTENIDO ACADÉMICO VÁLIDO
+"""
+
+
+def validar_contenido_academico(texto: str) -> dict:
+    """
+    Valida si el contenido es apropiado para publicación académica/universitaria.
+    VERSIÓN MEJORADA: Acepta contenido relacionado con UAGRM incluso si es sensible.
+    """
+    prompt_validacion = f"""
+    Eres un moderador de contenido para redes sociales de la UAGRM (Universidad Autónoma Gabriel René Moreno).
+    Tu tarea es determinar si el siguiente contenido es apropiado para publicar en las redes sociales oficiales de la universidad.
     
+    {CRITERIOS_VALIDACION}
     Contenido a evaluar: "{texto}"
     
     Debes responder ÚNICAMENTE con un JSON en el siguiente formato:
@@ -285,9 +324,19 @@ def validar_contenido_academico(texto: str) -> dict:
         }
 
 
-def adaptar_contenido(titulo: str, contenido: str, red_social: str):
+# Caché de adaptaciones: la clave es modelo + prompt renderizado, así que
+# editar una plantilla de PROMPTS_POR_RED invalida sus entradas automáticamente
+cache_adaptaciones = cache_service.crear_cache(
+    "adaptaciones",
+    maxsize=int(os.getenv("CACHE_ADAPTACIONES_MAX", 512)),
+    ttl=int(os.getenv("CACHE_ADAPTACIONES_TTL", 24 * 3600))
+)
+
+
+def adaptar_contenido(titulo: str, contenido: str, red_social: str, usar_cache: bool = True):
     """
     Adapta el contenido para una red social específica usando Gemini.
+    Las respuestas válidas se cachean (usar_cache=False para forzar una llamada nueva).
     """
     print(f"Adaptando contenido para: {red_social}")
     
@@ -300,15 +349,25 @@ def adaptar_contenido(titulo: str, contenido: str, red_social: str):
     # 2. Formatear el prompt con el contenido del usuario
     prompt_final = prompt_template.format(titulo=titulo, contenido=contenido)
     
+    return cache_adaptaciones.obtener_o_calcular(
+        cache_service.clave_cache(MODELO_GEMINI, prompt_final),
+        lambda: _generar_adaptacion(prompt_final, red_social),
+        usar_cache=usar_cache
+    )
+
+
+def _limpiar_json_llm(texto: str) -> str:
+    """Quita los bloques ```json que a veces agrega el modelo"""
+    return texto.strip().replace('```json\n', '').replace('```\n', '').replace('```', '').strip()
+
+
+def _generar_adaptacion(prompt_final: str, red_social: str) -> dict:
     try:
         # 3. Llamar a la API de Gemini
         response = model.generate_content(prompt_final)
         
-        # 4. Parsear la respuesta
-        response_text = response.text.strip()
-        
-        # Limpiar markdown si existe
-        response_text = response_text.replace('```json\n', '').replace('```\n', '').replace('```', '').strip()
+        # 4. Parsear la respuesta (limpiando markdown si existe)
+        response_text = _limpiar_json_llm(response.text)
         
         # Parsear JSON
         response_json = json.loads(response_text)
@@ -336,116 +395,307 @@ def adaptar_contenido(titulo: str, contenido: str, red_social: str):
 
 
 # ============================================
-# 🆕 GENERACIÓN DE IMÁGENES CON REPLICATE
+# 📦 ADAPTACIÓN MULTI-RED EN UNA SOLA LLAMADA
+# ============================================
+
+PROMPT_ADAPTACION_MULTI = """
+    Eres un experto en marketing de redes sociales para instituciones académicas.
+    Vas a adaptar el MISMO contenido para varias redes sociales en una sola respuesta.
+
+    Contenido original:
+    - Título: {titulo}
+    - Contenido: {contenido}
+
+    Abajo están las instrucciones de cada red, separadas por "=== RED: <nombre> ===".
+    Cada sección se refiere al contenido original de arriba. Sigue las instrucciones
+    de cada red por separado, sin mezclar tonos ni formatos.
+
+    {secciones}
+
+    Debes responder ÚNICAMENTE con un objeto JSON cuyas claves sean exactamente: {redes}.
+    El valor de cada clave debe ser el JSON que pide la sección de esa red.
+    NO incluyas texto adicional, SOLO el JSON.
+    """
+
+
+def _secciones_multi(redes: list) -> str:
+    """Instrucciones de cada red, sin repetir el contenido original en cada una"""
+    return "\n".join(
+        f"=== RED: {red} ===\n" + PROMPTS_POR_RED[red].format(
+            titulo="(ver título original arriba)",
+            contenido="(ver contenido original arriba)"
+        )
+        for red in redes
+    )
+
+
+def _clave_adaptacion(titulo: str, contenido: str, red_social: str) -> str:
+    """Misma clave que usa adaptar_contenido para la red"""
+    prompt_final = PROMPTS_POR_RED[red_social].format(titulo=titulo, contenido=contenido)
+    return cache_service.clave_cache(MODELO_GEMINI, prompt_final)
+
+
+def _extraer_adaptacion(valor):
+    """Valida el bloque de una red dentro de la respuesta en lote"""
+    if isinstance(valor, list) and valor:
+        valor = valor[0]
+    if isinstance(valor, dict) and valor.get("text"):
+        return valor
+    return None
+
+
+def _repartir_adaptaciones(data: dict, titulo: str, contenido: str, pendientes: list, usar_cache: bool) -> dict:
+    """
+    Toma de la respuesta en lote la adaptación de cada red pendiente.
+    Las que falten o no tengan el formato esperado se piden por separado.
+    """
+    resultados = {}
+
+    for red in pendientes:
+        adaptacion = _extraer_adaptacion(data.get(red))
+
+        if adaptacion is None:
+            print(f"⚠️ {red}: sin adaptación válida en el lote, reintentando por separado...")
+            resultados[red] = adaptar_contenido(titulo, contenido, red, usar_cache=usar_cache)
+            continue
+
+        resultados[red] = adaptacion
+        if cache_service.activa(usar_cache):
+            cache_adaptaciones.guardar(_clave_adaptacion(titulo, contenido, red), adaptacion)
+
+    return resultados
+
+
+def _separar_cacheadas(titulo: str, contenido: str, redes: list, usar_cache: bool):
+    """Devuelve (resultados ya resueltos, redes que hay que pedir al modelo)"""
+    resultados = {}
+    pendientes = []
+
+    for red in redes:
+        if red not in PROMPTS_POR_RED:
+            resultados[red] = {"error": f"Red social '{red}' no soportada."}
+            continue
+
+        cacheada = None
+        if cache_service.activa(usar_cache):
+            cacheada = cache_adaptaciones.obtener(_clave_adaptacion(titulo, contenido, red))
+
+        if cacheada is not None:
+            resultados[red] = cacheada
+        else:
+            pendientes.append(red)
+
+    return resultados, pendientes
+
+
+def adaptar_contenido_multi(titulo: str, contenido: str, redes: list, usar_cache: bool = True) -> dict:
+    """
+    Adapta el contenido para varias redes con UNA sola llamada a Gemini,
+    en lugar de una llamada por red.
+
+    - Las redes que ya están en caché no se vuelven a pedir.
+    - Las redes que no se puedan parsear de la respuesta se adaptan
+      por separado con adaptar_contenido.
+
+    Returns:
+        dict red → adaptación (o {"error": ...}), en el orden de `redes`
+    """
+    redes = list(dict.fromkeys(redes))
+    resultados, pendientes = _separar_cacheadas(titulo, contenido, redes, usar_cache)
+
+    if len(pendientes) == 1:
+        red = pendientes[0]
+        resultados[red] = adaptar_contenido(titulo, contenido, red, usar_cache=usar_cache)
+
+    elif pendientes:
+        print(f"📦 Adaptando en una sola llamada para: {', '.join(pendientes)}")
+        prompt = PROMPT_ADAPTACION_MULTI.format(
+            titulo=titulo,
+            contenido=contenido,
+            secciones=_secciones_multi(pendientes),
+            redes=", ".join(pendientes)
+        )
+
+        try:
+            response = model.generate_content(prompt)
+            data = json.loads(_limpiar_json_llm(response.text))
+        except Exception as e:
+            print(f"⚠️ Error en la adaptación en lote: {e}")
+            data = {}
+
+        if not isinstance(data, dict):
+            data = {}
+
+        resultados.update(_repartir_adaptaciones(data, titulo, contenido, pendientes, usar_cache))
+
+    return {red: resultados[red] for red in redes}
+
+
+# ============================================
+# 🔀 VALIDACIÓN + ADAPTACIÓN EN UNA SOLA LLAMADA
+# ============================================
+
+# Con "false" se vuelve a validar y adaptar en dos llamadas separadas
+VALIDAR_Y_ADAPTAR_COMBINADO = os.getenv("LLM_VALIDAR_Y_ADAPTAR", "true").lower() == "true"
+
+PROMPT_VALIDAR_Y_ADAPTAR = """
+    Eres moderador de contenido y experto en marketing de redes sociales de la UAGRM
+    (Universidad Autónoma Gabriel René Moreno). Tienes DOS tareas sobre el mismo contenido.
+
+    Contenido original:
+    - Título: {titulo}
+    - Contenido: {contenido}
+
+    TAREA 1 - VALIDACIÓN: determina si el contenido es apropiado para publicar en las
+    redes sociales oficiales de la universidad.
+    {criterios}
+
+    TAREA 2 - ADAPTACIÓN (SOLO si el contenido es académico): sigue las instrucciones
+    de cada red, separadas por "=== RED: <nombre> ===". Cada sección se refiere al
+    contenido original de arriba.
+
+    {secciones}
+
+    Debes responder ÚNICAMENTE con un JSON en el siguiente formato:
+    {{
+      "validacion": {{"es_academico": true o false, "razon": "Breve explicación"}},
+      "adaptaciones": {{"<red>": <el JSON que pide la sección de esa red>}}
+    }}
+
+    - Las claves de "adaptaciones" deben ser exactamente: {redes}.
+    - Si es_academico es false, devuelve "adaptaciones": {{}} y no adaptes nada.
+    NO incluyas texto adicional, SOLO el JSON.
+    """
+
+
+def validar_y_adaptar(texto: str, redes: list, titulo: str = None, usar_cache: bool = True, combinado: bool = None) -> dict:
+    """
+    Valida el contenido y lo adapta para todas las redes en una sola llamada a Gemini,
+    en lugar de validar_contenido_academico + adaptar_contenido_multi en serie.
+
+    Si el contenido no es académico, "adaptaciones" viene vacío y el llamador
+    no debe generar media. Las redes que falten en la respuesta se adaptan por
+    separado; si la validación no se puede leer, se valida por separado.
+
+    Args:
+        combinado: None usa LLM_VALIDAR_Y_ADAPTAR; False fuerza las dos llamadas
+
+    Returns:
+        {"validacion": {"es_academico", "razon"}, "adaptaciones": {red: adaptación}}
+    """
+    titulo = titulo if titulo is not None else texto[:50]
+    redes = list(dict.fromkeys(redes))
+    combinado = VALIDAR_Y_ADAPTAR_COMBINADO if combinado is None else combinado
+
+    if not combinado:
+        validacion = validar_contenido_academico(texto)
+        if not validacion.get("es_academico", False):
+            return {"validacion": validacion, "adaptaciones": {}}
+        return {"validacion": validacion, "adaptaciones": adaptar_contenido_multi(titulo, texto, redes, usar_cache)}
+
+    resultados, pendientes = _separar_cacheadas(titulo, texto, redes, usar_cache)
+
+    print(f"🔀 Validando y adaptando en una sola llamada para: {', '.join(pendientes) or '(todo en caché)'}")
+    prompt = PROMPT_VALIDAR_Y_ADAPTAR.format(
+        titulo=titulo,
+        contenido=texto,
+        criterios=CRITERIOS_VALIDACION,
+        secciones=_secciones_multi(pendientes),
+        redes=", ".join(pendientes)
+    )
+
+    try:
+        response = model.generate_content(prompt)
+        data = json.loads(_limpiar_json_llm(response.text))
+    except Exception as e:
+        print(f"⚠️ Error en validación + adaptación combinada: {e}")
+        data = {}
+
+    if not isinstance(data, dict):
+        data = {}
+
+    validacion = data.get("validacion")
+    if not isinstance(validacion, dict) or "es_academico" not in validacion:
+        print("⚠️ Validación ausente en la respuesta combinada, validando por separado...")
+        validacion = validar_contenido_academico(texto)
+
+    if not validacion.get("es_academico", False):
+        return {"validacion": validacion, "adaptaciones": {}}
+
+    adaptaciones = data.get("adaptaciones")
+    if not isinstance(adaptaciones, dict):
+        adaptaciones = {}
+
+    resultados.update(_repartir_adaptaciones(adaptaciones, titulo, texto, pendientes, usar_cache))
+    return {"validacion": validacion, "adaptaciones": {red: resultados[red] for red in redes}}
+
+
+# ============================================
+# 🆕 GENERACIÓN DE IMÁGENES (ver imagen_service.py)
 # ============================================
 
+def _subir_a_imgur(imagen_bytes: bytes) -> str:
+    print("📤 Subiendo a Imgur...")
+    imgur_response = httpx.post(
+        "https://api.imgur.com/3/upload",
+        headers={"Authorization": "Client-ID 546c25a59c58ad7"},
+        files={"image": imagen_bytes},
+        timeout=30.0
+    )
+    imgur_response.raise_for_status()
+    url_imgur = imgur_response.json()["data"]["link"]
+    print(f"✅ Imgur: {url_imgur}")
+    return url_imgur
+
+
+def publicar_imagen(imagen_bytes: bytes, mime: str) -> str:
+    """URL pública de la imagen: /media del backend, o Imgur si no hay MEDIA_PUBLIC_URL"""
+    if media_store.configurado():
+        url = media_store.publicar(imagen_bytes, mime)
+        print(f"✅ Imagen publicada: {url}")
+        return url
+    return _subir_a_imgur(imagen_bytes)
+
+
 def generar_imagen_ia(prompt_imagen: str) -> str:
     """
-    Genera imagen con IA y sube a Imgur
+    Genera imagen con IA y devuelve su URL pública (ver publicar_imagen)
+
+    Los proveedores se prueban en el orden de IMAGEN_PROVEEDORES; si solo
+    hay un marcador de posición (tarjeta local, stub), devuelve None.
+    La imagen se publica ya adaptada al perfil "instagram" (ver imagen_redes).
     """
     try:
-        import httpx
-        import base64
-        
-        STABILITY_KEY = os.getenv("STABILITY_API_KEY")
-        
-        print(f"🎨 Generando con Stability AI...")
         print(f"📝 Prompt: {prompt_imagen[:100]}...")
-        
-        response = httpx.post(
-            "https://api.stability.ai/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image",
-            headers={
-                "Authorization": f"Bearer {STABILITY_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "text_prompts": [{"text": f"professional university photo, {prompt_imagen}, realistic, high quality"}],
-                "cfg_scale": 7,
-                "height": 1024,
-                "width": 1024,
-                "samples": 1,
-            },
-            timeout=60.0
-        )
-        response.raise_for_status()
-        
-        result = response.json()
-        imagen_base64_str = result["artifacts"][0]["base64"]
-        imagen_bytes = base64.b64decode(imagen_base64_str)
-        
-        print(f"✅ Imagen generada ({len(imagen_bytes)} bytes)")
-        
-        # Subir a Imgur
-        print("📤 Subiendo a Imgur...")
-        imgur_response = httpx.post(
-            "https://api.imgur.com/3/upload",
-            headers={"Authorization": "Client-ID 546c25a59c58ad7"},
-            files={"image": imagen_bytes},
-            timeout=30.0
-        )
-        imgur_response.raise_for_status()
-        
-        url_imgur = imgur_response.json()["data"]["link"]
-        print(f"✅ Imgur: {url_imgur}")
-        return url_imgur
-            
+        imagen = imagen_service.generar_imagen(prompt_imagen)
+        if not imagen_service.publicable(imagen):
+            return None
+        imagen = imagen_redes.preparar(imagen, "instagram")
+        return publicar_imagen(imagen["bytes"], imagen["mime"])
     except Exception as e:
-        print(f"❌ Error con IA: {e}")
-        # Fallback a imagen estática que funciona
-        print("⚠️ Usando imagen de respaldo...")
-        
-        response = httpx.get("https://picsum.photos/id/180/1080/1080", follow_redirects=True)
-        imagen_bytes = response.content
-        
-        imgur_response = httpx.post(
-            "https://api.imgur.com/3/upload",
-            headers={"Authorization": "Client-ID 546c25a59c58ad7"},
-            files={"image": imagen_bytes}
-        )
-        return imgur_response.json()["data"]["link"]
+        print(f"❌ Error generando imagen: {type(e).__name__}: {e}")
+        return None
 
 
 def generar_imagen_ia_base64(prompt_imagen: str) -> str:
+    """
+    Igual que generar_imagen_ia, pero devuelve un data URL (sin Imgur)
+
+    Se usa para los estados de WhatsApp: la imagen viaja dentro del JSON,
+    así que se adapta al perfil "whatsapp" (800x800 JPEG, ~300 KB) en lugar
+    de mandar el PNG original de varios MB.
+    """
     try:
-        import httpx
-        import base64
-        
-        STABILITY_KEY = os.getenv("STABILITY_API_KEY")
-        
-        if not STABILITY_KEY:
-            return "https://picsum.photos/800/800"
-        
-        print(f"🎨 Generando con Stability AI (base64)...")
-        
-        response = httpx.post(
-            "https://api.stability.ai/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image",
-            
-            headers={
-                "Authorization": f"Bearer {STABILITY_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "text_prompts": [{"text": f"professional photo, {prompt_imagen}, university, realistic"}],
-                "cfg_scale": 7,
-                "height": 1024,
-                "width": 1024,
-                "samples": 1,
-            },
-            timeout=60.0
-        )
-        
-        result = response.json()
-        imagen_base64_str = result["artifacts"][0]["base64"]
-        
-        # Convertir a data URL
-        data_url = f"data:image/png;base64,{imagen_base64_str}"
-        
-        print(f"✅ Imagen generada en base64")
-        return data_url
-        
+        imagen = imagen_service.generar_imagen(prompt_imagen)
+        if not imagen_service.publicable(imagen):
+            return None
+        imagen = imagen_redes.preparar(imagen, "whatsapp")
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return "https://picsum.photos/800/800"
+        print(f"❌ Error generando imagen: {type(e).__name__}: {e}")
+        return None
+
+    print(f"✅ Imagen generada en base64")
+    return f"data:{imagen['mime']};base64,{base64.b64encode(imagen['bytes']).decode('ascii')}"
 
 
 def extraer_keywords_con_llm(texto: str) -> list:
@@ -738,6 +988,8 @@ def buscar_video_pexels_inteligente(keywords: list, orientation: str = "portrait
     2. Intenta keyword completa → simplificada → primera palabra
     3. Fallback inteligente si no encuentra suficientes
     4. Evita videos irrelevantes con filtros de calidad
+    5. Una página de candidatos por búsqueda, cacheada (ver buscar_candidatos_pexels)
+    6. Sin clips repetidos (ver SeleccionClips)
     
     Args:
         keywords: Lista de keywords específicas (mínimo 3 palabras cada una)
@@ -777,54 +1029,46 @@ def buscar_video_pexels_inteligente(keywords: list, orientation: str = "portrait
     # ═══════════════════════════════════════════════════════════════
     # 🎬 BÚSQUEDA CON ESTRATEGIA DE FALLBACK
     # ═══════════════════════════════════════════════════════════════
-    
+    # Cada búsqueda trae una página de candidatos, así que casi siempre
+    # alcanza con la keyword completa. Los intentos más cortos (3 → 2
+    # palabras) solo se lanzan, en paralelo, para las keywords sin video.
+    seleccion = SeleccionClips()
+    escalones = []
     for keyword in keywords_validas[:2]:  # Buscar con las 2 mejores keywords
-        print(f"───────────────────────────────────────")
-        print(f"🔍 Buscando: '{keyword}'")
-        
-        # ─────────────────────────────────────────────────────────
-        # INTENTO 1: Keyword completa (3-5 palabras)
-        # ─────────────────────────────────────────────────────────
-        url = buscar_video_pexels(keyword, orientation)
-        if url:
-            video_urls.append(url)
-            print(f"✅ Video encontrado con keyword completa")
-            continue
-        
-        print(f"⚠️ No encontrado con keyword completa")
-        
-        # ─────────────────────────────────────────────────────────
-        # INTENTO 2: Versión simplificada (primeras 3 palabras)
-        # ─────────────────────────────────────────────────────────
         palabras = keyword.split()
+        intentos = [keyword]
         if len(palabras) > 3:
-            keyword_simplificada = " ".join(palabras[:3])
-            print(f"🔄 Intentando versión simplificada: '{keyword_simplificada}'")
-            
-            url = buscar_video_pexels(keyword_simplificada, orientation)
-            if url:
-                video_urls.append(url)
-                print(f"✅ Video encontrado con versión simplificada")
-                continue
-            
-            print(f"⚠️ No encontrado con versión simplificada")
-        
-        # ─────────────────────────────────────────────────────────
-        # INTENTO 3: Primeras 2 palabras (más general)
-        # ─────────────────────────────────────────────────────────
+            intentos.append(" ".join(palabras[:3]))
         if len(palabras) >= 2:
-            keyword_base = " ".join(palabras[:2])
-            print(f"🔄 Intentando versión base: '{keyword_base}'")
-            
-            url = buscar_video_pexels(keyword_base, orientation)
-            if url:
-                video_urls.append(url)
-                print(f"✅ Video encontrado con versión base")
-                continue
-            
-            print(f"⚠️ No encontrado con versión base")
-        
-        print(f"❌ No se encontró video para: '{keyword}'")
+            intentos.append(" ".join(palabras[:2]))
+        escalones.append((keyword, list(dict.fromkeys(intentos))))
+    
+    def buscar_todas(queries: list) -> dict:
+        queries = list(dict.fromkeys(queries))
+        with ThreadPoolExecutor(max_workers=PEXELS_CONCURRENCIA, thread_name_prefix="pexels") as executor:
+            return dict(zip(queries, executor.map(lambda q: buscar_candidatos_pexels(q, orientation), queries)))
+    
+    resultados = buscar_todas([intentos[0] for _, intentos in escalones])
+    
+    pendientes = [(k, intentos) for k, intentos in escalones if not resultados[intentos[0]]]
+    if pendientes:
+        print(f"🔄 Intentando versiones más cortas para: {[k for k, _ in pendientes]}")
+        resultados.update(buscar_todas([q for _, intentos in pendientes for q in intentos[1:]]))
+    
+    for keyword, intentos in escalones:
+        candidato = next((c for c in (seleccion.tomar(resultados.get(q, [])) for q in intentos) if c), None)
+        if candidato:
+            print(f"✅ Video para '{keyword}'")
+        else:
+            print(f"❌ No se encontró video para: '{keyword}'")
+    
+    # Si falta un clip, se completa con otros candidatos de las mismas búsquedas
+    if len(seleccion.urls) < 2:
+        for _, intentos in escalones:
+            for query in intentos:
+                seleccion.completar(resultados.get(query, []), 2)
+    
+    video_urls = seleccion.urls
     
     # ═══════════════════════════════════════════════════════════════
     # 🆘 FALLBACK FINAL: Si no se encontraron suficientes videos
@@ -842,16 +1086,17 @@ def buscar_video_pexels_inteligente(keywords: list, orientation: str = "portrait
             "university hallway students walking"
         ]
         
+        # Una búsqueda suele alcanzar; las demás solo si no hay suficientes
         for fb_keyword in fallback_keywords:
             if len(video_urls) >= 3:
                 break
             
             print(f"🔄 Fallback: '{fb_keyword}'")
-            url = buscar_video_pexels(fb_keyword, orientation)
+            antes = len(video_urls)
+            seleccion.completar(buscar_candidatos_pexels(fb_keyword, orientation), 3)
             
-            if url and url not in video_urls:
-                video_urls.append(url)
-                print(f"✅ Video fallback agregado")
+            if len(video_urls) > antes:
+                print(f"✅ {len(video_urls) - antes} video(s) fallback agregados")
     
     # ═══════════════════════════════════════════════════════════════
     # 📊 RESULTADO FINAL
@@ -872,21 +1117,149 @@ def buscar_video_pexels_inteligente(keywords: list, orientation: str = "portrait
     return video_urls[:3]  # Máximo 3 videos      
 
 
-def buscar_video_pexels(query: str, orientation: str = "portrait") -> str:
+def _cubre_salida(vf: dict, ancho: int = None, alto: int = None, fps: int = None) -> bool:
+    """Indica si la versión alcanza la resolución y los fps de salida"""
+    ancho = ancho or TIKTOK_ANCHO
+    alto = alto or TIKTOK_ALTO
+    fps = fps or TIKTOK_FPS
+    # El render recorta para cubrir la salida, así que basta con el lado corto
+    lado_corto, lado_largo = sorted((vf["width"], vf["height"]))
+    salida_corto, salida_largo = sorted((ancho, alto))
+    return lado_corto >= salida_corto and lado_largo >= salida_largo and (vf.get("fps") or fps) >= fps
+
+
+def seleccionar_rendicion(video_files: list, ancho: int = None, alto: int = None, fps: int = None, orientation: str = "portrait") -> dict:
+    """
+    Elige la versión (video_file) más liviana que cubra la resolución de salida.
+
+    Pexels ofrece cada video en varias resoluciones (SD, HD, UHD...). Como el
+    render escala todo a TIKTOK_ANCHO x TIKTOK_ALTO, bajar el UHD solo gasta
+    red y tiempo de decodificación.
+
+    Orden de preferencia:
+    1. Orientación pedida (si existe alguna versión así)
+    2. La más chica que sea >= ancho x alto y >= fps
+    3. Si ninguna alcanza, la más grande disponible
+    """
+    ancho = ancho or TIKTOK_ANCHO
+    alto = alto or TIKTOK_ALTO
+    fps = fps or TIKTOK_FPS
+
+    archivos = [vf for vf in video_files if vf.get("link") and vf.get("width") and vf.get("height")]
+    if not archivos:
+        return None
+
+    if orientation == "portrait":
+        orientados = [vf for vf in archivos if vf["width"] < vf["height"]]
+    elif orientation == "landscape":
+        orientados = [vf for vf in archivos if vf["width"] > vf["height"]]
+    else:
+        orientados = []
+    candidatos = orientados or archivos
+
+    def pixeles(vf):
+        return vf["width"] * vf["height"]
+
+    suficientes = [vf for vf in candidatos if _cubre_salida(vf, ancho, alto, fps)]
+    if suficientes:
+        return min(suficientes, key=lambda vf: (pixeles(vf), vf.get("fps") or 0, vf.get("size") or 0))
+
+    return max(candidatos, key=lambda vf: (pixeles(vf), vf.get("fps") or 0))
+
+
+def _describir_rendicion(video: dict, vf: dict) -> dict:
+    """Datos de la versión elegida: resolución, peso y bitrate estimado"""
+    duracion = video.get("duration") or 0
+    tamano = vf.get("size")
+    return {
+        "video_id": video.get("id"),
+        "link": vf.get("link"),
+        "width": vf.get("width"),
+        "height": vf.get("height"),
+        "fps": vf.get("fps"),
+        "quality": vf.get("quality"),
+        "duration": duracion,
+        "size_bytes": tamano,
+        "bitrate_kbps": round(tamano * 8 / duracion / 1000) if tamano and duracion else None,
+    }
+
+
+# Caché de búsquedas en Pexels: la clave es la query normalizada + orientación
+# + perfil de salida (que decide la versión elegida). Se guarda la página
+# completa de candidatos ya ordenados. Las búsquedas sin resultados también
+# se guardan (con un TTL más corto) para no repetirlas
+cache_busquedas_pexels = cache_service.crear_cache(
+    "pexels_busquedas",
+    maxsize=int(os.getenv("CACHE_PEXELS_MAX", 1024)),
+    ttl=int(os.getenv("CACHE_PEXELS_TTL", 6 * 3600))
+)
+cache_busquedas_pexels_vacias = cache_service.crear_cache(
+    "pexels_sin_resultados",
+    maxsize=int(os.getenv("CACHE_PEXELS_MAX", 1024)),
+    ttl=int(os.getenv("CACHE_PEXELS_TTL_VACIO", 3600))
+)
+
+# Búsquedas simultáneas a la API de Pexels (cuida el rate limit)
+PEXELS_CONCURRENCIA = int(os.getenv("PEXELS_CONCURRENCIA", 4))
+
+# Candidatos por búsqueda y rango de duración preferido para un clip
+PEXELS_POR_PAGINA = int(os.getenv("PEXELS_POR_PAGINA", 15))
+CLIP_DURACION_MIN = int(os.getenv("CLIP_DURACION_MIN", 5))
+CLIP_DURACION_MAX = int(os.getenv("CLIP_DURACION_MAX", 40))
+
+
+def _clave_busqueda_pexels(query: str, orientation: str) -> str:
+    query_normalizada = " ".join(query.lower().split())
+    return cache_service.clave_cache(
+        "pexels_candidatos", query_normalizada, orientation, PEXELS_POR_PAGINA, TIKTOK_ANCHO, TIKTOK_ALTO, TIKTOK_FPS
+    )
+
+
+def ordenar_candidatos(candidatos: list, orientation: str = "portrait") -> list:
+    """
+    Ordena los candidatos de una búsqueda, del mejor al peor:
+    1. Orientación pedida
+    2. Versión que cubre la resolución de salida
+    3. Duración dentro de CLIP_DURACION_MIN..CLIP_DURACION_MAX
+    4. Relevancia según Pexels (posición en la página)
+    5. Menor tamaño de archivo
+    """
+    def orientacion_ok(c):
+        if orientation == "portrait":
+            return c["width"] < c["height"]
+        if orientation == "landscape":
+            return c["width"] > c["height"]
+        return True
+
+    def clave(par):
+        posicion, c = par
+        return (
+            not orientacion_ok(c),
+            not _cubre_salida(c),
+            not (CLIP_DURACION_MIN <= (c.get("duration") or 0) <= CLIP_DURACION_MAX),
+            posicion,
+            c.get("size_bytes") or 0,
+        )
+
+    return [c for _, c in sorted(enumerate(candidatos), key=clave)]
+
+
+def _consultar_pexels(query: str, orientation: str):
     """
-    Busca un video en Pexels API
+    Llamada a la API. Devuelve (candidatos, sin_resultados): los errores de
+    red o de configuración no cuentan como "sin resultados" (no se cachean).
     """
     PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
     
     if not PEXELS_API_KEY:
         print("⚠️ PEXELS_API_KEY no configurada")
-        return None
+        return [], False
     
     headers = {"Authorization": PEXELS_API_KEY}
     
     params = {
         "query": query,
-        "per_page": 1,
+        "per_page": PEXELS_POR_PAGINA,
         "orientation": orientation,  # portrait para TikTok
         "size": "medium"
     }
@@ -903,29 +1276,100 @@ def buscar_video_pexels(query: str, orientation: str = "portrait") -> str:
         data = response.json()
         videos = data.get("videos", [])
         
-        if videos:
-            # Buscar el archivo de video en resolución portrait
-            video_files = videos[0].get("video_files", [])
-            
-            # Priorizar resolución HD portrait
-            for vf in video_files:
-                if vf.get("width", 0) < vf.get("height", 0):  # Portrait
-                    print(f"✅ Video encontrado: {query}")
-                    return vf.get("link")
-            
-            # Si no hay portrait, usar el primero
-            if video_files:
-                return video_files[0].get("link")
+        candidatos = []
+        for video in videos:
+            vf = seleccionar_rendicion(video.get("video_files", []), orientation=orientation)
+            if vf:
+                candidatos.append(_describir_rendicion(video, vf))
+        
+        if candidatos:
+            candidatos = ordenar_candidatos(candidatos, orientation)
+            mejor = candidatos[0]
+            peso = f"{mejor['size_bytes'] / (1024 * 1024):.1f} MB" if mejor["size_bytes"] else "? MB"
+            bitrate = f"{mejor['bitrate_kbps']} kbps" if mejor["bitrate_kbps"] else "? kbps"
+            print(f"✅ {len(candidatos)} videos para: {query} (mejor: {mejor['width']}x{mejor['height']} @ {mejor.get('fps') or '?'}fps, {peso}, {bitrate})")
+            return candidatos, False
         
         print(f"⚠️ No se encontraron videos para: {query}")
-        return None
+        return [], True
         
     except Exception as e:
         print(f"❌ Error buscando video en Pexels: {e}")
-        return None
+        return [], False
+
+
+def buscar_candidatos_pexels(query: str, orientation: str = "portrait", usar_cache: bool = True) -> list:
+    """
+    Busca en Pexels API y devuelve una página de candidatos (una versión
+    por video, ver seleccionar_rendicion) ordenados con ordenar_candidatos()
+
+    usar_cache: False para forzar la llamada a la API
+    """
+    clave = _clave_busqueda_pexels(query, orientation)
+    cache_activa = cache_service.activa(usar_cache)
+
+    if cache_activa:
+        candidatos = cache_busquedas_pexels.obtener(clave)
+        if candidatos is not None:
+            print(f"🗃️ Búsqueda en caché: {query}")
+            return candidatos
+        if cache_busquedas_pexels_vacias.obtener(clave) is not None:
+            print(f"🗃️ Sin resultados (en caché): {query}")
+            return []
+
+    candidatos, sin_resultados = _consultar_pexels(query, orientation)
+
+    if cache_activa:
+        if candidatos:
+            cache_busquedas_pexels.guardar(clave, candidatos)
+        elif sin_resultados:
+            cache_busquedas_pexels_vacias.guardar(clave, {"query": query})
+
+    return candidatos
+
+
+def buscar_rendicion_pexels(query: str, orientation: str = "portrait", usar_cache: bool = True) -> dict:
+    """
+    Busca un video en Pexels API y devuelve el mejor candidato con su
+    resolución, tamaño y bitrate (o None)
+    """
+    candidatos = buscar_candidatos_pexels(query, orientation, usar_cache)
+    return candidatos[0] if candidatos else None
+
 
+def buscar_video_pexels(query: str, orientation: str = "portrait") -> str:
+    """
+    Busca un video en Pexels API (solo el link de la versión elegida)
+    """
+    rendicion = buscar_rendicion_pexels(query, orientation)
+    return rendicion["link"] if rendicion else None
+
+
+class SeleccionClips:
+    """
+    Reparte clips distintos entre los lugares del video: un mismo video de
+    Pexels (aunque aparezca en varias búsquedas) se usa una sola vez.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self._usados = set()
+
+    def _id(self, candidato: dict):
+        return candidato.get("video_id") or candidato["link"]
 
+    def tomar(self, candidatos: list) -> dict:
+        """Agrega el primer candidato que no se haya usado (o None)"""
+        for candidato in candidatos:
+            if self._id(candidato) not in self._usados:
+                self._usados.add(self._id(candidato))
+                self.urls.append(candidato["link"])
+                return candidato
+        return None
 
+    def completar(self, candidatos: list, hasta: int):
+        while len(self.urls) < hasta and self.tomar(candidatos):
+            pass
 
 
 def limpiar_texto_para_tts(texto: str) -> str:
@@ -1054,15 +1498,21 @@ def generar_guion_narracion(texto_original: str) -> str:
         # Fallback: usar el texto original limpio
         return limpiar_texto_para_tts(texto_original)
 
-def generar_audio_gTTS(texto: str, usar_guion_ia: bool = True) -> str:
+def generar_audio_gTTS(texto: str, usar_guion_ia: bool = True, velocidad: float = None) -> str:
     """
     Genera audio con Google TTS (gTTS) - VERSIÓN MEJORADA
-    🆕 Ahora con velocidad x1.5
+    🆕 Ahora con velocidad x1.5 (TTS_VELOCIDAD)
+
+    velocidad: 1.0 devuelve el audio tal cual, sin la pasada extra de FFmpeg
+               (el render de TikTok aplica atempo en su propio grafo)
+
+    El audio final se guarda en cache_audio: el mismo texto a la misma
+    velocidad no vuelve a pasar por gTTS ni por FFmpeg. La síntesis se hace
+    por oraciones en paralelo (ver tts_service).
     """
+    velocidad = TTS_VELOCIDAD if velocidad is None else velocidad
+    motor = tts_service.motor.nombre
     try:
-        from gtts import gTTS
-        from pydub import AudioSegment
-        
         print(f"🎤 Generando audio con Google TTS (gTTS)...")
         
         # Generar guión inteligente con IA
@@ -1077,33 +1527,38 @@ def generar_audio_gTTS(texto: str, usar_guion_ia: bool = True) -> str:
         
         print(f"📝 Texto que se leerá: {texto_final[:150]}...")
         
-        # Crear audio con gTTS
-        tts = gTTS(text=texto_final, lang='es', slow=False)
+        audio_en_cache = cache_audio.obtener(texto_final, 'es', velocidad, motor)
+        if audio_en_cache:
+            print(f"🗃️ Audio en caché: {audio_en_cache}")
+            return audio_en_cache
+        
+        # Crear audio con gTTS (oración por oración)
+        temp_audio_path = tts_service.sintetizar_narracion(texto_final, 'es')
         
-        # Guardar en archivo temporal
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as audio_file:
-            tts.save(audio_file.name)
-            temp_audio_path = audio_file.name
+        if velocidad == 1.0:
+            cache_audio.guardar(temp_audio_path, texto_final, 'es', velocidad, motor)
+            print(f"✅ Audio generado: {temp_audio_path}")
+            return temp_audio_path
         
         # 🆕 AUMENTAR VELOCIDAD x1.5 usando FFmpeg directamente
-        print("⚡ Aumentando velocidad a x1.5 con FFmpeg...")
+        print(f"⚡ Aumentando velocidad a x{velocidad} con FFmpeg...")
         
         # Crear ruta para audio acelerado
         audio_rapido_path = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3').name
         
         # Usar FFmpeg para acelerar (atempo=1.5)
-        subprocess.run([
-            FFMPEG_PATH,
+        ejecutar_ffmpeg_con_progreso([
             '-i', temp_audio_path,
-            '-filter:a', 'atempo=1.5',  # Acelerar 1.5x
+            '-filter:a', f'atempo={velocidad}',  # Acelerar 1.5x
             '-y',
             audio_rapido_path
-        ], check=True, capture_output=True, text=True)
+        ], 0)
         
         # Limpiar audio temporal original
         os.unlink(temp_audio_path)
         
-        print(f"✅ Audio generado con velocidad x1.5: {audio_rapido_path}")
+        cache_audio.guardar(audio_rapido_path, texto_final, 'es', velocidad, motor)
+        print(f"✅ Audio generado con velocidad x{velocidad}: {audio_rapido_path}")
         return audio_rapido_path
             
     except ImportError as e:
@@ -1148,150 +1603,428 @@ def verificar_ffmpeg() -> bool:
         return False
 
 
-def combinar_videos_con_audio(video_urls: list, audio_path: str, duracion_total: int = 15) -> str:
+def ejecutar_ffmpeg_con_progreso(args: list, duracion_segundos: float, progreso=None, inicio: int = 0, fin: int = 100,
+                                 timeout: float = None, cancelacion=None):
     """
-    Combina múltiples videos con audio usando FFmpeg
-    🆕 Ahora ajusta duración automáticamente según el audio
+    Ejecuta FFmpeg leyendo su salida de -progress para reportar el avance.
+    Pasa por el pool de render_service (concurrencia, -threads, timeout).
+
+    Args:
+        args: argumentos de FFmpeg (sin el ejecutable)
+        duracion_segundos: duración esperada del resultado, para calcular el %
+        progreso: callback(porcentaje) opcional
+        inicio, fin: rango de porcentaje que cubre este comando
+        timeout: segundos máximos del proceso (por defecto RENDER_TIMEOUT)
+        cancelacion: TokenCancelacion opcional (ver especulacion.py)
     """
-    try:
-        # Verificar FFmpeg
-        if not verificar_ffmpeg():
-            return None
+    estado = {"ultimo": inicio}
+
+    def al_linea(linea):
+        clave, _, valor = linea.strip().partition('=')
+        if clave != 'out_time_us' or not valor.isdigit():
+            return
+
+        fraccion = min(int(valor) / 1_000_000 / duracion_segundos, 1.0)
+        porcentaje = inicio + int((fin - inicio) * fraccion)
+        if porcentaje >= estado["ultimo"] + 5:
+            estado["ultimo"] = porcentaje
+            progreso(porcentaje)
+
+    render_service.pool.ejecutar(
+        [FFMPEG_PATH, '-progress', 'pipe:1', '-nostats', '-loglevel', 'error', *args],
+        timeout=timeout or render_service.RENDER_TIMEOUT,
+        cancelacion=cancelacion,
+        al_linea=al_linea if progreso and duracion_segundos else None
+    )
 
-        print(f"🎬 Combinando {len(video_urls)} videos con audio...")
+    if progreso and estado["ultimo"] < fin:
+        progreso(fin)
+
+
+def _resolver_preset(preset: str = None) -> str:
+    preset = preset or RENDER_PRESET
+    if preset not in PRESETS_RENDER:
+        print(f"⚠️ RENDER_PRESET '{preset}' desconocido, usando 'rapido'")
+        preset = "rapido"
+    return preset
+
+
+def _filtro_normalizar(ancho: int = None, alto: int = None, fps: int = None) -> str:
+    """Escala/recorta al tamaño de salida con fps y formato de píxel fijos"""
+    ancho = ancho or TIKTOK_ANCHO
+    alto = alto or TIKTOK_ALTO
+    fps = fps or TIKTOK_FPS
+    return (
+        f"scale={ancho}:{alto}:force_original_aspect_ratio=increase,"
+        f"crop={ancho}:{alto},setsar=1,fps={fps},format=yuv420p"
+    )
+
+
+def construir_grafo_render(n_clips: int, velocidad_audio: float = 1.0, ancho: int = None, alto: int = None, fps: int = None) -> str:
+    """
+    filter_complex del render de TikTok: escala/recorta cada clip a la
+    salida, los concatena y ajusta el tempo de la narración (última entrada).
+    """
+    filtro = _filtro_normalizar(ancho, alto, fps)
+    cadenas = [f"[{i}:v]{filtro}[v{i}]" for i in range(n_clips)]
+    entradas = "".join(f"[v{i}]" for i in range(n_clips))
+    cadenas.append(f"{entradas}concat=n={n_clips}:v=1:a=0[video]")
+
+    if velocidad_audio != 1.0:
+        cadenas.append(f"[{n_clips}:a]atempo={velocidad_audio}[audio]")
+    else:
+        cadenas.append(f"[{n_clips}:a]anull[audio]")
+
+    return ";".join(cadenas)
 
-        # Descargar videos
-        video_paths = []
-        for i, url in enumerate(video_urls):
-            if not url:
-                continue
 
-            print(f"📥 Descargando video {i+1}/{len(video_urls)}...")
-            response = httpx.get(url, timeout=30.0)
+def argumentos_render(video_paths: list, audio_path: str, output_path: str, duracion_segundos: float,
+                      velocidad_audio: float = 1.0, preset: str = None) -> list:
+    """Argumentos de FFmpeg (sin el ejecutable) para el render en una sola pasada"""
+    preset = _resolver_preset(preset)
 
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as video_file:
-                video_file.write(response.content)
-                video_paths.append(video_file.name)
+    args = []
+    for path in video_paths:
+        args += ['-i', path]
+    args += ['-i', audio_path]
+
+    return args + [
+        '-filter_complex', construir_grafo_render(len(video_paths), velocidad_audio),
+        '-map', '[video]', '-map', '[audio]',
+        *PRESETS_RENDER[preset],
+        '-c:a', 'aac', '-b:a', '128k',
+        '-t', f"{duracion_segundos:.3f}",
+        '-shortest',
+        '-movflags', '+faststart',
+        '-y', output_path
+    ]
+
+
+# ============================================
+# 🗃️ SEGMENTOS NORMALIZADOS (ver cache_clips.py)
+# ============================================
+
+CLIPS_MAX_SEGUNDOS = int(os.getenv("CLIPS_MAX_SEGUNDOS", 30))
+
+
+def perfil_salida(preset: str = None) -> str:
+    """Identifica el formato de los segmentos: solo se concatenan iguales"""
+    return f"{TIKTOK_ANCHO}x{TIKTOK_ALTO}_{TIKTOK_FPS}fps_{_resolver_preset(preset)}"
+
+
+def argumentos_normalizar_clip(origen: str, destino: str, preset: str = None) -> list:
+    """Convierte un clip al perfil de salida, sin audio, listo para concatenar con copy"""
+    return [
+        '-i', origen,
+        '-an',
+        '-vf', _filtro_normalizar(),
+        *PRESETS_RENDER[_resolver_preset(preset)],
+        '-t', str(CLIPS_MAX_SEGUNDOS),
+        '-video_track_timescale', '90000',
+        '-movflags', '+faststart',
+        '-y', destino
+    ]
+
+
+def argumentos_concat_copia(lista_path: str, audio_path: str, output_path: str, duracion_segundos: float,
+                            velocidad_audio: float = 1.0) -> list:
+    """Concatena segmentos normalizados sin recodificar el video y agrega la narración"""
+    filtro_audio = ['-af', f'atempo={velocidad_audio}'] if velocidad_audio != 1.0 else []
+    return [
+        '-f', 'concat', '-safe', '0', '-i', lista_path,
+        '-i', audio_path,
+        '-map', '0:v:0', '-map', '1:a:0',
+        '-c:v', 'copy',
+        *filtro_audio,
+        '-c:a', 'aac', '-b:a', '128k',
+        '-t', f"{duracion_segundos:.3f}",
+        '-shortest',
+        '-movflags', '+faststart',
+        '-y', output_path
+    ]
+
+
+def preparar_segmentos(video_urls: list, preset: str = None, progreso=None, cancelacion=None) -> list:
+    """
+    Devuelve los segmentos normalizados de cada clip (en orden), usando la
+    caché de clips. Solo los que faltan se descargan y se convierten, en
+    paralelo a través del pool de render: cada clip se normaliza apenas
+    termina su descarga, sin esperar a los demás.
+
+    progreso: callback(porcentaje) opcional, de 0 a 100 sobre esta etapa
+    """
+    perfil = perfil_salida(preset)
+    urls = [url for url in video_urls if url]
+    segmentos = [None] * len(urls)
+    faltantes = []
+
+    for indice, url in enumerate(urls):
+        video_id = cache_clips.id_video(url)
+        segmentos[indice] = cache_clips.cache.obtener(video_id, perfil)
+        if segmentos[indice] is None:
+            faltantes.append((indice, url, video_id))
+
+    print(f"🗃️ Clips en caché: {len(urls) - len(faltantes)}/{len(urls)}")
+
+    if faltantes:
+        print(f"📥 Descargando {len(faltantes)} videos...")
+        listos = {"n": 0}
+
+        def normalizar(faltante, origen):
+            indice, _, video_id = faltante
+            if not origen:
+                return
+            destino = cache_clips.cache.ruta_temporal(video_id, perfil)
+            try:
+                ejecutar_ffmpeg_con_progreso(argumentos_normalizar_clip(origen, destino, preset), 0, cancelacion=cancelacion)
+                segmentos[indice] = cache_clips.cache.guardar(destino, video_id, perfil)
+            except Exception as e:
+                print(f"❌ No se pudo normalizar el clip {video_id}: {type(e).__name__}: {e}")
+                if os.path.exists(destino):
+                    os.unlink(destino)
+            finally:
+                os.unlink(origen)
+                listos["n"] += 1
+                if progreso:
+                    progreso(listos["n"] * 100 // len(faltantes))
+
+        with ThreadPoolExecutor(max_workers=len(faltantes), thread_name_prefix="normalizar") as executor:
+            futuros = [
+                executor.submit(normalizar, faltantes[posicion], origen)
+                for posicion, origen in descargas.descargar_a_medida([url for _, url, _ in faltantes], sufijo='.mp4')
+            ]
+            for futuro in futuros:
+                futuro.result()
+
+    return [segmento for segmento in segmentos if segmento]
+
+
+def _render_una_pasada(video_urls, audio_path, output_path, duracion, velocidad_audio, preset, progreso, cancelacion) -> bool:
+    video_paths = []
+    try:
+        # Descargar videos (en paralelo y directo a disco, ver descargas.py)
+        print(f"📥 Descargando {len(video_urls)} videos...")
+        video_paths = descargas.descargar_en_paralelo(video_urls, sufijo='.mp4')
 
         if not video_paths:
             print("❌ No se descargaron videos")
-            return None
+            return False
 
-        # 🆕 CALCULAR DURACIÓN DEL AUDIO
-        from pydub import AudioSegment
-        audio = AudioSegment.from_file(audio_path)
-        duracion_audio_segundos = len(audio) / 1000.0
-        
-        print(f"⏱️  Duración del audio: {duracion_audio_segundos:.1f} segundos")
-        
-        # Crear archivo temporal para el video final
-        output_path = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4').name
+        print("🔄 Renderizando (concat + escala + audio en una pasada)...")
+        ejecutar_ffmpeg_con_progreso(
+            argumentos_render(video_paths, audio_path, output_path, duracion, velocidad_audio, preset),
+            duracion, progreso, cancelacion=cancelacion
+        )
+        return True
 
-        # Crear lista de archivos para FFmpeg
-        concat_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt')
+    finally:
+        # Limpiar archivos temporales
         for path in video_paths:
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def _cubrir_duracion(segmentos: list, duracion: float) -> list:
+    """
+    Repite la lista de segmentos hasta cubrir la narración: con -shortest y
+    -c:v copy, si los clips suman menos que el audio el video queda corto.
+    """
+    duraciones = [media_probe.duracion(segmento) for segmento in segmentos]
+    if None in duraciones or sum(duraciones) <= 0:
+        return segmentos
+
+    total = sum(duraciones)
+    if total >= duracion:
+        return segmentos
+
+    vueltas = int(duracion // total) + 1
+    print(f"🔁 Clips: {total:.1f}s para {duracion:.1f}s de audio, se repiten x{vueltas}")
+    return segmentos * vueltas
+
+
+def _render_con_segmentos(video_urls, audio_path, output_path, duracion, velocidad_audio, preset, progreso, cancelacion) -> bool:
+    # Normalizar lo que falte ocupa el 0-70%; la concatenación (copy) el resto
+    reportar = (lambda p: progreso(p * 70 // 100)) if progreso else None
+    segmentos = preparar_segmentos(video_urls, preset, reportar, cancelacion)
+
+    if not segmentos:
+        print("❌ No se obtuvieron clips")
+        return False
+
+    segmentos = _cubrir_duracion(segmentos, duracion)
+
+    concat_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt')
+    try:
+        for path in segmentos:
             path_normalized = path.replace('\\', '/')
             concat_file.write(f"file '{path_normalized}'\n")
         concat_file.close()
 
-        # Combinar videos
-        temp_video = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4').name
-
-        print("🔄 Concatenando videos...")
-        subprocess.run([
-            FFMPEG_PATH, '-f', 'concat', '-safe', '0',
-            '-i', concat_file.name,
-            '-vf', f'scale=540:960:force_original_aspect_ratio=increase,crop=540:960',
-            '-t', str(duracion_audio_segundos),  # 🆕 Usar duración del audio
-            '-c:v', 'libx264', '-preset', 'ultrafast',
-            '-y', temp_video
-        ], check=True, capture_output=True, text=True)
-
-        # Agregar audio
-        print("🔄 Agregando audio...")
-        subprocess.run([
-            FFMPEG_PATH, '-i', temp_video, '-i', audio_path,
-            '-c:v', 'copy', '-c:a', 'aac',
-            '-map', '0:v:0', '-map', '1:a:0',
-            '-shortest',
-            '-y', output_path
-        ], check=True, capture_output=True, text=True)
-
-        print(f"✅ Video final creado: {output_path}")
+        print("🔄 Concatenando segmentos (sin recodificar video)...")
+        ejecutar_ffmpeg_con_progreso(
+            argumentos_concat_copia(concat_file.name, audio_path, output_path, duracion, velocidad_audio),
+            duracion, progreso, 70 if progreso else 0, 100, cancelacion=cancelacion
+        )
+        return True
 
-        # Limpiar archivos temporales
+    finally:
         os.unlink(concat_file.name)
-        os.unlink(temp_video)
-        for path in video_paths:
-            os.unlink(path)
 
-        return output_path
+
+def combinar_videos_con_audio(video_urls: list, audio_path: str, duracion_total: int = 15, progreso=None,
+                              velocidad_audio: float = 1.0, preset: str = None, cancelacion=None) -> str:
+    """
+    Combina múltiples videos con audio usando FFmpeg
+    🆕 Ahora ajusta duración automáticamente según el audio
+    🆕 progreso: callback(porcentaje) opcional con el avance del render
+
+    Con la caché de clips (por defecto), cada clip se normaliza una sola vez
+    al perfil de salida y el render final solo concatena con -c:v copy.
+    Con CLIPS_CACHE_DESACTIVADO se usa una sola pasada de FFmpeg (ver
+    construir_grafo_render). En ambos casos se acelera la narración
+    (velocidad_audio) y se recorta a la duración del audio.
+    preset: clave de PRESETS_RENDER (por defecto RENDER_PRESET)
+    cancelacion: TokenCancelacion opcional; detiene el render en curso
+    """
+    output_path = None
+    try:
+        # Verificar FFmpeg
+        if not verificar_ffmpeg():
+            return None
+
+        print(f"🎬 Combinando {len(video_urls)} videos con audio...")
+
+        # 🆕 CALCULAR DURACIÓN DEL AUDIO (ya acelerado), leyendo los encabezados
+        duracion_audio_segundos = media_probe.duracion(audio_path)
+        if not duracion_audio_segundos:
+            print(f"❌ No se pudo leer la duración del audio: {audio_path}")
+            return None
+        duracion_audio_segundos /= velocidad_audio
+        
+        print(f"⏱️  Duración del audio: {duracion_audio_segundos:.1f} segundos")
+        
+        # Crear archivo temporal para el video final
+        output_path = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4').name
+
+        render = _render_una_pasada if cache_clips.CLIPS_CACHE_DESACTIVADO else _render_con_segmentos
+        if render(video_urls, audio_path, output_path, duracion_audio_segundos, velocidad_audio, preset, progreso, cancelacion):
+            print(f"✅ Video final creado: {output_path}")
+            return output_path
 
     except Exception as e:
         print(f"❌ Error combinando videos: {type(e).__name__}: {e}")
-        return None
+
+    if output_path and os.path.exists(output_path):
+        os.unlink(output_path)
+    return None
 
 
-def generar_video_tiktok(texto_adaptado: str, adaptacion: dict = None) -> str:
+def buscar_clips_tiktok(texto: str, cancelacion=None) -> list:
     """
-    🎬 GENERACIÓN DE VIDEO TIKTOK - VERSIÓN PROFESIONAL
-    
-    Flujo completo:
-    1. Extrae keywords contextuales con LLM mejorado
-    2. Busca videos relevantes en Pexels con fallback inteligente
-    3. Genera audio natural con gTTS (reemplazando siglas)
-    4. Combina videos + audio con FFmpeg
+    Keywords + búsqueda en Pexels. Solo necesita el texto (original o adaptado),
+    así que puede lanzarse de forma especulativa antes de la validación.
+
+    cancelacion: TokenCancelacion opcional (ver especulacion.py)
     """
-    print("\n" + "="*60)
-    print("🎬 GENERANDO VIDEO PARA TIKTOK")
-    print("="*60)
-    
-    # ═══════════════════════════════════════════════════════════════
-    # PASO 1: EXTRAER KEYWORDS PROFESIONALES
-    # ═══════════════════════════════════════════════════════════════
     print("\n📝 [1/4] Analizando contenido...")
-    keywords = extraer_keywords_con_llm(texto_adaptado)
-    
+    keywords = extraer_keywords_con_llm(texto)
+
     if not keywords:
         print("❌ No se pudieron generar keywords")
-        return None
-    
-    # ═══════════════════════════════════════════════════════════════
-    # PASO 2: BUSCAR VIDEOS EN PEXELS
-    # ═══════════════════════════════════════════════════════════════
+        return []
+
+    especulacion.verificar(cancelacion)
+
     print("\n🔍 [2/4] Buscando videos en Pexels...")
     video_urls = buscar_video_pexels_inteligente(keywords)
-    
+
     if not video_urls:
         print("❌ No se encontraron videos en Pexels")
-        return None
-    
+        return []
+
     print(f"✅ Videos encontrados: {len(video_urls)}")
-    
-    # ═══════════════════════════════════════════════════════════════
-    # PASO 3: GENERAR AUDIO
-    # ═══════════════════════════════════════════════════════════════
+    return video_urls
+
+
+def generar_audio_tiktok(texto_adaptado: str, adaptacion: dict = None) -> str:
+    """
+    Narración del video: usa tts_text de la adaptación o genera un guión.
+    El audio queda a velocidad normal; el render aplica TTS_VELOCIDAD.
+    """
     print("\n🎤 [3/4] Generando audio...")
-    
+
     if adaptacion and "tts_text" in adaptacion:
         texto_para_audio = adaptacion["tts_text"]
         print(f"✅ Usando tts_text del LLM: {texto_para_audio[:80]}...")
-        audio_path = generar_audio_gTTS(texto_para_audio, usar_guion_ia=False)
+        audio_path = generar_audio_gTTS(texto_para_audio, usar_guion_ia=False, velocidad=1.0)
     else:
         print(f"🎬 Generando guión de narración inteligente...")
-        audio_path = generar_audio_gTTS(texto_adaptado, usar_guion_ia=True)
-    
+        audio_path = generar_audio_gTTS(texto_adaptado, usar_guion_ia=True, velocidad=1.0)
+
     if not audio_path:
         print("❌ No se pudo generar audio")
         return None
-    
+
     print(f"✅ Audio generado: {audio_path}")
+    return audio_path
+
+
+def generar_video_tiktok(texto_adaptado: str, adaptacion: dict = None, progreso=None, video_urls: list = None, audio_path: str = None, cancelacion=None) -> str:
+    """
+    🎬 GENERACIÓN DE VIDEO TIKTOK - VERSIÓN PROFESIONAL
+    
+    Flujo completo:
+    1. Extrae keywords contextuales con LLM mejorado
+    2. Busca videos relevantes en Pexels con fallback inteligente
+    3. Genera audio natural con gTTS (reemplazando siglas)
+    4. Combina videos + audio con FFmpeg
+
+    La búsqueda (1-2) y el audio (3) son independientes y corren en paralelo.
+    Si ya se tienen `video_urls` o `audio_path` (p. ej. de una etapa
+    especulativa), no se vuelven a generar. El audio se borra al terminar.
+
+    progreso: callback(porcentaje) opcional; el render ocupa del 40% al 100%
+    cancelacion: TokenCancelacion opcional (ver especulacion.py)
+    """
+    def reportar(porcentaje):
+        if progreso:
+            progreso(porcentaje)
+
+    print("\n" + "="*60)
+    print("🎬 GENERANDO VIDEO PARA TIKTOK")
+    print("="*60)
+    
+    # ═══════════════════════════════════════════════════════════════
+    # PASOS 1-3: CLIPS DE PEXELS Y AUDIO (en paralelo)
+    # ═══════════════════════════════════════════════════════════════
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="tiktok") as executor:
+        futuro_clips = executor.submit(buscar_clips_tiktok, texto_adaptado) if video_urls is None else None
+        futuro_audio = executor.submit(generar_audio_tiktok, texto_adaptado, adaptacion) if audio_path is None else None
+
+        if futuro_clips:
+            try:
+                video_urls = futuro_clips.result()
+            except Exception as e:
+                print(f"❌ Error buscando clips: {e}")
+                video_urls = None
+            reportar(25)
+        if futuro_audio:
+            audio_path = futuro_audio.result()
+
+    if not video_urls or not audio_path:
+        if audio_path and os.path.exists(audio_path):
+            os.unlink(audio_path)
+        return None
     
     # ═══════════════════════════════════════════════════════════════
     # PASO 4: COMBINAR VIDEOS + AUDIO
     # ═══════════════════════════════════════════════════════════════
+    reportar(40)
     print("\n🎬 [4/4] Combinando videos con audio...")
-    video_final = combinar_videos_con_audio(video_urls, audio_path)
+    video_final = combinar_videos_con_audio(
+        video_urls, audio_path, velocidad_audio=TTS_VELOCIDAD, cancelacion=cancelacion,
+        progreso=(lambda p: reportar(40 + p * 60 // 100)) if progreso else None
+    )
     
     # Limpiar audio temporal
     if audio_path and os.path.exists(audio_path):
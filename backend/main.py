@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 import social_services
 import schemas
 import llm_service
+import render_service
+import especulacion
 import os
 
 from auth import auth_schemas, auth_service
@@ -21,11 +23,37 @@ chat_models.Base.metadata.create_all(bind=engine)
 from chat import routes as chat_routes
 app.include_router(chat_routes.router)
 
+from jobs import routes as jobs_routes
+from jobs import service as jobs_service
+app.include_router(jobs_routes.router)
+
+from metrics import routes as metrics_routes
+app.include_router(metrics_routes.router)
+
+from media import routes as media_routes
+app.include_router(media_routes.router)
+
 @app.on_event("startup")
 def startup_event():
     init_db()
     print("🚀 Servidor iniciado con autenticación")
 
+@app.on_event("startup")
+async def iniciar_clientes_http():
+    await social_services.iniciar_clientes_http()
+
+@app.on_event("shutdown")
+async def cerrar_clientes_http():
+    await social_services.cerrar_clientes_http()
+
+@app.on_event("shutdown")
+def cerrar_cola_jobs():
+    jobs_service.cola.cerrar()
+
+@app.on_event("shutdown")
+def cerrar_pool_render():
+    render_service.pool.cerrar()
+
 # ✅ CORS ACTUALIZADO PARA PRODUCCIÓN
 # Obtener los orígenes permitidos desde variables de entorno
 env_origins = os.getenv("ALLOWED_ORIGINS", "")
@@ -146,6 +174,16 @@ def logout(authorization: Optional[str] = Header(None)):
     return {"message": "Logout exitoso"}
 
 
+@app.post("/api/auth/logout-all")
+def logout_all(current_user: User = Depends(get_current_user)):
+    """
+    Cierra todas las sesiones del usuario actual (en todos los dispositivos)
+    """
+    revocados = auth_service.logout_all(current_user.id)
+    
+    return {"message": "Sesiones cerradas", "sesiones_revocadas": revocados}
+
+
 @app.get("/api/auth/me", response_model=auth_schemas.UserResponse)
 def get_current_user_info(current_user: User = Depends(get_current_user)):
     """
@@ -164,19 +202,22 @@ def adapt_post_content(request: schemas.AdaptRequest, current_user: User = Depen
     print(f"Recibida solicitud para adaptar: {request.titulo}")
     
     adaptaciones_finales = {}
+    redes_soportadas = []
     
     for red in request.target_networks:
         if red not in llm_service.PROMPTS_POR_RED:
             adaptaciones_finales[red] = {"error": f"Red '{red}' no soportada."}
-            continue
+        else:
+            redes_soportadas.append(red)
 
-        resultado = llm_service.adaptar_contenido(
+    # Una sola llamada al LLM para todas las redes
+    if redes_soportadas:
+        adaptaciones_finales.update(llm_service.adaptar_contenido_multi(
             titulo=request.titulo,
             contenido=request.contenido,
-            red_social=red
-        )
-        
-        adaptaciones_finales[red] = resultado
+            redes=redes_soportadas,
+            usar_cache=request.usar_cache
+        ))
 
     if not adaptaciones_finales:
         raise HTTPException(status_code=400, detail="No se especificaron redes válidas.")
@@ -193,72 +234,90 @@ def test_post_facebook(request: schemas.TestPostRequest, current_user: User = De
     - 🆕 GENERACIÓN DE IMAGEN (igual que Instagram)
     """
     
-    # 1. Validar contenido académico
-    print("🔍 Validando contenido académico...")
-    validacion = llm_service.validar_contenido_academico(request.text)
-    
-    if not validacion.get("es_academico", False):
-        raise HTTPException(
-            status_code=400, 
-            detail={
-                "error": "contenido_no_academico",
-                "mensaje": "❌ Este contenido no es apropiado para publicación académica."
-            }
+    def prompt_imagen_de(adaptacion):
+        return adaptacion.get("suggested_image_prompt", f"Universidad UAGRM, tema académico: {request.text[:100]}")
+        
+    def imagen_si_corresponde(validacion, adaptacion):
+        if not validacion.get("es_academico", False) or "error" in adaptacion:
+            return None
+        return llm_service.generar_imagen_ia(prompt_imagen_de(adaptacion))
+        
+    # Validación y adaptación en paralelo; la imagen (de pago) espera a que
+    # la validación la apruebe
+    plan = especulacion.PlanificadorEspeculativo()
+    plan.lanzar("validacion", llm_service.validar_contenido_academico, request.text)
+    plan.lanzar("adaptacion", llm_service.adaptar_contenido, titulo=request.text[:50], contenido=request.text, red_social="facebook")
+    plan.despues("imagen", ["validacion", "adaptacion"], imagen_si_corresponde)
+        
+    try:
+        # 1. Validar contenido académico
+        print("🔍 Validando contenido académico...")
+        validacion = plan.resultado("validacion")
+        
+        if not validacion.get("es_academico", False):
+            raise HTTPException(
+                status_code=400, 
+                detail={
+                    "error": "contenido_no_academico",
+                    "mensaje": "❌ Este contenido no es apropiado para publicación académica."
+                }
+            )
+        
+        print(f"✅ Contenido validado como académico: {validacion.get('razon')}")
+        
+        # 2. Adaptar contenido
+        print("🔄 Adaptando contenido para Facebook...")
+        adaptacion = plan.resultado("adaptacion")
+        
+        if "error" in adaptacion:
+            raise HTTPException(status_code=400, detail=adaptacion["error"])
+        
+        texto_adaptado = adaptacion.get("text", request.text)
+        
+        if "hashtags" in adaptacion and adaptacion["hashtags"]:
+            hashtags_str = " ".join(adaptacion["hashtags"])
+            texto_adaptado = f"{texto_adaptado}\n\n{hashtags_str}"
+        
+        print(f"✅ Texto adaptado: {texto_adaptado[:100]}...")
+        
+        # 3. 🆕 GENERAR IMAGEN (igual que Instagram)
+        print("🎨 Generando imagen para Facebook...")
+        # prompt_imagen = f"Universidad UAGRM, tema académico: {request.text[:100]}"
+        prompt_imagen = prompt_imagen_de(adaptacion)
+        imagen_url = plan.resultado("imagen")
+        if imagen_url:
+            print(f"✅ Imagen generada: {imagen_url[:100]}...")
+        else:
+            print("⚠️ Sin imagen generada: se publica solo el texto")
+        
+        # 4. Publicar en Facebook CON IMAGEN (o solo texto si no se pudo generar)
+        result = social_services.post_to_facebook(
+            text=texto_adaptado,
+            image_url=imagen_url  # ✅ CON IMAGEN
         )
-    
-    print(f"✅ Contenido validado como académico: {validacion.get('razon')}")
-    
-    # 2. Adaptar contenido
-    print("🔄 Adaptando contenido para Facebook...")
-    adaptacion = llm_service.adaptar_contenido(
-        titulo=request.text[:50],
-        contenido=request.text,
-        red_social="facebook"
-    )
-    
-    if "error" in adaptacion:
-        raise HTTPException(status_code=400, detail=adaptacion["error"])
-    
-    texto_adaptado = adaptacion.get("text", request.text)
-    
-    if "hashtags" in adaptacion and adaptacion["hashtags"]:
-        hashtags_str = " ".join(adaptacion["hashtags"])
-        texto_adaptado = f"{texto_adaptado}\n\n{hashtags_str}"
-    
-    print(f"✅ Texto adaptado: {texto_adaptado[:100]}...")
-    
-    # 3. 🆕 GENERAR IMAGEN (igual que Instagram)
-    print("🎨 Generando imagen para Facebook...")
-    # prompt_imagen = f"Universidad UAGRM, tema académico: {request.text[:100]}"
-    prompt_imagen = adaptacion.get("suggested_image_prompt", f"Universidad UAGRM, tema académico: {request.text[:100]}")
-    imagen_url = llm_service.generar_imagen_ia(prompt_imagen)
-    print(f"✅ Imagen generada: {imagen_url[:100]}...")
-    
-    # 4. Publicar en Facebook CON IMAGEN
-    result = social_services.post_to_facebook(
-        text=texto_adaptado,
-        image_url=imagen_url  # ✅ CON IMAGEN
-    )
-    
-    if "error" in result:
-        raise HTTPException(status_code=400, detail=result["error"])
-    
-    # 5. Construir link del post
-    post_id = result.get("id") or result.get("post_id")
-    link_facebook = f"https://www.facebook.com/{post_id.replace('_', '/posts/')}" if post_id else None
-    
-    # 6. 🆕 Retornar con imagen_generada
-    return {
-        "validacion": validacion,
-        "adaptacion": adaptacion,
-        "imagen_generada": {  # ✅ AGREGADO
-            "url": imagen_url,
-            "prompt": prompt_imagen
-        },
-        "publicacion": {
-            "id": post_id,
-            "link": link_facebook,
-            "raw": result
-        },
-        "mensaje": "✅ Contenido académico validado, adaptado, imagen generada y publicado en Facebook"
-    }
\ No newline at end of file
+        
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        
+        # 5. Construir link del post
+        post_id = result.get("id") or result.get("post_id")
+        link_facebook = f"https://www.facebook.com/{post_id.replace('_', '/posts/')}" if post_id else None
+        
+        # 6. 🆕 Retornar con imagen_generada
+        return {
+            "validacion": validacion,
+            "adaptacion": adaptacion,
+            "imagen_generada": {  # ✅ AGREGADO
+                "url": imagen_url,
+                "prompt": prompt_imagen
+            } if imagen_url else None,
+            "publicacion": {
+                "id": post_id,
+                "link": link_facebook,
+                "raw": result
+            },
+            "mensaje": "✅ Contenido académico validado, adaptado, imagen generada y publicado en Facebook" if imagen_url else "✅ Contenido académico validado, adaptado y publicado en Facebook (solo texto, no se pudo generar la imagen)"
+        }
+    finally:
+        # Lo que quedó en vuelo (rechazo, error o excepción) ya no se usa
+        plan.cancelar()
\ No newline at end of file
@@ -1,10 +1,16 @@
 from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 import social_services
 import schemas
 import llm_service
+import render_service
+import pipeline_service
+import especulacion
+import asyncio
 import os
+import uuid
 
 from auth import auth_schemas, auth_service
 from auth.database import get_db, init_db, engine
@@ -21,11 +27,38 @@ chat_models.Base.metadata.create_all(bind=engine)
 from chat import routes as chat_routes
 app.include_router(chat_routes.router)
 
+from jobs import routes as jobs_routes
+from jobs import service as jobs_service
+from jobs import eventos
+app.include_router(jobs_routes.router)
+
+from metrics import routes as metrics_routes
+app.include_router(metrics_routes.router)
+
+from media import routes as media_routes
+app.include_router(media_routes.router)
+
 @app.on_event("startup")
 def startup_event():
     init_db()
     print("🚀 Servidor iniciado con autenticación")
 
+@app.on_event("startup")
+async def iniciar_clientes_http():
+    await social_services.iniciar_clientes_http()
+
+@app.on_event("shutdown")
+async def cerrar_clientes_http():
+    await social_services.cerrar_clientes_http()
+
+@app.on_event("shutdown")
+def cerrar_cola_jobs():
+    jobs_service.cola.cerrar()
+
+@app.on_event("shutdown")
+def cerrar_pool_render():
+    render_service.pool.cerrar()
+
 # ✅ CORS ACTUALIZADO PARA PRODUCCIÓN
 # Obtener los orígenes permitidos desde variables de entorno
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "").split(",")
@@ -142,6 +175,16 @@ def logout(authorization: Optional[str] = Header(None)):
     return {"message": "Logout exitoso"}
 
 
+@app.post("/api/auth/logout-all")
+def logout_all(current_user: User = Depends(get_current_user)):
+    """
+    Cierra todas las sesiones del usuario actual (en todos los dispositivos)
+    """
+    revocados = auth_service.logout_all(current_user.id)
+    
+    return {"message": "Sesiones cerradas", "sesiones_revocadas": revocados}
+
+
 @app.get("/api/auth/me", response_model=auth_schemas.UserResponse)
 def get_current_user_info(current_user: User = Depends(get_current_user)):
     """
@@ -160,19 +203,22 @@ def adapt_post_content(request: schemas.AdaptRequest, current_user: User = Depen
     print(f"Recibida solicitud para adaptar: {request.titulo}")
     
     adaptaciones_finales = {}
+    redes_soportadas = []
     
     for red in request.target_networks:
         if red not in llm_service.PROMPTS_POR_RED:
             adaptaciones_finales[red] = {"error": f"Red '{red}' no soportada."}
-            continue
+        else:
+            redes_soportadas.append(red)
 
-        resultado = llm_service.adaptar_contenido(
+    # Una sola llamada al LLM para todas las redes
+    if redes_soportadas:
+        adaptaciones_finales.update(llm_service.adaptar_contenido_multi(
             titulo=request.titulo,
             contenido=request.contenido,
-            red_social=red
-        )
-        
-        adaptaciones_finales[red] = resultado
+            redes=redes_soportadas,
+            usar_cache=request.usar_cache
+        ))
 
     if not adaptaciones_finales:
         raise HTTPException(status_code=400, detail="No se especificaron redes válidas.")
@@ -255,74 +301,99 @@ def test_post_instagram(request: schemas.TestPostRequest, current_user: User = D
     - GENERACIÓN DE IMAGEN con IA
     """
     
-    # 1. VALIDAR que el contenido sea académico
-    print("🔍 Validando contenido académico...")
-    validacion = llm_service.validar_contenido_academico(request.text)
-    
-    if not validacion.get("es_academico", False):
-        raise HTTPException(
-            status_code=400, 
-            detail={
-                "error": "contenido_no_academico",
-                "mensaje": "❌ Este contenido no es apropiado para publicación académica. Por favor, ingrese información relacionada con actividades universitarias, fechas académicas, eventos educativos, etc."
-            }
+    def prompt_imagen_de(adaptacion):
+        return adaptacion.get("suggested_image_prompt", f"Universidad UAGRM, tema académico: {request.text[:100]}")
+        
+    def imagen_si_corresponde(validacion, adaptacion):
+        if not validacion.get("es_academico", False) or "error" in adaptacion:
+            return None
+        return llm_service.generar_imagen_ia(prompt_imagen_de(adaptacion))
+        
+    # Validación y adaptación en paralelo; la imagen (de pago) espera a que
+    # la validación la apruebe
+    plan = especulacion.PlanificadorEspeculativo()
+    plan.lanzar("validacion", llm_service.validar_contenido_academico, request.text)
+    plan.lanzar("adaptacion", llm_service.adaptar_contenido, titulo=request.text[:50], contenido=request.text, red_social="instagram")
+    plan.despues("imagen", ["validacion", "adaptacion"], imagen_si_corresponde)
+        
+    try:
+        # 1. VALIDAR que el contenido sea académico
+        print("🔍 Validando contenido académico...")
+        validacion = plan.resultado("validacion")
+        
+        if not validacion.get("es_academico", False):
+            raise HTTPException(
+                status_code=400, 
+                detail={
+                    "error": "contenido_no_academico",
+                    "mensaje": "❌ Este contenido no es apropiado para publicación académica. Por favor, ingrese información relacionada con actividades universitarias, fechas académicas, eventos educativos, etc."
+                }
+            )
+        
+        print(f"✅ Contenido validado como académico: {validacion.get('razon')}")
+        
+        # 2. Adaptar el contenido
+        print("🔄 Adaptando contenido para Instagram...")
+        adaptacion = plan.resultado("adaptacion")
+        
+        if "error" in adaptacion:
+            raise HTTPException(status_code=400, detail=adaptacion["error"])
+        
+        # 3. Preparar texto adaptado con hashtags
+        texto_adaptado = adaptacion.get("text", request.text)
+        
+        if "hashtags" in adaptacion and adaptacion["hashtags"]:
+            hashtags_str = " ".join(adaptacion["hashtags"])
+            texto_adaptado = f"{texto_adaptado}\n\n{hashtags_str}"
+        
+        print(f"✅ Texto adaptado: {texto_adaptado[:100]}...")
+        
+        # 4. GENERAR IMAGEN con IA
+        print("🎨 Generando imagen con IA...")
+        prompt_imagen = prompt_imagen_de(adaptacion)
+        imagen_url = plan.resultado("imagen")
+        
+        # Instagram no admite publicaciones sin imagen
+        if not imagen_url:
+            raise HTTPException(
+                status_code=502,
+                detail={
+                    "error": "imagen_no_disponible",
+                    "mensaje": "❌ No se pudo generar la imagen para Instagram. Intente nuevamente en unos minutos."
+                }
+            )
+        print(f"✅ Imagen generada: {imagen_url[:100]}...")
+        
+        # 5. Publicar en Instagram (CON IMAGEN GENERADA)
+        result = social_services.post_to_instagram(
+            text=texto_adaptado,
+            image_url=imagen_url
         )
-    
-    print(f"✅ Contenido validado como académico: {validacion.get('razon')}")
-    
-    # 2. Adaptar el contenido
-    print("🔄 Adaptando contenido para Instagram...")
-    adaptacion = llm_service.adaptar_contenido(
-        titulo=request.text[:50],
-        contenido=request.text,
-        red_social="instagram"
-    )
-    
-    if "error" in adaptacion:
-        raise HTTPException(status_code=400, detail=adaptacion["error"])
-    
-    # 3. Preparar texto adaptado con hashtags
-    texto_adaptado = adaptacion.get("text", request.text)
-    
-    if "hashtags" in adaptacion and adaptacion["hashtags"]:
-        hashtags_str = " ".join(adaptacion["hashtags"])
-        texto_adaptado = f"{texto_adaptado}\n\n{hashtags_str}"
-    
-    print(f"✅ Texto adaptado: {texto_adaptado[:100]}...")
-    
-    # 4. GENERAR IMAGEN con IA
-    print("🎨 Generando imagen con IA...")
-    prompt_imagen = adaptacion.get("suggested_image_prompt", f"Universidad UAGRM, tema académico: {request.text[:100]}")
-    imagen_url = llm_service.generar_imagen_ia(prompt_imagen)
-    print(f"✅ Imagen generada: {imagen_url[:100]}...")
-    
-    # 5. Publicar en Instagram (CON IMAGEN GENERADA)
-    result = social_services.post_to_instagram(
-        text=texto_adaptado,
-        image_url=imagen_url
-    )
-    
-    if "error" in result:
-        raise HTTPException(status_code=400, detail=result["error"])
-    
-    # 6. Usar el permalink real de Instagram
-    media_id = result.get("id")
-    permalink = result.get("permalink")  # Este es el link REAL
-    
-    return {
-        "validacion": validacion,
-        "adaptacion": adaptacion,
-        "imagen_generada": {
-            "url": imagen_url,
-            "prompt": prompt_imagen
-        },
-        "publicacion": {
-            "id": media_id,
-            "link": permalink,  # Link real de Instagram
-            "raw": result
-        },
-        "mensaje": "✅ Contenido académico validado, adaptado, imagen generada y publicado en Instagram"
-    }
+        
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        
+        # 6. Usar el permalink real de Instagram
+        media_id = result.get("id")
+        permalink = result.get("permalink")  # Este es el link REAL
+        
+        return {
+            "validacion": validacion,
+            "adaptacion": adaptacion,
+            "imagen_generada": {
+                "url": imagen_url,
+                "prompt": prompt_imagen
+            },
+            "publicacion": {
+                "id": media_id,
+                "link": permalink,  # Link real de Instagram
+                "raw": result
+            },
+            "mensaje": "✅ Contenido académico validado, adaptado, imagen generada y publicado en Instagram"
+        }
+    finally:
+        # Lo que quedó en vuelo (rechazo, error o excepción) ya no se usa
+        plan.cancelar()
 
 
 @app.post("/api/test/linkedin")
@@ -402,64 +473,74 @@ def test_post_whatsapp_status(request: schemas.TestPostRequest, current_user: Us
     - PUBLICACIÓN EN ESTADO (Story)
     """
     
-    # 1. VALIDAR contenido académico
-    print("🔍 [WhatsApp Status] Validando contenido académico...")
-    validacion = llm_service.validar_contenido_academico(request.text)
-    
-    if not validacion.get("es_academico", False):
-        raise HTTPException(
-            status_code=400, 
-            detail={
-                "error": "contenido_no_academico",
-                "mensaje": "❌ Contenido no apto para WhatsApp académico. " + validacion.get('razon', '')
-            }
-        )
-    
-    # 2. ADAPTAR contenido (Usa el prompt específico de WhatsApp en llm_service)
-    print("🔄 [WhatsApp Status] Adaptando contenido para Estado...")
-    adaptacion = llm_service.adaptar_contenido(
-        titulo=request.text[:50],
-        contenido=request.text,
-        red_social="whatsapp"
-    )
-    
-    if "error" in adaptacion:
-        raise HTTPException(status_code=400, detail=adaptacion["error"])
-    
-    # 3. Preparar texto final (sin hashtags para WhatsApp Status)
-    texto_adaptado = adaptacion.get("text", request.text)
-    
-    print(f"✅ Texto WhatsApp: {texto_adaptado[:100]}...")
-    
-    # 4. GENERAR IMAGEN con IA (para el estado)
-    print("🎨 Generando imagen para el estado...")
+    # La imagen solo depende del texto original, pero es de pago: se genera
+    # apenas la validación la aprueba, mientras termina la adaptación
     prompt_imagen = f"Universidad UAGRM, tema académico: {request.text[:100]}"
-    imagen_url = llm_service.generar_imagen_ia_base64(prompt_imagen)
-    print(f"✅ Imagen generada: {imagen_url[:100]}...")
-    
-    # 5. PUBLICAR EN ESTADO DE WHATSAPP
-    result = social_services.post_whatsapp_status(
-        text=texto_adaptado,
-        image_url=imagen_url
-    )
-    
-    if "error" in result:
-        raise HTTPException(status_code=400, detail=result["error"])
+    plan = especulacion.PlanificadorEspeculativo()
+    plan.lanzar("validacion", llm_service.validar_contenido_academico, request.text)
+    plan.lanzar("adaptacion", llm_service.adaptar_contenido, titulo=request.text[:50], contenido=request.text, red_social="whatsapp")
+    plan.despues("imagen", ["validacion"], lambda validacion: llm_service.generar_imagen_ia_base64(prompt_imagen) if validacion.get("es_academico", False) else None)
     
-    return {
-        "validacion": validacion,
-        "adaptacion": adaptacion,
-        "imagen_generada": {
-            "url": imagen_url,
-            "prompt": prompt_imagen
-        },
-        "publicacion": {
-            "id": result.get("id"),
-            "status": result.get("status"),
-            "raw": result
-        },
-        "mensaje": "✅ Estado publicado en WhatsApp con imagen generada"
-    }
+    try:
+        # 1. VALIDAR contenido académico
+        print("🔍 [WhatsApp Status] Validando contenido académico...")
+        validacion = plan.resultado("validacion")
+        
+        if not validacion.get("es_academico", False):
+            raise HTTPException(
+                status_code=400, 
+                detail={
+                    "error": "contenido_no_academico",
+                    "mensaje": "❌ Contenido no apto para WhatsApp académico. " + validacion.get('razon', '')
+                }
+            )
+        
+        # 2. ADAPTAR contenido (Usa el prompt específico de WhatsApp en llm_service)
+        print("🔄 [WhatsApp Status] Adaptando contenido para Estado...")
+        adaptacion = plan.resultado("adaptacion")
+        
+        if "error" in adaptacion:
+            raise HTTPException(status_code=400, detail=adaptacion["error"])
+        
+        # 3. Preparar texto final (sin hashtags para WhatsApp Status)
+        texto_adaptado = adaptacion.get("text", request.text)
+        
+        print(f"✅ Texto WhatsApp: {texto_adaptado[:100]}...")
+        
+        # 4. GENERAR IMAGEN con IA (para el estado)
+        print("🎨 Generando imagen para el estado...")
+        imagen_url = plan.resultado("imagen")
+        if imagen_url:
+            print(f"✅ Imagen generada: {imagen_url[:100]}...")
+        else:
+            print("⚠️ Sin imagen generada: el estado se publica solo con texto")
+        
+        # 5. PUBLICAR EN ESTADO DE WHATSAPP
+        result = social_services.post_whatsapp_status(
+            text=texto_adaptado,
+            image_url=imagen_url
+        )
+        
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        
+        return {
+            "validacion": validacion,
+            "adaptacion": adaptacion,
+            "imagen_generada": {
+                "url": imagen_url,
+                "prompt": prompt_imagen
+            } if imagen_url else None,
+            "publicacion": {
+                "id": result.get("id"),
+                "status": result.get("status"),
+                "raw": result
+            },
+            "mensaje": "✅ Estado publicado en WhatsApp con imagen generada" if imagen_url else "✅ Estado publicado en WhatsApp (solo texto, no se pudo generar la imagen)"
+        }
+    finally:
+        # Lo que quedó en vuelo (rechazo, error o excepción) ya no se usa
+        plan.cancelar()
 
 @app.post("/api/test/tiktok")
 def test_post_tiktok(request: schemas.TestPostRequest, current_user: User = Depends(get_current_user)):
@@ -468,99 +549,129 @@ def test_post_tiktok(request: schemas.TestPostRequest, current_user: User = Depe
     🆕 Ahora usa tts_text para audio limpio sin emojis
     """
     
-    # 1. VALIDAR contenido académico
-    print("🔍 [TikTok] Validando contenido académico...")
-    validacion = llm_service.validar_contenido_academico(request.text)
-    
-    if not validacion.get("es_academico", False):
-        raise HTTPException(
-            status_code=400, 
-            detail={
-                "error": "contenido_no_academico",
-                "mensaje": "❌ Contenido no apto para TikTok académico. " + validacion.get('razon', '')
-            }
+    # Los clips de Pexels salen del texto original: se buscan mientras se valida
+    # y se adapta; la narración arranca apenas existe la adaptación
+    plan = especulacion.PlanificadorEspeculativo()
+    plan.lanzar("validacion", llm_service.validar_contenido_academico, request.text)
+    plan.lanzar("adaptacion", llm_service.adaptar_contenido, titulo=request.text[:50], contenido=request.text, red_social="tiktok")
+    plan.lanzar("clips", llm_service.buscar_clips_tiktok, request.text, cancelacion=plan.token)
+    plan.despues("audio", ["adaptacion"], lambda adaptacion: None if "error" in adaptacion else llm_service.generar_audio_tiktok(adaptacion.get("text", request.text), adaptacion))
+    
+    def descartar_audio():
+        # Si la narración alcanzó a generarse, se borra al terminar
+        def borrar(futuro):
+            if not futuro.cancelled() and futuro.exception() is None:
+                audio_path = futuro.result()
+                if audio_path and os.path.exists(audio_path):
+                    os.unlink(audio_path)
+        plan.futuro("audio").add_done_callback(borrar)
+    
+    audio_consumido = False
+    video_path = None
+    try:
+        # 1. VALIDAR contenido académico
+        print("🔍 [TikTok] Validando contenido académico...")
+        validacion = plan.resultado("validacion")
+        
+        if not validacion.get("es_academico", False):
+            raise HTTPException(
+                status_code=400, 
+                detail={
+                    "error": "contenido_no_academico",
+                    "mensaje": "❌ Contenido no apto para TikTok académico. " + validacion.get('razon', '')
+                }
+            )
+        
+        # 2. ADAPTAR contenido
+        print("🔄 [TikTok] Adaptando contenido para TikTok...")
+        adaptacion = plan.resultado("adaptacion")
+        
+        if "error" in adaptacion:
+            raise HTTPException(status_code=400, detail=adaptacion["error"])
+        
+        # 3. Preparar texto adaptado
+        texto_adaptado = adaptacion.get("text", request.text)    
+        if "hashtags" in adaptacion and adaptacion["hashtags"]:
+            hashtags_str = " ".join(adaptacion["hashtags"])
+            # Solo agregar hashtags si no están ya en el texto
+            if not any(tag in texto_adaptado for tag in adaptacion["hashtags"]):
+                texto_adaptado = f"{texto_adaptado}\n\n{hashtags_str}"
+        
+        print(f"✅ Texto TikTok: {texto_adaptado[:100]}...")
+        
+        if "tts_text" in adaptacion:
+            print(f"✅ Texto para audio (limpio): {adaptacion['tts_text'][:100]}...")
+        
+        # 4. GENERAR VIDEO con IA
+        print("🎬 [TikTok] Generando video con IA...")
+        # 🔥 CAMBIO: Pasar la adaptación completa para usar tts_text
+        try:
+            video_urls = plan.resultado("clips")
+        except Exception as e:
+            print(f"❌ Error buscando clips: {e}")
+            video_urls = []
+        audio_path = plan.resultado("audio")
+        # generar_video_tiktok borra la narración que recibe
+        audio_consumido = True
+        video_path = llm_service.generar_video_tiktok(
+            texto_adaptado, adaptacion,
+            video_urls=video_urls, audio_path=audio_path
         )
-    
-    # 2. ADAPTAR contenido
-    print("🔄 [TikTok] Adaptando contenido para TikTok...")
-    adaptacion = llm_service.adaptar_contenido(
-        titulo=request.text[:50],
-        contenido=request.text,
-        red_social="tiktok"
-    )
-    
-    if "error" in adaptacion:
-        raise HTTPException(status_code=400, detail=adaptacion["error"])
-    
-    # 3. Preparar texto adaptado
-    texto_adaptado = adaptacion.get("text", request.text)    
-    if "hashtags" in adaptacion and adaptacion["hashtags"]:
-        hashtags_str = " ".join(adaptacion["hashtags"])
-        # Solo agregar hashtags si no están ya en el texto
-        if not any(tag in texto_adaptado for tag in adaptacion["hashtags"]):
-            texto_adaptado = f"{texto_adaptado}\n\n{hashtags_str}"
-    
-    print(f"✅ Texto TikTok: {texto_adaptado[:100]}...")
-    
-    if "tts_text" in adaptacion:
-        print(f"✅ Texto para audio (limpio): {adaptacion['tts_text'][:100]}...")
-    
-    # 4. GENERAR VIDEO con IA
-    print("🎬 [TikTok] Generando video con IA...")
-    # 🔥 CAMBIO: Pasar la adaptación completa para usar tts_text
-    video_path = llm_service.generar_video_tiktok(texto_adaptado, adaptacion)
-
-    if not video_path:
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "video_generation_failed",
-                "mensaje": "Error al generar video."
-            }
+        
+        if not video_path:
+            raise HTTPException(
+                status_code=500,
+                detail={
+                    "error": "video_generation_failed",
+                    "mensaje": "Error al generar video."
+                }
+            )
+        
+        print(f"✅ Video generado: {video_path}")
+        
+        # 5. PUBLICAR EN TIKTOK (PRIVADO)
+        result = social_services.post_to_tiktok(
+            text=texto_adaptado,
+            video_path=video_path,
+            privacy="SELF_ONLY"  # PRIVADO
         )
-    
-    print(f"✅ Video generado: {video_path}")
-    
-    # 5. PUBLICAR EN TIKTOK (PRIVADO)
-    result = social_services.post_to_tiktok(
-        text=texto_adaptado,
-        video_path=video_path,
-        privacy="SELF_ONLY"  # PRIVADO
-    )
-    
-    # 6. Limpiar video temporal
-    if video_path and os.path.exists(video_path):
-        os.unlink(video_path)
-    
-    # 7. Verificar resultado
-    if "error" in result:
-        raise HTTPException(status_code=400, detail=result)
-    
-    # 8. Respuesta exitosa
-    return {
-        "validacion": validacion,
-        "adaptacion": adaptacion,
-        "video_generado": {
-            "mensaje": "Video generado con Pexels + gTTS",
-            "audio_usado": "tts_text limpio (sin emojis)" if "tts_text" in adaptacion else "texto limpiado automáticamente"
-        },
-        "publicacion": result,
-        "mensaje": "✅ Video generado y publicado en TikTok (privado)"
-    }
+        
+        # 6. Verificar resultado
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result)
+        
+        # 7. Respuesta exitosa
+        return {
+            "validacion": validacion,
+            "adaptacion": adaptacion,
+            "video_generado": {
+                "mensaje": "Video generado con Pexels + gTTS",
+                "audio_usado": "tts_text limpio (sin emojis)" if "tts_text" in adaptacion else "texto limpiado automáticamente"
+            },
+            "publicacion": result,
+            "mensaje": "✅ Video generado y publicado en TikTok (privado)"
+        }
+    finally:
+        # Rechazo, error o excepción: detener la búsqueda de clips y no dejar
+        # la narración ni el video en disco
+        plan.cancelar()
+        if not audio_consumido:
+            descartar_audio()
+        if video_path and os.path.exists(video_path):
+            os.unlink(video_path)
 
 
 
 @app.post("/api/posts/publish-multi", response_model=schemas.MultiNetworkPostResponse)
-def publish_to_multiple_networks(request: schemas.MultiNetworkPostRequest, current_user: User = Depends(get_current_user)):
+async def publish_to_multiple_networks(request: schemas.MultiNetworkPostRequest, current_user: User = Depends(get_current_user)):
     """
     🆕 ENDPOINT PRINCIPAL: Publica en múltiples redes sociales simultáneamente
     
     Flujo:
-    1. Valida que el contenido sea académico
-    2. Adapta el contenido para cada red social seleccionada
-    3. Genera recursos necesarios (imágenes, videos)
-    4. Publica en cada red
-    5. Retorna resumen de publicaciones exitosas/fallidas
+    1. Valida que el contenido sea académico y lo adapta (una sola llamada al LLM)
+    2. Para cada red, EN PARALELO: genera recursos → publica
+       (ver pipeline_service, con límite de concurrencia por proveedor)
+    3. Retorna resumen de publicaciones exitosas/fallidas y tiempos por red/etapa
     
     Redes soportadas:
     - facebook (solo texto)
@@ -577,8 +688,53 @@ def publish_to_multiple_networks(request: schemas.MultiNetworkPostRequest, curre
     }
     ```
     """
+    return await _publicar_multi(request)
+
+
+@app.post("/api/posts/publish-multi/stream")
+async def publish_to_multiple_networks_stream(request: schemas.MultiNetworkPostRequest, current_user: User = Depends(get_current_user)):
+    """
+    Igual que /api/posts/publish-multi, pero responde con un stream SSE
+    con el progreso de cada etapa a medida que ocurre:
+    validacion_completa, adaptacion_lista, imagen_lista, video_progreso, publicacion.
+
+    El último evento es 'completado' (con la misma respuesta del endpoint JSON)
+    o 'error' (con el status_code y el detalle que tendría la HTTPException).
+    """
+    canal = f"publish-{uuid.uuid4().hex}"
+
+    def al_evento(tipo: str, **datos):
+        eventos.bus.publicar(canal, tipo, **datos)
+
+    async def ejecutar():
+        try:
+            respuesta = await _publicar_multi(request, al_evento)
+            al_evento("completado", resultado=respuesta)
+        except HTTPException as e:
+            al_evento("error", status_code=e.status_code, error=e.detail)
+        except Exception as e:
+            print(f"❌ Error en publicación multi-red: {e}")
+            al_evento("error", status_code=500, error=str(e))
+        finally:
+            eventos.bus.cerrar_canal(canal)
+
+    async def generar():
+        # Si el cliente se desconecta, la publicación sigue hasta terminar
+        tarea = asyncio.create_task(ejecutar())
+        async for evento in eventos.bus.suscribir(canal):
+            yield eventos.formatear_sse(evento)
+        await tarea
+
+    return StreamingResponse(generar(), media_type="text/event-stream", headers=jobs_routes.SSE_HEADERS)
+
+
+async def _publicar_multi(request: schemas.MultiNetworkPostRequest, al_evento=None) -> dict:
+    """Flujo compartido por el endpoint JSON y el de streaming"""
     import time
     
+    if al_evento is None:
+        al_evento = lambda tipo, **datos: None
+    
     inicio = time.time()
     
     print("\n" + "="*70)
@@ -591,10 +747,34 @@ def publish_to_multiple_networks(request: schemas.MultiNetworkPostRequest, curre
     # ═══════════════════════════════════════════════════════════════
     # 🔍 PASO 1: VALIDAR CONTENIDO ACADÉMICO (una sola vez)
     # ═══════════════════════════════════════════════════════════════
-    print("🔍 [PASO 1/5] Validando contenido académico...")
-    validacion = llm_service.validar_contenido_academico(request.text)
+    redes_soportadas = []
+    for red in request.target_networks:
+        if red not in llm_service.PROMPTS_POR_RED:
+            print(f"   ⚠️  Red '{red}' no soportada, omitiendo...")
+        elif red not in redes_soportadas:
+            redes_soportadas.append(red)
+    
+    # Mientras el LLM valida, se adelanta lo que solo depende del texto original
+    # y no se paga (búsqueda de clips de TikTok)
+    plan_multi = pipeline_service.iniciar_especulacion(request.text, redes_soportadas)
+    
+    # Validación y adaptación en una sola llamada al LLM (ver LLM_VALIDAR_Y_ADAPTAR)
+    print("🔍 [PASO 1/3] Validando contenido académico y adaptando...")
+    tiempos_validacion = {}
+    try:
+        validado = await pipeline_service.ejecutar_etapa(
+            "validacion", "gemini", tiempos_validacion,
+            llm_service.validar_y_adaptar, request.text, redes_soportadas
+        )
+    except BaseException:
+        plan_multi.cancelar()
+        raise
+    validacion = validado["validacion"]
+    al_evento("validacion_completa", es_academico=validacion.get("es_academico", False), razon=validacion.get("razon"))
     
+    # Rechazo temprano: se cancela lo especulativo y no se publica nada
     if not validacion.get("es_academico", False):
+        plan_multi.cancelar()
         raise HTTPException(
             status_code=400, 
             detail={
@@ -608,32 +788,18 @@ def publish_to_multiple_networks(request: schemas.MultiNetworkPostRequest, curre
     print(f"✅ Contenido validado: {validacion.get('razon')}\n")
     
     # ═══════════════════════════════════════════════════════════════
-    # 📊 PASO 2: ADAPTAR CONTENIDO PARA CADA RED (en paralelo)
+    # 🚀 PASO 2: RECURSOS + PUBLICAR (en paralelo por red)
     # ═══════════════════════════════════════════════════════════════
-    print("🔄 [PASO 2/5] Adaptando contenido para cada red social...")
+    print("🚀 [PASO 2/3] Procesando redes en paralelo...")
     
-    adaptaciones = {}
-    redes_validas = []
+    procesadas = await pipeline_service.publicar_en_paralelo(
+        request.text, redes_soportadas, al_evento,
+        adaptaciones=validado["adaptaciones"],
+        tiempo_adaptacion=tiempos_validacion.get("validacion"),
+        especulacion=plan_multi
+    )
     
-    for red in request.target_networks:
-        if red not in llm_service.PROMPTS_POR_RED:
-            print(f"   ⚠️  Red '{red}' no soportada, omitiendo...")
-            continue
-        
-        print(f"   🔄 Adaptando para {red.upper()}...")
-        adaptacion = llm_service.adaptar_contenido(
-            titulo=request.text[:50],
-            contenido=request.text,
-            red_social=red
-        )
-        
-        if "error" in adaptacion:
-            print(f"   ❌ Error en {red}: {adaptacion['error']}")
-            adaptaciones[red] = {"error": adaptacion["error"]}
-        else:
-            print(f"   ✅ {red.upper()} adaptado")
-            adaptaciones[red] = adaptacion
-            redes_validas.append(red)
+    redes_validas = [p["red"] for p in procesadas if p["adaptada"]]
     
     if not redes_validas:
         raise HTTPException(
@@ -645,284 +811,28 @@ def publish_to_multiple_networks(request: schemas.MultiNetworkPostRequest, curre
             }
         )
     
-    print(f"\n✅ Adaptaciones completadas: {len(redes_validas)} redes\n")
-    
-    # ═══════════════════════════════════════════════════════════════
-    # 🎨 PASO 3: GENERAR RECURSOS (imágenes, videos)
-    # ═══════════════════════════════════════════════════════════════
-    print("🎨 [PASO 3/5] Generando recursos multimedia...")
-    
-    recursos = {
-        "imagen_instagram": None,
-        "imagen_whatsapp": None,
-        "video_tiktok": None
-    }
-    
-    # Imagen para Instagram (si está en la lista)
-    if "instagram" in redes_validas and "instagram" in adaptaciones:
-        print("   🎨 Generando imagen para Instagram...")
-        prompt_img = adaptaciones["instagram"].get(
-            "suggested_image_prompt", 
-            f"Universidad UAGRM: {request.text[:100]}"
-        )
-        recursos["imagen_instagram"] = llm_service.generar_imagen_ia(prompt_img)
-        print(f"   ✅ Imagen Instagram generada")
-    
-    # Imagen para WhatsApp Status (si está en la lista)
-    if "whatsapp" in redes_validas:
-        print("   🎨 Generando imagen para WhatsApp Status...")
-        prompt_img = f"Universidad UAGRM: {request.text[:100]}"
-        recursos["imagen_whatsapp"] = llm_service.generar_imagen_ia_base64(prompt_img)
-        print(f"   ✅ Imagen WhatsApp generada")
-    
-    # Video para TikTok (si está en la lista)
-    if "tiktok" in redes_validas and "tiktok" in adaptaciones:
-        print("   🎬 Generando video para TikTok...")
-        texto_adaptado = adaptaciones["tiktok"].get("text", request.text)
-        recursos["video_tiktok"] = llm_service.generar_video_tiktok(
-            texto_adaptado, 
-            adaptaciones["tiktok"]
-        )
-        if recursos["video_tiktok"]:
-            print(f"   ✅ Video TikTok generado")
-        else:
-            print(f"   ❌ Error generando video TikTok")
-            redes_validas.remove("tiktok")
-    
-    print(f"\n✅ Recursos multimedia generados\n")
-    
-    # ═══════════════════════════════════════════════════════════════
-    # 📤 PASO 4: PUBLICAR EN CADA RED SOCIAL
-    # ═══════════════════════════════════════════════════════════════
-    print("📤 [PASO 4/5] Publicando en redes sociales...")
-    
     resultados = {}
-    exitosos = 0
-    fallidos = 0
+    tiempos_por_red = {}
+    for p in procesadas:
+        tiempos_por_red[p["red"]] = p["tiempos"]
+        if p["adaptada"]:
+            resultados[p["red"]] = {**p["resultado"], "tiempos": p["tiempos"]}
     
-    for red in redes_validas:
-        print(f"\n   📤 Publicando en {red.upper()}...")
-        
-        try:
-            adaptacion = adaptaciones[red]
-            texto_adaptado = adaptacion.get("text", request.text)
-            
-            # Agregar hashtags si existen
-            if "hashtags" in adaptacion and adaptacion["hashtags"]:
-                hashtags_str = " ".join(adaptacion["hashtags"])
-                if not any(tag in texto_adaptado for tag in adaptacion["hashtags"]):
-                    texto_adaptado = f"{texto_adaptado}\n\n{hashtags_str}"
-            
-            # ─────────────────────────────────────────────────────
-            # 🔵 FACEBOOK (solo texto)
-            # ─────────────────────────────────────────────────────
-            if red == "facebook":
-                result = social_services.post_to_facebook(
-                    text=texto_adaptado,
-                    image_url=None
-                )
-                
-                if "error" in result:
-                    resultados["facebook"] = {
-                        "estado": "error",
-                        "error": result["error"],
-                        "adaptacion": adaptacion
-                    }
-                    fallidos += 1
-                    print(f"   ❌ Facebook falló: {result['error']}")
-                else:
-                    post_id = result.get("id") or result.get("post_id")
-                    link = f"https://www.facebook.com/{post_id.replace('_', '/posts/')}" if post_id else None
-                    
-                    resultados["facebook"] = {
-                        "estado": "exitoso",
-                        "id": post_id,
-                        "link": link,
-                        "adaptacion": adaptacion
-                    }
-                    exitosos += 1
-                    print(f"   ✅ Facebook publicado: {link}")
-            
-            # ─────────────────────────────────────────────────────
-            # 📸 INSTAGRAM (texto + imagen)
-            # ─────────────────────────────────────────────────────
-            elif red == "instagram":
-                if not recursos["imagen_instagram"]:
-                    resultados["instagram"] = {
-                        "estado": "error",
-                        "error": "No se pudo generar imagen",
-                        "adaptacion": adaptacion
-                    }
-                    fallidos += 1
-                    print(f"   ❌ Instagram falló: sin imagen")
-                    continue
-                
-                result = social_services.post_to_instagram(
-                    text=texto_adaptado,
-                    image_url=recursos["imagen_instagram"]
-                )
-                
-                if "error" in result:
-                    resultados["instagram"] = {
-                        "estado": "error",
-                        "error": result["error"],
-                        "adaptacion": adaptacion
-                    }
-                    fallidos += 1
-                    print(f"   ❌ Instagram falló: {result['error']}")
-                else:
-                    resultados["instagram"] = {
-                        "estado": "exitoso",
-                        "id": result.get("id"),
-                        "link": result.get("permalink"),
-                        "imagen_url": recursos["imagen_instagram"],
-                        "adaptacion": adaptacion
-                    }
-                    exitosos += 1
-                    print(f"   ✅ Instagram publicado: {result.get('permalink')}")
-            
-            # ─────────────────────────────────────────────────────
-            # 💼 LINKEDIN (texto profesional)
-            # ─────────────────────────────────────────────────────
-            elif red == "linkedin":
-                result = social_services.post_to_linkedin(text=texto_adaptado)
-                
-                if "error" in result:
-                    resultados["linkedin"] = {
-                        "estado": "error",
-                        "error": result["error"],
-                        "adaptacion": adaptacion
-                    }
-                    fallidos += 1
-                    print(f"   ❌ LinkedIn falló: {result['error']}")
-                else:
-                    post_urn = result.get("id", "")
-                    link = f"https://www.linkedin.com/feed/update/{post_urn}" if post_urn else None
-                    
-                    resultados["linkedin"] = {
-                        "estado": "exitoso",
-                        "id": post_urn.split(":")[-1] if ":" in post_urn else post_urn,
-                        "link": link,
-                        "adaptacion": adaptacion
-                    }
-                    exitosos += 1
-                    print(f"   ✅ LinkedIn publicado: {link}")
-            
-            # ─────────────────────────────────────────────────────
-            # 💚 WHATSAPP STATUS (imagen + texto)
-            # ─────────────────────────────────────────────────────
-            elif red == "whatsapp":
-                if not recursos["imagen_whatsapp"]:
-                    resultados["whatsapp"] = {
-                        "estado": "error",
-                        "error": "No se pudo generar imagen",
-                        "adaptacion": adaptacion
-                    }
-                    fallidos += 1
-                    print(f"   ❌ WhatsApp falló: sin imagen")
-                    continue
-                
-                result = social_services.post_whatsapp_status(
-                    text=texto_adaptado,
-                    image_url=recursos["imagen_whatsapp"]
-                )
-                
-                if "error" in result:
-                    resultados["whatsapp"] = {
-                        "estado": "error",
-                        "error": result["error"],
-                        "adaptacion": adaptacion
-                    }
-                    fallidos += 1
-                    print(f"   ❌ WhatsApp falló: {result['error']}")
-                else:
-                    resultados["whatsapp"] = {
-                        "estado": "exitoso",
-                        "id": result.get("id"),
-                        "status": result.get("status"),
-                        "adaptacion": adaptacion
-                    }
-                    exitosos += 1
-                    print(f"   ✅ WhatsApp Status publicado")
-            
-            # ─────────────────────────────────────────────────────
-            # 🎵 TIKTOK (video generado)
-            # ─────────────────────────────────────────────────────
-            elif red == "tiktok":
-                if not recursos["video_tiktok"]:
-                    resultados["tiktok"] = {
-                        "estado": "error",
-                        "error": "No se pudo generar video",
-                        "adaptacion": adaptacion
-                    }
-                    fallidos += 1
-                    print(f"   ❌ TikTok falló: sin video")
-                    continue
-                
-                result = social_services.post_to_tiktok(
-                    text=texto_adaptado,
-                    video_path=recursos["video_tiktok"],
-                    privacy="SELF_ONLY"
-                )
-                
-                # Limpiar video temporal
-                if recursos["video_tiktok"] and os.path.exists(recursos["video_tiktok"]):
-                    os.unlink(recursos["video_tiktok"])
-                
-                if "error" in result:
-                    resultados["tiktok"] = {
-                        "estado": "error",
-                        "error": result["error"],
-                        "mensaje": result.get("mensaje", "Error al publicar en TikTok"),
-                        "adaptacion": adaptacion
-                    }
-                    fallidos += 1
-                    print(f"   ❌ TikTok falló: {result['error']}")
-                else:
-                    # 🔗 RETORNAR TODA LA INFO INCLUYENDO share_url
-                    resultados["tiktok"] = {
-                        "estado": "exitoso",
-                        "publish_id": result.get("publish_id"),
-                        "video_id": result.get("video_id"),
-                        "share_url": result.get("share_url"),  # 🔗 ENLACE DEL VIDEO
-                        "privacy": result.get("privacy"),
-                        "mode": result.get("mode"),
-                        "size_mb": result.get("size_mb"),
-                        "mensaje": result.get("mensaje"),
-                        "como_ver": result.get("como_ver"),  # 📱 INSTRUCCIONES
-                        "cuenta": result.get("cuenta", "@limberg818"),
-                        "visibilidad": result.get("visibilidad"),
-                        "nota": result.get("nota"),
-                        "adaptacion": adaptacion
-                    }
-                    exitosos += 1
-                    
-                    # Log del share_url
-                    share_url = result.get("share_url")
-                    if share_url:
-                        print(f"   ✅ TikTok publicado: {share_url}")
-                    else:
-                        print(f"   ✅ TikTok publicado (sin share_url público)")
-        
-        except Exception as e:
-            resultados[red] = {
-                "estado": "error",
-                "error": f"Excepción: {str(e)}",
-                "adaptacion": adaptacion
-            }
-            fallidos += 1
-            print(f"   ❌ {red.upper()} falló con excepción: {e}")
+    exitosos = sum(1 for r in resultados.values() if r.get("estado") == "exitoso")
+    fallidos = len(resultados) - exitosos
     
     # ═══════════════════════════════════════════════════════════════
-    # 📊 PASO 5: RESUMEN FINAL
+    # 📊 PASO 3: RESUMEN FINAL
     # ═══════════════════════════════════════════════════════════════
     tiempo_total = time.time() - inicio
     
     print("\n" + "="*70)
-    print("📊 [PASO 5/5] RESUMEN DE PUBLICACIONES")
+    print("📊 [PASO 3/3] RESUMEN DE PUBLICACIONES")
     print("="*70)
     print(f"✅ Exitosos: {exitosos}")
     print(f"❌ Fallidos: {fallidos}")
+    for red, tiempos in tiempos_por_red.items():
+        print(f"   ⏱️  {red.upper()}: {tiempos}")
     print(f"⏱️  Tiempo total: {tiempo_total:.1f} segundos")
     print("="*70 + "\n")
     
@@ -932,7 +842,9 @@ def publish_to_multiple_networks(request: schemas.MultiNetworkPostRequest, curre
         "exitosos": exitosos,
         "fallidos": fallidos,
         "tasa_exito": f"{(exitosos/len(redes_validas)*100):.1f}%" if redes_validas else "0%",
-        "tiempo_segundos": round(tiempo_total, 1)
+        "tiempo_segundos": round(tiempo_total, 1),
+        "tiempo_validacion_segundos": tiempos_validacion.get("validacion"),
+        "tiempos_por_red": tiempos_por_red
     }
     
     return {
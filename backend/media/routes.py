@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+import media_store
+
+# El nombre es el hash del contenido: la URL nunca cambia de contenido
+CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+router = APIRouter(
+    prefix="/media",
+    tags=["media"]
+)
+
+
+@router.api_route("/{nombre}", methods=["GET", "HEAD"])
+def get_media(nombre: str):
+    """
+    Sirve un archivo del almacén de medios (sin autenticación: lo descargan
+    Instagram/Facebook). Soporta Range, ETag y Last-Modified.
+    """
+    ruta = media_store.almacen.ruta_de(nombre)
+    if ruta is None:
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+
+    extension = nombre[nombre.rindex("."):]
+    return FileResponse(ruta, media_type=media_store.TIPOS[extension], headers=CACHE_HEADERS)
@@ -0,0 +1,195 @@
+"""
+Metadatos de archivos de audio y video sin decodificarlos
+
+Para saber cuánto dura la narración no hace falta cargarla entera (pydub
+decodifica todo a PCM en memoria): alcanza con los encabezados del
+contenedor.
+
+- probar(ruta): duración, códec, dimensiones y bitrate con ffprobe (JSON)
+- Si ffprobe no está o falla, los MP3 se leen con un parser de encabezados
+- Resultados en caché por archivo (ruta + tamaño + fecha de modificación):
+  los segmentos de cache_clips se prueban una sola vez (sus aciertos solo
+  tocan el atime, ver CacheClips.obtener)
+"""
+import json
+import os
+import shutil
+import subprocess
+
+import cache_service
+
+FFPROBE_PATH = os.getenv("FFPROBE_PATH") or shutil.which("ffprobe") or "ffprobe"
+FFPROBE_TIMEOUT = int(os.getenv("FFPROBE_TIMEOUT", 10))
+
+# Las rutas son locales a este proceso: nunca en Redis
+cache_metadatos = cache_service.crear_cache(
+    "media_probe",
+    maxsize=int(os.getenv("CACHE_MEDIA_PROBE_MAX", 2048)),
+    ttl=int(os.getenv("CACHE_MEDIA_PROBE_TTL", 24 * 3600)),
+    backend="memoria"
+)
+
+
+_BITRATES_KBPS = {
+    "1": [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    "2": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_FRECUENCIAS = {
+    "1": [44100, 48000, 32000],
+    "2": [22050, 24000, 16000],
+    "2.5": [11025, 12000, 8000],
+}
+_VERSIONES = {0b11: "1", 0b10: "2", 0b00: "2.5"}
+
+
+def saltar_id3(datos: bytes) -> int:
+    """Tamaño de la etiqueta ID3v2 al inicio (0 si no hay)"""
+    if len(datos) < 10 or datos[:3] != b"ID3":
+        return 0
+    tamano = 0
+    for byte in datos[6:10]:
+        tamano = (tamano << 7) | (byte & 0x7F)
+    return 10 + tamano
+
+
+def primer_frame_mp3(datos: bytes) -> dict:
+    """Primer encabezado MPEG Layer III válido de `datos` (o None)"""
+    for i in range(len(datos) - 4):
+        if datos[i] != 0xFF or (datos[i + 1] & 0xE0) != 0xE0:
+            continue
+        version = _VERSIONES.get((datos[i + 1] >> 3) & 0b11)
+        capa = (datos[i + 1] >> 1) & 0b11
+        indice_bitrate = datos[i + 2] >> 4
+        indice_frecuencia = (datos[i + 2] >> 2) & 0b11
+        if not version or capa != 0b01 or indice_bitrate in (0, 15) or indice_frecuencia == 3:
+            continue  # No es un encabezado de Layer III válido
+
+        bitrate = _BITRATES_KBPS["1" if version == "1" else "2"][indice_bitrate] * 1000
+        frecuencia = _FRECUENCIAS[version][indice_frecuencia]
+        relleno = (datos[i + 2] >> 1) & 0x1
+        frame = {
+            "posicion": i,
+            "bitrate": bitrate,
+            "frecuencia": frecuencia,
+            "muestras": 1152 if version == "1" else 576,
+            "largo": (144 if version == "1" else 72) * bitrate // frecuencia + relleno,
+            "cabecera_vbr": False,  # Frame Xing/Info: no tiene audio
+            "frames": None,
+        }
+
+        for marca in (b"Xing", b"Info"):
+            posicion = datos.find(marca, i + 4, i + 64)
+            if posicion == -1:
+                continue
+            frame["cabecera_vbr"] = True
+            # "Info" es CBR: alcanza con el tamaño. "Xing" trae la cantidad de frames
+            if marca == b"Xing" and posicion + 12 <= len(datos) and datos[posicion + 7] & 0x1:
+                frame["frames"] = int.from_bytes(datos[posicion + 8:posicion + 12], "big")
+        return frame
+
+    return None
+
+
+def duracion_mp3(ruta: str) -> float:
+    """
+    Duración en segundos según el primer frame (y el encabezado Xing si el
+    archivo es VBR), sin decodificar el audio. None si no es un MP3 válido.
+    """
+    try:
+        tamano_archivo = os.path.getsize(ruta)
+        with open(ruta, "rb") as archivo:
+            base = saltar_id3(archivo.read(10))
+            archivo.seek(base)
+            frame = primer_frame_mp3(archivo.read(64 * 1024))
+    except OSError:
+        return None
+
+    if not frame:
+        return None
+    if frame["frames"]:
+        return frame["frames"] * frame["muestras"] / frame["frecuencia"]
+
+    inicio_audio = base + frame["posicion"] + (frame["largo"] if frame["cabecera_vbr"] else 0)
+    return (tamano_archivo - inicio_audio) * 8 / frame["bitrate"]
+
+
+def _con_ffprobe(ruta: str) -> dict:
+    resultado = subprocess.run(
+        [FFPROBE_PATH, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", ruta],
+        capture_output=True, text=True, timeout=FFPROBE_TIMEOUT, check=True
+    )
+    datos = json.loads(resultado.stdout)
+    formato = datos.get("format", {})
+    streams = datos.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    principal = video or audio or {}
+
+    duracion = formato.get("duration") or principal.get("duration")
+    bitrate = formato.get("bit_rate") or principal.get("bit_rate")
+    return {
+        "duracion": float(duracion) if duracion else None,
+        "codec": principal.get("codec_name"),
+        "codec_audio": audio.get("codec_name") if audio else None,
+        "ancho": video.get("width") if video else None,
+        "alto": video.get("height") if video else None,
+        "bitrate_kbps": int(bitrate) // 1000 if bitrate else None,
+        "formato": formato.get("format_name"),
+        "fuente": "ffprobe",
+    }
+
+
+def _con_encabezados(ruta: str) -> dict:
+    duracion = duracion_mp3(ruta)
+    if duracion is None:
+        return None
+
+    with open(ruta, "rb") as archivo:
+        archivo.seek(saltar_id3(archivo.read(10)))
+        frame = primer_frame_mp3(archivo.read(64 * 1024))
+    return {
+        "duracion": duracion,
+        "codec": "mp3",
+        "codec_audio": "mp3",
+        "ancho": None,
+        "alto": None,
+        "bitrate_kbps": frame["bitrate"] // 1000,
+        "formato": "mp3",
+        "fuente": "encabezados",
+    }
+
+
+def probar(ruta: str) -> dict:
+    """
+    Metadatos de `ruta`: duracion (s), codec, codec_audio, ancho, alto,
+    bitrate_kbps, formato y fuente ("ffprobe" o "encabezados").
+    None si el archivo no existe o no se pudo leer.
+    """
+    try:
+        stat = os.stat(ruta)
+    except OSError:
+        return None
+
+    clave = cache_service.clave_cache("media_probe", os.path.abspath(ruta), stat.st_size, stat.st_mtime_ns)
+    metadatos = cache_metadatos.obtener(clave)
+    if metadatos is not None:
+        return metadatos
+
+    try:
+        metadatos = _con_ffprobe(ruta)
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        print(f"⚠️ ffprobe no disponible para {os.path.basename(ruta)} ({type(e).__name__}), leyendo encabezados")
+        try:
+            metadatos = _con_encabezados(ruta)
+        except OSError:
+            metadatos = None
+
+    if metadatos is not None:
+        cache_metadatos.guardar(clave, metadatos)
+    return metadatos
+
+
+def duracion(ruta: str) -> float:
+    """Duración en segundos (o None)"""
+    metadatos = probar(ruta)
+    return metadatos["duracion"] if metadatos else None
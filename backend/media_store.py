@@ -0,0 +1,87 @@
+"""
+Almacén de medios servido por el propio backend (/media)
+
+generar_imagen_ia subía cada imagen a Imgur (un segundo upload de 1-2 MB,
+con Client-ID fijo y su rate limit) solo para tener una URL pública que
+Instagram/Facebook pudieran descargar. Ahora la imagen se guarda en disco
+y la sirve media/routes.py:
+
+- Direccionado por contenido: el nombre es el SHA-256 de los bytes, así que
+  la misma imagen se guarda una vez y la URL nunca cambia (caché immutable)
+- Tope de tamaño con desalojo LRU (ver cache_clips.CacheClips); lo usado
+  en los últimos MEDIA_PROTECCION segundos no se borra, para que la red
+  social alcance a descargarlo
+- MEDIA_PUBLIC_URL (o RENDER_EXTERNAL_URL en Render) es la base de las URLs
+  públicas; sin ella se sigue usando Imgur
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+from cache_clips import CacheClips
+
+MEDIA_DIR = os.getenv("MEDIA_DIR", os.path.join(tempfile.gettempdir(), "media_store"))
+MEDIA_MAX_MB = int(os.getenv("MEDIA_MAX_MB", 1024))
+MEDIA_PROTECCION = int(os.getenv("MEDIA_PROTECCION", 24 * 3600))
+MEDIA_PUBLIC_URL = (os.getenv("MEDIA_PUBLIC_URL") or os.getenv("RENDER_EXTERNAL_URL") or "").rstrip("/")
+
+EXTENSIONES = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/webp": ".webp",
+    "video/mp4": ".mp4",
+    "audio/mpeg": ".mp3",
+}
+TIPOS = {extension: mime for mime, extension in EXTENSIONES.items()}
+
+_PATRON_NOMBRE = re.compile(r"^[0-9a-f]{32}(\.[a-z0-9]+)$")
+
+
+class AlmacenMedia(CacheClips):
+    """CacheClips con archivos <sha256><extensión> de cualquier tipo"""
+
+    def __init__(self, directorio: str = MEDIA_DIR, max_mb: int = MEDIA_MAX_MB, proteccion: int = MEDIA_PROTECCION):
+        super().__init__(directorio, max_mb=max_mb, proteccion=proteccion, extension="")
+
+    def _ruta(self, digest: str, extension: str) -> str:
+        return os.path.join(self.directorio, f"{digest}{extension}")
+
+    def guardar_bytes(self, datos: bytes, mime: str) -> str:
+        """Guarda `datos` (si no estaban) y devuelve el nombre del archivo"""
+        extension = EXTENSIONES.get(mime)
+        if extension is None:
+            raise ValueError(f"Tipo de medio no soportado: {mime}")
+
+        digest = hashlib.sha256(datos).hexdigest()[:32]
+        if self.obtener(digest, extension) is None:
+            temporal = self.ruta_temporal(digest, extension)
+            with open(temporal, "wb") as archivo:
+                archivo.write(datos)
+            self.guardar(temporal, digest, extension)
+        return f"{digest}{extension}"
+
+    def ruta_de(self, nombre: str) -> str:
+        """Ruta en disco de un nombre público (None si no es válido o no existe)"""
+        coincidencia = _PATRON_NOMBRE.match(nombre)
+        if not coincidencia or coincidencia.group(1) not in TIPOS:
+            return None
+        ruta = self._ruta(nombre[:32], coincidencia.group(1))
+        return ruta if os.path.isfile(ruta) else None
+
+
+almacen = AlmacenMedia()
+
+
+def configurado() -> bool:
+    """Hay una URL pública desde la que las redes pueden descargar"""
+    return bool(MEDIA_PUBLIC_URL)
+
+
+def url_publica(nombre: str) -> str:
+    return f"{MEDIA_PUBLIC_URL}/media/{nombre}"
+
+
+def publicar(datos: bytes, mime: str) -> str:
+    """Guarda `datos` y devuelve su URL pública"""
+    return url_publica(almacen.guardar_bytes(datos, mime))
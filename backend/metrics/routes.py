@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+from auth.models import User
+from dependencies import get_current_user
+import cache_audio
+import cache_clips
+import cache_service
+import imagen_service
+import media_store
+import render_service
+from jobs import service as jobs_service
+
+router = APIRouter(
+    prefix="/api/metrics",
+    tags=["metrics"]
+)
+
+
+@router.get("")
+def get_metrics(current_user: User = Depends(get_current_user)):
+    """Métricas de operación: cachés (aciertos/fallos), cola de trabajos, renders, clips, audio, imágenes y medios publicados"""
+    return {
+        "cache": cache_service.metricas(),
+        "jobs": jobs_service.cola.estadisticas(),
+        "render": render_service.pool.estadisticas(),
+        "clips": cache_clips.cache.metricas(),
+        "audio": cache_audio.cache.metricas(),
+        "imagenes": imagen_service.metricas(),
+        "media": media_store.almacen.metricas(),
+    }
@@ -0,0 +1,450 @@
+"""
+Motor de publicación multi-red (fan-out)
+
+Adapta el contenido para todas las redes en una sola llamada a Gemini y
+luego ejecuta en paralelo la cadena de cada red social:
+    recursos (imagen / video) → publicación
+
+Cada etapa pasa por un límite de concurrencia por proveedor, de modo que
+cinco redes no disparen cinco renders de FFmpeg ni saturen la cuota de
+Stability al mismo tiempo. Se registra el tiempo de cada red y de cada etapa.
+
+Lo que solo depende del texto original y es gratis o barato (búsqueda de
+clips de TikTok) se lanza de forma especulativa mientras el LLM valida y
+adapta; si la validación rechaza el contenido, se cancela (ver Especulacion).
+Las imágenes (Stability, de pago) nunca se especulan: se generan después
+de la validación.
+
+Opcionalmente recibe un callback `al_evento(tipo, **datos)` que se invoca al
+terminar cada etapa (ver jobs.eventos); puede llamarse desde hilos de trabajo.
+"""
+import asyncio
+import os
+import time
+import weakref
+
+import activos_imagen
+import especulacion
+import llm_service
+import social_services
+
+
+# ============================================
+# ⚙️ LÍMITES DE CONCURRENCIA POR PROVEEDOR
+# ============================================
+
+LIMITES_PROVEEDOR = {
+    "gemini": int(os.getenv("LIMITE_GEMINI", 4)),
+    "stability": int(os.getenv("LIMITE_STABILITY", 2)),
+    "render": int(os.getenv("LIMITE_RENDER", 1)),
+    "pexels": int(os.getenv("LIMITE_PEXELS", 2)),
+    "tts": int(os.getenv("LIMITE_TTS", 2)),
+    "facebook": int(os.getenv("LIMITE_FACEBOOK", 2)),
+    "instagram": int(os.getenv("LIMITE_INSTAGRAM", 2)),
+    "linkedin": int(os.getenv("LIMITE_LINKEDIN", 2)),
+    "whatsapp": int(os.getenv("LIMITE_WHATSAPP", 2)),
+    "tiktok": int(os.getenv("LIMITE_TIKTOK", 1)),
+}
+
+# Los semáforos de asyncio pertenecen a un event loop; se crean por loop
+_semaforos = weakref.WeakKeyDictionary()
+
+
+def _semaforo(proveedor: str) -> asyncio.Semaphore:
+    """Obtiene (o crea) el semáforo del proveedor para el loop actual"""
+    loop = asyncio.get_running_loop()
+    por_loop = _semaforos.setdefault(loop, {})
+
+    if proveedor not in por_loop:
+        por_loop[proveedor] = asyncio.Semaphore(LIMITES_PROVEEDOR.get(proveedor, 2))
+
+    return por_loop[proveedor]
+
+
+async def ejecutar_etapa(nombre: str, proveedor: str, tiempos: dict, func, *args, **kwargs):
+    """
+    Ejecuta una función bloqueante en un hilo respetando el límite del proveedor.
+    Guarda en `tiempos[nombre]` los segundos de ejecución (sin contar la espera).
+    """
+    async with _semaforo(proveedor):
+        inicio = time.perf_counter()
+        try:
+            return await asyncio.to_thread(func, *args, **kwargs)
+        finally:
+            tiempos[nombre] = round(time.perf_counter() - inicio, 2)
+
+
+async def ejecutar_etapa_async(nombre: str, proveedor: str, tiempos: dict, coro_func, *args, **kwargs):
+    """
+    Igual que ejecutar_etapa, pero para corrutinas (p. ej. los publicadores
+    asíncronos de social_services, que usan el pool HTTP compartido).
+    """
+    async with _semaforo(proveedor):
+        inicio = time.perf_counter()
+        try:
+            return await coro_func(*args, **kwargs)
+        finally:
+            tiempos[nombre] = round(time.perf_counter() - inicio, 2)
+
+
+# ============================================
+# 📤 PUBLICACIÓN POR RED
+# ============================================
+
+def _texto_con_hashtags(adaptacion: dict, texto_original: str) -> str:
+    texto_adaptado = adaptacion.get("text", texto_original)
+
+    if "hashtags" in adaptacion and adaptacion["hashtags"]:
+        hashtags_str = " ".join(adaptacion["hashtags"])
+        if not any(tag in texto_adaptado for tag in adaptacion["hashtags"]):
+            texto_adaptado = f"{texto_adaptado}\n\n{hashtags_str}"
+
+    return texto_adaptado
+
+
+def _resultado_error(error: str, adaptacion: dict, **extra) -> dict:
+    return {"estado": "error", "error": error, **extra, "adaptacion": adaptacion}
+
+
+def _formatear_facebook(result: dict, adaptacion: dict, recurso) -> dict:
+    post_id = result.get("id") or result.get("post_id")
+    link = f"https://www.facebook.com/{post_id.replace('_', '/posts/')}" if post_id else None
+    return {"estado": "exitoso", "id": post_id, "link": link, "adaptacion": adaptacion}
+
+
+def _formatear_instagram(result: dict, adaptacion: dict, recurso) -> dict:
+    return {
+        "estado": "exitoso",
+        "id": result.get("id"),
+        "link": result.get("permalink"),
+        "imagen_url": recurso,
+        "adaptacion": adaptacion
+    }
+
+
+def _formatear_linkedin(result: dict, adaptacion: dict, recurso) -> dict:
+    post_urn = result.get("id", "")
+    return {
+        "estado": "exitoso",
+        "id": post_urn.split(":")[-1] if ":" in post_urn else post_urn,
+        "link": f"https://www.linkedin.com/feed/update/{post_urn}" if post_urn else None,
+        "adaptacion": adaptacion
+    }
+
+
+def _formatear_whatsapp(result: dict, adaptacion: dict, recurso) -> dict:
+    return {
+        "estado": "exitoso",
+        "id": result.get("id"),
+        "status": result.get("status"),
+        "adaptacion": adaptacion
+    }
+
+
+def _formatear_tiktok(result: dict, adaptacion: dict, recurso) -> dict:
+    return {
+        "estado": "exitoso",
+        "publish_id": result.get("publish_id"),
+        "video_id": result.get("video_id"),
+        "share_url": result.get("share_url"),
+        "privacy": result.get("privacy"),
+        "mode": result.get("mode"),
+        "size_mb": result.get("size_mb"),
+        "mensaje": result.get("mensaje"),
+        "como_ver": result.get("como_ver"),
+        "cuenta": result.get("cuenta", "@limberg818"),
+        "visibilidad": result.get("visibilidad"),
+        "nota": result.get("nota"),
+        "adaptacion": adaptacion
+    }
+
+
+def _sin_eventos(tipo: str, **datos):
+    pass
+
+
+def _prompt_whatsapp(texto: str) -> str:
+    return f"Universidad UAGRM: {texto[:100]}"
+
+
+async def _esperar_especulativa(tarea: asyncio.Task, tiempos: dict, tiempos_especulativos: dict = None):
+    """Espera una tarea especulativa y copia sus tiempos (se llenan al terminar)"""
+    resultado = await tarea
+    tiempos.update(tiempos_especulativos or {})
+    return resultado
+
+
+async def _generar_video_tiktok(red: str, texto: str, adaptacion: dict, tiempos: dict, al_evento, especulativa=None, tiempos_especulativos=None):
+    """
+    Clips de Pexels y narración TTS en paralelo; el render empieza cuando ambos están.
+    La búsqueda de clips puede venir ya lanzada desde antes de la validación.
+    """
+    texto_adaptado = adaptacion.get("text", texto)
+    al_evento("video_progreso", red=red, porcentaje=0)
+
+    if especulativa is not None:
+        clips = asyncio.ensure_future(_esperar_especulativa(especulativa, tiempos, tiempos_especulativos))
+    else:
+        clips = asyncio.ensure_future(ejecutar_etapa("clips", "pexels", tiempos, llm_service.buscar_clips_tiktok, texto_adaptado))
+
+    try:
+        audio_path = await ejecutar_etapa("audio", "tts", tiempos, llm_service.generar_audio_tiktok, texto_adaptado, adaptacion)
+    except BaseException:
+        clips.cancel()
+        raise
+
+    try:
+        video_urls = await clips
+    except Exception as e:
+        print(f"❌ Error buscando clips: {e}")
+        video_urls = None
+
+    if not video_urls or not audio_path:
+        if audio_path and os.path.exists(audio_path):
+            os.unlink(audio_path)
+        return None
+
+    al_evento("video_progreso", red=red, porcentaje=40)
+    return await ejecutar_etapa(
+        "recursos", "render", tiempos,
+        llm_service.generar_video_tiktok, texto_adaptado, adaptacion,
+        progreso=lambda porcentaje: al_evento("video_progreso", red=red, porcentaje=porcentaje),
+        video_urls=video_urls, audio_path=audio_path
+    )
+
+
+async def _generar_recurso(red: str, texto: str, adaptacion: dict, tiempos: dict, al_evento=_sin_eventos, especulativa=None, tiempos_especulativos=None, imagen=None):
+    """
+    Genera la imagen o el video que necesita cada red (None si no necesita).
+    Las imágenes son variantes de la imagen maestra de la publicación (`imagen`).
+    """
+    imagen = imagen or activos_imagen.ImagenPost()
+
+    if red == "instagram":
+        prompt_img = adaptacion.get("suggested_image_prompt", f"Universidad UAGRM: {texto[:100]}")
+        return await ejecutar_etapa("recursos", "stability", tiempos, imagen.variante, "instagram", prompt_img)
+
+    if red == "whatsapp":
+        prompt_img = adaptacion.get("suggested_image_prompt") or _prompt_whatsapp(texto)
+        return await ejecutar_etapa("recursos", "stability", tiempos, imagen.variante, "whatsapp", prompt_img)
+
+    if red == "tiktok":
+        return await _generar_video_tiktok(red, texto, adaptacion, tiempos, al_evento, especulativa, tiempos_especulativos)
+
+    return None
+
+
+# ============================================
+# 🔮 ETAPAS ESPECULATIVAS
+# ============================================
+
+class Especulacion:
+    """
+    Tareas lanzadas antes de conocer la validación, una por red como máximo.
+    Respetan los mismos límites por proveedor que el resto del pipeline.
+    Solo trabajo gratis o barato: lo de pago espera a la validación.
+
+    Es la contraparte async de especulacion.PlanificadorEspeculativo: aquel
+    corre en hilos para los endpoints síncronos de una sola red, mientras que
+    aquí las tareas viven en el event loop de /publish-multi y pasan por
+    ejecutar_etapa (semáforos por proveedor y tiempos por red). Ambos
+    comparten el mismo TokenCancelacion para cortar el trabajo en curso.
+    """
+
+    def __init__(self):
+        self.token = especulacion.TokenCancelacion()
+        self.tareas = {}
+        self.tiempos = {}
+
+    def lanzar(self, red: str, nombre: str, proveedor: str, func, *args, **kwargs):
+        self.tiempos[red] = {}
+        self.tareas[red] = asyncio.ensure_future(
+            ejecutar_etapa(nombre, proveedor, self.tiempos[red], func, *args, **kwargs)
+        )
+
+    def cancelar(self):
+        """Cancela lo que siga pendiente y descarta los resultados no usados"""
+        self.token.cancelar()
+        pendientes = [red for red, tarea in self.tareas.items() if not tarea.done()]
+
+        for tarea in self.tareas.values():
+            if tarea.done():
+                if not tarea.cancelled():
+                    tarea.exception()  # Evita el aviso de "exception was never retrieved"
+            else:
+                tarea.cancel()
+
+        if pendientes:
+            print(f"🛑 Especulación cancelada para: {', '.join(pendientes)}")
+
+
+def iniciar_especulacion(texto: str, redes: list) -> Especulacion:
+    """
+    Lanza, sin esperar la validación, lo que solo depende del texto original
+    y no se paga por uso:
+    - tiktok: keywords + búsqueda de clips en Pexels (se corta vía token)
+
+    La imagen de WhatsApp no se adelanta: cada generación en Stability se
+    paga, y un contenido rechazado la desperdiciaría.
+
+    Debe llamarse dentro del event loop; cancelar() si se rechaza el contenido.
+    """
+    esp = Especulacion()
+
+    if "tiktok" in redes:
+        esp.lanzar("tiktok", "clips", "pexels", llm_service.buscar_clips_tiktok, texto, cancelacion=esp.token)
+
+    return esp
+
+
+async def _publicar(red: str, texto_adaptado: str, recurso, tiempos: dict) -> dict:
+    if red == "facebook":
+        return await ejecutar_etapa_async("publicacion", red, tiempos, social_services.post_to_facebook_async, text=texto_adaptado, image_url=None)
+    if red == "instagram":
+        return await ejecutar_etapa_async("publicacion", red, tiempos, social_services.post_to_instagram_async, text=texto_adaptado, image_url=recurso)
+    if red == "linkedin":
+        return await ejecutar_etapa_async("publicacion", red, tiempos, social_services.post_to_linkedin_async, text=texto_adaptado)
+    if red == "whatsapp":
+        return await ejecutar_etapa_async("publicacion", red, tiempos, social_services.post_whatsapp_status_async, text=texto_adaptado, image_url=recurso)
+    if red == "tiktok":
+        return await ejecutar_etapa_async("publicacion", red, tiempos, social_services.post_to_tiktok_async, text=texto_adaptado, video_path=recurso, privacy="SELF_ONLY")
+    return {"error": f"Red '{red}' no soportada"}
+
+
+_FORMATEADORES = {
+    "facebook": _formatear_facebook,
+    "instagram": _formatear_instagram,
+    "linkedin": _formatear_linkedin,
+    "whatsapp": _formatear_whatsapp,
+    "tiktok": _formatear_tiktok,
+}
+
+_ERROR_SIN_RECURSO = {
+    "instagram": "No se pudo generar imagen",
+    "whatsapp": "No se pudo generar imagen",
+    "tiktok": "No se pudo generar video",
+}
+
+
+async def procesar_red(red: str, texto: str, al_evento=_sin_eventos, adaptacion: dict = None, tiempo_adaptacion: float = None, especulacion: Especulacion = None, imagen=None) -> dict:
+    """
+    Cadena completa de una red: adaptar → generar recurso → publicar.
+    Emite adaptacion_lista, imagen_lista, video_progreso y publicacion.
+
+    Si se recibe `adaptacion` (ya hecha en lote), se salta la llamada al LLM
+    y `tiempo_adaptacion` se registra como el tiempo de esa etapa. Si hay una
+    `especulacion` con una tarea para esta red, se reutiliza su resultado.
+    `imagen` (activos_imagen.ImagenPost) se comparte entre las redes del post.
+
+    Returns:
+        dict con "red", "adaptada" (bool), "resultado" y "tiempos"
+    """
+    tiempos = {}
+    inicio = time.perf_counter()
+    recurso = None
+
+    try:
+        # 1. Adaptación (si no vino ya del lote)
+        if adaptacion is None:
+            adaptacion = {}
+            print(f"   🔄 Adaptando para {red.upper()}...")
+            adaptacion = await ejecutar_etapa(
+                "adaptacion", "gemini", tiempos,
+                llm_service.adaptar_contenido,
+                titulo=texto[:50], contenido=texto, red_social=red
+            )
+        else:
+            tiempos["adaptacion"] = tiempo_adaptacion
+
+        if "error" in adaptacion:
+            print(f"   ❌ Error adaptando {red}: {adaptacion['error']}")
+            al_evento("publicacion", red=red, ok=False, error=adaptacion["error"])
+            return {"red": red, "adaptada": False, "resultado": {"error": adaptacion["error"]}, "tiempos": tiempos}
+
+        al_evento("adaptacion_lista", red=red, texto=adaptacion.get("text", ""))
+
+        # 2. Recursos multimedia
+        especulativa = especulacion.tareas.get(red) if especulacion else None
+        tiempos_especulativos = especulacion.tiempos.get(red) if especulacion else None
+        recurso = await _generar_recurso(red, texto, adaptacion, tiempos, al_evento, especulativa, tiempos_especulativos, imagen)
+
+        if red in ("instagram", "whatsapp"):
+            # Las imágenes base64 (WhatsApp) no se envían en el evento por su tamaño
+            es_url = bool(recurso) and recurso.startswith("http")
+            al_evento("imagen_lista", red=red, ok=bool(recurso), url=recurso if es_url else None)
+
+        if red in _ERROR_SIN_RECURSO and not recurso:
+            print(f"   ❌ {red.upper()} falló: sin recurso multimedia")
+            al_evento("publicacion", red=red, ok=False, error=_ERROR_SIN_RECURSO[red])
+            return {"red": red, "adaptada": True, "resultado": _resultado_error(_ERROR_SIN_RECURSO[red], adaptacion), "tiempos": tiempos}
+
+        # 3. Publicación
+        print(f"   📤 Publicando en {red.upper()}...")
+        result = await _publicar(red, _texto_con_hashtags(adaptacion, texto), recurso, tiempos)
+
+        if "error" in result:
+            extra = {"mensaje": result.get("mensaje", "Error al publicar en TikTok")} if red == "tiktok" else {}
+            print(f"   ❌ {red.upper()} falló: {result['error']}")
+            resultado = _resultado_error(result["error"], adaptacion, **extra)
+        else:
+            print(f"   ✅ {red.upper()} publicado")
+            resultado = _FORMATEADORES[red](result, adaptacion, recurso)
+
+        al_evento(
+            "publicacion", red=red, ok=resultado["estado"] == "exitoso",
+            link=resultado.get("link") or resultado.get("share_url"), error=resultado.get("error")
+        )
+        return {"red": red, "adaptada": True, "resultado": resultado, "tiempos": tiempos}
+
+    except Exception as e:
+        print(f"   ❌ {red.upper()} falló con excepción: {e}")
+        al_evento("publicacion", red=red, ok=False, error=str(e))
+        return {"red": red, "adaptada": bool(adaptacion), "resultado": _resultado_error(f"Excepción: {str(e)}", adaptacion), "tiempos": tiempos}
+
+    finally:
+        tiempos["total"] = round(time.perf_counter() - inicio + (tiempo_adaptacion or 0), 2)
+        # Limpiar video temporal de TikTok
+        if red == "tiktok" and recurso and os.path.exists(recurso):
+            os.unlink(recurso)
+
+
+async def adaptar_en_lote(texto: str, redes: list, tiempos: dict) -> dict:
+    """
+    Una sola llamada a Gemini para todas las redes (ver llm_service.adaptar_contenido_multi).
+    Si falla por completo, devuelve {} y cada red se adapta por separado.
+    """
+    try:
+        return await ejecutar_etapa(
+            "adaptacion", "gemini", tiempos,
+            llm_service.adaptar_contenido_multi,
+            titulo=texto[:50], contenido=texto, redes=redes
+        )
+    except Exception as e:
+        print(f"   ⚠️ Falló la adaptación en lote: {e}")
+        return {}
+
+
+async def publicar_en_paralelo(texto: str, redes: list, al_evento=_sin_eventos, adaptaciones: dict = None, tiempo_adaptacion: float = None, especulacion: Especulacion = None) -> list:
+    """
+    Adapta en lote (si no se reciben `adaptaciones`) y lanza la cadena de
+    cada red al mismo tiempo. El tiempo total queda cerca de la red más
+    lenta, no de la suma. Las redes con imagen comparten una sola imagen
+    maestra, generada con el prompt adaptado de la red principal.
+    """
+    if adaptaciones is None:
+        tiempos_lote = {}
+        print(f"   🔄 Adaptando para {', '.join(r.upper() for r in redes)} (una llamada)...")
+        adaptaciones = await adaptar_en_lote(texto, redes, tiempos_lote)
+        tiempo_adaptacion = tiempos_lote.get("adaptacion")
+
+    imagen = activos_imagen.ImagenPost(activos_imagen.prompt_maestro(adaptaciones))
+
+    try:
+        return await asyncio.gather(*(
+            procesar_red(red, texto, al_evento, adaptaciones.get(red), tiempo_adaptacion if red in adaptaciones else None, especulacion, imagen)
+            for red in redes
+        ))
+    finally:
+        # Tareas especulativas de redes que fallaron antes de usarlas
+        if especulacion:
+            especulacion.cancelar()
@@ -0,0 +1,228 @@
+"""
+Planificador de renders de FFmpeg
+
+Cada encode de libx264 usa todos los núcleos que encuentra; dos
+publicaciones de TikTok al mismo tiempo pueden dejar a la API sin CPU.
+Todas las llamadas a FFmpeg de llm_service pasan por este pool:
+
+- RENDER_WORKERS procesos como máximo a la vez (por defecto, los núcleos)
+- cola acotada (RENDER_COLA_MAX): si está llena se espera hasta
+  RENDER_ESPERA_COLA segundos y luego se rechaza con ColaRenderLlena
+- cada render recibe -threads RENDER_CPUS // RENDER_WORKERS: el reparto
+  es fijo, así un render que arranca solo no se queda con todo el CPU
+  que después necesitan los que llegan
+- timeout por trabajo (RENDER_TIMEOUT) y cancelación (TokenCancelacion
+  o cancelar(id)): el proceso de FFmpeg se mata
+- métricas: profundidad de la cola, renders activos y duraciones
+"""
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import especulacion
+
+NUCLEOS = os.cpu_count() or 1
+
+RENDER_CPUS = int(os.getenv("RENDER_CPUS", NUCLEOS))
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", NUCLEOS))
+RENDER_COLA_MAX = int(os.getenv("RENDER_COLA_MAX", RENDER_WORKERS * 2))
+RENDER_ESPERA_COLA = float(os.getenv("RENDER_ESPERA_COLA", 30))
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", 300))
+
+
+class ColaRenderLlena(Exception):
+    """No hay lugar en la cola de renders (backpressure)"""
+
+
+class RenderTimeout(Exception):
+    """El render superó su tiempo máximo y se detuvo"""
+
+
+def con_hilos(comando: list, hilos: int) -> list:
+    """Agrega -threads antes del archivo de salida (último argumento)"""
+    return [*comando[:-1], '-threads', str(hilos), comando[-1]]
+
+
+class PoolRender:
+    """Ejecuta comandos de FFmpeg con concurrencia, cola y CPU acotadas"""
+
+    def __init__(self, workers: int = RENDER_WORKERS, cpus: int = RENDER_CPUS,
+                 cola_max: int = RENDER_COLA_MAX, espera_cola: float = RENDER_ESPERA_COLA):
+        self.workers = max(1, workers)
+        self.cpus = max(1, cpus)
+        self.espera_cola = espera_cola
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render")
+        self._cupos = threading.BoundedSemaphore(self.workers + max(0, cola_max))
+        self._lock = threading.Lock()
+        self._procesos = {}
+        self._cancelados = set()
+
+        self.en_cola = 0
+        self.activos = 0
+        self.completados = 0
+        self.fallidos = 0
+        self.cancelados = 0
+        self.timeouts = 0
+        self.rechazados = 0
+        self._duracion_total = 0.0
+        self._espera_total = 0.0
+        self.ultima_duracion = None
+
+    def _contar(self, campo: str, delta=1):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + delta)
+
+    def _hilos_por_render(self) -> int:
+        """Parte fija de RENDER_CPUS por worker, sin importar cuántos estén activos"""
+        return max(1, self.cpus // self.workers)
+
+    def enviar(self, comando: list, timeout: float = RENDER_TIMEOUT, cancelacion=None, al_linea=None, trabajo_id: str = None):
+        """
+        Encola un comando de FFmpeg y devuelve un Future con su stderr.
+
+        Raises:
+            ColaRenderLlena: si la cola sigue llena después de RENDER_ESPERA_COLA
+        """
+        if not self._cupos.acquire(timeout=self.espera_cola):
+            self._contar("rechazados")
+            raise ColaRenderLlena(f"Cola de renders llena ({self.en_cola} en espera)")
+
+        trabajo_id = trabajo_id or uuid.uuid4().hex
+        self._contar("en_cola")
+        encolado = time.perf_counter()
+
+        def ejecutar():
+            try:
+                self._contar("en_cola", -1)
+                self._contar("_espera_total", time.perf_counter() - encolado)
+                return self._ejecutar(trabajo_id, comando, timeout, cancelacion, al_linea)
+            finally:
+                self._cupos.release()
+
+        try:
+            return self._executor.submit(ejecutar)
+        except Exception:
+            self._contar("en_cola", -1)
+            self._cupos.release()
+            raise
+
+    def ejecutar(self, comando: list, timeout: float = RENDER_TIMEOUT, cancelacion=None, al_linea=None) -> str:
+        """Como enviar(), pero espera el resultado"""
+        return self.enviar(comando, timeout, cancelacion, al_linea).result()
+
+    def _ejecutar(self, trabajo_id: str, comando: list, timeout: float, cancelacion, al_linea) -> str:
+        with self._lock:
+            cancelado_en_cola = trabajo_id in self._cancelados
+            self._cancelados.discard(trabajo_id)
+        if cancelado_en_cola or (cancelacion is not None and cancelacion.cancelado):
+            self._contar("cancelados")
+            raise especulacion.Cancelado()
+
+        self._contar("activos")
+        hilos = self._hilos_por_render()
+        inicio = time.perf_counter()
+        vencido = threading.Event()
+        # stderr va a un archivo: con un segundo pipe, FFmpeg se bloquearía
+        # al llenarlo mientras aquí se lee stdout hasta el final
+        salida_error = tempfile.TemporaryFile(mode="w+")
+
+        try:
+            proceso = subprocess.Popen(
+                con_hilos(comando, hilos),
+                stdout=subprocess.PIPE, stderr=salida_error, text=True
+            )
+        except Exception:
+            salida_error.close()
+            self._contar("activos", -1)
+            self._contar("fallidos")
+            raise
+        with self._lock:
+            self._procesos[trabajo_id] = proceso
+
+        def vencer():
+            vencido.set()
+            proceso.kill()
+
+        temporizador = threading.Timer(timeout, vencer) if timeout else None
+        if temporizador:
+            temporizador.daemon = True
+            temporizador.start()
+
+        try:
+            for linea in proceso.stdout:
+                if cancelacion is not None and cancelacion.cancelado:
+                    proceso.kill()
+                    break
+                if al_linea:
+                    al_linea(linea)
+
+            codigo = proceso.wait()
+            salida_error.seek(0)
+            stderr = salida_error.read()
+        finally:
+            salida_error.close()
+            if temporizador:
+                temporizador.cancel()
+            duracion = time.perf_counter() - inicio
+            with self._lock:
+                self._procesos.pop(trabajo_id, None)
+                cancelado = trabajo_id in self._cancelados
+                self._cancelados.discard(trabajo_id)
+                self.activos -= 1
+                self.ultima_duracion = round(duracion, 2)
+
+        if vencido.is_set():
+            self._contar("timeouts")
+            print(f"⏱️ Render detenido tras {timeout:.0f}s (timeout)")
+            raise RenderTimeout(f"El render superó {timeout:.0f} segundos")
+
+        if cancelado or (cancelacion is not None and cancelacion.cancelado):
+            self._contar("cancelados")
+            print("🛑 Render cancelado")
+            raise especulacion.Cancelado()
+
+        if codigo != 0:
+            self._contar("fallidos")
+            raise subprocess.CalledProcessError(codigo, comando, stderr=stderr)
+
+        self._contar("completados")
+        self._contar("_duracion_total", duracion)
+        print(f"🎞️ Render terminado en {duracion:.1f}s ({hilos} hilos)")
+        return stderr
+
+    def cancelar(self, trabajo_id: str):
+        """Cancela un render en cola o en ejecución (mata su proceso)"""
+        with self._lock:
+            self._cancelados.add(trabajo_id)
+            proceso = self._procesos.get(trabajo_id)
+        if proceso:
+            proceso.kill()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            completados = self.completados
+            return {
+                "workers": self.workers,
+                "cpus": self.cpus,
+                "en_cola": self.en_cola,
+                "activos": self.activos,
+                "completados": completados,
+                "fallidos": self.fallidos,
+                "cancelados": self.cancelados,
+                "timeouts": self.timeouts,
+                "rechazados": self.rechazados,
+                "duracion_promedio": round(self._duracion_total / completados, 2) if completados else None,
+                "ultima_duracion": self.ultima_duracion,
+                "espera_promedio": round(self._espera_total / (completados + self.fallidos + self.timeouts), 2)
+                if completados + self.fallidos + self.timeouts else None,
+            }
+
+    def cerrar(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+pool = PoolRender()
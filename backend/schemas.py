@@ -6,6 +6,7 @@ class AdaptRequest(BaseModel):
     titulo: str
     contenido: str
     target_networks: List[str] 
+    usar_cache: bool = True  # False para forzar una nueva llamada al LLM
 
 class AdaptResponse(BaseModel):
     data: Dict[str, Any]
@@ -1,6 +1,9 @@
+import asyncio
 import httpx
 import os
 import logging
+import time
+import traceback
 from dotenv import load_dotenv
 
 logging.basicConfig(level=logging.INFO)
@@ -14,6 +17,11 @@ WHAPI_CHANNEL_ID = os.getenv("WHAPI_CHANNEL_ID")
 
 META_GRAPH_URL = "https://graph.facebook.com/v19.0"
 WHAPI_BASE_URL = "https://gate.whapi.cloud"
+LINKEDIN_USERINFO_URL = "https://api.linkedin.com/v2/userinfo"
+LINKEDIN_POST_URL = "https://api.linkedin.com/v2/ugcPosts"
+TIKTOK_INIT_URL = "https://open.tiktokapis.com/v2/post/publish/video/init/"
+TIKTOK_STATUS_URL = "https://open.tiktokapis.com/v2/post/publish/status/fetch/"
+TIKTOK_CUENTA = "@limberg818"
 
 
 def post_to_facebook(text: str, image_url: str = None):
@@ -731,4 +739,716 @@ def post_to_tiktok(text: str, video_path: str, privacy: str = "SELF_ONLY"):
         logging.error(f"❌ Error inesperado: {type(e).__name__}: {e}")
         import traceback
         logging.error(traceback.format_exc())
-        return {"error": f"Error inesperado: {str(e)}"}
\ No newline at end of file
+        return {"error": f"Error inesperado: {str(e)}"}
+
+
+# ============================================
+# 🧩 HELPERS DE LOS PUBLICADORES ASÍNCRONOS
+# ============================================
+# Validación, armado de payloads y manejo de respuestas/errores de cada red
+# para las versiones *_async (más abajo), que solo agregan la llamada HTTP
+# con el pool compartido.
+
+
+def _error_inesperado(red: str, e: Exception) -> dict:
+    logging.error(f"❌ Error inesperado en {red}: {e}")
+    return {"error": f"Error inesperado: {str(e)}"}
+
+
+# ============================================
+# 📘 FACEBOOK
+# ============================================
+
+def _validar_facebook(text: str):
+    if not text or text.strip() == "":
+        logging.warning("⚠️ Intento de publicar en Facebook sin texto")
+        return {
+            "error": "El texto no puede estar vacío",
+            "status": "rejected"
+        }
+    return None
+
+
+def _peticion_facebook(text: str, image_url: str = None):
+    """URL y payload: foto con texto si hay imagen, si no solo texto"""
+    if image_url:
+        return f"{META_GRAPH_URL}/{PAGE_ID}/photos", {
+            'caption': text,
+            'url': image_url,
+            'access_token': META_TOKEN
+        }
+    return f"{META_GRAPH_URL}/{PAGE_ID}/feed", {
+        'message': text,
+        'access_token': META_TOKEN
+    }
+
+
+def _resultado_facebook(response: httpx.Response) -> dict:
+    response.raise_for_status()
+    result = response.json()
+    logging.info(f"✅ Publicado en Facebook. Post ID: {result.get('id', result.get('post_id', 'N/A'))}")
+    return result
+
+
+def _error_api_facebook(e: httpx.HTTPStatusError) -> dict:
+    logging.error(f"❌ Error al publicar en Facebook: {e.response.json()}")
+    return {"error": f"Error de API: {e.response.json()}"}
+
+
+# ============================================
+# 📸 INSTAGRAM
+# ============================================
+
+def _validar_instagram(image_url: str):
+    if not IG_ACCOUNT_ID:
+        logging.error("❌ INSTAGRAM_ACCOUNT_ID no configurado en .env")
+        return {
+            "error": "Instagram Account ID no configurado. "
+                     "Ejecuta verify_instagram.py para obtenerlo"
+        }
+
+    if not image_url:
+        logging.error("❌ Instagram requiere una imagen")
+        return {"error": "Instagram requiere una URL de imagen"}
+
+    return None
+
+
+def _peticion_contenedor_instagram(text: str, image_url: str):
+    return f"{META_GRAPH_URL}/{IG_ACCOUNT_ID}/media", {
+        'image_url': image_url,
+        'caption': text,
+        'access_token': META_TOKEN
+    }
+
+
+def _peticion_publicar_instagram(container_id: str):
+    return f"{META_GRAPH_URL}/{IG_ACCOUNT_ID}/media_publish", {
+        'creation_id': container_id,
+        'access_token': META_TOKEN
+    }
+
+
+def _peticion_permalink_instagram(media_id: str):
+    return f"{META_GRAPH_URL}/{media_id}", {
+        'fields': 'id,permalink',
+        'access_token': META_TOKEN
+    }
+
+
+def _id_contenedor_instagram(response: httpx.Response) -> str:
+    response.raise_for_status()
+    container_id = response.json()['id']
+    logging.info(f"✅ Contenedor creado: {container_id}")
+    return container_id
+
+
+def _resultado_publicar_instagram(response: httpx.Response) -> dict:
+    response.raise_for_status()
+    result = response.json()
+    logging.info(f"✅ Publicado en Instagram. Media ID: {result['id']}")
+    return result
+
+
+def _agregar_permalink_instagram(result: dict, response: httpx.Response) -> dict:
+    response.raise_for_status()
+    permalink = response.json().get('permalink', None)
+    logging.info(f"✅ Permalink obtenido: {permalink}")
+    result['permalink'] = permalink
+    return result
+
+
+def _error_api_instagram(e: httpx.HTTPStatusError) -> dict:
+    error_data = e.response.json()
+    logging.error(f"❌ Error al publicar en Instagram: {error_data}")
+
+    if error_data.get('error', {}).get('error_subcode') == 33:
+        logging.error("💡 Este error indica que:")
+        logging.error("   1. La página no tiene Instagram conectado")
+        logging.error("   2. O el token no tiene permisos de Instagram")
+        logging.error("   Ejecuta verify_instagram.py para diagnosticar")
+
+    return {"error": f"Error de API: {error_data}"}
+
+
+# ============================================
+# 💼 LINKEDIN
+# ============================================
+
+_ERROR_SUB_LINKEDIN = {
+    "error": "No se pudo obtener el identificador de LinkedIn. "
+             "Verifica que tu token tenga los scopes 'openid' y 'profile'."
+}
+
+
+def _headers_userinfo_linkedin() -> dict:
+    return {'Authorization': f'Bearer {os.getenv("LINKEDIN_ACCESS_TOKEN")}'}
+
+
+def _sub_linkedin(response: httpx.Response):
+    response.raise_for_status()
+    user_data = response.json()
+    # El nuevo endpoint retorna 'sub' en lugar de 'id'
+    user_sub = user_data.get('sub')
+    logging.info(f"✅ Usuario LinkedIn obtenido: {user_data.get('name')} (sub: {user_sub})")
+    return user_sub
+
+
+def _error_userinfo_linkedin(e: httpx.HTTPStatusError):
+    try:
+        logging.error(f"❌ Error al obtener URN de LinkedIn: {e.response.json()}")
+    except Exception:
+        logging.error(f"❌ Error HTTP: {e}")
+
+    logging.error("💡 Posibles causas:")
+    logging.error("   1. Tu token no tiene el scope 'openid' o 'profile'")
+    logging.error("   2. El token ha expirado (duran 60 días)")
+    logging.error("   3. Necesitas regenerar el token con los scopes correctos")
+    logging.error("   4. Verifica que la URL sea correcta: /v2/userinfo")
+    return None
+
+
+def _peticion_post_linkedin(text: str, user_sub: str):
+    """Headers y payload de un post de solo texto a nombre de `user_sub`"""
+    headers = {
+        'Authorization': f'Bearer {os.getenv("LINKEDIN_ACCESS_TOKEN")}',
+        'Content-Type': 'application/json',
+        'X-Restli-Protocol-Version': '2.0.0'
+    }
+    payload = {
+        "author": f"urn:li:person:{user_sub}",
+        "lifecycleState": "PUBLISHED",
+        "specificContent": {
+            "com.linkedin.ugc.ShareContent": {
+                "shareCommentary": {
+                    "text": text
+                },
+                "shareMediaCategory": "NONE"
+            }
+        },
+        "visibility": {
+            "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
+        }
+    }
+    return headers, payload
+
+
+def _resultado_linkedin(response: httpx.Response) -> dict:
+    response.raise_for_status()
+    logging.info("✅ Publicado en LinkedIn con éxito.")
+    return response.json()
+
+
+def _error_api_linkedin(e: httpx.HTTPStatusError) -> dict:
+    error_data = e.response.json()
+    logging.error(f"❌ Error al publicar en LinkedIn: {error_data}")
+    return {"error": f"Error de API: {error_data}"}
+
+
+# ============================================
+# 📱 WHATSAPP (Whapi.Cloud)
+# ============================================
+
+def _validar_whatsapp():
+    if not WHAPI_TOKEN:
+        logging.error("❌ WHAPI_TOKEN no configurado en .env")
+        return {
+            "error": "Whapi.Cloud no configurado. Agrega WHAPI_TOKEN en .env"
+        }
+    return None
+
+
+def _peticion_whatsapp(text: str, image_url: str = None):
+    """Headers y payload del estado: imagen (URL o Base64) o solo texto con fondo"""
+    headers = {
+        'Authorization': f'Bearer {WHAPI_TOKEN}',
+        'Content-Type': 'application/json'
+    }
+
+    if image_url:
+        payload = {
+            "media": image_url,
+            "caption": text
+        }
+        logging.info(f"✅ Usando imagen para WhatsApp (URL o Base64)")
+    else:
+        payload = {
+            "background_color": "#1F2937",
+            "caption": text,
+            "caption_color": "#FFFFFF",
+            "font_type": "SYSTEM"
+        }
+        logging.info(f"✅ Usando solo texto con fondo")
+
+    return headers, payload
+
+
+def _resultado_whatsapp(response: httpx.Response) -> dict:
+    logging.info(f"📥 Status code: {response.status_code}")
+    logging.info(f"📥 Response: {response.text[:200]}")
+    response.raise_for_status()
+
+    result = response.json()
+    logging.info(f"✅ Estado publicado en WhatsApp")
+
+    return {
+        "id": result.get("id", "N/A"),
+        "status": "publicado",
+        "mensaje": "Estado publicado exitosamente en WhatsApp"
+    }
+
+
+def _error_api_whatsapp(e: httpx.HTTPStatusError) -> dict:
+    try:
+        logging.error(f"❌ Error al publicar estado en WhatsApp: {e.response.json()}")
+    except Exception:
+        logging.error(f"❌ Error HTTP: {e}")
+    logging.error(f"❌ Response text: {e.response.text}")
+    return {"error": f"Error al publicar estado: {e.response.text}"}
+
+
+# ============================================
+# 🎵 TIKTOK (Direct Post)
+# ============================================
+
+def _validar_tiktok(video_path: str):
+    if not os.getenv("TIKTOK_ACCESS_TOKEN"):
+        logging.error("❌ TIKTOK_ACCESS_TOKEN no configurado")
+        return {"error": "TikTok no configurado"}
+
+    if not os.path.exists(video_path):
+        logging.error(f"❌ Video no encontrado: {video_path}")
+        return {"error": "Video no encontrado"}
+
+    return None
+
+
+def _peticion_init_tiktok(text: str, privacy: str, video_size: int):
+    """Headers (también para la consulta de estado) y payload de inicialización"""
+    headers = {
+        "Authorization": f"Bearer {os.getenv('TIKTOK_ACCESS_TOKEN')}",
+        "Content-Type": "application/json; charset=UTF-8"
+    }
+    payload = {
+        "post_info": {
+            "title": text[:500],
+            "privacy_level": privacy,
+            "disable_duet": False,
+            "disable_comment": False,
+            "disable_stitch": False,
+            "video_cover_timestamp_ms": 1000
+        },
+        "source_info": {
+            "source": "FILE_UPLOAD",
+            "video_size": video_size,
+            "chunk_size": video_size,
+            "total_chunk_count": 1
+        }
+    }
+    return headers, payload
+
+
+def _datos_init_tiktok(response: httpx.Response):
+    """(publish_id, upload_url), o un dict de error si la respuesta no los trae"""
+    response.raise_for_status()
+    init_data = response.json()
+
+    if "data" not in init_data:
+        logging.error(f"❌ Respuesta inesperada: {init_data}")
+        return {"error": f"Respuesta inesperada: {init_data}"}
+
+    logging.info(f"✅ Publish ID: {init_data['data']['publish_id']}")
+    return init_data["data"]["publish_id"], init_data["data"]["upload_url"]
+
+
+def _headers_subida_tiktok(video_size: int) -> dict:
+    return {
+        "Content-Type": "video/mp4",
+        "Content-Length": str(video_size),
+        "Content-Range": f"bytes 0-{video_size-1}/{video_size}"
+    }
+
+
+def _error_subida_tiktok(response: httpx.Response):
+    """Dict de error si TikTok rechazó el archivo, o None"""
+    logging.info(f"📊 Status de subida: {response.status_code}")
+
+    if response.status_code in [200, 201, 204]:
+        logging.info(f"✅ Video subido exitosamente")
+        return None
+
+    logging.error(f"❌ Error al subir video:")
+    logging.error(f"   Status: {response.status_code}")
+    logging.error(f"   Response: {response.text[:500]}")
+
+    return {
+        "error": "upload_failed",
+        "mensaje": f"TikTok rechazó el video (HTTP {response.status_code})",
+        "status_code": response.status_code,
+        "detalles": response.text[:500] if response.text else "Sin detalles"
+    }
+
+
+def _estado_tiktok(publish_id: str, response: httpx.Response):
+    """(share_url, video_id, publicacion_info) a partir de la consulta de estado"""
+    share_url = None
+    video_id = None
+    publicacion_info = {}
+
+    if response.status_code == 200:
+        publicacion_info = response.json().get("data", {})
+        logging.info(f"📊 Estado del video: {publicacion_info.get('status', 'unknown')}")
+        share_url = publicacion_info.get("publicaly_available_post_id_list", [None])[0]
+
+        # Si no está en publicaly_available_post_id_list, buscar en uploaded_videos
+        if not share_url:
+            uploaded_videos = publicacion_info.get("uploaded_videos", [])
+            if uploaded_videos:
+                video_id = uploaded_videos[0].get("video_id")
+                share_url = f"https://www.tiktok.com/{TIKTOK_CUENTA}/video/{video_id}"
+
+        if share_url:
+            logging.info(f"🔗 Share URL: {share_url}")
+        else:
+            logging.warning("⚠️ No se pudo obtener share_url (video privado)")
+            # Para videos privados, construir URL estimada
+            share_url = f"https://www.tiktok.com/{TIKTOK_CUENTA}/video/{publish_id.split('~')[-1]}"
+
+    return share_url, video_id, publicacion_info
+
+
+def _estado_tiktok_no_disponible(publish_id: str, e: Exception):
+    logging.warning(f"⚠️ No se pudo verificar estado: {e}")
+    # URL de respaldo para ver en la app
+    return f"tiktok://app/post/{publish_id}", None, {}
+
+
+def _resultado_tiktok(text: str, privacy: str, video_size: int, publish_id: str, estado) -> dict:
+    share_url, video_id, publicacion_info = estado
+    logging.info(f"✅ Video publicado PRIVADO en TikTok ({TIKTOK_CUENTA})")
+
+    return {
+        "publish_id": publish_id,
+        "video_id": video_id,
+        "share_url": share_url,  # 🔗 ENLACE DEL VIDEO
+        "status": "published_private",
+        "privacy": privacy,
+        "mode": "Direct Post (video.publish)",
+        "size_mb": round(video_size / (1024*1024), 2),
+        "mensaje": "✅ Video publicado PRIVADO en TikTok (Solo tú puedes verlo)",
+        "descripcion": text,
+        "cuenta": TIKTOK_CUENTA,
+        "visibilidad": "PRIVADO (Solo yo)",
+        "nota": "El video está publicado pero SOLO TÚ puedes verlo.",
+        "como_ver": [
+            "1. Abre la app de TikTok en tu teléfono",
+            f"2. Ve a tu perfil ({TIKTOK_CUENTA})",
+            "3. El video aparecerá en 'Privados'",
+            f"4. O usa este enlace: {share_url}"
+        ],
+        "detalles": publicacion_info
+    }
+
+
+def _error_api_tiktok(e: httpx.HTTPStatusError) -> dict:
+    try:
+        error_data = e.response.json()
+        logging.error(f"❌ Error TikTok API [{e.response.status_code}]: {error_data}")
+
+        if error_data.get("error", {}).get("code", "") == "unaudited_client_can_only_post_to_private_accounts":
+            return {
+                "error": "app_not_approved",
+                "mensaje": "⚠️ Tu app no está aprobada por TikTok. Solo puedes publicar en cuentas privadas.",
+                "solucion": "Usa SELF_ONLY para publicar videos privados (Solo tú)",
+                "detalles": error_data
+            }
+
+        return {
+            "error": error_data.get("error", {}).get("code", "api_error"),
+            "mensaje": error_data.get("error", {}).get("message", "Error de TikTok API"),
+            "detalles": error_data
+        }
+    except Exception:
+        logging.error(f"❌ Error HTTP: {e}")
+        return {"error": f"Error HTTP {e.response.status_code}"}
+
+
+def _error_inesperado_tiktok(e: Exception) -> dict:
+    logging.error(f"❌ Error inesperado: {type(e).__name__}: {e}")
+    logging.error(traceback.format_exc())
+    return {"error": f"Error inesperado: {str(e)}"}
+
+
+def _leer_archivo(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+# ============================================
+# 🔌 POOL DE CLIENTES HTTP ASÍNCRONOS
+# ============================================
+# Un httpx.AsyncClient por host, creado al iniciar FastAPI y cerrado al apagar.
+# Reutiliza conexiones TCP+TLS entre publicaciones (Instagram hace 3 llamadas
+# seguidas a graph.facebook.com por post) y usa HTTP/2 si `h2` está instalado.
+
+try:
+    import h2  # noqa: F401
+    HTTP2_DISPONIBLE = True
+except ImportError:
+    HTTP2_DISPONIBLE = False
+
+CONFIG_HOSTS = {
+    "meta": {"http2": True, "max_keepalive": 10, "keepalive_expiry": 120.0, "timeout": 60.0},
+    "linkedin": {"http2": True, "max_keepalive": 4, "keepalive_expiry": 60.0, "timeout": 30.0},
+    "whapi": {"http2": False, "max_keepalive": 4, "keepalive_expiry": 60.0, "timeout": 30.0},
+    "tiktok": {"http2": True, "max_keepalive": 4, "keepalive_expiry": 30.0, "timeout": 180.0},
+}
+
+_clientes_http = {}
+_loop_clientes = None
+_cierres_pendientes = set()
+
+
+def _crear_cliente(config: dict) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=config["http2"] and HTTP2_DISPONIBLE,
+        timeout=httpx.Timeout(config["timeout"], connect=10.0),
+        limits=httpx.Limits(
+            max_connections=config["max_keepalive"] * 2,
+            max_keepalive_connections=config["max_keepalive"],
+            keepalive_expiry=config["keepalive_expiry"],
+        ),
+    )
+
+
+async def iniciar_clientes_http():
+    """Crea el pool de clientes (se llama en el startup de FastAPI)"""
+    global _loop_clientes
+
+    await cerrar_clientes_http()
+    _loop_clientes = asyncio.get_running_loop()
+
+    for nombre, config in CONFIG_HOSTS.items():
+        _clientes_http[nombre] = _crear_cliente(config)
+
+    logging.info(f"🔌 Clientes HTTP iniciados: {list(_clientes_http)} (HTTP/2: {HTTP2_DISPONIBLE})")
+
+
+async def _cerrar_clientes(clientes: list):
+    for cliente in clientes:
+        try:
+            await cliente.aclose()
+        except Exception as e:
+            logging.warning(f"⚠️ No se pudo cerrar un cliente HTTP: {e}")
+
+
+def _descartar_clientes(clientes: list, loop_anterior):
+    """
+    Cierra clientes creados en otro event loop. Si ese loop sigue corriendo
+    (otro hilo) el cierre se agenda ahí, donde viven sus conexiones; si ya
+    terminó, se cierra desde el loop actual.
+    """
+    if not clientes:
+        return
+
+    if loop_anterior is not None and not loop_anterior.is_closed() and loop_anterior.is_running():
+        asyncio.run_coroutine_threadsafe(_cerrar_clientes(clientes), loop_anterior)
+        return
+
+    tarea = asyncio.get_running_loop().create_task(_cerrar_clientes(clientes))
+    _cierres_pendientes.add(tarea)
+    tarea.add_done_callback(_cierres_pendientes.discard)
+
+
+async def cerrar_clientes_http():
+    """Cierra las conexiones abiertas (se llama en el shutdown de FastAPI)"""
+    global _loop_clientes
+
+    clientes = list(_clientes_http.values())
+    _clientes_http.clear()
+
+    if _loop_clientes is asyncio.get_running_loop():
+        await _cerrar_clientes(clientes)
+    else:
+        _descartar_clientes(clientes, _loop_clientes)
+
+    _loop_clientes = None
+
+
+def cliente_http(nombre: str) -> httpx.AsyncClient:
+    """
+    Devuelve el cliente compartido del host.
+    Si el pool no se inició (scripts, tests) o pertenece a otro event loop, se crea
+    uno nuevo y los clientes del loop anterior se cierran.
+    """
+    global _loop_clientes
+
+    loop = asyncio.get_running_loop()
+    if _loop_clientes is not loop:
+        anteriores = list(_clientes_http.values())
+        _clientes_http.clear()
+        _descartar_clientes(anteriores, _loop_clientes)
+        _loop_clientes = loop
+
+    if nombre not in _clientes_http:
+        _clientes_http[nombre] = _crear_cliente(CONFIG_HOSTS[nombre])
+
+    return _clientes_http[nombre]
+
+
+# ============================================
+# ⚡ VERSIONES ASÍNCRONAS DE LOS PUBLICADORES
+# ============================================
+
+async def post_to_facebook_async(text: str, image_url: str = None):
+    """
+    Versión asíncrona de post_to_facebook (usa el pool compartido).
+    """
+    error = _validar_facebook(text)
+    if error:
+        return error
+
+    post_url, payload = _peticion_facebook(text, image_url)
+
+    try:
+        logging.info(f"Publicando en Facebook: {text[:20]}...")
+        return _resultado_facebook(await cliente_http("meta").post(post_url, data=payload))
+    except httpx.HTTPStatusError as e:
+        return _error_api_facebook(e)
+    except Exception as e:
+        return _error_inesperado("Facebook", e)
+
+
+async def post_to_instagram_async(text: str, image_url: str):
+    """
+    Versión asíncrona de post_to_instagram.
+    Las 3 llamadas (contenedor → publicar → permalink) reutilizan la misma conexión.
+    """
+    error = _validar_instagram(image_url)
+    if error:
+        return error
+
+    logging.info(f"Publicando en Instagram: {text[:20]}...")
+    cliente = cliente_http("meta")
+
+    try:
+        logging.info("Instagram - Paso 1: Creando contenedor...")
+        url, payload = _peticion_contenedor_instagram(text, image_url)
+        container_id = _id_contenedor_instagram(await cliente.post(url, data=payload))
+
+        logging.info("Instagram - Paso 2: Publicando contenedor...")
+        url, payload = _peticion_publicar_instagram(container_id)
+        result = _resultado_publicar_instagram(await cliente.post(url, data=payload))
+
+        logging.info("Instagram - Paso 3: Obteniendo permalink...")
+        url, params = _peticion_permalink_instagram(result['id'])
+        return _agregar_permalink_instagram(result, await cliente.get(url, params=params, timeout=10.0))
+
+    except httpx.HTTPStatusError as e:
+        return _error_api_instagram(e)
+    except Exception as e:
+        return _error_inesperado("Instagram", e)
+
+
+async def get_linkedin_user_info_async():
+    """
+    Versión asíncrona de get_linkedin_user_info (retorna el 'sub' del usuario).
+    """
+    try:
+        return _sub_linkedin(await cliente_http("linkedin").get(
+            LINKEDIN_USERINFO_URL, headers=_headers_userinfo_linkedin(), timeout=10.0
+        ))
+    except httpx.HTTPStatusError as e:
+        return _error_userinfo_linkedin(e)
+    except Exception as e:
+        logging.error(f"❌ Error inesperado: {e}")
+        return None
+
+
+async def post_to_linkedin_async(text: str):
+    """
+    Versión asíncrona de post_to_linkedin.
+    """
+    logging.info(f"Publicando en LinkedIn: {text[:20]}...")
+
+    user_sub = await get_linkedin_user_info_async()
+    if not user_sub:
+        return dict(_ERROR_SUB_LINKEDIN)
+
+    headers, payload = _peticion_post_linkedin(text, user_sub)
+
+    try:
+        return _resultado_linkedin(await cliente_http("linkedin").post(LINKEDIN_POST_URL, json=payload, headers=headers))
+    except httpx.HTTPStatusError as e:
+        return _error_api_linkedin(e)
+    except Exception as e:
+        return _error_inesperado("LinkedIn", e)
+
+
+async def post_whatsapp_status_async(text: str, image_url: str = None):
+    """
+    Versión asíncrona de post_whatsapp_status (Whapi.Cloud).
+    """
+    error = _validar_whatsapp()
+    if error:
+        return error
+
+    logging.info(f"📱 Publicando estado en WhatsApp: {text[:30]}...")
+    headers, payload = _peticion_whatsapp(text, image_url)
+
+    try:
+        return _resultado_whatsapp(await cliente_http("whapi").post(f"{WHAPI_BASE_URL}/stories", json=payload, headers=headers))
+    except httpx.HTTPStatusError as e:
+        return _error_api_whatsapp(e)
+    except Exception as e:
+        logging.error(f"❌ Error inesperado: {e}")
+        return {"error": f"Error inesperado: {str(e)}"}
+
+
+async def post_to_tiktok_async(text: str, video_path: str, privacy: str = "SELF_ONLY"):
+    """
+    Versión asíncrona de post_to_tiktok (Direct Post).
+    La espera de procesamiento usa asyncio.sleep y no bloquea el servidor.
+    """
+    error = _validar_tiktok(video_path)
+    if error:
+        return error
+
+    logging.info(f"📤 Subiendo video a TikTok (PRIVADO): {text[:30]}...")
+    cliente = cliente_http("tiktok")
+
+    try:
+        video_bytes = await asyncio.to_thread(_leer_archivo, video_path)
+        video_size = len(video_bytes)
+
+        # PASO 1: Inicializar subida
+        headers, payload = _peticion_init_tiktok(text, privacy, video_size)
+        datos = _datos_init_tiktok(await cliente.post(TIKTOK_INIT_URL, json=payload, headers=headers, timeout=30.0))
+        if isinstance(datos, dict):
+            return datos
+        publish_id, upload_url = datos
+
+        # PASO 2: Subir el video
+        error = _error_subida_tiktok(await cliente.put(
+            upload_url, content=video_bytes, headers=_headers_subida_tiktok(video_size)
+        ))
+        if error:
+            return error
+
+        # PASO 3: Esperar procesamiento
+        await asyncio.sleep(5)
+
+        # PASO 4: Obtener share_url
+        try:
+            estado = _estado_tiktok(publish_id, await cliente.post(
+                TIKTOK_STATUS_URL, json={"publish_id": publish_id}, headers=headers, timeout=10.0
+            ))
+        except Exception as e:
+            estado = _estado_tiktok_no_disponible(publish_id, e)
+
+        return _resultado_tiktok(text, privacy, video_size, publish_id, estado)
+
+    except httpx.HTTPStatusError as e:
+        return _error_api_tiktok(e)
+    except Exception as e:
+        return _error_inesperado_tiktok(e)
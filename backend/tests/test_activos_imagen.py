@@ -0,0 +1,99 @@
+"""
+Pruebas unitarias para la imagen maestra y sus variantes por red
+"""
+import pytest
+import base64
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import activos_imagen
+import imagen_service
+
+
+def _maestra():
+    """PNG del stub, presentado como si viniera de Stability"""
+    imagen = imagen_service.generar_imagen("campus", 1024, 1024, proveedores=["stub"])
+    return {**imagen, "proveedor": "stability", "marcador": False}
+
+
+class TestImagenPost:
+    """Pruebas para ImagenPost"""
+
+    def test_redes_simultaneas_generan_una_sola_imagen(self, mocker):
+        """
+        Prueba que dos redes que piden la imagen a la vez compartan la maestra.
+        """
+        maestra = _maestra()
+
+        def generar_lento(prompt):
+            time.sleep(0.1)
+            return maestra
+
+        mock_generar = mocker.patch("imagen_service.generar_imagen", side_effect=generar_lento)
+        mocker.patch("activos_imagen.llm_service.publicar_imagen", return_value="https://api.ejemplo.com/media/a.jpg")
+        imagen = activos_imagen.ImagenPost()
+        resultados = {}
+
+        hilos = [
+            threading.Thread(target=lambda red=red: resultados.update({red: imagen.variante(red, f"prompt {red}")}))
+            for red in ("instagram", "whatsapp")
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        assert mock_generar.call_count == 1
+        assert resultados["instagram"] == "https://api.ejemplo.com/media/a.jpg"
+        assert resultados["whatsapp"].startswith("data:image/")
+
+    def test_prompt_maestro_prioriza_instagram(self, mocker):
+        """
+        Prueba que el prompt adaptado de Instagram defina la maestra aunque
+        WhatsApp la pida primero con otro prompt.
+        """
+        adaptaciones = {
+            "whatsapp": {"text": "Hola", "suggested_image_prompt": "estado"},
+            "instagram": {"text": "Hola", "suggested_image_prompt": "feria de ciencias en el campus"},
+        }
+        mock_generar = mocker.patch("imagen_service.generar_imagen", return_value=_maestra())
+        imagen = activos_imagen.ImagenPost(activos_imagen.prompt_maestro(adaptaciones))
+
+        imagen.variante("whatsapp", "Universidad UAGRM: texto original")
+
+        mock_generar.assert_called_once_with("feria de ciencias en el campus")
+        assert activos_imagen.prompt_maestro({"linkedin": {"text": "x"}}) is None
+
+    def test_sin_imagen_no_reintenta(self, mocker):
+        """
+        Prueba que si la generación falla, las demás redes no paguen otro intento.
+        """
+        mock_generar = mocker.patch("imagen_service.generar_imagen", side_effect=imagen_service.ImagenNoDisponible("x"))
+        imagen = activos_imagen.ImagenPost()
+
+        assert imagen.variante("instagram", "campus") is None
+        assert imagen.variante("whatsapp", "campus") is None
+        assert mock_generar.call_count == 1
+
+    def test_whatsapp_recibe_data_url(self, mocker):
+        """
+        Prueba que la variante de WhatsApp sea un data URL decodificable.
+        """
+        mocker.patch("imagen_service.generar_imagen", return_value=_maestra())
+        mock_publicar = mocker.patch("activos_imagen.llm_service.publicar_imagen")
+
+        data_url = activos_imagen.ImagenPost().variante("whatsapp", "campus")
+
+        encabezado, datos = data_url.split(",", 1)
+        assert encabezado.endswith(";base64")
+        assert base64.b64decode(datos)
+        mock_publicar.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,131 @@
+"""
+Pruebas unitarias para la adaptación multi-red en una sola llamada
+"""
+import pytest
+import json
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import llm_service
+
+
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    llm_service.cache_adaptaciones.invalidar()
+    yield
+    llm_service.cache_adaptaciones.invalidar()
+
+
+def _respuesta(data):
+    return MagicMock(text=json.dumps(data))
+
+
+class TestAdaptacionMulti:
+    """Pruebas para llm_service.adaptar_contenido_multi"""
+
+    def test_una_sola_llamada_para_todas_las_redes(self, mocker):
+        """
+        Prueba que varias redes se resuelvan con una llamada y que el
+        contenido original se envíe una sola vez.
+        """
+        generar = mocker.patch.object(llm_service.model, "generate_content", return_value=_respuesta({
+            "facebook": {"text": "FB"},
+            "linkedin": {"text": "LI"},
+        }))
+
+        resultado = llm_service.adaptar_contenido_multi("Titulo", "Feria de ciencias FICCT", ["facebook", "linkedin"])
+
+        assert resultado == {"facebook": {"text": "FB"}, "linkedin": {"text": "LI"}}
+        assert generar.call_count == 1
+        prompt = generar.call_args[0][0]
+        assert prompt.count("Feria de ciencias FICCT") == 1
+
+    def test_red_invalida_se_pide_por_separado(self, mocker):
+        """
+        Prueba que una red sin bloque válido en la respuesta se adapte con adaptar_contenido.
+        """
+        generar = mocker.patch.object(llm_service.model, "generate_content", side_effect=[
+            _respuesta({"facebook": {"text": "FB"}, "linkedin": "no es un dict"}),
+            _respuesta({"text": "LI individual"}),
+        ])
+
+        resultado = llm_service.adaptar_contenido_multi("T", "Contenido", ["facebook", "linkedin", "myspace"])
+
+        assert resultado["facebook"] == {"text": "FB"}
+        assert resultado["linkedin"] == {"text": "LI individual"}
+        assert "error" in resultado["myspace"]
+        assert generar.call_count == 2
+
+    def test_resultados_del_lote_quedan_en_cache(self, mocker):
+        """
+        Prueba que una adaptación individual posterior reutilice el resultado del lote.
+        """
+        generar = mocker.patch.object(llm_service.model, "generate_content", return_value=_respuesta({
+            "facebook": {"text": "FB"},
+            "instagram": {"text": "IG"},
+        }))
+
+        llm_service.adaptar_contenido_multi("T", "Contenido", ["facebook", "instagram"])
+        individual = llm_service.adaptar_contenido("T", "Contenido", "instagram")
+
+        assert individual == {"text": "IG"}
+        assert generar.call_count == 1
+
+
+class TestValidarYAdaptar:
+    """Pruebas para llm_service.validar_y_adaptar (modo combinado)"""
+
+    def test_valida_y_adapta_en_una_llamada(self, mocker):
+        """
+        Prueba que validación y adaptaciones salgan de una sola respuesta.
+        """
+        generar = mocker.patch.object(llm_service.model, "generate_content", return_value=_respuesta({
+            "validacion": {"es_academico": True, "razon": "Menciona la FICCT"},
+            "adaptaciones": {"facebook": {"text": "FB"}, "linkedin": {"text": "LI"}},
+        }))
+
+        resultado = llm_service.validar_y_adaptar("Feria FICCT", ["facebook", "linkedin"], combinado=True)
+
+        assert resultado["validacion"]["es_academico"] is True
+        assert resultado["adaptaciones"] == {"facebook": {"text": "FB"}, "linkedin": {"text": "LI"}}
+        assert generar.call_count == 1
+
+    def test_rechazo_temprano_sin_adaptaciones(self, mocker):
+        """
+        Prueba que un contenido no académico no devuelva adaptaciones ni haga más llamadas.
+        """
+        generar = mocker.patch.object(llm_service.model, "generate_content", return_value=_respuesta({
+            "validacion": {"es_academico": False, "razon": "Chisme de farándula"},
+            "adaptaciones": {"facebook": {"text": "No debería usarse"}},
+        }))
+
+        resultado = llm_service.validar_y_adaptar("Chisme", ["facebook"], combinado=True)
+
+        assert resultado["validacion"]["es_academico"] is False
+        assert resultado["adaptaciones"] == {}
+        assert generar.call_count == 1
+
+    def test_validacion_ausente_se_pide_por_separado(self, mocker):
+        """
+        Prueba que, si la respuesta no trae la validación, se valide con la función separada.
+        """
+        mocker.patch.object(llm_service.model, "generate_content", return_value=_respuesta({
+            "adaptaciones": {"facebook": {"text": "FB"}},
+        }))
+        validar = mocker.patch.object(
+            llm_service, "validar_contenido_academico",
+            return_value={"es_academico": True, "razon": "ok"}
+        )
+
+        resultado = llm_service.validar_y_adaptar("Texto UAGRM", ["facebook"], combinado=True)
+
+        assert validar.called
+        assert resultado["adaptaciones"] == {"facebook": {"text": "FB"}}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,88 @@
+"""
+Pruebas unitarias para la caché de respuestas y la caché de adaptaciones
+"""
+import pytest
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import cache_service
+import llm_service
+
+
+class TestCacheRespuestas:
+    """Pruebas para CacheRespuestas con el backend en memoria"""
+
+    def test_segunda_llamada_es_acierto(self):
+        """
+        Prueba que la misma clave no vuelva a calcular el valor.
+        """
+        cache = cache_service.CacheRespuestas("prueba", maxsize=10, ttl=60, backend="memoria")
+        calcular = MagicMock(return_value={"text": "hola"})
+
+        primero = cache.obtener_o_calcular("k", calcular)
+        segundo = cache.obtener_o_calcular("k", calcular)
+
+        assert primero == segundo == {"text": "hola"}
+        assert calcular.call_count == 1
+        assert cache.metricas()["aciertos"] == 1
+        assert cache.metricas()["fallos"] == 1
+
+    def test_no_cachea_errores_y_respeta_bypass(self):
+        """
+        Prueba que los errores no se guarden y que usar_cache=False salte la caché.
+        """
+        cache = cache_service.CacheRespuestas("prueba", maxsize=10, ttl=60, backend="memoria")
+        calcular = MagicMock(return_value={"error": "cuota"})
+
+        cache.obtener_o_calcular("k", calcular)
+        cache.obtener_o_calcular("k", calcular)
+        assert calcular.call_count == 2
+
+        calcular.return_value = {"text": "ok"}
+        cache.obtener_o_calcular("k", calcular)
+        cache.obtener_o_calcular("k", calcular, usar_cache=False)
+        assert calcular.call_count == 4
+        assert cache.metricas()["omitidos"] == 1
+
+    def test_valor_devuelto_es_copia(self):
+        """
+        Prueba que mutar el resultado no altere la entrada cacheada.
+        """
+        cache = cache_service.CacheRespuestas("prueba", maxsize=10, ttl=60, backend="memoria")
+
+        resultado = cache.obtener_o_calcular("k", lambda: {"text": "hola"})
+        resultado["image_url"] = "https://x"
+
+        assert cache.obtener("k") == {"text": "hola"}
+
+
+class TestCacheAdaptaciones:
+    """Pruebas de la caché aplicada a llm_service.adaptar_contenido"""
+
+    def test_adaptacion_repetida_no_llama_a_gemini(self, mocker):
+        """
+        Prueba que la misma adaptación solo llame una vez al modelo
+        y que cambiar la plantilla produzca una nueva llamada.
+        """
+        llm_service.cache_adaptaciones.invalidar()
+        respuesta = MagicMock(text='{"text": "Adaptado"}')
+        generar = mocker.patch.object(llm_service.model, "generate_content", return_value=respuesta)
+
+        llm_service.adaptar_contenido("T", "Inscripciones UAGRM", "linkedin")
+        resultado = llm_service.adaptar_contenido("T", "Inscripciones UAGRM", "linkedin")
+
+        assert resultado == {"text": "Adaptado"}
+        assert generar.call_count == 1
+
+        mocker.patch.dict(llm_service.PROMPTS_POR_RED, {"linkedin": "Nueva plantilla {titulo} {contenido}"})
+        llm_service.adaptar_contenido("T", "Inscripciones UAGRM", "linkedin")
+
+        assert generar.call_count == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
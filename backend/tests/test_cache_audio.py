@@ -0,0 +1,81 @@
+"""
+Pruebas unitarias para la caché de narraciones TTS
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import cache_audio
+import cache_clips
+import llm_service
+
+
+@pytest.fixture
+def cache_temporal(mocker, tmp_path):
+    cache = cache_clips.CacheClips(str(tmp_path / "audio"), max_mb=10, extension=".mp3")
+    mocker.patch("cache_audio.cache", cache)
+    return cache
+
+
+class TestCacheAudio:
+    """Pruebas para cache_audio y su uso en generar_audio_gTTS"""
+
+    def test_clave_ignora_espacios_pero_no_la_velocidad(self):
+        """
+        Prueba que la clave dependa del texto limpio, el idioma y la velocidad.
+        """
+        base = cache_audio.clave_audio("Hola  mundo\n", "es", 1.5)
+
+        assert base == cache_audio.clave_audio("Hola mundo", "es", 1.5)
+        assert base != cache_audio.clave_audio("Hola mundo", "es", 1.0)
+        assert base != cache_audio.clave_audio("Hola mundo", "en", 1.5)
+
+    def test_entrega_una_copia_de_trabajo(self, cache_temporal, tmp_path):
+        """
+        Prueba que borrar el audio entregado no borre la entrada de la caché.
+        """
+        original = tmp_path / "voz.mp3"
+        original.write_bytes(b"mp3")
+
+        cache_audio.guardar(str(original), "Hola mundo", "es", 1.5)
+        copia = cache_audio.obtener("Hola mundo", "es", 1.5)
+        os.unlink(copia)
+
+        assert original.exists()
+        assert cache_audio.obtener("Hola mundo", "es", 1.5)
+        assert cache_temporal.metricas()["entradas"] == 1
+
+    def test_repetir_texto_salta_gtts_y_ffmpeg(self, mocker, cache_temporal):
+        """
+        Prueba que la segunda narración del mismo texto no llame a gTTS ni a FFmpeg.
+        """
+        def guardar_mp3(ruta):
+            with open(ruta, "wb") as archivo:
+                archivo.write(b"mp3")
+
+        mock_gtts = mocker.patch("gtts.gTTS")
+        mock_gtts.return_value.save.side_effect = guardar_mp3
+
+        def acelerar_falso(args, duracion, **kwargs):
+            guardar_mp3(args[-1])
+
+        mock_ffmpeg = mocker.patch("llm_service.ejecutar_ffmpeg_con_progreso", side_effect=acelerar_falso)
+        texto = "La universidad abre las inscripciones del segundo semestre"
+
+        primera = llm_service.generar_audio_gTTS(texto, usar_guion_ia=False, velocidad=1.5)
+        segunda = llm_service.generar_audio_gTTS(texto, usar_guion_ia=False, velocidad=1.5)
+
+        assert primera != segunda
+        assert open(segunda, "rb").read() == b"mp3"
+        assert mock_gtts.call_count == 1
+        assert mock_ffmpeg.call_count == 1
+        assert cache_temporal.metricas()["aciertos"] == 1
+        os.unlink(primera)
+        os.unlink(segunda)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
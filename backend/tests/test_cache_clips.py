@@ -0,0 +1,121 @@
+"""
+Pruebas unitarias para la caché de clips normalizados
+"""
+import pytest
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import cache_clips
+import llm_service
+
+
+def _escribir(ruta, tamano: int):
+    with open(ruta, "wb") as archivo:
+        archivo.write(b"x" * tamano)
+    return str(ruta)
+
+
+class TestCacheClips:
+    """Pruebas para CacheClips e id_video"""
+
+    def test_id_igual_para_todas_las_resoluciones(self):
+        """
+        Prueba que las versiones UHD y SD de un clip compartan la clave.
+        """
+        uhd = "https://videos.pexels.com/video-files/3209828/3209828-uhd_2160_3840_25fps.mp4"
+        sd = "https://videos.pexels.com/video-files/3209828/3209828-sd_540_960_25fps.mp4"
+
+        assert cache_clips.id_video(uhd) == cache_clips.id_video(sd) == "3209828"
+        assert cache_clips.id_video("https://otro.cdn/clip.mp4").startswith("url-")
+
+    def test_guardar_y_obtener(self, tmp_path):
+        """
+        Prueba que un segmento guardado se encuentre con el mismo perfil.
+        """
+        cache = cache_clips.CacheClips(str(tmp_path / "cache"), max_mb=10)
+        origen = _escribir(tmp_path / "nuevo.mp4", 10)
+
+        cache.guardar(origen, "123", "540x960_25fps_rapido")
+
+        assert cache.obtener("123", "540x960_25fps_rapido")
+        assert cache.obtener("123", "1080x1920_30fps_rapido") is None
+        assert cache.metricas()["aciertos"] == 1
+
+    def test_desaloja_el_menos_usado(self, tmp_path):
+        """
+        Prueba el LRU: al superar el tope se borra el segmento usado hace más tiempo.
+        """
+        cache = cache_clips.CacheClips(str(tmp_path / "cache"), max_mb=1, proteccion=0)
+        mb = 1024 * 1024
+
+        viejo = cache.guardar(_escribir(tmp_path / "a.mp4", mb // 2), "1", "p")
+        os.utime(viejo, (time.time() - 100, time.time() - 100))
+        reciente = cache.guardar(_escribir(tmp_path / "b.mp4", mb // 2), "2", "p")
+        os.utime(reciente, (time.time() - 50, time.time() - 50))
+        cache.obtener("1", "p")  # "1" pasa a ser el más reciente
+        cache.guardar(_escribir(tmp_path / "c.mp4", mb // 2), "3", "p")
+
+        assert cache.obtener("1", "p")
+        assert cache.obtener("2", "p") is None
+        assert cache.obtener("3", "p")
+
+    def test_no_desaloja_segmentos_en_uso(self, tmp_path):
+        """
+        Prueba que los segmentos usados recientemente no se borren aunque sobre tamaño.
+        """
+        cache = cache_clips.CacheClips(str(tmp_path / "cache"), max_mb=1, proteccion=600)
+        mb = 1024 * 1024
+
+        cache.guardar(_escribir(tmp_path / "a.mp4", mb), "1", "p")
+        cache.guardar(_escribir(tmp_path / "b.mp4", mb), "2", "p")
+
+        assert cache.metricas()["entradas"] == 2
+
+
+class TestSegmentos:
+    """Pruebas para preparar_segmentos y el render con copy"""
+
+    def test_solo_normaliza_los_clips_que_faltan(self, mocker, tmp_path):
+        """
+        Prueba que un clip en caché no se descargue ni se vuelva a codificar.
+        """
+        cache = cache_clips.CacheClips(str(tmp_path / "cache"), max_mb=10)
+        mocker.patch("llm_service.cache_clips.cache", cache)
+        perfil = llm_service.perfil_salida()
+        cache.guardar(_escribir(tmp_path / "hit.mp4", 10), "111", perfil)
+
+        crudo = _escribir(tmp_path / "crudo.mp4", 10)
+        mock_descarga = mocker.patch("llm_service.descargas.descargar_a_medida", return_value=iter([(0, crudo)]))
+
+        def normalizar_falso(args, duracion, progreso=None, cancelacion=None, **kwargs):
+            _escribir(args[-1], 10)
+
+        mock_ffmpeg = mocker.patch("llm_service.ejecutar_ffmpeg_con_progreso", side_effect=normalizar_falso)
+
+        segmentos = llm_service.preparar_segmentos([
+            "https://videos.pexels.com/video-files/111/111-sd_540_960_25fps.mp4",
+            "https://videos.pexels.com/video-files/222/222-hd_1080_1920_25fps.mp4",
+        ])
+
+        assert mock_descarga.call_args[0][0] == ["https://videos.pexels.com/video-files/222/222-hd_1080_1920_25fps.mp4"]
+        assert mock_ffmpeg.call_count == 1
+        assert [os.path.basename(s).split("_")[0] for s in segmentos] == ["111", "222"]
+        assert not os.path.exists(crudo)
+
+    def test_concat_copia_no_recodifica_video(self):
+        """
+        Prueba que el render final copie el video y solo codifique el audio.
+        """
+        args = llm_service.argumentos_concat_copia("lista.txt", "voz.mp3", "final.mp4", 12, velocidad_audio=1.5)
+
+        assert args[args.index("-c:v") + 1] == "copy"
+        assert "libx264" not in args
+        assert args[args.index("-af") + 1] == "atempo=1.5"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,133 @@
+"""
+Pruebas unitarias para la caché de usuarios de get_current_user
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pydantic import ValidationError
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from auth import auth_service
+from auth.models import Base, User
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'usuarios.db'}")
+    Base.metadata.create_all(bind=engine)
+    sesion = sessionmaker(bind=engine)()
+    sesion.add(User(id=1, username="ana", email="ana@uagrm.edu.bo", hashed_password="x"))
+    sesion.commit()
+    auth_service.cache_usuarios.invalidar()
+    yield sesion
+    sesion.close()
+    auth_service.cache_usuarios.invalidar()
+
+
+@pytest.fixture
+def consultas(db):
+    """Cuenta los SELECT que llegan a la base"""
+    contador = {"select": 0}
+
+    def contar(conn, cursor, sentencia, parametros, contexto, multiples):
+        if sentencia.lstrip().upper().startswith("SELECT"):
+            contador["select"] += 1
+
+    event.listen(db.get_bind(), "before_cursor_execute", contar)
+    yield contador
+    event.remove(db.get_bind(), "before_cursor_execute", contar)
+
+
+class TestCacheUsuarios:
+    """Pruebas para get_user_cached y su invalidación"""
+
+    def test_segunda_consulta_sale_de_memoria(self, db, consultas):
+        """
+        Prueba que solo el primer request vaya a la base.
+        """
+        aciertos = auth_service.cache_usuarios.aciertos
+
+        primero = auth_service.get_user_cached(db, 1)
+        segundo = auth_service.get_user_cached(db, 1)
+
+        assert primero.username == segundo.username == "ana"
+        assert consultas["select"] == 1
+        assert auth_service.cache_usuarios.aciertos == aciertos + 1
+
+    def test_devuelve_usuario_de_solo_lectura(self, db):
+        """
+        Prueba que el usuario cacheado no sea un User de la sesión ni se pueda modificar.
+        """
+        usuario = auth_service.get_user_cached(db, 1)
+
+        assert not isinstance(usuario, User)
+        with pytest.raises(ValidationError):
+            usuario.is_active = False
+        assert auth_service.get_user_cached(db, 1).is_active is True
+
+    def test_desactivar_invalida(self, db):
+        """
+        Prueba que al desactivar un usuario se deje de aceptar de inmediato.
+        """
+        assert auth_service.get_user_cached(db, 1) is not None
+
+        usuario = db.query(User).filter(User.id == 1).first()
+        usuario.is_active = False
+        db.commit()
+
+        assert auth_service.get_user_cached(db, 1) is None
+
+    def test_cambio_de_datos_invalida(self, db):
+        """
+        Prueba que un cambio de email se vea en el siguiente request.
+        """
+        auth_service.get_user_cached(db, 1)
+
+        db.query(User).filter(User.id == 1).first().email = "ana@ficct.uagrm.edu.bo"
+        db.commit()
+
+        assert auth_service.get_user_cached(db, 1).email == "ana@ficct.uagrm.edu.bo"
+
+    def test_lectura_concurrente_antes_del_commit(self, db):
+        """
+        Prueba que una lectura entre el flush y el commit no deje cacheado
+        el usuario viejo.
+        """
+        otra_sesion = sessionmaker(bind=db.get_bind())()
+
+        usuario = db.query(User).filter(User.id == 1).first()
+        usuario.is_active = False
+        db.flush()
+
+        # Otro request lee la fila confirmada (todavía activa) y la cachea
+        assert auth_service.get_user_cached(otra_sesion, 1) is not None
+
+        db.commit()
+        otra_sesion.close()
+
+        assert auth_service.get_user_cached(db, 1) is None
+
+    def test_usuario_inexistente_no_se_cachea(self, db, consultas):
+        """
+        Prueba que un id inexistente no quede guardado como válido.
+        """
+        assert auth_service.get_user_cached(db, 99) is None
+        assert auth_service.get_user_cached(db, 99) is None
+        assert consultas["select"] == 2
+
+    def test_metricas_expuestas(self, db):
+        """
+        Prueba que la caché aparezca en las métricas de /api/metrics.
+        """
+        import cache_service
+
+        assert "usuarios" in cache_service.metricas()
+        assert "tasa_aciertos" in cache_service.metricas()["usuarios"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,159 @@
+"""
+Pruebas unitarias para las descargas en streaming (clips de Pexels)
+"""
+import pytest
+import httpx
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import descargas
+
+CONTENIDO = b"0123456789" * 100
+
+
+class CorteDeConexion(httpx.ByteStream):
+    """Entrega solo una parte del cuerpo y luego falla como una red caída"""
+
+    def __init__(self, datos: bytes):
+        self._datos = datos
+
+    def __iter__(self):
+        yield self._datos
+        raise httpx.ReadError("conexión interrumpida")
+
+
+class TestDescargas:
+    """Pruebas para descargar_archivo y descargar_en_paralelo"""
+
+    def test_reanuda_con_range_tras_un_corte(self, tmp_path, mocker):
+        """
+        Prueba que el segundo intento pida solo los bytes que faltan.
+        """
+        mocker.patch("descargas.time.sleep")
+        rangos = []
+
+        def handler(request):
+            rango = request.headers.get("Range")
+            rangos.append(rango)
+            if rango is None:
+                return httpx.Response(200, headers={"content-length": str(len(CONTENIDO))}, stream=CorteDeConexion(CONTENIDO[:300]))
+            inicio = int(rango.split("=")[1].rstrip("-"))
+            return httpx.Response(206, content=CONTENIDO[inicio:])
+
+        destino = str(tmp_path / "clip.mp4")
+        with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+            descargas.descargar_archivo("https://videos.pexels.com/a.mp4", destino, client)
+
+        assert rangos == [None, "bytes=300-"]
+        with open(destino, "rb") as archivo:
+            assert archivo.read() == CONTENIDO
+
+    def test_rechaza_archivos_demasiado_grandes(self, tmp_path):
+        """
+        Prueba que el tope de tamaño corte la descarga sin reintentar.
+        """
+        llamadas = []
+
+        def handler(request):
+            llamadas.append(request)
+            return httpx.Response(200, content=CONTENIDO)
+
+        with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+            with pytest.raises(descargas.DescargaError):
+                descargas.descargar_archivo("https://videos.pexels.com/a.mp4", str(tmp_path / "clip.mp4"), client, max_bytes=100)
+
+        assert len(llamadas) == 1
+
+    def test_errores_4xx_no_se_reintentan(self, tmp_path):
+        """
+        Prueba que un 404 falle de inmediato.
+        """
+        llamadas = []
+
+        def handler(request):
+            llamadas.append(request)
+            return httpx.Response(404)
+
+        with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+            with pytest.raises(descargas.DescargaError):
+                descargas.descargar_archivo("https://videos.pexels.com/a.mp4", str(tmp_path / "clip.mp4"), client)
+
+        assert len(llamadas) == 1
+
+    def test_paralelo_conserva_orden_y_omite_fallidas(self, mocker):
+        """
+        Prueba que las rutas sigan el orden de las URLs y se omitan las fallidas.
+        """
+        def descargar_falso(url, destino, client=None, max_bytes=None):
+            if "mala" in url:
+                raise descargas.DescargaError("404")
+            with open(destino, "wb") as archivo:
+                archivo.write(url.encode())
+            return destino
+
+        mocker.patch("descargas.descargar_archivo", side_effect=descargar_falso)
+
+        rutas = descargas.descargar_en_paralelo(["https://a", "https://mala", None, "https://b"])
+
+        try:
+            contenidos = []
+            for ruta in rutas:
+                with open(ruta, "rb") as archivo:
+                    contenidos.append(archivo.read())
+            assert contenidos == [b"https://a", b"https://b"]
+        finally:
+            for ruta in rutas:
+                os.unlink(ruta)
+
+    def test_a_medida_entrega_cada_archivo_al_terminar(self, mocker):
+        """
+        Prueba que la descarga rápida se entregue sin esperar a la lenta.
+        """
+        import threading
+
+        liberar_lenta = threading.Event()
+
+        def descargar_falso(url, destino, client=None, max_bytes=None):
+            if "lenta" in url:
+                assert liberar_lenta.wait(timeout=2)
+            with open(destino, "wb") as archivo:
+                archivo.write(url.encode())
+            return destino
+
+        mocker.patch("descargas.descargar_archivo", side_effect=descargar_falso)
+
+        entregas = []
+        for indice, ruta in descargas.descargar_a_medida(["https://lenta", "https://rapida"]):
+            entregas.append(indice)
+            os.unlink(ruta)
+            liberar_lenta.set()
+
+        assert entregas == [1, 0]
+
+    def test_a_medida_borra_lo_no_entregado(self, mocker):
+        """
+        Prueba que si se deja de iterar, los archivos pendientes no queden en disco.
+        """
+        creados = []
+
+        def descargar_falso(url, destino, client=None, max_bytes=None):
+            creados.append(destino)
+            with open(destino, "wb") as archivo:
+                archivo.write(url.encode())
+            return destino
+
+        mocker.patch("descargas.descargar_archivo", side_effect=descargar_falso)
+
+        iterador = descargas.descargar_a_medida(["https://a", "https://b", "https://c"])
+        _, primera = next(iterador)
+        iterador.close()
+        os.unlink(primera)
+
+        assert creados and not any(os.path.exists(ruta) for ruta in creados)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
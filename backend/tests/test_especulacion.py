@@ -0,0 +1,213 @@
+"""
+Pruebas unitarias para la ejecución especulativa de etapas
+"""
+import pytest
+import asyncio
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import especulacion
+import pipeline_service
+
+
+class TestPlanificadorEspeculativo:
+    """Pruebas para el planificador con hilos"""
+
+    def test_despues_recibe_resultados_de_dependencias(self):
+        """
+        Prueba que una etapa dependiente reciba los resultados en orden.
+        """
+        plan = especulacion.PlanificadorEspeculativo()
+        plan.lanzar("a", lambda: 2)
+        plan.lanzar("b", lambda: 3)
+        plan.despues("suma", ["a", "b"], lambda a, b: a + b)
+
+        assert plan.resultado("suma", timeout=2) == 5
+
+    def test_etapas_independientes_se_solapan(self):
+        """
+        Prueba que validación y media corran al mismo tiempo, no en serie.
+        """
+        plan = especulacion.PlanificadorEspeculativo()
+        inicio = time.perf_counter()
+        plan.lanzar("validacion", time.sleep, 0.2)
+        plan.lanzar("imagen", time.sleep, 0.2)
+        plan.resultado("validacion", timeout=2)
+        plan.resultado("imagen", timeout=2)
+
+        assert time.perf_counter() - inicio < 0.35
+
+    def test_cancelar_descarta_etapas_pendientes(self):
+        """
+        Prueba que al cancelar no se ejecuten las etapas que aún esperaban.
+        """
+        liberar = threading.Event()
+        ejecutadas = []
+
+        plan = especulacion.PlanificadorEspeculativo()
+        plan.lanzar("validacion", liberar.wait, 2)
+        plan.despues("imagen", ["validacion"], lambda _: ejecutadas.append("imagen"))
+
+        plan.cancelar()
+        liberar.set()
+
+        with pytest.raises(especulacion.Cancelado):
+            plan.resultado("imagen", timeout=2)
+        assert ejecutadas == []
+
+    def test_token_interrumpe_funcion_en_vuelo(self):
+        """
+        Prueba que una función larga se detenga en su siguiente verificación.
+        """
+        en_curso = threading.Event()
+        liberar = threading.Event()
+
+        def buscar(cancelacion=None):
+            en_curso.set()
+            liberar.wait(2)
+            especulacion.verificar(cancelacion)
+            return ["clip.mp4"]
+
+        plan = especulacion.PlanificadorEspeculativo()
+        plan.lanzar("clips", buscar, cancelacion=plan.token)
+        en_curso.wait(2)
+
+        plan.cancelar()
+        liberar.set()
+
+        with pytest.raises(especulacion.Cancelado):
+            plan.resultado("clips", timeout=2)
+
+
+class TestEspeculacionPipeline:
+    """Pruebas para las tareas especulativas del pipeline asíncrono"""
+
+    def test_imagen_no_se_especula(self, mocker):
+        """
+        Prueba que la imagen de WhatsApp (de pago) no se genere antes de validar.
+        """
+        mock_imagen = mocker.patch("imagen_service.generar_imagen")
+
+        async def flujo():
+            esp = pipeline_service.iniciar_especulacion("Texto", ["whatsapp", "instagram"])
+            await asyncio.sleep(0.05)
+            esp.cancelar()
+            return esp
+
+        esp = asyncio.run(flujo())
+
+        assert esp.tareas == {}
+        mock_imagen.assert_not_called()
+
+    def test_imagen_se_genera_una_vez_tras_validar(self, mocker):
+        """
+        Prueba que, ya validado, WhatsApp genere la imagen una sola vez.
+        """
+        mock_imagen = mocker.patch(
+            "imagen_service.generar_imagen",
+            return_value={"bytes": b"png", "mime": "image/png", "proveedor": "stability"}
+        )
+        mocker.patch("imagen_redes.preparar", side_effect=lambda imagen, red: imagen)
+        mock_post = mocker.patch(
+            "pipeline_service.social_services.post_whatsapp_status_async",
+            return_value={"id": "1", "status": "sent"}
+        )
+
+        async def flujo():
+            esp = pipeline_service.iniciar_especulacion("Texto", ["whatsapp"])
+            return await pipeline_service.publicar_en_paralelo(
+                "Texto", ["whatsapp"],
+                adaptaciones={"whatsapp": {"text": "Hola"}}, tiempo_adaptacion=0.1,
+                especulacion=esp
+            )
+
+        procesadas = asyncio.run(flujo())
+
+        assert mock_imagen.call_count == 1
+        assert mock_post.called
+        assert "recursos" in procesadas[0]["tiempos"]
+
+    def test_rechazo_cancela_busqueda_de_clips(self, mocker):
+        """
+        Prueba que cancelar la especulación evite la búsqueda en Pexels.
+        """
+        def keywords_lentas(texto):
+            time.sleep(0.1)
+            return ["universidad"]
+
+        mocker.patch("pipeline_service.llm_service.extraer_keywords_con_llm", side_effect=keywords_lentas)
+        mock_pexels = mocker.patch("pipeline_service.llm_service.buscar_video_pexels_inteligente")
+
+        async def flujo():
+            esp = pipeline_service.iniciar_especulacion("Texto", ["tiktok"])
+            await asyncio.sleep(0.02)  # La búsqueda ya está en vuelo
+            esp.cancelar()
+            await asyncio.sleep(0.2)
+            return esp
+
+        esp = asyncio.run(flujo())
+
+        assert esp.token.cancelado
+        assert not mock_pexels.called
+
+
+@pytest.fixture(scope="module")
+def app_completa():
+    """backend/main/main.py (la carpeta main/ no es importable como paquete)"""
+    import importlib.util
+
+    os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    ruta = os.path.join(os.path.dirname(__file__), "..", "main", "main.py")
+    spec = importlib.util.spec_from_file_location("main_completo", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+class TestEndpointTikTok:
+    """Pruebas de limpieza del endpoint /api/test/tiktok"""
+
+    def test_error_antes_del_video_limpia_plan_y_audio(self, mocker, tmp_path, app_completa):
+        """
+        Prueba que si la validación falla se cancele la búsqueda de clips
+        y se borre la narración ya generada.
+        """
+        audio = tmp_path / "narracion.mp3"
+        tokens = []
+
+        def audio_falso(texto, adaptacion):
+            audio.write_bytes(b"mp3")
+            return str(audio)
+
+        def validar_lento(texto):
+            time.sleep(0.1)
+            raise RuntimeError("Gemini caído")
+
+        def clips_lentos(texto, cancelacion=None):
+            tokens.append(cancelacion)
+            time.sleep(0.2)
+            return []
+
+        mocker.patch("llm_service.validar_contenido_academico", side_effect=validar_lento)
+        mocker.patch("llm_service.adaptar_contenido", return_value={"text": "Hola"})
+        mocker.patch("llm_service.generar_audio_tiktok", side_effect=audio_falso)
+        mocker.patch("llm_service.buscar_clips_tiktok", side_effect=clips_lentos)
+        mock_video = mocker.patch("llm_service.generar_video_tiktok")
+
+        solicitud = app_completa.schemas.TestPostRequest(text="Inscripciones FICCT")
+        with pytest.raises(RuntimeError):
+            app_completa.test_post_tiktok(solicitud, mocker.MagicMock())
+
+        time.sleep(0.05)
+        assert tokens and tokens[0].cancelado
+        assert not audio.exists()
+        mock_video.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,100 @@
+"""
+Pruebas unitarias para el bus de eventos de progreso
+"""
+import pytest
+import asyncio
+import threading
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from jobs import eventos
+import pipeline_service
+
+
+async def _recolectar(bus, canal):
+    return [evento async for evento in bus.suscribir(canal, keepalive=1) if evento is not None]
+
+
+class TestBusLocal:
+    """Pruebas para el bus en memoria"""
+
+    def test_suscriptor_tardio_recibe_historial(self):
+        """
+        Prueba que un suscriptor que llega después reciba los eventos previos.
+        """
+        bus = eventos.BusLocal()
+        bus.publicar("job-1", "validacion_completa", es_academico=True)
+        bus.publicar("job-1", "completado")
+        bus.cerrar_canal("job-1")
+
+        recibidos = asyncio.run(_recolectar(bus, "job-1"))
+
+        assert [e["tipo"] for e in recibidos] == ["validacion_completa", "completado"]
+        assert recibidos[0]["es_academico"] is True
+
+    def test_eventos_publicados_desde_otro_hilo(self):
+        """
+        Prueba que los eventos publicados desde un hilo de trabajo lleguen en vivo.
+        """
+        bus = eventos.BusLocal()
+
+        def trabajar():
+            for porcentaje in (0, 50, 100):
+                bus.publicar("job-2", "video_progreso", red="tiktok", porcentaje=porcentaje)
+            bus.cerrar_canal("job-2")
+
+        async def escenario():
+            tarea = asyncio.create_task(_recolectar(bus, "job-2"))
+            await asyncio.sleep(0.05)
+            threading.Thread(target=trabajar).start()
+            return await asyncio.wait_for(tarea, timeout=2)
+
+        recibidos = asyncio.run(escenario())
+
+        assert [e["porcentaje"] for e in recibidos] == [0, 50, 100]
+
+    def test_formato_sse(self):
+        """
+        Prueba el formato text/event-stream de un evento y del keepalive.
+        """
+        texto = eventos.formatear_sse({"tipo": "publicacion", "red": "facebook"})
+
+        assert texto.startswith("event: publicacion\ndata: {")
+        assert texto.endswith("\n\n")
+        assert eventos.formatear_sse(None) == ": keepalive\n\n"
+
+
+class TestEventosPipeline:
+    """Pruebas de los eventos emitidos por pipeline_service"""
+
+    def test_procesar_red_emite_adaptacion_y_publicacion(self, mocker):
+        """
+        Prueba que la cadena de una red emita sus eventos en orden.
+        """
+        mocker.patch(
+            "pipeline_service.llm_service.adaptar_contenido",
+            return_value={"text": "Texto adaptado", "hashtags": []}
+        )
+
+        async def publicar(**kwargs):
+            return {"id": "123_456"}
+
+        mocker.patch("pipeline_service.social_services.post_to_facebook_async", side_effect=publicar)
+
+        recibidos = []
+        asyncio.run(pipeline_service.procesar_red(
+            "facebook", "Inscripciones abiertas",
+            lambda tipo, **datos: recibidos.append((tipo, datos))
+        ))
+
+        assert [tipo for tipo, _ in recibidos] == ["adaptacion_lista", "publicacion"]
+        assert recibidos[0][1]["texto"] == "Texto adaptado"
+        assert recibidos[1][1]["ok"] is True
+        assert recibidos[1][1]["link"] == "https://www.facebook.com/123/posts/456"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,153 @@
+"""
+Pruebas unitarias para el pool de clientes HTTP asíncronos y los publicadores async
+"""
+import pytest
+import asyncio
+import httpx
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import social_services
+
+
+def _cliente_simulado(handler, llamadas):
+    """Crea un AsyncClient que responde con `handler` y registra cada cliente creado"""
+    def crear(config):
+        cliente = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        llamadas.append(cliente)
+        return cliente
+    return crear
+
+
+class TestHttpPool:
+    """Pruebas para el ciclo de vida del pool y la reutilización de conexiones"""
+
+    def test_pool_se_inicia_y_cierra(self, mocker):
+        """
+        Prueba que iniciar/cerrar cree un cliente por host y luego los cierre.
+        """
+        creados = []
+        mocker.patch("social_services._crear_cliente", side_effect=_cliente_simulado(lambda r: httpx.Response(200), creados))
+
+        async def ciclo():
+            await social_services.iniciar_clientes_http()
+            nombres = set(social_services._clientes_http)
+            await social_services.cerrar_clientes_http()
+            return nombres
+
+        nombres = asyncio.run(ciclo())
+
+        assert nombres == set(social_services.CONFIG_HOSTS)
+        assert all(c.is_closed for c in creados)
+        assert social_services._clientes_http == {}
+
+    def test_cambio_de_loop_cierra_clientes_anteriores(self, mocker):
+        """
+        Prueba que al usar el pool desde otro event loop se cierren los clientes viejos.
+        """
+        creados = []
+        mocker.patch("social_services._crear_cliente", side_effect=_cliente_simulado(lambda r: httpx.Response(200), creados))
+        mocker.patch.dict(social_services._clientes_http, clear=True)
+
+        async def usar():
+            cliente = social_services.cliente_http("meta")
+            await asyncio.sleep(0)
+            return cliente
+
+        viejo = asyncio.run(usar())
+        nuevo = asyncio.run(usar())
+
+        assert viejo is not nuevo
+        assert viejo.is_closed
+        assert not nuevo.is_closed
+        asyncio.run(nuevo.aclose())
+
+    def test_loop_anterior_en_otro_hilo_cierra_alli(self, mocker):
+        """
+        Prueba que si el loop anterior sigue corriendo, el cierre se agende en ese loop.
+        """
+        import threading
+
+        creados = []
+        mocker.patch("social_services._crear_cliente", side_effect=_cliente_simulado(lambda r: httpx.Response(200), creados))
+        mocker.patch.dict(social_services._clientes_http, clear=True)
+
+        loop_hilo = asyncio.new_event_loop()
+        hilo = threading.Thread(target=loop_hilo.run_forever)
+        hilo.start()
+        try:
+            async def crear():
+                return social_services.cliente_http("meta")
+
+            viejo = asyncio.run_coroutine_threadsafe(crear(), loop_hilo).result(timeout=2)
+
+            async def usar_y_esperar():
+                social_services.cliente_http("meta")
+                for _ in range(50):
+                    if viejo.is_closed:
+                        break
+                    await asyncio.sleep(0.01)
+
+            asyncio.run(usar_y_esperar())
+            assert viejo.is_closed
+        finally:
+            loop_hilo.call_soon_threadsafe(loop_hilo.stop)
+            hilo.join()
+            loop_hilo.close()
+            asyncio.run(social_services.cerrar_clientes_http())
+
+    def test_instagram_async_reutiliza_cliente(self, mocker):
+        """
+        Prueba que los 3 pasos de Instagram usen el mismo cliente compartido.
+        """
+        clientes_usados = []
+        enviar_original = httpx.AsyncClient.send
+
+        async def enviar(cliente, request, **kwargs):
+            clientes_usados.append(cliente)
+            return await enviar_original(cliente, request, **kwargs)
+
+        mocker.patch.object(httpx.AsyncClient, "send", enviar)
+
+        def handler(request):
+            if request.url.path.endswith("/media"):
+                return httpx.Response(200, json={"id": "container_1"})
+            if request.url.path.endswith("/media_publish"):
+                return httpx.Response(200, json={"id": "media_67890"})
+            return httpx.Response(200, json={"id": "media_67890", "permalink": "https://instagram.com/p/abc"})
+
+        creados = []
+        mocker.patch("social_services._crear_cliente", side_effect=_cliente_simulado(handler, creados))
+        mocker.patch("social_services.IG_ACCOUNT_ID", "ig_123")
+
+        async def publicar():
+            await social_services.iniciar_clientes_http()
+            meta = social_services._clientes_http["meta"]
+            try:
+                return await social_services.post_to_instagram_async("Evento FICCT", "https://example.com/img.jpg"), meta
+            finally:
+                await social_services.cerrar_clientes_http()
+
+        resultado, meta = asyncio.run(publicar())
+
+        assert resultado["id"] == "media_67890"
+        assert resultado["permalink"] == "https://instagram.com/p/abc"
+        assert len(clientes_usados) == 3
+        assert all(cliente is meta for cliente in clientes_usados)
+
+    def test_facebook_async_rechaza_texto_vacio(self, mocker):
+        """
+        Prueba que la versión async valide el texto antes de llamar a la API.
+        """
+        mock_cliente = mocker.patch("social_services.cliente_http")
+
+        resultado = asyncio.run(social_services.post_to_facebook_async(text="   "))
+
+        assert "error" in resultado
+        assert not mock_cliente.called
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
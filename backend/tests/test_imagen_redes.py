@@ -0,0 +1,81 @@
+"""
+Pruebas unitarias para el post-procesado de imágenes por red
+"""
+import pytest
+import io
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import imagen_redes
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _foto(ancho=1024, alto=1024):
+    """PNG con ruido (comprime mal, como una foto de Stability)"""
+    imagen = Image.frombytes("RGB", (ancho, alto), os.urandom(ancho * alto * 3))
+    salida = io.BytesIO()
+    imagen.save(salida, format="PNG")
+    return {"bytes": salida.getvalue(), "mime": "image/png", "proveedor": "stability"}
+
+
+def _abrir(imagen):
+    return Image.open(io.BytesIO(imagen["bytes"]))
+
+
+class TestImagenRedes:
+    """Pruebas para transcodificar y preparar"""
+
+    def test_facebook_tamano_y_formato(self):
+        """
+        Prueba que la imagen de Facebook se recorte a 1200x630 en JPEG.
+        """
+        imagen = imagen_redes.preparar(_foto(), "facebook")
+
+        assert imagen["mime"] == "image/jpeg"
+        assert _abrir(imagen).size == (1200, 630)
+        assert imagen["proveedor"] == "stability"
+
+    def test_whatsapp_respeta_presupuesto(self):
+        """
+        Prueba que la imagen de WhatsApp entre en su presupuesto de bytes.
+        """
+        original = _foto()
+
+        imagen = imagen_redes.preparar(original, "whatsapp")
+
+        assert len(imagen["bytes"]) <= imagen_redes.PERFILES["whatsapp"]["max_bytes"]
+        assert len(imagen["bytes"]) * 5 <= len(original["bytes"])
+
+    def test_achica_si_la_calidad_no_alcanza(self):
+        """
+        Prueba que, agotada la calidad mínima, se reduzca el tamaño de la imagen.
+        """
+        imagen = imagen_redes.transcodificar(_foto(), 800, 800, "jpeg", 80, max_bytes=60 * 1024)
+
+        assert len(imagen["bytes"]) <= 60 * 1024
+        assert _abrir(imagen).width < 800
+
+    def test_webp(self):
+        """
+        Prueba la salida en WebP.
+        """
+        imagen = imagen_redes.transcodificar(_foto(256, 256), 128, 128, "webp", 75)
+
+        assert imagen["mime"] == "image/webp"
+        assert _abrir(imagen).format == "WEBP"
+
+    def test_red_sin_perfil_sin_cambios(self):
+        """
+        Prueba que una red sin perfil reciba la imagen original.
+        """
+        original = _foto(64, 64)
+
+        assert imagen_redes.preparar(original, "tiktok") is original
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,127 @@
+"""
+Pruebas unitarias para los proveedores de imágenes
+"""
+import pytest
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import imagen_service
+import llm_service
+
+
+class ProveedorLento(imagen_service.ProveedorImagen):
+    nombre = "lento"
+
+    def generar(self, prompt, ancho, alto):
+        time.sleep(1)
+        return b"tarde"
+
+
+@pytest.fixture
+def proveedores(mocker):
+    """Proveedores nuevos (métricas en cero) para cada prueba"""
+    registro = {
+        "stability": imagen_service.ProveedorStability(),
+        "stub": imagen_service.ProveedorStub(),
+        "lento": ProveedorLento(timeout=0.1),
+    }
+    mocker.patch.dict(imagen_service.PROVEEDORES, registro, clear=True)
+    return registro
+
+
+class TestImagenService:
+    """Pruebas para generar_imagen y sus proveedores"""
+
+    def test_stub_devuelve_png_del_tamano_pedido(self, proveedores):
+        """
+        Prueba que el stub genere un PNG válido sin red ni Pillow.
+        """
+        imagen = imagen_service.generar_imagen("campus", 64, 32, proveedores=["stub"])
+
+        assert imagen["bytes"].startswith(b"\x89PNG\r\n\x1a\n")
+        assert int.from_bytes(imagen["bytes"][16:20], "big") == 64
+        assert int.from_bytes(imagen["bytes"][20:24], "big") == 32
+        assert imagen["proveedor"] == "stub"
+
+    def test_sin_api_key_pasa_al_siguiente(self, mocker, proveedores):
+        """
+        Prueba que sin STABILITY_API_KEY no se llame a la API y se use el respaldo.
+        """
+        mocker.patch.dict(os.environ, {"STABILITY_API_KEY": ""})
+        mock_post = mocker.patch("imagen_service.httpx.post")
+
+        imagen = imagen_service.generar_imagen("campus", 64, 64, proveedores=["stability", "stub"])
+
+        assert imagen["proveedor"] == "stub"
+        mock_post.assert_not_called()
+        assert imagen_service.metricas()["stability"]["no_disponible"] == 1
+
+    def test_timeout_por_proveedor(self, proveedores):
+        """
+        Prueba que un proveedor lento se abandone a su timeout y se registre.
+        """
+        inicio = time.perf_counter()
+        imagen = imagen_service.generar_imagen("campus", 64, 64, proveedores=["lento", "stub"])
+
+        assert imagen["proveedor"] == "stub"
+        assert time.perf_counter() - inicio < 0.8
+        metricas = imagen_service.metricas()
+        assert metricas["lento"]["timeouts"] == 1
+        assert metricas["stub"]["exitos"] == 1
+        assert metricas["stub"]["latencia_promedio"] is not None
+
+    def test_error_de_stability_usa_respaldo(self, mocker, proveedores):
+        """
+        Prueba el respaldo cuando Stability responde con error (p. ej. sin créditos).
+        """
+        mocker.patch.dict(os.environ, {"STABILITY_API_KEY": "test"})
+        mocker.patch("imagen_service.httpx.post", side_effect=RuntimeError("402 Payment Required"))
+        mocker.patch("imagen_service.IMAGEN_PROVEEDORES", ["stability", "stub"])
+        mocker.patch("imagen_service.IMAGEN_PERMITIR_MARCADORES", True)
+
+        data_url = llm_service.generar_imagen_ia_base64("campus")
+
+        assert data_url.startswith("data:image/")
+        assert imagen_service.metricas()["stability"]["errores"] == 1
+
+    def test_marcador_no_se_publica_por_defecto(self, mocker, proveedores):
+        """
+        Prueba que una tarjeta de respaldo no se publique como si fuera real.
+        """
+        mocker.patch("imagen_service.IMAGEN_PROVEEDORES", ["stub"])
+        mock_publicar = mocker.patch("llm_service.publicar_imagen")
+
+        assert imagen_service.IMAGEN_PERMITIR_MARCADORES is False
+        assert llm_service.generar_imagen_ia("campus") is None
+        assert llm_service.generar_imagen_ia_base64("campus") is None
+        mock_publicar.assert_not_called()
+
+    def test_base64_sin_imagen_devuelve_none(self, mocker):
+        """
+        Prueba que cualquier error al generar o transcodificar devuelva None
+        (los endpoints publican sin imagen o responden con un error claro).
+        """
+        mocker.patch("llm_service.imagen_redes.preparar", side_effect=OSError("imagen corrupta"))
+        mocker.patch("imagen_service.generar_imagen", return_value={"bytes": b"x", "mime": "image/png", "proveedor": "stability"})
+
+        assert llm_service.generar_imagen_ia_base64("campus") is None
+
+    def test_tarjeta_local_determinista(self):
+        """
+        Prueba que la tarjeta local sea igual para el mismo prompt.
+        """
+        pytest.importorskip("PIL")
+        proveedor = imagen_service.ProveedorLocal()
+
+        primera = proveedor.generar("feria de ciencias FICCT", 540, 540)
+
+        assert primera == proveedor.generar("feria de ciencias FICCT", 540, 540)
+        assert primera.startswith(b"\x89PNG")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,157 @@
+"""
+Pruebas unitarias para la cola de trabajos en segundo plano
+"""
+import pytest
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from jobs import service as jobs_service
+
+
+@jobs_service.tarea("test.sumar")
+def _sumar(job, a, b):
+    job.reportar("sumando")
+    return {"total": a + b}
+
+
+@jobs_service.tarea("test.fallar")
+def _fallar(job):
+    raise RuntimeError("falló el render")
+
+
+def _esperar(cola, job_id, timeout=2.0):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        job = cola.estado(job_id)
+        if job["estado"] in (jobs_service.COMPLETADO, jobs_service.ERROR):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("El job no terminó a tiempo")
+
+
+class TestColaLocal:
+    """Pruebas para el backend local de la cola"""
+
+    def test_encolar_devuelve_al_instante_y_completa(self):
+        """
+        Prueba que encolar no bloquee y que el resultado quede disponible.
+        """
+        cola = jobs_service.ColaLocal(workers=1)
+
+        job = cola.encolar("test.sumar", 7, 2, 3)
+
+        assert job["estado"] == jobs_service.PENDIENTE
+        assert job["usuario_id"] == 7
+
+        terminado = _esperar(cola, job["id"])
+        assert terminado["estado"] == jobs_service.COMPLETADO
+        assert terminado["resultado"] == {"total": 5}
+        assert terminado["etapa"] == "sumando"
+        cola.cerrar()
+
+    def test_error_en_tarea_queda_registrado(self):
+        """
+        Prueba que una excepción en la tarea marque el job como error.
+        """
+        cola = jobs_service.ColaLocal(workers=1)
+
+        job = cola.encolar("test.fallar", 1)
+        terminado = _esperar(cola, job["id"])
+
+        assert terminado["estado"] == jobs_service.ERROR
+        assert "falló el render" in terminado["error"]
+        cola.cerrar()
+
+    def test_tarea_no_registrada(self):
+        """
+        Prueba que no se pueda encolar una tarea desconocida.
+        """
+        cola = jobs_service.ColaLocal(workers=1)
+
+        with pytest.raises(ValueError):
+            cola.encolar("test.no_existe", 1)
+        cola.cerrar()
+
+    def test_expirados_se_limpian_al_consultar(self, mocker):
+        """
+        Prueba que los jobs vencidos se liberen aunque no se encole nada más.
+        """
+        cola = jobs_service.ColaLocal(workers=1)
+        job = cola.encolar("test.sumar", 7, 2, 3)
+        _esperar(cola, job["id"])
+
+        mocker.patch("jobs.service.JOBS_TTL_SEGUNDOS", -1)
+
+        assert cola.estado(job["id"]) is None
+        assert cola.estadisticas()["pendientes"] == 0
+        cola.cerrar()
+
+
+class RedisFalso:
+    """Lo mínimo de redis.Redis que usa ColaCelery"""
+
+    def __init__(self):
+        self.datos = {}
+
+    def set(self, clave, valor, ex=None):
+        self.datos[clave] = str(valor).encode()
+
+    def get(self, clave):
+        return self.datos.get(clave)
+
+
+class TestColaCelery:
+    """Pruebas para el dueño de los jobs con el backend Celery"""
+
+    def _cola(self, mocker, estado="PENDING"):
+        app = mocker.MagicMock()
+        app.AsyncResult.return_value.state = estado
+        app.AsyncResult.return_value.info = None
+        app.AsyncResult.return_value.result = {"ok": True}
+        return jobs_service.ColaCelery(app=app, redis_cliente=RedisFalso())
+
+    @pytest.mark.parametrize("estado", ["PENDING", "SUCCESS"])
+    def test_dueno_conocido_en_pending_y_success(self, mocker, estado):
+        """
+        Prueba que el dueño se conozca aunque el result backend no lo tenga.
+        """
+        cola = self._cola(mocker, estado)
+
+        job = cola.encolar("test.sumar", 7, 2, 3)
+
+        assert cola.estado(job["id"])["usuario_id"] == 7
+
+    def test_otro_usuario_recibe_404(self, mocker):
+        """
+        Prueba que un usuario no pueda leer el job de otro.
+        """
+        from fastapi import HTTPException
+        from jobs import routes
+
+        cola = self._cola(mocker, "SUCCESS")
+        mocker.patch("jobs.service.cola", cola)
+        job = cola.encolar("test.sumar", 7, 2, 3)
+
+        assert routes._obtener_job(job["id"], mocker.MagicMock(id=7))["estado"] == jobs_service.COMPLETADO
+        with pytest.raises(HTTPException) as error:
+            routes._obtener_job(job["id"], mocker.MagicMock(id=8))
+        assert error.value.status_code == 404
+
+    def test_dueno_desconocido_es_404(self, mocker):
+        """
+        Prueba que un job sin dueño registrado (o expirado) no se exponga.
+        """
+        from fastapi import HTTPException
+        from jobs import routes
+
+        mocker.patch("jobs.service.cola", self._cola(mocker, "SUCCESS"))
+
+        with pytest.raises(HTTPException):
+            routes._obtener_job("no-existe", mocker.MagicMock(id=7))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,115 @@
+"""
+Pruebas unitarias para la lectura de metadatos de audio y video
+"""
+import pytest
+import json
+import subprocess
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import cache_clips
+import llm_service
+import media_probe
+
+# MPEG-2 Layer III, 32 kbps, 24 kHz, mono (como gTTS): 96 bytes y 24 ms por frame
+FRAME = bytes([0xFF, 0xF3, 0x44, 0xC4]) + b"\x00" * 92
+
+SALIDA_FFPROBE = {
+    "format": {"duration": "12.480000", "bit_rate": "1850000", "format_name": "mov,mp4,m4a,3gp,3g2,mj2"},
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "width": 540, "height": 960},
+        {"codec_type": "audio", "codec_name": "aac"},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache_metadatos():
+    media_probe.cache_metadatos.invalidar()
+    yield
+
+
+class TestMediaProbe:
+    """Pruebas para probar, duracion y el parser de encabezados MP3"""
+
+    def test_lee_ffprobe_json(self, mocker, tmp_path):
+        """
+        Prueba que se tomen duración, códec, dimensiones y bitrate de ffprobe.
+        """
+        ruta = tmp_path / "clip.mp4"
+        ruta.write_bytes(b"mp4")
+        resultado = subprocess.CompletedProcess([], 0, stdout=json.dumps(SALIDA_FFPROBE))
+        mocker.patch("media_probe.subprocess.run", return_value=resultado)
+
+        metadatos = media_probe.probar(str(ruta))
+
+        assert metadatos["duracion"] == pytest.approx(12.48)
+        assert (metadatos["codec"], metadatos["codec_audio"]) == ("h264", "aac")
+        assert (metadatos["ancho"], metadatos["alto"]) == (540, 960)
+        assert metadatos["bitrate_kbps"] == 1850
+
+    def test_resultado_en_cache_por_archivo(self, mocker, tmp_path):
+        """
+        Prueba que el mismo archivo no se vuelva a probar, pero sí si cambia.
+        """
+        ruta = tmp_path / "clip.mp4"
+        ruta.write_bytes(b"mp4")
+        resultado = subprocess.CompletedProcess([], 0, stdout=json.dumps(SALIDA_FFPROBE))
+        mock_run = mocker.patch("media_probe.subprocess.run", return_value=resultado)
+
+        media_probe.probar(str(ruta))
+        media_probe.probar(str(ruta))
+        ruta.write_bytes(b"otro mp4")
+        media_probe.probar(str(ruta))
+
+        assert mock_run.call_count == 2
+
+    def test_segmento_de_cache_clips_se_prueba_una_vez(self, mocker, tmp_path):
+        """
+        Prueba que un acierto en cache_clips no invalide los metadatos del segmento.
+        """
+        cache = cache_clips.CacheClips(str(tmp_path / "cache"), max_mb=10)
+        origen = tmp_path / "segmento.mp4"
+        origen.write_bytes(b"mp4")
+        ruta = cache.guardar(str(origen), "123", "540x960_25fps_rapido")
+        mtime = os.stat(ruta).st_mtime_ns
+        resultado = subprocess.CompletedProcess([], 0, stdout=json.dumps(SALIDA_FFPROBE))
+        mock_run = mocker.patch("media_probe.subprocess.run", return_value=resultado)
+
+        media_probe.probar(ruta)
+        for _ in range(3):
+            media_probe.probar(cache.obtener("123", "540x960_25fps_rapido"))
+
+        assert os.stat(ruta).st_mtime_ns == mtime
+        assert mock_run.call_count == 1
+
+    def test_sin_ffprobe_lee_encabezados_mp3(self, mocker, tmp_path):
+        """
+        Prueba el respaldo: duración del MP3 desde el tamaño y el bitrate.
+        """
+        ruta = tmp_path / "voz.mp3"
+        ruta.write_bytes(b"ID3\x03\x00\x00\x00\x00\x00\x05" + b"x" * 5 + FRAME * 100)
+        mocker.patch("media_probe.subprocess.run", side_effect=FileNotFoundError("ffprobe"))
+
+        metadatos = media_probe.probar(str(ruta))
+
+        assert metadatos["duracion"] == pytest.approx(2.4)
+        assert metadatos["bitrate_kbps"] == 32
+        assert metadatos["fuente"] == "encabezados"
+        assert media_probe.probar(str(tmp_path / "no_existe.mp3")) is None
+
+    def test_repite_clips_cortos_para_cubrir_el_audio(self, mocker):
+        """
+        Prueba que los segmentos se repitan si suman menos que la narración.
+        """
+        mocker.patch("llm_service.media_probe.duracion", return_value=4.0)
+
+        assert llm_service._cubrir_duracion(["a.mp4", "b.mp4"], 6.0) == ["a.mp4", "b.mp4"]
+        assert llm_service._cubrir_duracion(["a.mp4", "b.mp4"], 10.0) == ["a.mp4", "b.mp4"] * 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
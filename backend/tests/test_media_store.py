@@ -0,0 +1,94 @@
+"""
+Pruebas unitarias para el almacén de medios y la ruta /media
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import llm_service
+import media_store
+from media import routes as media_routes
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def almacen(mocker, tmp_path):
+    almacen = media_store.AlmacenMedia(str(tmp_path / "media"), max_mb=10)
+    mocker.patch("media_store.almacen", almacen)
+    mocker.patch("media_store.MEDIA_PUBLIC_URL", "https://api.ejemplo.com")
+    return almacen
+
+
+@pytest.fixture
+def cliente():
+    app = FastAPI()
+    app.include_router(media_routes.router)
+    return TestClient(app)
+
+
+class TestMediaStore:
+    """Pruebas para AlmacenMedia, publicar y GET /media/{nombre}"""
+
+    def test_mismo_contenido_misma_url(self, almacen):
+        """
+        Prueba el direccionamiento por contenido: la misma imagen se guarda una vez.
+        """
+        primera = media_store.publicar(PNG, "image/png")
+        segunda = media_store.publicar(PNG, "image/png")
+
+        assert primera == segunda
+        assert primera.startswith("https://api.ejemplo.com/media/") and primera.endswith(".png")
+        assert almacen.metricas()["entradas"] == 1
+
+    def test_sirve_con_cabeceras_de_cache(self, almacen, cliente):
+        """
+        Prueba que la ruta devuelva el archivo con caché immutable y tipo correcto.
+        """
+        nombre = media_store.publicar(PNG, "image/png").rsplit("/", 1)[1]
+
+        respuesta = cliente.get(f"/media/{nombre}")
+
+        assert respuesta.status_code == 200
+        assert respuesta.content == PNG
+        assert respuesta.headers["content-type"] == "image/png"
+        assert "immutable" in respuesta.headers["cache-control"]
+        assert respuesta.headers["etag"]
+
+    def test_soporta_range(self, almacen, cliente):
+        """
+        Prueba las descargas parciales (Range) que usan algunos clientes.
+        """
+        nombre = media_store.publicar(PNG, "image/png").rsplit("/", 1)[1]
+
+        respuesta = cliente.get(f"/media/{nombre}", headers={"Range": "bytes=8-15"})
+
+        assert respuesta.status_code == 206
+        assert respuesta.content == PNG[8:16]
+
+    def test_rechaza_nombres_invalidos(self, almacen, cliente):
+        """
+        Prueba que no se pueda salir del directorio ni pedir archivos inexistentes.
+        """
+        assert cliente.get("/media/..%2F..%2Fetc%2Fpasswd").status_code == 404
+        assert cliente.get("/media/" + "0" * 32 + ".png").status_code == 404
+
+    def test_sin_url_publica_usa_imgur(self, mocker, almacen):
+        """
+        Prueba el respaldo: sin MEDIA_PUBLIC_URL la imagen se sigue subiendo a Imgur.
+        """
+        mocker.patch("media_store.MEDIA_PUBLIC_URL", "")
+        mock_imgur = mocker.patch("llm_service._subir_a_imgur", return_value="https://i.imgur.com/x.png")
+
+        assert llm_service.publicar_imagen(PNG, "image/png") == "https://i.imgur.com/x.png"
+        mock_imgur.assert_called_once()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,226 @@
+"""
+Pruebas unitarias para la selección de versiones de clips de Pexels
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import llm_service
+
+VIDEO_FILES = [
+    {"quality": "uhd", "width": 2160, "height": 3840, "fps": 25, "link": "uhd.mp4", "size": 60_000_000},
+    {"quality": "hd", "width": 1080, "height": 1920, "fps": 25, "link": "hd.mp4", "size": 15_000_000},
+    {"quality": "sd", "width": 540, "height": 960, "fps": 25, "link": "sd.mp4", "size": 4_000_000},
+    {"quality": "sd", "width": 360, "height": 640, "fps": 25, "link": "tiny.mp4", "size": 1_500_000},
+    {"quality": "hd", "width": 1920, "height": 1080, "fps": 25, "link": "landscape.mp4", "size": 14_000_000},
+]
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache_pexels():
+    llm_service.cache_busquedas_pexels.invalidar()
+    llm_service.cache_busquedas_pexels_vacias.invalidar()
+    yield
+
+
+def _respuesta_pexels(mocker, videos):
+    respuesta = mocker.Mock()
+    respuesta.json.return_value = {"videos": videos}
+    return respuesta
+
+
+def _candidato(video_id, width=540, height=960, duration=10):
+    return {
+        "video_id": video_id, "link": f"{video_id}.mp4", "width": width, "height": height,
+        "fps": 25, "duration": duration, "size_bytes": 4_000_000,
+    }
+
+
+class TestSeleccionarRendicion:
+    """Pruebas para seleccionar_rendicion"""
+
+    def test_elige_la_mas_chica_que_cubre_la_salida(self):
+        """
+        Prueba que con salida 540x960 se elija la versión SD, no la UHD.
+        """
+        vf = llm_service.seleccionar_rendicion(VIDEO_FILES, 540, 960, 25)
+
+        assert vf["link"] == "sd.mp4"
+
+    def test_resolucion_objetivo_configurable(self):
+        """
+        Prueba que un objetivo mayor suba a la versión HD.
+        """
+        vf = llm_service.seleccionar_rendicion(VIDEO_FILES, 720, 1280, 25)
+
+        assert vf["link"] == "hd.mp4"
+
+    def test_respeta_fps_minimo(self):
+        """
+        Prueba que se descarten versiones con menos fps que la salida.
+        """
+        archivos = [
+            {"width": 540, "height": 960, "fps": 24, "link": "lento.mp4"},
+            {"width": 720, "height": 1280, "fps": 30, "link": "fluido.mp4"},
+        ]
+
+        vf = llm_service.seleccionar_rendicion(archivos, 540, 960, 30)
+
+        assert vf["link"] == "fluido.mp4"
+
+    def test_sin_version_suficiente_usa_la_mas_grande(self):
+        """
+        Prueba el respaldo cuando ninguna versión alcanza la resolución.
+        """
+        vf = llm_service.seleccionar_rendicion(VIDEO_FILES[2:4], 1080, 1920, 25)
+
+        assert vf["link"] == "sd.mp4"
+
+    def test_buscar_rendicion_expone_tamano_y_bitrate(self, mocker):
+        """
+        Prueba que el resultado incluya resolución, peso y bitrate estimado.
+        """
+        mocker.patch.dict(os.environ, {"PEXELS_API_KEY": "test"})
+        respuesta = _respuesta_pexels(mocker, [{"duration": 10, "video_files": VIDEO_FILES}])
+        mocker.patch("llm_service.httpx.get", return_value=respuesta)
+
+        rendicion = llm_service.buscar_rendicion_pexels("university campus students")
+
+        assert rendicion["link"] == "sd.mp4"
+        assert (rendicion["width"], rendicion["height"]) == (540, 960)
+        assert rendicion["size_bytes"] == 4_000_000
+        assert rendicion["bitrate_kbps"] == 3200
+
+
+class TestBusquedaPexels:
+    """Pruebas para la caché de búsquedas y la escalera de intentos"""
+
+    def test_busqueda_repetida_usa_cache(self, mocker):
+        """
+        Prueba que la misma query (con otro formato) no vuelva a llamar a la API.
+        """
+        mocker.patch.dict(os.environ, {"PEXELS_API_KEY": "test"})
+        respuesta = _respuesta_pexels(mocker, [{"duration": 10, "video_files": VIDEO_FILES}])
+        mock_get = mocker.patch("llm_service.httpx.get", return_value=respuesta)
+
+        primera = llm_service.buscar_video_pexels("University Campus Students")
+        segunda = llm_service.buscar_video_pexels("  university   campus students ")
+
+        assert primera == segunda == "sd.mp4"
+        assert mock_get.call_count == 1
+
+    def test_sin_resultados_tambien_se_cachea(self, mocker):
+        """
+        Prueba el caché negativo: una búsqueda vacía no se repite.
+        """
+        mocker.patch.dict(os.environ, {"PEXELS_API_KEY": "test"})
+        mock_get = mocker.patch("llm_service.httpx.get", return_value=_respuesta_pexels(mocker, []))
+
+        assert llm_service.buscar_video_pexels("zzz sin resultados") is None
+        assert llm_service.buscar_video_pexels("zzz sin resultados") is None
+        assert mock_get.call_count == 1
+
+    def test_errores_de_red_no_se_cachean(self, mocker):
+        """
+        Prueba que un fallo de la API se reintente en la siguiente búsqueda.
+        """
+        mocker.patch.dict(os.environ, {"PEXELS_API_KEY": "test"})
+        mock_get = mocker.patch("llm_service.httpx.get", side_effect=RuntimeError("timeout"))
+
+        llm_service.buscar_video_pexels("university campus students")
+        llm_service.buscar_video_pexels("university campus students")
+
+        assert mock_get.call_count == 2
+
+    def test_escalera_solo_para_keywords_sin_video(self, mocker):
+        """
+        Prueba que los intentos más cortos solo se lancen para la keyword sin resultados.
+        """
+        encontrados = {
+            "university campus students walking daytime": [_candidato(1)],
+            "college building exterior": [_candidato(2)],
+        }
+        mock_buscar = mocker.patch(
+            "llm_service.buscar_candidatos_pexels",
+            side_effect=lambda query, orientation="portrait": encontrados.get(query, [])
+        )
+
+        urls = llm_service.buscar_video_pexels_inteligente([
+            "university campus students walking daytime",
+            "college building exterior establishing shot",
+        ])
+
+        assert urls == ["1.mp4", "2.mp4"]
+        consultas = [llamada.args[0] for llamada in mock_buscar.call_args_list]
+        assert "university campus students" not in consultas
+        assert mock_buscar.call_count == 4  # 2 completas + 2 cortas de la segunda
+
+    def test_no_repite_clips_entre_keywords(self, mocker):
+        """
+        Prueba que un video que aparece en ambas búsquedas se use una sola vez.
+        """
+        encontrados = {
+            "university campus students walking daytime": [_candidato(1), _candidato(2)],
+            "college building exterior establishing shot": [_candidato(1), _candidato(3)],
+        }
+        mocker.patch(
+            "llm_service.buscar_candidatos_pexels",
+            side_effect=lambda query, orientation="portrait": encontrados.get(query, [])
+        )
+
+        urls = llm_service.buscar_video_pexels_inteligente(list(encontrados))
+
+        assert urls == ["1.mp4", "3.mp4"]
+
+    def test_completa_con_la_misma_pagina(self, mocker):
+        """
+        Prueba que una sola búsqueda con varios candidatos alcance para los dos clips.
+        """
+        mock_buscar = mocker.patch(
+            "llm_service.buscar_candidatos_pexels",
+            side_effect=lambda query, orientation="portrait": (
+                [_candidato(1), _candidato(2)] if query == "university campus students walking daytime" else []
+            )
+        )
+
+        urls = llm_service.buscar_video_pexels_inteligente(["university campus students walking daytime"])
+
+        assert urls == ["1.mp4", "2.mp4"]
+        assert mock_buscar.call_count == 1  # Sin fallback
+
+    def test_ordena_candidatos_por_orientacion_y_duracion(self):
+        """
+        Prueba el orden local: orientación, resolución, duración y luego relevancia.
+        """
+        candidatos = [
+            _candidato(1, width=1920, height=1080),
+            _candidato(2, duration=2),
+            _candidato(3, width=360, height=640),
+            _candidato(4),
+        ]
+
+        ordenados = llm_service.ordenar_candidatos(candidatos, "portrait")
+
+        assert [c["video_id"] for c in ordenados] == [4, 2, 3, 1]
+
+    def test_una_pagina_por_busqueda(self, mocker):
+        """
+        Prueba que se pida una página de candidatos y se cachee completa.
+        """
+        mocker.patch.dict(os.environ, {"PEXELS_API_KEY": "test"})
+        videos = [{"id": n, "duration": 10, "video_files": VIDEO_FILES} for n in (7, 8)]
+        mock_get = mocker.patch("llm_service.httpx.get", return_value=_respuesta_pexels(mocker, videos))
+
+        candidatos = llm_service.buscar_candidatos_pexels("university campus students")
+        llm_service.buscar_candidatos_pexels("university campus students")
+
+        assert mock_get.call_args.kwargs["params"]["per_page"] == llm_service.PEXELS_POR_PAGINA
+        assert [c["video_id"] for c in candidatos] == [7, 8]
+        assert mock_get.call_count == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
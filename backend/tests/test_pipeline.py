@@ -0,0 +1,157 @@
+"""
+Pruebas unitarias para el motor de publicación multi-red (fan-out)
+"""
+import pytest
+import asyncio
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import pipeline_service
+
+
+def _adaptacion_lenta(titulo, contenido, redes):
+    time.sleep(0.2)
+    return {red: {"text": f"{red}: {contenido}", "hashtags": ["#UAGRM"]} for red in redes}
+
+
+class TestPipelineFanOut:
+    """Pruebas para la ejecución concurrente por red"""
+
+    def test_redes_se_procesan_en_paralelo(self, mocker):
+        """
+        Prueba que el tiempo total sea cercano al de la red más lenta, no a la suma.
+        """
+        mock_multi = mocker.patch("pipeline_service.llm_service.adaptar_contenido_multi", side_effect=_adaptacion_lenta)
+
+        async def publicar_lento(**kwargs):
+            await asyncio.sleep(0.2)
+            return {"id": "123_456"}
+
+        mocker.patch("pipeline_service.social_services.post_to_facebook_async", side_effect=publicar_lento)
+        mocker.patch("pipeline_service.social_services.post_to_linkedin_async", side_effect=publicar_lento)
+        mocker.patch.dict(pipeline_service.LIMITES_PROVEEDOR, {"gemini": 4})
+
+        inicio = time.perf_counter()
+        procesadas = asyncio.run(
+            pipeline_service.publicar_en_paralelo("La FICCT anuncia inscripciones", ["facebook", "linkedin"])
+        )
+        duracion = time.perf_counter() - inicio
+
+        assert duracion < 0.7  # En serie serían ~0.8 segundos
+        assert mock_multi.call_count == 1  # Una sola llamada al LLM para ambas redes
+        assert [p["red"] for p in procesadas] == ["facebook", "linkedin"]
+        assert all(p["resultado"]["estado"] == "exitoso" for p in procesadas)
+
+        tiempos = procesadas[0]["tiempos"]
+        assert "adaptacion" in tiempos
+        assert "publicacion" in tiempos
+        assert "total" in tiempos
+
+    def test_limite_por_proveedor(self, mocker):
+        """
+        Prueba que el límite de un proveedor serialice sus llamadas.
+        """
+        activos = {"actual": 0, "maximo": 0}
+
+        def generar_contando(prompt):
+            activos["actual"] += 1
+            activos["maximo"] = max(activos["maximo"], activos["actual"])
+            time.sleep(0.05)
+            activos["actual"] -= 1
+            return None
+
+        mocker.patch(
+            "pipeline_service.llm_service.adaptar_contenido_multi",
+            side_effect=lambda titulo, contenido, redes: {red: {"text": "Hola"} for red in redes}
+        )
+        mocker.patch("imagen_service.generar_imagen", side_effect=generar_contando)
+        mocker.patch.dict(pipeline_service.LIMITES_PROVEEDOR, {"stability": 1})
+
+        async def dos_publicaciones():
+            return await asyncio.gather(
+                pipeline_service.publicar_en_paralelo("Texto uno", ["instagram"]),
+                pipeline_service.publicar_en_paralelo("Texto dos", ["instagram"]),
+            )
+
+        procesadas = [p for lote in asyncio.run(dos_publicaciones()) for p in lote]
+
+        assert activos["maximo"] == 1
+        assert all(p["resultado"]["estado"] == "error" for p in procesadas)
+
+    def test_una_imagen_por_publicacion(self, mocker):
+        """
+        Prueba que Instagram y WhatsApp usen variantes de la misma imagen maestra.
+        """
+        mocker.patch(
+            "pipeline_service.llm_service.adaptar_contenido_multi",
+            side_effect=lambda titulo, contenido, redes: {red: {"text": "Hola"} for red in redes}
+        )
+        mock_generar = mocker.patch(
+            "imagen_service.generar_imagen",
+            return_value={"bytes": b"png", "mime": "image/png", "proveedor": "stub"}
+        )
+        mocker.patch("activos_imagen.llm_service.publicar_imagen", return_value="https://api.ejemplo.com/media/a.png")
+        mocker.patch("imagen_redes.preparar", side_effect=lambda imagen, red: imagen)
+        mock_instagram = mocker.patch("pipeline_service.social_services.post_to_instagram_async", return_value={"id": "1"})
+        mock_whatsapp = mocker.patch("pipeline_service.social_services.post_whatsapp_status_async", return_value={"id": "2"})
+
+        asyncio.run(pipeline_service.publicar_en_paralelo("Texto", ["instagram", "whatsapp"]))
+
+        assert mock_generar.call_count == 1
+        assert mock_instagram.call_args.kwargs["image_url"] == "https://api.ejemplo.com/media/a.png"
+        assert mock_whatsapp.call_args.kwargs["image_url"].startswith("data:image/png;base64,")
+
+    def test_instagram_sin_imagen_reporta_error(self, mocker):
+        """
+        Prueba que Instagram no publique si no se generó la imagen.
+        """
+        mocker.patch("pipeline_service.llm_service.adaptar_contenido", return_value={"text": "Hola"})
+        mocker.patch("imagen_service.generar_imagen", side_effect=RuntimeError("sin proveedores"))
+        mock_post = mocker.patch("pipeline_service.social_services.post_to_instagram_async")
+
+        procesada = asyncio.run(pipeline_service.procesar_red("instagram", "Texto"))
+
+        assert not mock_post.called
+        assert procesada["resultado"]["estado"] == "error"
+        assert procesada["resultado"]["error"] == "No se pudo generar imagen"
+
+
+class TestPipelineChat:
+    """Pruebas para la tarea chat.publicar"""
+
+    def test_redes_del_chat_se_procesan_en_paralelo(self, mocker):
+        """
+        Prueba que la tarea del chat publique todas las redes a la vez y
+        conserve el orden de los resultados.
+        """
+        from chat import pipeline as chat_pipeline
+
+        mocker.patch("chat.pipeline.SessionLocal")
+        mocker.patch("chat.pipeline._guardar_respuesta", return_value=1)
+        formatear = mocker.patch("chat.pipeline.formatear_respuesta", return_value="")
+        mocker.patch("chat.pipeline.llm_service.validar_y_adaptar", return_value={
+            "validacion": {"es_academico": True},
+            "adaptaciones": {red: {"text": red} for red in ("facebook", "linkedin")},
+        })
+
+        def publicar_lento(texto, *args):
+            time.sleep(0.2)
+            return {"id": "123_456"}
+
+        mocker.patch("chat.pipeline.social_services.post_to_facebook", side_effect=publicar_lento)
+        mocker.patch("chat.pipeline.social_services.post_to_linkedin", side_effect=publicar_lento)
+
+        inicio = time.perf_counter()
+        chat_pipeline.publicar_desde_chat(mocker.MagicMock(), 1, "Inscripciones FICCT", ["facebook", "linkedin"])
+        duracion = time.perf_counter() - inicio
+
+        assert duracion < 0.35
+        assert [r["network"] for r in formatear.call_args[0][0]] == ["facebook", "linkedin"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
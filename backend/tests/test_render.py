@@ -0,0 +1,91 @@
+"""
+Pruebas unitarias para el render de videos de TikTok (FFmpeg)
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import llm_service
+
+
+class TestGrafoRender:
+    """Pruebas para construir_grafo_render y argumentos_render"""
+
+    def test_grafo_concatena_escala_y_acelera(self):
+        """
+        Prueba que el grafo escale cada clip, los concatene y acelere el audio.
+        """
+        grafo = llm_service.construir_grafo_render(2, velocidad_audio=1.5, ancho=540, alto=960, fps=25)
+
+        assert "[0:v]scale=540:960:force_original_aspect_ratio=increase,crop=540:960" in grafo
+        assert "[1:v]scale=540:960" in grafo
+        assert "[v0][v1]concat=n=2:v=1:a=0[video]" in grafo
+        assert "[2:a]atempo=1.5[audio]" in grafo
+
+    def test_grafo_sin_cambio_de_tempo(self):
+        """
+        Prueba que a velocidad 1.0 no se agregue atempo.
+        """
+        grafo = llm_service.construir_grafo_render(1, velocidad_audio=1.0)
+
+        assert "atempo" not in grafo
+        assert "[1:a]anull[audio]" in grafo
+
+    def test_argumentos_una_sola_salida_con_preset(self):
+        """
+        Prueba que haya una única salida, recortada a la duración, con el preset pedido.
+        """
+        args = llm_service.argumentos_render(
+            ["a.mp4", "b.mp4"], "voz.mp3", "final.mp4", 12.5,
+            velocidad_audio=1.5, preset="calidad"
+        )
+
+        assert args[:6] == ["-i", "a.mp4", "-i", "b.mp4", "-i", "voz.mp3"]
+        assert args.count("-filter_complex") == 1
+        assert args[args.index("-t") + 1] == "12.500"
+        assert args[args.index("-preset") + 1] == "medium"
+        assert args[-1] == "final.mp4"
+
+    def test_preset_desconocido_usa_rapido(self):
+        """
+        Prueba el respaldo cuando RENDER_PRESET no existe.
+        """
+        args = llm_service.argumentos_render(["a.mp4"], "voz.mp3", "final.mp4", 10, preset="inexistente")
+
+        assert args[args.index("-preset") + 1] == "ultrafast"
+
+
+class TestCombinarVideos:
+    """Pruebas para combinar_videos_con_audio"""
+
+    def test_una_sola_pasada_de_ffmpeg_y_limpieza(self, mocker, tmp_path):
+        """
+        Prueba que, sin caché de clips, se ejecute FFmpeg una vez y se borren
+        los clips descargados.
+        """
+        clips = []
+        for nombre in ("a.mp4", "b.mp4"):
+            ruta = tmp_path / nombre
+            ruta.write_bytes(b"clip")
+            clips.append(str(ruta))
+
+        mocker.patch("llm_service.cache_clips.CLIPS_CACHE_DESACTIVADO", True)
+        mocker.patch("llm_service.verificar_ffmpeg", return_value=True)
+        mocker.patch("llm_service.descargas.descargar_en_paralelo", return_value=clips)
+        mocker.patch("llm_service.media_probe.duracion", return_value=15.0)
+        mock_ffmpeg = mocker.patch("llm_service.ejecutar_ffmpeg_con_progreso")
+
+        salida = llm_service.combinar_videos_con_audio(["u1", "u2"], "voz.mp3", velocidad_audio=1.5)
+
+        assert salida
+        os.unlink(salida)
+        assert mock_ffmpeg.call_count == 1
+        assert mock_ffmpeg.call_args[0][1] == pytest.approx(10.0)  # 15 s de voz a x1.5
+        assert not any(os.path.exists(ruta) for ruta in clips)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,141 @@
+"""
+Pruebas unitarias para el pool de renders (FFmpeg)
+
+Se usan procesos de Python en lugar de FFmpeg: el pool solo agrega
+-threads antes del último argumento, que Python recibe en sys.argv.
+"""
+import pytest
+import subprocess
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import especulacion
+import render_service
+
+
+def _comando(codigo: str) -> list:
+    return [sys.executable, "-c", codigo, "salida.mp4"]
+
+
+class TestPoolRender:
+    """Pruebas para PoolRender"""
+
+    def test_agrega_threads_antes_de_la_salida(self):
+        """
+        Prueba que -threads quede justo antes del archivo de salida.
+        """
+        comando = render_service.con_hilos(["ffmpeg", "-i", "a.mp4", "-y", "b.mp4"], 3)
+
+        assert comando == ["ffmpeg", "-i", "a.mp4", "-y", "-threads", "3", "b.mp4"]
+
+    def test_reparte_cpus_entre_workers(self):
+        """
+        Prueba que cada render reciba su parte fija de los núcleos, también
+        el que arranca cuando no hay otros activos.
+        """
+        pool = render_service.PoolRender(workers=2, cpus=4)
+        codigo = "import sys, time; time.sleep(0.3); print(sys.argv[sys.argv.index('-threads') + 1])"
+        hilos = []
+
+        pool.ejecutar(_comando(codigo), al_linea=lambda linea: hilos.append(int(linea)))
+        futuros = [pool.enviar(_comando(codigo), al_linea=lambda linea: hilos.append(int(linea))) for _ in range(2)]
+        for futuro in futuros:
+            futuro.result(timeout=5)
+
+        assert hilos == [2, 2, 2]
+        assert pool.estadisticas()["completados"] == 3
+        pool.cerrar()
+
+    def test_limita_renders_simultaneos(self):
+        """
+        Prueba que con un worker los renders se ejecuten de a uno.
+        """
+        pool = render_service.PoolRender(workers=1, cpus=1)
+        inicio = time.perf_counter()
+
+        futuros = [pool.enviar(_comando("import time; time.sleep(0.2)")) for _ in range(2)]
+        time.sleep(0.05)
+        assert pool.estadisticas()["en_cola"] == 1
+        for futuro in futuros:
+            futuro.result(timeout=5)
+
+        assert time.perf_counter() - inicio >= 0.4
+        pool.cerrar()
+
+    def test_cola_llena_rechaza(self):
+        """
+        Prueba el backpressure cuando no queda lugar en la cola.
+        """
+        pool = render_service.PoolRender(workers=1, cpus=1, cola_max=0, espera_cola=0.05)
+        futuro = pool.enviar(_comando("import time; time.sleep(0.3)"))
+
+        with pytest.raises(render_service.ColaRenderLlena):
+            pool.enviar(_comando("pass"))
+
+        futuro.result(timeout=5)
+        assert pool.estadisticas()["rechazados"] == 1
+        pool.cerrar()
+
+    def test_timeout_mata_el_proceso(self):
+        """
+        Prueba que un render que excede su tiempo se detenga.
+        """
+        pool = render_service.PoolRender(workers=1, cpus=1)
+        inicio = time.perf_counter()
+
+        with pytest.raises(render_service.RenderTimeout):
+            pool.ejecutar(_comando("import time; time.sleep(10)"), timeout=0.2)
+
+        assert time.perf_counter() - inicio < 5
+        assert pool.estadisticas()["timeouts"] == 1
+        pool.cerrar()
+
+    def test_cancelacion_con_token(self):
+        """
+        Prueba que el token detenga un render en curso.
+        """
+        pool = render_service.PoolRender(workers=1, cpus=1)
+        token = especulacion.TokenCancelacion()
+        codigo = "import time\nfor i in range(100):\n    print(i, flush=True)\n    time.sleep(0.05)"
+
+        threading.Timer(0.2, token.cancelar).start()
+        with pytest.raises(especulacion.Cancelado):
+            pool.ejecutar(_comando(codigo), cancelacion=token)
+
+        assert pool.estadisticas()["cancelados"] == 1
+        pool.cerrar()
+
+    def test_error_de_proceso(self):
+        """
+        Prueba que un código de salida distinto de cero se reporte como antes.
+        """
+        pool = render_service.PoolRender(workers=1, cpus=1)
+
+        with pytest.raises(subprocess.CalledProcessError):
+            pool.ejecutar(_comando("import sys; sys.exit(1)"))
+
+        assert pool.estadisticas()["fallidos"] == 1
+        pool.cerrar()
+
+    def test_stderr_abundante_no_bloquea(self):
+        """
+        Prueba que un proceso que escribe mucho en stderr antes de cerrar
+        stdout termine, y que su stderr se devuelva completo.
+        """
+        pool = render_service.PoolRender(workers=1, cpus=1)
+        codigo = "import sys\nsys.stderr.write('x' * 1000000)\nsys.stderr.flush()\nprint('listo')"
+
+        stderr = pool.ejecutar(_comando(codigo), timeout=5)
+
+        assert len(stderr) == 1000000
+        assert pool.estadisticas()["completados"] == 1
+        pool.cerrar()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
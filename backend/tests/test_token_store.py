@@ -0,0 +1,115 @@
+"""
+Pruebas unitarias para el almacén de tokens de sesión
+"""
+import pytest
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from auth import auth_service, token_store
+from auth.models import Base, User
+
+
+@pytest.fixture
+def store_postgres(tmp_path):
+    """StorePostgres sobre SQLite, con la misma tabla auth_tokens"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'tokens.db'}")
+    Base.metadata.create_all(bind=engine)
+    return token_store.StorePostgres(sessionmaker(bind=engine))
+
+
+@pytest.fixture(params=["memoria", "postgres"])
+def store(request, store_postgres):
+    if request.param == "postgres":
+        return store_postgres
+    return token_store.StoreMemoria()
+
+
+class TestTokenStore:
+    """Pruebas comunes a los backends memoria y postgres"""
+
+    def test_guardar_y_obtener(self, store):
+        """
+        Prueba que un token guardado devuelva su usuario.
+        """
+        store.guardar("abc", 7, ttl=60)
+
+        assert store.obtener("abc") == 7
+        assert store.obtener("otro") is None
+
+    def test_expira_con_ttl(self, store):
+        """
+        Prueba que el token deje de ser válido al cumplirse su TTL.
+        """
+        store.guardar("abc", 7, ttl=1)
+        time.sleep(1.1)
+
+        assert store.obtener("abc") is None
+
+    def test_revocar(self, store):
+        """
+        Prueba el logout de un solo token.
+        """
+        store.guardar("abc", 7, ttl=60)
+
+        assert store.revocar("abc") is True
+        assert store.revocar("abc") is False
+        assert store.obtener("abc") is None
+
+    def test_revocar_usuario(self, store):
+        """
+        Prueba que se revoquen todas las sesiones de un usuario y no las de otro.
+        """
+        store.guardar("a1", 1, ttl=60)
+        store.guardar("a2", 1, ttl=60)
+        store.guardar("b1", 2, ttl=60)
+
+        assert store.revocar_usuario(1) == 2
+        assert store.obtener("a1") is None and store.obtener("a2") is None
+        assert store.obtener("b1") == 2
+
+
+class TestAuthService:
+    """Pruebas de auth_service con un store compartido"""
+
+    def test_otro_worker_ve_el_token(self, mocker, store_postgres):
+        """
+        Prueba que un token creado por un worker sea válido en otro (mismo store).
+        """
+        mocker.patch("auth.auth_service.tokens", store_postgres)
+        mocker.patch("auth.auth_service.cache_usuarios.obtener", return_value=None)
+        usuario = User(id=5, username="ana", email="ana@uagrm.edu.bo", hashed_password="x", is_active=True)
+        db = mocker.MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = usuario
+
+        token = auth_service.create_access_token(usuario)
+        otro_worker = token_store.StorePostgres(store_postgres._sesion)
+
+        assert otro_worker.obtener(token) == 5
+        assert auth_service.verify_token(token, db).username == "ana"
+
+    def test_store_caido_no_autentica(self, mocker):
+        """
+        Prueba que si el store falla, el token se rechace en vez de dar un 500.
+        """
+        store = mocker.MagicMock()
+        store.obtener.side_effect = ConnectionError("redis caído")
+        mocker.patch("auth.auth_service.tokens", store)
+
+        assert auth_service.verify_token("abc", mocker.MagicMock()) is None
+
+    def test_backend_desconocido(self):
+        """
+        Prueba que un TOKEN_STORE mal escrito falle al arrancar.
+        """
+        with pytest.raises(ValueError):
+            token_store.crear_store("memcached")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,180 @@
+"""
+Pruebas unitarias para los tokens de acceso firmados (JWT)
+"""
+import pytest
+import sys
+import os
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from auth import auth_service, tokens_firmados
+from auth.models import User
+
+
+@pytest.fixture
+def modo_jwt(mocker):
+    """AUTH_TOKEN_MODE=jwt con dos claves y una lista de revocación nueva"""
+    mocker.patch("auth.tokens_firmados.AUTH_TOKEN_MODE", "jwt")
+    mocker.patch("auth.tokens_firmados.CLAVES", tokens_firmados.cargar_claves("nueva:secreto-nuevo,vieja:secreto-viejo"))
+    mocker.patch("auth.tokens_firmados.revocados", tokens_firmados.ListaRevocacion("memoria"))
+
+
+def _usuario(**campos):
+    datos = {"id": 5, "username": "ana", "email": "ana@uagrm.edu.bo", "hashed_password": "x",
+             "is_active": True, "created_at": datetime(2025, 3, 1, 12, 0)}
+    datos.update(campos)
+    return User(**datos)
+
+
+class TestTokensFirmados:
+    """Pruebas para emitir, verificar y revocar tokens firmados"""
+
+    def test_verifica_sin_db(self, mocker, modo_jwt):
+        """
+        Prueba que el token se valide solo con la firma, sin consultar la DB.
+        """
+        db = mocker.MagicMock()
+        token = auth_service.create_access_token(_usuario())
+
+        usuario = auth_service.verify_token(token, db)
+
+        assert usuario.id == 5 and usuario.username == "ana"
+        assert usuario.created_at == datetime(2025, 3, 1, 12, 0)
+        db.query.assert_not_called()
+
+    def test_rotacion_de_claves(self, mocker, modo_jwt):
+        """
+        Prueba que un token firmado con una clave anterior siga siendo válido,
+        y que uno con una clave retirada no.
+        """
+        mocker.patch("auth.tokens_firmados.CLAVES", tokens_firmados.cargar_claves("vieja:secreto-viejo"))
+        token_viejo = tokens_firmados.emitir(_usuario())
+        mocker.patch("auth.tokens_firmados.CLAVES", tokens_firmados.cargar_claves("nueva:secreto-nuevo,vieja:secreto-viejo"))
+
+        assert tokens_firmados.verificar(token_viejo).id == 5
+
+        mocker.patch("auth.tokens_firmados.CLAVES", tokens_firmados.cargar_claves("nueva:secreto-nuevo"))
+        assert tokens_firmados.verificar(token_viejo) is None
+
+    def test_rechaza_firma_alterada_y_expirado(self, modo_jwt):
+        """
+        Prueba que no se acepten tokens manipulados ni vencidos.
+        """
+        token = tokens_firmados.emitir(_usuario())
+        cabecera, claims, firma = token.split(".")
+        alterado = f"{cabecera}.{claims}.{firma[:-2]}xx"
+        expirado = tokens_firmados.emitir(_usuario(), ttl=-1)
+
+        assert tokens_firmados.verificar(alterado) is None
+        assert tokens_firmados.verificar(expirado) is None
+
+    def test_usuario_inactivo(self, modo_jwt):
+        """
+        Prueba que el claim de usuario activo se respete.
+        """
+        token = tokens_firmados.emitir(_usuario(is_active=False))
+
+        assert tokens_firmados.verificar(token) is None
+
+    def test_logout_revoca_jti(self, modo_jwt):
+        """
+        Prueba que el logout invalide ese token y no otros del mismo usuario.
+        """
+        primero = auth_service.create_access_token(_usuario())
+        segundo = auth_service.create_access_token(_usuario())
+
+        assert auth_service.logout_user(primero) is True
+        assert tokens_firmados.verificar(primero) is None
+        assert tokens_firmados.verificar(segundo) is not None
+
+    def test_logout_all_invalida_los_emitidos(self, mocker, modo_jwt):
+        """
+        Prueba que logout-all invalide todos los tokens firmados del usuario.
+        """
+        mocker.patch("auth.auth_service.tokens", mocker.MagicMock())
+        token = auth_service.create_access_token(_usuario())
+        otro = auth_service.create_access_token(_usuario(id=6))
+
+        auth_service.logout_all(5)
+
+        assert tokens_firmados.verificar(token) is None
+        assert tokens_firmados.verificar(otro).id == 6
+
+    def test_login_inmediato_tras_logout_all(self, mocker, modo_jwt):
+        """
+        Prueba que un login hecho en el mismo segundo que logout-all sea válido
+        y que los tokens anteriores sigan revocados.
+        """
+        mocker.patch("auth.auth_service.tokens", mocker.MagicMock())
+        segundo = int(time.time()) * 1_000_000_000
+        mocker.patch("auth.tokens_firmados.time.time_ns", side_effect=[
+            segundo + 100_000_000,  # emisión del token viejo
+            segundo + 400_000_000,  # logout-all
+            segundo + 700_000_000,  # login inmediato
+        ])
+        viejo = auth_service.create_access_token(_usuario())
+        auth_service.logout_all(5)
+        nuevo = auth_service.create_access_token(_usuario())
+
+        assert tokens_firmados.verificar(viejo) is None
+        assert tokens_firmados.verificar(nuevo).id == 5
+
+    def test_vida_corta_por_defecto(self, modo_jwt):
+        """
+        Prueba que el token venza en JWT_TTL (minutos, no días).
+        """
+        claims = tokens_firmados.decodificar(tokens_firmados.emitir(_usuario()))
+
+        assert claims["exp"] - claims["iat"] == tokens_firmados.JWT_TTL
+        if "JWT_TTL_SEGUNDOS" not in os.environ and "JWT_TTL_MINUTOS" not in os.environ:
+            assert tokens_firmados.JWT_TTL == 15 * 60
+
+    def test_revocacion_en_memoria_con_varios_workers(self):
+        """
+        Prueba que JWT_REVOCACION=memoria con más de un worker falle al arrancar.
+        """
+        with pytest.raises(ValueError):
+            tokens_firmados.comprobar_revocacion("memoria", workers=4)
+
+        tokens_firmados.comprobar_revocacion("memoria", workers=1)
+        tokens_firmados.comprobar_revocacion("redis", workers=4)
+
+    def test_desactivar_usuario_revoca_sus_tokens(self, modo_jwt, tmp_path):
+        """
+        Prueba que un usuario desactivado no siga entrando con un token ya emitido.
+        """
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from auth.models import Base
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'usuarios.db'}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        db.add(_usuario())
+        db.commit()
+        usuario = db.query(User).filter(User.id == 5).first()
+        token = tokens_firmados.emitir(usuario)
+
+        usuario.is_active = False
+        db.commit()
+        db.close()
+
+        assert tokens_firmados.verificar(token) is None
+
+    def test_sin_claves_falla_al_emitir(self, mocker, modo_jwt):
+        """
+        Prueba que AUTH_TOKEN_MODE=jwt sin JWT_KEYS sea un error explícito.
+        """
+        mocker.patch("auth.tokens_firmados.CLAVES", {})
+
+        with pytest.raises(ValueError):
+            auth_service.create_access_token(_usuario())
+
+        with pytest.raises(ValueError):
+            tokens_firmados.cargar_claves("sin-separador")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
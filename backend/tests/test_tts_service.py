@@ -0,0 +1,141 @@
+"""
+Pruebas unitarias para la síntesis de voz por oraciones
+"""
+import pytest
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import cache_clips
+import tts_service
+
+# MPEG-2 Layer III, 32 kbps, 24 kHz, mono (como gTTS): 96 bytes y 24 ms por frame
+ENCABEZADO_FRAME = bytes([0xFF, 0xF3, 0x44, 0xC4])
+
+
+def _frames(cantidad: int, relleno: bytes = b"\x00") -> bytes:
+    return (ENCABEZADO_FRAME + relleno * 92) * cantidad
+
+
+class MotorFalso(tts_service.MotorTTS):
+    """Escribe 50 frames por oración (1.2 s) con el primer carácter como relleno"""
+
+    nombre = "falso"
+
+    def __init__(self, espera: float = 0.0):
+        self.espera = espera
+        self.oraciones = []
+        self.simultaneos = 0
+        self.max_simultaneos = 0
+        self._lock = threading.Lock()
+
+    def sintetizar(self, texto, idioma, destino):
+        with self._lock:
+            self.oraciones.append(texto)
+            self.simultaneos += 1
+            self.max_simultaneos = max(self.max_simultaneos, self.simultaneos)
+        time.sleep(self.espera)
+        with open(destino, "wb") as archivo:
+            archivo.write(b"ID3\x03\x00\x00\x00\x00\x00\x00" + _frames(50, texto[0].encode()))
+        with self._lock:
+            self.simultaneos -= 1
+
+
+@pytest.fixture(autouse=True)
+def cache_temporal(mocker, tmp_path):
+    cache = cache_clips.CacheClips(str(tmp_path / "audio"), max_mb=10, extension=".mp3")
+    mocker.patch("cache_audio.cache", cache)
+    return cache
+
+
+class TestTTSService:
+    """Pruebas para dividir_en_oraciones y sintetizar_narracion"""
+
+    def test_divide_y_junta_oraciones_cortas(self):
+        """
+        Prueba que las oraciones muy cortas se unan a la siguiente.
+        """
+        oraciones = tts_service.dividir_en_oraciones(
+            "¡Hola! La universidad abre sus inscripciones hoy. ¿Qué esperas para anotarte ya?",
+            min_caracteres=20
+        )
+
+        assert oraciones == [
+            "¡Hola! La universidad abre sus inscripciones hoy.",
+            "¿Qué esperas para anotarte ya?",
+        ]
+
+    def test_concatena_en_orden_sin_encabezados_intermedios(self):
+        """
+        Prueba que el resultado tenga las oraciones en orden y solo frames de audio.
+        """
+        motor = MotorFalso()
+        texto = "Abren las inscripciones del segundo semestre. Bienvenidos todos los estudiantes nuevos."
+
+        ruta = tts_service.sintetizar_narracion(texto, motor_tts=motor)
+        datos = open(ruta, "rb").read()
+        os.unlink(ruta)
+
+        assert b"ID3" not in datos
+        assert datos[4:5] == b"A" and datos[50 * 96 + 4:50 * 96 + 5] == b"B"
+        assert len(datos) == 100 * 96
+
+    def test_sintetiza_en_paralelo_con_limite(self, mocker):
+        """
+        Prueba que las oraciones se pidan en paralelo sin superar el pool.
+        """
+        mocker.patch("tts_service._pool", tts_service.ThreadPoolExecutor(max_workers=2))
+        motor = MotorFalso(espera=0.1)
+        texto = " ".join(f"Oración número {n} de la narración del video." for n in range(4))
+
+        inicio = time.perf_counter()
+        os.unlink(tts_service.sintetizar_narracion(texto, motor_tts=motor))
+
+        assert motor.max_simultaneos == 2
+        assert time.perf_counter() - inicio < 0.35
+
+    def test_oraciones_repetidas_salen_de_la_cache(self):
+        """
+        Prueba que al cambiar una oración solo esa se vuelva a sintetizar.
+        """
+        motor = MotorFalso()
+        os.unlink(tts_service.sintetizar_narracion(
+            "Abren las inscripciones del segundo semestre. Bienvenidos todos los estudiantes nuevos.", motor_tts=motor
+        ))
+        os.unlink(tts_service.sintetizar_narracion(
+            "Abren las inscripciones del segundo semestre. Cierran el viernes a medianoche, no lo olvides.", motor_tts=motor
+        ))
+
+        assert motor.oraciones[2:] == ["Cierran el viernes a medianoche, no lo olvides."]
+
+    def test_desalojo_concurrente_no_rompe_la_lectura(self, mocker, cache_temporal):
+        """
+        Prueba que si la caché desaloja una oración justo después de encontrarla,
+        la narración se arme igual (copia de trabajo o nueva síntesis).
+        """
+        motor = MotorFalso()
+        texto = "Abren las inscripciones del segundo semestre."
+        os.unlink(tts_service.sintetizar_narracion(texto, motor_tts=motor))
+
+        obtener = cache_temporal.obtener
+
+        def obtener_y_desalojar(*clave):
+            ruta = obtener(*clave)
+            if ruta:
+                os.unlink(ruta)
+            return ruta
+
+        mocker.patch.object(cache_temporal, "obtener", side_effect=obtener_y_desalojar)
+        salida = tts_service.sintetizar_narracion(texto, motor_tts=motor)
+
+        assert os.path.getsize(salida) > 0
+        assert len(motor.oraciones) == 2
+        os.unlink(salida)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
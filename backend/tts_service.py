@@ -0,0 +1,146 @@
+"""
+Síntesis de voz por oraciones
+
+gTTS sintetiza la narración completa en una sola llamada bloqueante (y por
+dentro hace una petición por cada trozo de ~100 caracteres, en serie).
+Acá la narración se divide en oraciones que se sintetizan en paralelo con
+un pool acotado (TTS_WORKERS) y se cachean una por una en cache_audio: si
+el guión cambia en una oración, solo esa se vuelve a pedir.
+
+Los MP3 de un mismo motor comparten formato, así que se concatenan frame a
+frame en orden (sin recodificar) a medida que cada oración está lista.
+
+- MotorTTS: interfaz de un motor (texto → archivo MP3); MotorGTTS por defecto
+"""
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import cache_audio
+import media_probe
+
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", 4))
+# Oraciones más cortas se juntan con la siguiente (una petición menos)
+TTS_MIN_CARACTERES = int(os.getenv("TTS_MIN_CARACTERES", 40))
+
+_pool = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+
+
+class MotorTTS:
+    """Interfaz de un motor de síntesis de voz"""
+
+    nombre = "base"
+
+    def sintetizar(self, texto: str, idioma: str, destino: str):
+        """Escribe en `destino` el MP3 con `texto` leído en `idioma`"""
+        raise NotImplementedError
+
+
+class MotorGTTS(MotorTTS):
+    """Google Translate TTS (gTTS)"""
+
+    nombre = "gtts"
+
+    def sintetizar(self, texto: str, idioma: str, destino: str):
+        from gtts import gTTS
+        gTTS(text=texto, lang=idioma, slow=False).save(destino)
+
+
+motor = MotorGTTS()
+
+
+def dividir_en_oraciones(texto: str, min_caracteres: int = None) -> list:
+    """Divide por . ! ? … y junta las oraciones muy cortas con la siguiente"""
+    min_caracteres = TTS_MIN_CARACTERES if min_caracteres is None else min_caracteres
+    partes = [p.strip() for p in re.split(r"(?<=[.!?…])\s+", " ".join(texto.split())) if p.strip()]
+
+    oraciones = []
+    pendiente = ""
+    for parte in partes:
+        pendiente = f"{pendiente} {parte}".strip()
+        if len(pendiente) >= min_caracteres:
+            oraciones.append(pendiente)
+            pendiente = ""
+    if pendiente:
+        if oraciones:
+            oraciones[-1] = f"{oraciones[-1]} {pendiente}"
+        else:
+            oraciones.append(pendiente)
+    return oraciones
+
+
+def _copiar_frames(origen, destino):
+    """Copia solo los frames de audio (sin ID3 ni encabezado Xing/Info)"""
+    origen.seek(media_probe.saltar_id3(origen.read(10)))
+    inicio = origen.tell()
+    frame = media_probe.primer_frame_mp3(origen.read(64 * 1024))
+    if frame:
+        inicio += frame["posicion"] + (frame["largo"] if frame["cabecera_vbr"] else 0)
+    origen.seek(inicio)
+    shutil.copyfileobj(origen, destino)
+
+
+def _sintetizar_oracion(oracion: str, idioma: str, motor_tts: MotorTTS) -> str:
+    """
+    Ruta de un MP3 propio (a borrar por quien lo recibe). Un acierto es una
+    copia de trabajo de la caché, así un desalojo concurrente no lo borra
+    antes de leerlo; si se desalojó antes de copiarlo, se sintetiza de nuevo.
+    """
+    ruta = cache_audio.obtener(oracion, idioma, 1.0, motor_tts.nombre)
+    if ruta:
+        return ruta
+
+    destino = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3").name
+    try:
+        motor_tts.sintetizar(oracion, idioma, destino)
+    except BaseException:
+        os.unlink(destino)
+        raise
+    cache_audio.guardar(destino, oracion, idioma, 1.0, motor_tts.nombre)
+    return destino
+
+
+def _descartar(futuro):
+    if futuro.cancelled() or futuro.exception():
+        return
+    ruta = futuro.result()
+    if os.path.exists(ruta):
+        os.unlink(ruta)
+
+
+def sintetizar_narracion(texto: str, idioma: str = "es", motor_tts: MotorTTS = None) -> str:
+    """
+    Sintetiza `texto` oración por oración (en paralelo) y devuelve la ruta
+    de un MP3 temporal con todas las oraciones en orden.
+    """
+    motor_tts = motor_tts or motor
+    oraciones = dividir_en_oraciones(texto)
+    print(f"🗣️ Sintetizando {len(oraciones)} oraciones con {motor_tts.nombre} ({TTS_WORKERS} en paralelo)...")
+
+    futuros = [_pool.submit(_sintetizar_oracion, oracion, idioma, motor_tts) for oracion in oraciones]
+    salida = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3").name
+    try:
+        with open(salida, "wb") as destino:
+            # Se escribe cada oración apenas está lista, respetando el orden
+            for futuro in futuros:
+                ruta = futuro.result()
+                try:
+                    with open(ruta, "rb") as origen:
+                        if len(futuros) == 1:
+                            shutil.copyfileobj(origen, destino)
+                        else:
+                            # Los encabezados de cada oración describen solo a esa oración
+                            _copiar_frames(origen, destino)
+                finally:
+                    os.unlink(ruta)
+    except BaseException:
+        # Las oraciones que aún no se leyeron se cancelan o se borran al terminar
+        for futuro in futuros:
+            futuro.cancel()
+            futuro.add_done_callback(_descartar)
+        os.unlink(salida)
+        raise
+
+    return salida
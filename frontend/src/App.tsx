@@ -1,10 +1,11 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import './App.css';
 import Login from './auth/Login';
 import ChatSidebar from './components/ChatSidebar';
 import ChatArea from './components/ChatArea';
 import { Menu } from 'lucide-react';
 import { API_ENDPOINTS, getAuthHeaders } from './config/api'; // ✅ IMPORTAR
+import { readEventStream, FINAL_EVENT_TYPES, type ProgressEvent } from './lib/sse';
 
 // Tipos
 export interface Conversation {
@@ -19,6 +20,10 @@ export interface Message {
   content: string;
 }
 
+// Respaldo por polling: intervalo y tiempo máximo de espera de un job
+const JOB_POLL_INTERVAL_MS = 2000;
+const JOB_POLL_MAX_MS = 10 * 60 * 1000;
+
 function App() {
   // Auth State
   const [isAuthenticated, setIsAuthenticated] = useState<boolean>(false);
@@ -30,11 +35,24 @@ function App() {
   const [currentConversationId, setCurrentConversationId] = useState<number | null>(null);
   const [messages, setMessages] = useState<Message[]>([]);
   const [isLoading, setIsLoading] = useState<boolean>(false);
+  const [progressEvents, setProgressEvents] = useState<ProgressEvent[]>([]);
   const [isSidebarOpen, setIsSidebarOpen] = useState(true);
 
   // Social Media State
   const [selectedNetworks, setSelectedNetworks] = useState<string[]>(['facebook', 'instagram']);
 
+  // Polling de jobs: se detiene al desmontar el componente
+  const pollingCancelled = useRef(false);
+  const pollingTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
+
+  useEffect(() => {
+    pollingCancelled.current = false;
+    return () => {
+      pollingCancelled.current = true;
+      if (pollingTimer.current) clearTimeout(pollingTimer.current);
+    };
+  }, []);
+
   // --- Auth Effects ---
   useEffect(() => {
     const savedToken = localStorage.getItem('token');
@@ -138,6 +156,7 @@ function App() {
     const userMsg: Message = { role: 'user', content };
     setMessages(prev => [...prev, userMsg]);
     setIsLoading(true);
+    setProgressEvents([]);
 
     try {
       const res = await fetch(API_ENDPOINTS.CONVERSATION_MESSAGES(convId), {
@@ -151,42 +170,72 @@ function App() {
       });
 
       if (res.ok) {
-        let attempts = 0;
-        const maxAttempts = 15;
+        const sentMsg = await res.json();
 
-        const pollMessages = async () => {
-          if (attempts >= maxAttempts) {
-            setIsLoading(false);
+        const refreshMessages = async () => {
+          await fetchMessages(convId!);
+          setIsLoading(false);
+          fetchConversations();
+        };
+
+        // Sin job (no se seleccionaron redes): no hay respuesta que esperar
+        if (!sentMsg.job_id) {
+          await refreshMessages();
+          return;
+        }
+
+        // El backend procesa en segundo plano: seguir el progreso en vivo (SSE)
+        try {
+          const lastEvent = await readEventStream(
+            API_ENDPOINTS.JOB_EVENTS(sentMsg.job_id),
+            { headers: getAuthHeaders(token) },
+            (event) => setProgressEvents(prev => [...prev, event])
+          );
+
+          if (lastEvent && FINAL_EVENT_TYPES.includes(lastEvent.tipo)) {
+            await refreshMessages();
+            return;
+          }
+        } catch (e) {
+          console.error("Event stream error, falling back to polling", e);
+        }
+
+        // Respaldo: consultar el estado del job (con tiempo máximo)
+        const pollDeadline = Date.now() + JOB_POLL_MAX_MS;
+        const pollJob = async () => {
+          if (pollingCancelled.current) return;
+          if (Date.now() > pollDeadline) {
+            console.error("Job polling timed out", sentMsg.job_id);
+            await refreshMessages();
             return;
           }
-
           try {
-            const msgsRes = await fetch(API_ENDPOINTS.CONVERSATION_DETAIL(convId!), {
+            const jobRes = await fetch(API_ENDPOINTS.JOB_STATUS(sentMsg.job_id), {
               headers: getAuthHeaders(token)
             });
 
-            if (msgsRes.ok) {
-              const data = await msgsRes.json();
-              const newMessages = data.messages || [];
-              const lastMsg = newMessages[newMessages.length - 1];
-
-              if (lastMsg && lastMsg.role === 'assistant') {
-                setMessages(newMessages);
-                setIsLoading(false);
-                fetchConversations();
-              } else {
-                attempts++;
-                setTimeout(pollMessages, 2000);
+            if (jobRes.ok) {
+              const job = await jobRes.json();
+              if (job.estado === 'completado' || job.estado === 'error') {
+                await refreshMessages();
+                return;
               }
+            } else if (jobRes.status === 404) {
+              // Job no visible en este worker: recargar la conversación
+              await refreshMessages();
+              return;
             }
           } catch (e) {
             console.error("Polling error", e);
-            attempts++;
-            setTimeout(pollMessages, 2000);
+          }
+          if (!pollingCancelled.current) {
+            pollingTimer.current = setTimeout(pollJob, JOB_POLL_INTERVAL_MS);
           }
         };
 
-        setTimeout(pollMessages, 2000);
+        pollingTimer.current = setTimeout(pollJob, JOB_POLL_INTERVAL_MS);
+      } else {
+        setIsLoading(false);
       }
 
     } catch (err) {
@@ -257,6 +306,7 @@ function App() {
           messages={messages}
           onSendMessage={sendMessage}
           isLoading={isLoading}
+          progressEvents={progressEvents}
           selectedNetworks={selectedNetworks}
           setSelectedNetworks={setSelectedNetworks}
         />
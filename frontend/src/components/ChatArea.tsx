@@ -2,6 +2,7 @@ import React, { useState, useRef, useEffect } from 'react';
 import { Send, Bot, User, Facebook, Instagram, Video, Loader2, Linkedin, MessageCircle, Check } from 'lucide-react';
 import { cn } from '../lib/utils';
 import type { Message } from '../App';
+import type { ProgressEvent } from '../lib/sse';
 import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 
@@ -9,6 +10,7 @@ interface ChatAreaProps {
     messages: Message[];
     onSendMessage: (content: string) => void;
     isLoading: boolean;
+    progressEvents?: ProgressEvent[];
     selectedNetworks: string[];
     setSelectedNetworks: (networks: string[]) => void;
 }
@@ -17,6 +19,7 @@ export default function ChatArea({
     messages,
     onSendMessage,
     isLoading,
+    progressEvents = [],
     selectedNetworks,
     setSelectedNetworks
 }: ChatAreaProps) {
@@ -30,7 +33,20 @@ export default function ChatArea({
 
     useEffect(() => {
         scrollToBottom();
-    }, [messages, isLoading]);
+    }, [messages, isLoading, progressEvents]);
+
+    // Último estado conocido de cada red según los eventos del pipeline
+    const validation = progressEvents.find(e => e.tipo === 'validacion_completa');
+    const networkProgress: Record<string, string> = {};
+    for (const event of progressEvents) {
+        if (!event.red) continue;
+        if (event.tipo === 'adaptacion') networkProgress[event.red] = 'Adapting content...';
+        if (event.tipo === 'adaptacion_lista') networkProgress[event.red] = 'Content ready';
+        if (event.tipo === 'imagen') networkProgress[event.red] = 'Generating image...';
+        if (event.tipo === 'imagen_lista') networkProgress[event.red] = event.ok ? 'Image ready' : 'Image failed';
+        if (event.tipo === 'video_progreso') networkProgress[event.red] = `Rendering video ${event.porcentaje ?? 0}%`;
+        if (event.tipo === 'publicacion') networkProgress[event.red] = event.ok ? '✅ Published' : `❌ ${event.error ?? 'Failed'}`;
+    }
 
     const handleSend = () => {
         if (!input.trim() || isLoading) return;
@@ -162,8 +178,16 @@ export default function ChatArea({
                         <div className="w-8 h-8 rounded-sm bg-green-600 flex-shrink-0 flex items-center justify-center mt-1">
                             <Bot size={18} className="text-white" />
                         </div>
-                        <div className="flex items-center mt-2">
+                        <div className="flex flex-col gap-1 mt-2 text-xs text-gray-400">
                             <Loader2 size={16} className="animate-spin text-gray-400" />
+                            {validation && (
+                                <div>{validation.es_academico ? '✅ Content validated' : '⚠️ Content not academic'}</div>
+                            )}
+                            {Object.entries(networkProgress).map(([network, status]) => (
+                                <div key={network}>
+                                    <span className="capitalize font-medium text-gray-300">{network}</span>: {status}
+                                </div>
+                            ))}
                         </div>
                     </div>
                 )}
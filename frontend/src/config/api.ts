@@ -26,6 +26,10 @@ export const API_ENDPOINTS = {
   CONVERSATION_DETAIL: (id: number) => `${API_BASE_URL}/api/chat/conversations/${id}`,
   CONVERSATION_MESSAGES: (id: number) => `${API_BASE_URL}/api/chat/conversations/${id}/messages`,
   DELETE_CONVERSATION: (id: number) => `${API_BASE_URL}/api/chat/conversations/${id}`,
+
+  // Jobs en segundo plano
+  JOB_STATUS: (jobId: string) => `${API_BASE_URL}/api/jobs/${jobId}`,
+  JOB_EVENTS: (jobId: string) => `${API_BASE_URL}/api/jobs/${jobId}/eventos`,
 };
 
 // Helper para headers con autenticación
@@ -0,0 +1,74 @@
+/**
+ * 📡 Lector de Server-Sent Events sobre fetch
+ *
+ * EventSource no permite enviar el header Authorization, así que se lee
+ * el stream text/event-stream manualmente.
+ */
+
+export interface ProgressEvent {
+  tipo: string;
+  ts?: number;
+  red?: string;
+  ok?: boolean;
+  texto?: string;
+  url?: string | null;
+  link?: string | null;
+  porcentaje?: number;
+  es_academico?: boolean;
+  razon?: string;
+  error?: any;
+  resultado?: any;
+}
+
+export const FINAL_EVENT_TYPES = ['completado', 'error'];
+
+/**
+ * Lee un stream SSE y llama a onEvent por cada evento recibido.
+ * Resuelve con el último evento cuando el servidor cierra el stream.
+ */
+export async function readEventStream(
+  url: string,
+  init: RequestInit,
+  onEvent: (event: ProgressEvent) => void
+): Promise<ProgressEvent | null> {
+  const res = await fetch(url, init);
+  if (!res.ok || !res.body) {
+    throw new Error(`SSE request failed: ${res.status}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let lastEvent: ProgressEvent | null = null;
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+
+    // Los eventos se separan con una línea en blanco
+    let separator;
+    while ((separator = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, separator);
+      buffer = buffer.slice(separator + 2);
+
+      const data = frame
+        .split('\n')
+        .filter(line => line.startsWith('data:'))
+        .map(line => line.slice(5).trim())
+        .join('\n');
+
+      if (!data) continue; // keepalive
+
+      try {
+        lastEvent = JSON.parse(data);
+        onEvent(lastEvent!);
+      } catch (e) {
+        console.error('Invalid SSE payload', e);
+      }
+    }
+  }
+
+  return lastEvent;
+}